@@ -91,6 +91,41 @@ function App() {
     }
   };
 
+  // Scene images and voice clips generate in the background; wait for each job and apply its result
+  const awaitAssetJob = async (name, jobId) => {
+    try {
+      for (let attempt = 0; attempt < 10; attempt++) {
+        const job = await api.get(`/jobs/${jobId}/wait`)
+        if (job.status === 'failed') return
+        if (job.status === 'done') {
+          // A roll's action image is shown in place of the scene image
+          const slot = name === 'action_image' ? 'scene_image' : name
+          const value = slot === 'scene_image' ? job.result.image_url : job.result
+          if (slot === 'scene_image' && !value) return
+          setAssets(prev => ({ ...prev, [slot]: value }))
+          if (name === 'voice_audio' && window.playVoice) {
+            window.playVoice(value);
+          }
+          return
+        }
+      }
+    } catch (err) {
+      console.error(`Waiting for ${name} failed:`, err)
+    }
+  }
+
+  // Apply finished assets at once and wait on the jobs still generating the rest
+  const applyAssets = (assets) => {
+    const { jobs = {}, action_image, ...ready } = assets
+    Object.keys(jobs).forEach(name => delete ready[name])
+    if (action_image) ready.scene_image = action_image
+    setAssets(prev => ({ ...prev, ...ready }))
+    if (ready.voice_audio && window.playVoice) {
+      window.playVoice(ready.voice_audio);
+    }
+    Object.entries(jobs).forEach(([name, job]) => awaitAssetJob(name, job.job_id))
+  }
+
   const handleAction = async (actionText) => {
     if (!session) return;
 
@@ -101,12 +136,7 @@ function App() {
         action: actionText
       });
       setGameState(data.state)
-      if (data.assets) {
-        setAssets(prev => ({ ...prev, ...data.assets }))
-        if (data.assets.voice_audio && window.playVoice) {
-          window.playVoice(data.assets.voice_audio);
-        }
-      }
+      if (data.assets) applyAssets(data.assets)
       setIsOnline(true)
     } catch (err) {
       console.error("Action failed:", err)
@@ -199,7 +229,7 @@ function App() {
               <Layout
                 gameState={gameState}
                 assets={assets}
-                onAssetsUpdate={setAssets}
+                onAssetsUpdate={applyAssets}
                 onAction={handleAction}
                 onGameStateUpdate={setGameState}
                 isLoading={loading}
@@ -266,7 +266,7 @@ const Layout = ({ gameState, assets, onAssetsUpdate, onAction, onGameStateUpdate
 
             // Update assets if returned
             if (onAssetsUpdate && data.assets) {
-                onAssetsUpdate(prev => ({ ...prev, ...data.assets }));
+                onAssetsUpdate(data.assets);
             }
 
             return data;
@@ -594,7 +594,7 @@ const Layout = ({ gameState, assets, onAssetsUpdate, onAction, onGameStateUpdate
                         onClose={() => setShowPortraitSettings(false)}
                         characterName={character.name}
                         onUpdate={(newAssets) => {
-                            if (onAssetsUpdate) onAssetsUpdate(prev => ({ ...prev, ...newAssets }));
+                            if (onAssetsUpdate) onAssetsUpdate(newAssets);
                         }}
                     />
 
@@ -0,0 +1,161 @@
+"""Measure few-shot example retrieval against a large feedback database.
+
+``ExampleRetriever`` runs on every narrator turn, filtering paragraphs by
+accepted/pacing/tone/scene_type and ordering by timestamp. This script fills
+a feedback database with ``--rows`` paragraphs and times retrieval in two modes:
+
+* ``legacy``: a new ``sqlite3`` connection per query and no paragraph indexes
+  (how ``FeedbackDatabase`` behaved before connections were pooled).
+* ``pooled``: the per-thread WAL connection and composite retrieval index.
+* ``relevance``: the pooled database with player input and location in the
+  context, so candidates are also ranked through the BM25 index.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.feedback_learning import ExampleRetriever, FeedbackDatabase
+
+PACINGS = ["slow", "standard", "fast"]
+TONES = ["tense", "melancholic", "hopeful", "mysterious", "neutral"]
+SCENE_TYPES = ["action", "dialogue", "description", "introspection", "general"]
+SUBJECTS = ["reactor", "airlock", "derelict", "smuggler", "nebula", "beacon", "drone", "vault"]
+LOCATIONS = ["Bleakhold Station", "the Iron Drift", "Sector 9 relay", "the Forge"]
+
+
+class _LegacyDatabase(FeedbackDatabase):
+    """Connection-per-call access without schema setup, as before pooling."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._is_memory = False
+
+    def _get_conn(self):
+        return sqlite3.connect(self.db_path)
+
+
+def _text(rng: random.Random, i: int) -> str:
+    subject, other = rng.sample(SUBJECTS, 2)
+    return f"The {subject} groans near {rng.choice(LOCATIONS)}, marker {i % 997}. You watch the {other}."
+
+
+def populate(db_path: str, rows: int, seed: int = 7) -> None:
+    """Bulk-load ``rows`` synthetic paragraphs (length stats are summarized in SQL)."""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    db = FeedbackDatabase(db_path)
+    conn = db._get_conn()
+    rows_data = [
+        (
+            f"p{i}",
+            _text(rng, i),
+            1 if rng.random() < 0.7 else 0,
+            rng.choice(PACINGS),
+            rng.choice(TONES),
+            rng.choice(SCENE_TYPES),
+            "[]", "", "", "", "[]", "[]",
+            i // 200,
+            (start + timedelta(seconds=i)).isoformat(),
+            10, 2, 5.0,
+        )
+        for i in range(rows)
+    ]
+    with conn:
+        conn.executemany("INSERT INTO paragraphs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows_data)
+        cursor = conn.cursor()
+        for row in rows_data:
+            db._index_paragraph(cursor, row[0], row[1], bool(row[2]))
+        conn.execute("""
+            INSERT INTO length_stats
+            SELECT accepted, COUNT(*), COUNT(*), SUM(avg_sentence_length),
+                   SUM(avg_sentence_length * avg_sentence_length)
+            FROM paragraphs GROUP BY accepted
+        """)
+    db.close()
+
+
+def _time_queries(retriever: ExampleRetriever, queries: int, with_scene: bool = False, seed: int = 11) -> list[float]:
+    rng = random.Random(seed)
+    timings: list[float] = []
+    for _ in range(queries):
+        context = {
+            "pacing": rng.choice(PACINGS),
+            "tone": rng.choice(TONES),
+            "scene_type": rng.choice(SCENE_TYPES),
+        }
+        if with_scene:
+            context["player_input"] = f"I check the {rng.choice(SUBJECTS)} for damage"
+            context["location"] = rng.choice(LOCATIONS)
+        start = time.perf_counter()
+        retriever.build_few_shot_prompt(context, n_positive=2, n_negative=1)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+
+def _summary(timings: list[float]) -> dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+def run_benchmark(rows: int, queries: int, workdir: str) -> dict[str, dict[str, float]]:
+    pooled_path = str(Path(workdir) / "feedback_pooled.db")
+    legacy_path = str(Path(workdir) / "feedback_legacy.db")
+
+    populate(pooled_path, rows)
+    shutil.copyfile(pooled_path, legacy_path)
+    conn = sqlite3.connect(legacy_path)
+    conn.execute("PRAGMA journal_mode=DELETE")
+    conn.execute("DROP INDEX idx_paragraphs_retrieval")
+    conn.execute("DROP INDEX idx_paragraphs_recent")
+    conn.close()
+
+    legacy_timings = _time_queries(ExampleRetriever(_LegacyDatabase(legacy_path)), queries)
+
+    db = FeedbackDatabase(pooled_path)
+    retriever = ExampleRetriever(db)
+    _time_queries(retriever, 1)  # Open this thread's connection as the first turn would.
+    pooled_timings = _time_queries(retriever, queries)
+    relevance_timings = _time_queries(retriever, queries, with_scene=True)
+    db.close()
+
+    results = {
+        "legacy": _summary(legacy_timings),
+        "pooled": _summary(pooled_timings),
+        "relevance": _summary(relevance_timings),
+    }
+    results["speedup"] = {"mean_x": round(results["legacy"]["mean_ms"] / max(results["pooled"]["mean_ms"], 1e-6), 1)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feedback example retrieval")
+    parser.add_argument("--rows", type=int, default=100_000, help="Paragraphs to load into the database")
+    parser.add_argument("--queries", type=int, default=200, help="Retrievals to time per mode")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = run_benchmark(args.rows, args.queries, tmp)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
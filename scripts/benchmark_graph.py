@@ -0,0 +1,97 @@
+"""Measure per-turn graph setup overhead with and without the compiled graph cache.
+
+Every graph helper (``process_turn``, ``start_game`` ...) starts by asking
+for the compiled game graph and then reads the session checkpoint. This
+script times that fixed cost in two modes:
+
+* ``rebuild``: a fresh ``StateGraph`` compile and ``sqlite3`` connection per
+  turn (the behaviour before graphs were cached).
+* ``cached``: ``create_game_graph`` returning the process-wide compiled graph
+  and its pooled WAL connection.
+
+LLM calls are not involved, so the numbers isolate framework overhead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.graph import build_game_graph, clear_graph_cache, create_game_graph
+
+
+def _rebuild_graph(checkpoint_path: str):
+    conn = sqlite3.connect(checkpoint_path, check_same_thread=False)
+    return build_game_graph(SqliteSaver(conn)), conn
+
+
+def _time_turns(turns: int, acquire) -> list[float]:
+    config = {"configurable": {"thread_id": "benchmark"}}
+    timings: list[float] = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        graph = acquire()
+        graph.get_state(config)
+        timings.append((time.perf_counter() - start) * 1000.0)
+    return timings
+
+
+def _summary(timings: list[float]) -> dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "p50_ms": round(ordered[len(ordered) // 2], 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+    }
+
+
+def run_benchmark(turns: int, checkpoint_path: str) -> dict[str, dict[str, float]]:
+    connections: list[sqlite3.Connection] = []
+
+    def rebuild():
+        graph, conn = _rebuild_graph(checkpoint_path)
+        connections.append(conn)
+        return graph
+
+    rebuild_timings = _time_turns(turns, rebuild)
+    for conn in connections:
+        conn.close()
+
+    clear_graph_cache()
+    create_game_graph(checkpoint_path)  # Warm the cache as the first turn would.
+    cached_timings = _time_turns(turns, lambda: create_game_graph(checkpoint_path))
+    clear_graph_cache()
+
+    results = {"rebuild": _summary(rebuild_timings), "cached": _summary(cached_timings)}
+    results["saved_per_turn_ms"] = {
+        "mean_ms": round(results["rebuild"]["mean_ms"] - results["cached"]["mean_ms"], 3)
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compiled graph reuse")
+    parser.add_argument("--turns", type=int, default=50, help="How many turns to simulate per mode")
+    parser.add_argument("--checkpoint-path", type=Path, default=None, help="Checkpoint DB (defaults to a temp file)")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint_path = str(args.checkpoint_path or Path(tmp) / "benchmark_sessions.db")
+        results = run_benchmark(args.turns, checkpoint_path)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
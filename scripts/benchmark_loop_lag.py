@@ -0,0 +1,119 @@
+"""Measure event-loop lag while chat turns do their blocking work.
+
+``--requests`` concurrent simulated chat turns each run the synchronous
+sections of ``/api/chat`` (orchestrator hydration, base and action guidance,
+``process_interaction`` and serialization) around an awaited narrator call
+of ``--narrator-ms``. The director's and voice synthesizer's synchronous
+client calls are stood in for by ``--blocking-io-ms`` of blocking wait per
+turn, so results do not depend on a local model. A ``LoopLagMonitor``
+samples the loop meanwhile:
+
+* ``inline``: blocking sections run directly on the event loop (the
+  behaviour before ``BlockingPool``).
+* ``offloaded``: blocking sections run on a ``BlockingPool``.
+
+Lag is what every other request on the worker waits on top of its own work.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from src.narrative_orchestrator import NarrativeOrchestrator
+from src.request_execution import BlockingPool, LoopLagMonitor
+
+NPCS = ["Ilsa Renn", "Captain Dorne"]
+
+
+def _seed_orchestrator(turns: int = 20) -> dict:
+    orchestrator = NarrativeOrchestrator()
+    for turn in range(turns):
+        orchestrator.process_interaction(
+            player_input=f"I press Ilsa about the crates, turn {turn}",
+            narrative_output="Ilsa folds her arms. The reactor hums. Dorne curses over the comm.",
+            location="Bleakhold Station",
+            active_npcs=NPCS,
+        )
+    return orchestrator.to_dict()
+
+
+def _begin(data: dict, action: str, blocking_io_ms: float = 0.0):
+    time.sleep(blocking_io_ms / 1000.0)  # Director's synchronous LLM call
+    orchestrator = NarrativeOrchestrator.from_dict(data)
+    guidance = orchestrator.get_comprehensive_guidance("Bleakhold Station", NPCS, action)
+    return orchestrator, guidance
+
+
+def _finish(orchestrator: NarrativeOrchestrator, action: str) -> dict:
+    orchestrator.process_interaction(
+        player_input=action,
+        narrative_output="Sparks rain from the conduit as the hatch gives way.",
+        location="Bleakhold Station",
+        active_npcs=NPCS,
+    )
+    return orchestrator.to_dict()
+
+
+async def _turn(data: dict, index: int, narrator_ms: float, blocking_io_ms: float, pool: BlockingPool | None) -> float:
+    action = f"I brace the hatch ({index})"
+    start = time.perf_counter()
+    if pool is None:
+        orchestrator, _ = _begin(data, action, blocking_io_ms)
+        await asyncio.sleep(narrator_ms / 1000.0)
+        _finish(orchestrator, action)
+    else:
+        orchestrator, _ = await pool.run(_begin, data, action, blocking_io_ms)
+        await asyncio.sleep(narrator_ms / 1000.0)
+        await pool.run(_finish, orchestrator, action)
+    return (time.perf_counter() - start) * 1000.0
+
+
+async def _run_mode(data: dict, requests: int, narrator_ms: float, blocking_io_ms: float, pool: BlockingPool | None) -> dict:
+    monitor = LoopLagMonitor(interval_ms=5.0)
+    monitor.start()
+    await asyncio.sleep(0.02)
+    start = time.perf_counter()
+    durations = await asyncio.gather(*(_turn(data, i, narrator_ms, blocking_io_ms, pool) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    await monitor.stop()
+    return {
+        "event_loop_lag": monitor.stats(),
+        "mean_turn_ms": round(sum(durations) / len(durations), 1),
+        "turns_per_second": round(requests / elapsed, 1),
+    }
+
+
+def run_benchmark(requests: int = 32, narrator_ms: float = 200.0, blocking_io_ms: float = 30.0, workers: int = 8) -> dict:
+    data = _seed_orchestrator()
+    _begin(data, "warm up")  # Import and cache costs stay out of both modes
+
+    inline = asyncio.run(_run_mode(data, requests, narrator_ms, blocking_io_ms, None))
+    pool = BlockingPool(workers=workers, name="benchmark")
+    offloaded = asyncio.run(_run_mode(data, requests, narrator_ms, blocking_io_ms, pool))
+    offloaded["offload"] = pool.stats()
+    return {"inline": inline, "offloaded": offloaded}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Event-loop lag with blocking handler sections inline vs offloaded")
+    parser.add_argument("--requests", type=int, default=32, help="Concurrent simulated chat turns")
+    parser.add_argument("--narrator-ms", type=float, default=200.0, help="Awaited narrator latency per turn")
+    parser.add_argument("--blocking-io-ms", type=float, default=30.0, help="Synchronous client wait per turn")
+    parser.add_argument("--workers", type=int, default=8, help="BlockingPool threads")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.requests, args.narrator_ms, args.blocking_io_ms, args.workers)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Load-test the streaming narrator offline against the mock LLM provider.
+
+``--sessions`` simulated players each play ``--turns`` turns concurrently
+through ``agenerate_narrative_stream`` with ``LLM_PROVIDER=mock``. Replies
+and latency samples are seeded (``--seed``), so a run is reproducible; the
+``--profile`` picks the simulated serving characteristics from
+``MOCK_LATENCY_PROFILES`` and ``--time-scale`` shrinks every simulated delay
+so long runs finish quickly. Reported times are wall-clock at that scale:
+
+* ``first_sentence_ms``: until the first verified sentence reaches the player.
+* ``turn_ms``: until the narration is complete.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+from src.narrator import NarratorConfig, agenerate_narrative_stream
+from src.provider_health import StaticHealthMonitor, set_health_monitor
+
+ACTIONS = [
+    "I pry open the reactor panel",
+    "I ask the quartermaster where the crates went",
+    "I vent the airlock",
+    "I follow the beacon into the nebula",
+    "I search the captain's quarters",
+]
+
+
+def _summary(timings: list[float]) -> dict[str, float]:
+    if not timings:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0}
+    ordered = sorted(timings)
+    return {
+        "mean_ms": round(statistics.fmean(ordered), 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+    }
+
+
+async def _play(session: int, turns: int, config: NarratorConfig, results: dict) -> None:
+    context = ""
+    for turn in range(turns):
+        action = ACTIONS[(session + turn) % len(ACTIONS)]
+        start = time.perf_counter()
+        first = None
+        sentences = []
+        try:
+            async for sentence in agenerate_narrative_stream(
+                player_input=action,
+                character_name=f"Pilot {session}",
+                location="Bleakhold Station",
+                context=context,
+                config=config,
+            ):
+                if first is None:
+                    first = (time.perf_counter() - start) * 1000.0
+                sentences.append(sentence)
+        except Exception:
+            results["errors"] += 1
+            continue
+        results["first_sentence"].append(first or 0.0)
+        results["turn"].append((time.perf_counter() - start) * 1000.0)
+        context = "".join(sentences)[-500:]
+
+
+def run_benchmark(
+    sessions: int = 8,
+    turns: int = 5,
+    profile: str = "local",
+    seed: int = 0,
+    time_scale: float = 0.1,
+) -> dict:
+    overrides = {"MOCK_LLM_SEED": str(seed), "MOCK_LLM_TIME_SCALE": str(time_scale)}
+    saved = {key: os.environ.get(key) for key in overrides}
+    os.environ.update(overrides)
+    previous = set_health_monitor(StaticHealthMonitor(online=True))
+    results: dict = {"first_sentence": [], "turn": [], "errors": 0}
+    try:
+        config = NarratorConfig(backend="mock", model=profile)
+
+        async def run_all():
+            await asyncio.gather(*(_play(session, turns, config, results) for session in range(sessions)))
+
+        start = time.perf_counter()
+        asyncio.run(run_all())
+        elapsed = time.perf_counter() - start
+    finally:
+        set_health_monitor(previous)
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    completed = len(results["turn"])
+    return {
+        "profile": profile,
+        "time_scale": time_scale,
+        "completed_turns": completed,
+        "errors": results["errors"],
+        "first_sentence_ms": _summary(results["first_sentence"]),
+        "turn_ms": _summary(results["turn"]),
+        "turns_per_second": round(completed / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent narrator load test against the mock LLM provider")
+    parser.add_argument("--sessions", type=int, default=8, help="Concurrent simulated players")
+    parser.add_argument("--turns", type=int, default=5, help="Turns per player")
+    parser.add_argument("--profile", default="local", help="Mock latency profile (instant, local, cloud, degraded)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for replies and latency samples")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="Multiplier on simulated delays")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.sessions, args.turns, args.profile, args.seed, args.time_scale)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Measure a NarrativeOrchestrator round trip late in a campaign.
+
+A campaign of ``--turns`` interactions is played. ``--npcs`` NPCs are met
+over its course, two of them active in each scene. The serialized
+orchestrator is then put through, ``--repeat`` times each:
+
+* ``eager_round_trip``: every subsystem and NPC memory bank deserialized
+  and serialized again, the cost before lazy hydration.
+* ``lazy_round_trip``: ``from_dict`` then ``to_dict`` with nothing accessed.
+* ``eager_turn`` / ``lazy_turn``: what ``/api/chat`` does, which is
+  hydrate, build base and action guidance, ``process_interaction`` and
+  ``to_dict``.
+
+Each repetition starts from a fresh copy of the turn-``--turns`` payload.
+Copying happens outside the timed section.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from src.narrative_orchestrator import _SUBSYSTEMS, NarrativeOrchestrator
+
+LOCATIONS = ["Bleakhold Station", "Iron Drift", "The Forge", "Ashen Reach"]
+
+
+def _npc_pair(turn: int, npcs: int) -> list[str]:
+    first = (turn // 10) % npcs  # A new pair of NPCs every ten turns
+    return [f"NPC {first}", f"NPC {(first + 1) % npcs}"]
+
+
+def _play(orchestrator: NarrativeOrchestrator, turn: int, npcs: int) -> None:
+    active = _npc_pair(turn, npcs)
+    location = LOCATIONS[(turn // 7) % len(LOCATIONS)]
+    if turn % 3 == 0:
+        orchestrator.advance_scene()
+    orchestrator.get_base_guidance(location, active)
+    orchestrator.get_action_guidance(active, f"I help {active[0]} with the crates ({turn})")
+    orchestrator.process_interaction(
+        player_input=f"I help {active[0]} with the crates, I promise ({turn})",
+        narrative_output=f"Turn {turn}: {active[0]} folds her arms. A hidden cache glints. The reactor hums.",
+        location=location,
+        active_npcs=active,
+    )
+
+
+def _campaign(turns: int, npcs: int) -> dict:
+    random.seed(0)
+    orchestrator = NarrativeOrchestrator()
+    for turn in range(turns):
+        _play(orchestrator, turn, npcs)
+    return orchestrator.to_dict()
+
+
+def _hydrate_everything(orchestrator: NarrativeOrchestrator) -> None:
+    for name in _SUBSYSTEMS:
+        getattr(orchestrator, name)
+    for _ in orchestrator.npc_memories.values():
+        pass
+
+
+def _eager_round_trip(data: dict) -> dict:
+    orchestrator = NarrativeOrchestrator.from_dict(data)
+    _hydrate_everything(orchestrator)
+    return orchestrator.to_dict()
+
+
+def _lazy_round_trip(data: dict) -> dict:
+    return NarrativeOrchestrator.from_dict(data).to_dict()
+
+
+def _turn(data: dict, turn: int, npcs: int, eager: bool) -> dict:
+    orchestrator = NarrativeOrchestrator.from_dict(data)
+    if eager:
+        _hydrate_everything(orchestrator)
+    _play(orchestrator, turn, npcs)
+    return orchestrator.to_dict()
+
+
+def _time(fn, data: dict, repeat: int) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        fresh = json.loads(json.dumps(data))
+        random.seed(1)
+        start = time.perf_counter()
+        fn(fresh)
+        samples.append((time.perf_counter() - start) * 1000.0)
+    ordered = sorted(samples)
+    return {"mean_ms": round(statistics.fmean(ordered), 3), "p50_ms": round(ordered[len(ordered) // 2], 3)}
+
+
+def run_benchmark(turns: int = 500, npcs: int = 40, repeat: int = 50) -> dict:
+    data = _campaign(turns, npcs)
+    results = {
+        "turns": turns,
+        "payload_bytes": len(json.dumps(data)),
+        "eager_round_trip": _time(_eager_round_trip, data, repeat),
+        "lazy_round_trip": _time(_lazy_round_trip, data, repeat),
+        "eager_turn": _time(lambda d: _turn(d, turns, npcs, eager=True), data, repeat),
+        "lazy_turn": _time(lambda d: _turn(d, turns, npcs, eager=False), data, repeat),
+    }
+
+    random.seed(1)
+    eager = _turn(json.loads(json.dumps(data)), turns, npcs, eager=True)
+    random.seed(1)
+    lazy = _turn(json.loads(json.dumps(data)), turns, npcs, eager=False)
+    results["identical_output"] = json.dumps(eager, sort_keys=True) == json.dumps(lazy, sort_keys=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NarrativeOrchestrator round trip cost late in a campaign")
+    parser.add_argument("--turns", type=int, default=500, help="Campaign length before measuring")
+    parser.add_argument("--npcs", type=int, default=40, help="NPCs met over the campaign")
+    parser.add_argument("--repeat", type=int, default=50, help="Timed repetitions per mode")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.turns, args.npcs, args.repeat)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
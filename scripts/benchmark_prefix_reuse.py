@@ -0,0 +1,215 @@
+"""Measure prompt prefill saved by the stable-to-volatile prompt layout.
+
+Ollama (and llama.cpp underneath it) skips prefill for the longest prefix a
+prompt shares with the one it evaluated last, as long as the model stays
+loaded. This script plays a scripted ``--turns`` session through two prompt
+builders and, for each turn, counts tokens shared with the previous turn:
+
+* ``narrative_prompt``: ``narrator._prepare_narrative_request`` messages.
+* ``chat_messages``: ``prompting.build_narrator_messages`` with the scene's
+  exchanges as history, reset whenever the location changes.
+
+Each scenario is built twice: ``legacy`` (volatile scene, dice and context
+ahead of style, guardrails and history, as before) and ``stable`` (the
+current layout). Prefill time is estimated from ``--prefill-rate`` tokens per
+second; with ``--ollama-model`` every turn is also sent to a local Ollama with
+``keep_alive`` set and the reported ``prompt_eval_duration`` is summed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+from src.narrator import NarratorConfig, SYSTEM_PROMPT, _prepare_narrative_request
+from src.prompt_budget import get_token_counter
+from src.prompting import SYSTEM_PROMPT as CHAT_SYSTEM_PROMPT
+from src.prompting import PrefixReuseTracker, PromptContext, build_narrator_messages
+from src.style_profile import load_style_profile
+
+LOCATIONS = ["Bleakhold Station", "the Iron Drift", "Sector 9 relay", "the Forge", "the derelict Tallow"]
+ACTIONS = [
+    "I check the reactor housing for damage",
+    "I ask the quartermaster about the missing crates",
+    "I vent the airlock and brace",
+    "I follow the beacon into the nebula",
+    "I swear to find the lost colony",
+    "I patch the hull breach",
+    "I bargain with the smuggler for fuel",
+]
+OUTCOMES = [("strong_hit", "Strong Hit"), ("weak_hit", "Weak Hit"), ("miss", "Miss"), ("", "")]
+STYLE_PROFILE = "crichton_clinical"
+
+
+def _legacy_narrative_prompt(
+    player_input: str,
+    roll_result: str,
+    outcome: str,
+    character_name: str,
+    location: str,
+    context: str,
+    style_profile,
+    guardrail_packet: str,
+    guardrail_rules: str,
+) -> str:
+    """``build_narrative_prompt`` segment order before the stable layout."""
+    parts = []
+    if context:
+        parts.append(f"[Previous scene]\n{context}\n")
+    parts.append(guardrail_packet)
+    parts.append(guardrail_rules)
+    parts.append(f"[Current location: {location}]")
+    parts.append(f"[Character: {character_name}]")
+    parts.append(f"\n[Player action]\n{player_input}")
+    if roll_result:
+        parts.append(f"\n[Dice result]\n{roll_result}")
+        parts.append(f"\n[Guidance: {outcome}]")
+    if style_profile:
+        parts.append("\n[NARRATIVE STYLE ACTIVE]")
+        parts.append("<tone_directives>\n- " + "\n- ".join(style_profile.tone_directives) + "\n</tone_directives>")
+        parts.append("<vocabulary_hints>\n- " + "\n- ".join(style_profile.vocabulary_hints) + "\n</vocabulary_hints>")
+        parts.append("\n<style_examples>")
+        for i, ex in enumerate(style_profile.few_shot_examples):
+            parts.append(f"Example {i+1}:\nContext: {ex.get('context', 'General')}\nNarrative: {ex.get('narrative', '')}")
+        parts.append("</style_examples>")
+    parts.append("\n[Write the narrative response now]")
+    return "\n".join(parts)
+
+
+def _legacy_chat_messages(user_prompt: str, context: PromptContext) -> list[dict[str, str]]:
+    """``build_narrator_messages`` order before the stable layout: context block, then history."""
+    blocks = [f"[Scene]\n{context.scene_summary}"]
+    if context.move_outcome:
+        blocks.append(f"[Move Outcome]\n{context.move_outcome}")
+    exchanges = [e for e in context.prior_exchanges if e.get("content")]
+    if exchanges:
+        blocks.append("[Recent Table Chat]\n" + "\n".join(f"{e['role'].capitalize()}: {e['content']}" for e in exchanges))
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": "\n\n".join(blocks)},
+        *({"role": e["role"], "content": e["content"]} for e in exchanges),
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def scripted_turns(turns: int, seed: int = 5) -> list[dict]:
+    rng = random.Random(seed)
+    script = []
+    previous = "You wake in the med bay as the station lights stutter."
+    for turn in range(turns):
+        outcome, label = rng.choice(OUTCOMES)
+        script.append({
+            "player_input": rng.choice(ACTIONS),
+            "outcome": outcome,
+            "roll_result": f"{label} (action {rng.randint(2, 10)} vs {rng.randint(1, 10)}, {rng.randint(1, 10)})" if label else "",
+            "location": LOCATIONS[(turn // 10) % len(LOCATIONS)],
+            "context": previous,
+        })
+        previous = f"Turn {turn}: the {rng.choice(['hull', 'crew', 'beacon', 'drone'])} {rng.choice(['groans', 'falls silent', 'flickers'])}."
+    return script
+
+
+def _narrative_layouts(script: list[dict]) -> dict[str, list[list[dict[str, str]]]]:
+    config = NarratorConfig(backend="ollama", style_profile_name=STYLE_PROFILE)
+    style = load_style_profile(STYLE_PROFILE)
+    legacy, stable = [], []
+    for turn in script:
+        store, messages = _prepare_narrative_request(
+            turn["player_input"], turn["roll_result"], turn["outcome"], "Kade", turn["location"],
+            turn["context"], config, None, None,
+        )
+        stable.append(messages)
+        legacy.append([
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": _legacy_narrative_prompt(
+                turn["player_input"], turn["roll_result"], turn["outcome"], "Kade", turn["location"],
+                turn["context"], style, store.build_context_packet(), store.guardrail_rules(),
+            )},
+        ])
+    return {"legacy": legacy, "stable": stable}
+
+
+def _chat_layouts(script: list[dict]) -> dict[str, list[list[dict[str, str]]]]:
+    legacy, stable = [], []
+    history: list[dict[str, str]] = []
+    for index, turn in enumerate(script):
+        if index and turn["location"] != script[index - 1]["location"]:
+            history = []  # New scene, fresh table chat
+        context = PromptContext(
+            scene_summary=f"{turn['location']}. {turn['context']}",
+            move_outcome=turn["roll_result"] or None,
+            prior_exchanges=list(history),
+        )
+        stable.append(build_narrator_messages(turn["player_input"], context))
+        legacy.append(_legacy_chat_messages(turn["player_input"], context))
+        history += [
+            {"role": "user", "content": turn["player_input"]},
+            {"role": "assistant", "content": turn["context"]},
+        ]
+    return {"legacy": legacy, "stable": stable}
+
+
+def _measure(turns: list[list[dict[str, str]]], prefill_rate: float, ollama=None) -> dict[str, float]:
+    tracker = PrefixReuseTracker(counter=get_token_counter())
+    reused_total = prompt_total = 0
+    measured_ms = 0.0
+    for messages in turns:
+        reused, total = tracker.observe("benchmark", messages)
+        reused_total += reused
+        prompt_total += total
+        if ollama is not None:
+            ollama.chat(messages, temperature=0.0, max_tokens=1)
+            measured_ms += ollama.last_prefill.get("prompt_eval_ms", 0.0)
+    prefill_tokens = prompt_total - reused_total
+    stats = {
+        "prompt_tokens": prompt_total,
+        "reused_tokens": reused_total,
+        "prefill_tokens": prefill_tokens,
+        "reuse_ratio": round(reused_total / max(prompt_total, 1), 3),
+        "est_prefill_ms": round(prefill_tokens / prefill_rate * 1000.0, 1),
+    }
+    if ollama is not None:
+        stats["measured_prefill_ms"] = round(measured_ms, 1)
+    return stats
+
+
+def run_benchmark(turns: int = 50, prefill_rate: float = 250.0, ollama_model: str | None = None) -> dict[str, dict]:
+    ollama = None
+    if ollama_model:
+        from src.llm_provider import OllamaProvider
+
+        ollama = OllamaProvider(model=ollama_model)
+
+    script = scripted_turns(turns)
+    results: dict[str, dict] = {}
+    for scenario, layouts in (("narrative_prompt", _narrative_layouts(script)), ("chat_messages", _chat_layouts(script))):
+        legacy = _measure(layouts["legacy"], prefill_rate, ollama)
+        stable = _measure(layouts["stable"], prefill_rate, ollama)
+        results[scenario] = {
+            "legacy": legacy,
+            "stable": stable,
+            "est_saved_ms": round(legacy["est_prefill_ms"] - stable["est_prefill_ms"], 1),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KV-cache prefix reuse across a scripted session")
+    parser.add_argument("--turns", type=int, default=50, help="Turns in the scripted session")
+    parser.add_argument("--prefill-rate", type=float, default=250.0, help="Prompt tokens/sec used to estimate prefill time")
+    parser.add_argument("--ollama-model", default=None, help="Also measure real prefill against this local Ollama model")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.turns, args.prefill_rate, args.ollama_model)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
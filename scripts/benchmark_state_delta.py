@@ -0,0 +1,101 @@
+"""Compare full-state and delta responses late in a session.
+
+A session plays ``--turns`` chat turns. Each turn changes the state the way
+``/api/chat`` does: the pending narrative, the orchestrator's serialized
+data and inner-voice dominance, plus a new location every few turns. For
+the last ``--measure`` turns, the state part of the response is serialized
+two ways:
+
+* ``full``: the whole state, the default response.
+* ``delta``: the JSON Patch from the client's previous version
+  (``since=<etag>``).
+
+Sizes are response bytes. Times cover encoding, ETag hashing and, for
+``delta``, diffing against the previous version.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from src.game_state import create_initial_state
+from src.narrative_orchestrator import NarrativeOrchestrator
+from src.state_delta import StateVersions
+
+NPCS = ["Ilsa Renn", "Captain Dorne"]
+LOCATIONS = ["Bleakhold Station", "Iron Drift", "The Forge", "Ashen Reach"]
+
+
+def _play_turn(state, orchestrator: NarrativeOrchestrator, turn: int) -> None:
+    location = LOCATIONS[(turn // 5) % len(LOCATIONS)]
+    narrative = f"Turn {turn}: Ilsa folds her arms. The reactor hums. Dorne curses over the comm."
+    state["world"].current_location = location
+    state["narrative"].pending_narrative = narrative
+    state["psyche"].voice_dominance["logic"] = round(0.5 + (turn % 10) / 20, 2)
+    orchestrator.process_interaction(
+        player_input=f"I press Ilsa about the crates, turn {turn}",
+        narrative_output=narrative,
+        location=location,
+        active_npcs=NPCS,
+    )
+    state["narrative_orchestrator"].orchestrator_data = orchestrator.to_dict()
+
+
+def _summary(samples: list[float], digits: int = 3) -> dict[str, float]:
+    return {"mean": round(statistics.fmean(samples), digits), "max": round(max(samples), digits)}
+
+
+def run_benchmark(turns: int = 200, measure: int = 20) -> dict:
+    state = create_initial_state("Kira")
+    orchestrator = NarrativeOrchestrator()
+    versions = StateVersions()
+    full_bytes, full_ms, delta_bytes, delta_ms = [], [], [], []
+
+    for turn in range(turns):
+        if turn < turns - measure:
+            _play_turn(state, orchestrator, turn)
+            continue
+        held = versions.snapshot("bench", state).etag  # Client's version before this turn
+        _play_turn(state, orchestrator, turn)
+
+        start = time.perf_counter()
+        _, body, _ = StateVersions.encode(state)
+        full_ms.append((time.perf_counter() - start) * 1000.0)
+        full_bytes.append(len(body))
+
+        start = time.perf_counter()
+        snapshot = versions.snapshot("bench", state)
+        patch = versions.patch_since("bench", held)
+        body = json.dumps({"state_etag": snapshot.etag, "state_patch": patch}, separators=(",", ":")).encode("utf-8")
+        delta_ms.append((time.perf_counter() - start) * 1000.0)
+        delta_bytes.append(len(body))
+
+    return {
+        "turns": turns,
+        "full": {"bytes": _summary(full_bytes, 0), "serialize_ms": _summary(full_ms)},
+        "delta": {"bytes": _summary(delta_bytes, 0), "serialize_ms": _summary(delta_ms)},
+        "size_ratio": round(statistics.fmean(delta_bytes) / statistics.fmean(full_bytes), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-state vs JSON Patch response size late in a session")
+    parser.add_argument("--turns", type=int, default=200, help="Turns played before and during measurement")
+    parser.add_argument("--measure", type=int, default=20, help="Final turns that are measured")
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.turns, args.measure)
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
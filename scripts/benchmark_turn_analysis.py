@@ -0,0 +1,175 @@
+"""Estimate post-narration bookkeeping time with and without the turn analysis.
+
+Before ``TurnAnalyzer`` every narration triggered two separate small LLM
+calls, one after another: event detection (``SmartEventDetector._llm_detect``)
+and director guidance (``DirectorAgent._llm_analyze``); scene summaries and
+entities came from heuristics. This script plays ``--turns`` narrations
+through both paths against a ``MockProvider`` that returns canned replies
+and charges each request ``--overhead-ms`` plus prompt prefill at
+``--prefill-rate`` and generation at ``--decode-rate`` tokens per second:
+
+* ``legacy``: the two original calls with their original prompts.
+* ``merged``: one JSON-schema constrained ``TurnAnalyzer`` request for the
+  same sections (``--sections`` to also ask for the summary and entities).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from src.director import DirectorAgent
+from src.llm_provider import LatencyProfile, MockProvider
+from src.provider_health import StaticHealthMonitor, set_health_monitor
+from src.smart_event_detection import SmartEventDetector
+from src.turn_analysis import DEFAULT_SECTIONS, SECTIONS, TurnAnalyzer
+
+NARRATIVES = [
+    "The reactor housing on Bleakhold Station coughs sparks as Kade pries the panel loose. "
+    "Quartermaster Ilsa Renn watches from the hatch, arms folded, and finally admits the crates "
+    "were sold to the Iron Drift smugglers. Kade swears to get them back before the colony starves.",
+    "Airlock alarms shriek. Kade vents the chamber and the boarding drone tumbles into the void, "
+    "its sensor eye still fixed on him. Somewhere aft, Captain Dorne curses over the comm and "
+    "orders the Tallow to come about.",
+    "The beacon leads into the nebula, to the derelict Tallow. In the dead captain's quarters Kade "
+    "finds a data chip etched with the sigil of the Ashen Covenant and a map to a colony no chart records.",
+]
+
+CANNED = {
+    "summary": "Kade learns the missing crates went to the Iron Drift smugglers and swears to recover them.",
+    "entities": [
+        {"type": "NPC", "name": "Ilsa Renn", "description": "Bleakhold quartermaster"},
+        {"type": "LOCATION", "name": "Iron Drift", "description": "Smuggler haven"},
+    ],
+    "events": [
+        {"type": "oath", "description": "Kade swore to recover the crates", "entities": ["Kade"], "severity": 0.6, "witnesses": ["Ilsa Renn"], "priority": 6},
+    ],
+    "director": {
+        "pacing": "standard",
+        "tone": "tense",
+        "beats": ["The smugglers expect him", "Ilsa has her own debt"],
+        "notes_for_narrator": "Keep the pressure on supplies.",
+    },
+}
+
+
+class SimulatedProvider(MockProvider):
+    """Canned replies, timed by a fixed mock latency profile without sleeping."""
+
+    def __init__(self, overhead_ms: float, prefill_rate: float, decode_rate: float):
+        super().__init__(
+            model="simulated",
+            profile=LatencyProfile(
+                ttft_ms=overhead_ms,
+                prefill_tokens_per_second=prefill_rate,
+                tokens_per_second=decode_rate,
+                distribution="fixed",
+            ),
+            time_scale=0.0,
+        )
+
+    def compose(self, messages, max_tokens, rng) -> str:  # noqa: ARG002
+        return json.dumps(CANNED["events"])
+
+    def compose_json(self, schema, rng) -> str:  # noqa: ARG002
+        return json.dumps({name: CANNED[name] for name in schema["properties"]})
+
+    def ollama_client(self, reply: str) -> "_OllamaStyleClient":
+        return _OllamaStyleClient(self, reply)
+
+
+class _OllamaStyleClient:
+    """``ollama.Client.chat`` shape for the consumers that call Ollama directly."""
+
+    def __init__(self, provider: SimulatedProvider, reply: str):
+        self.provider = provider
+        self.reply = reply
+
+    def chat(self, model, messages, options=None, **kwargs):  # noqa: ARG002
+        return {"message": {"content": self.provider.simulate(messages, lambda rng: self.reply).text}}
+
+
+def _world_state(turn: int) -> dict:
+    return {
+        "character": "Kade",
+        "location": ["Bleakhold Station", "the Iron Drift", "the derelict Tallow"][turn % 3],
+        "vows": [{"name": "Recover the colony's supplies", "rank": "dangerous", "progress_percent": 0.1 * (turn % 10)}],
+        "primary_vow_phase": "establishing",
+    }
+
+
+def _stats(provider: SimulatedProvider) -> dict:
+    stats = provider.stats()
+    return {
+        "calls": stats["calls"],
+        "prompt_tokens": stats["prompt_tokens"],
+        "output_tokens": stats["output_tokens"],
+        "est_ms": stats["simulated_ms"],
+    }
+
+
+def run_benchmark(
+    turns: int = 30,
+    overhead_ms: float = 120.0,
+    prefill_rate: float = 500.0,
+    decode_rate: float = 40.0,
+    sections: tuple[str, ...] = DEFAULT_SECTIONS,
+) -> dict:
+    provider = SimulatedProvider(overhead_ms, prefill_rate, decode_rate)
+    narratives = [NARRATIVES[turn % len(NARRATIVES)] + f" (Turn {turn}.)" for turn in range(turns)]
+
+    director = DirectorAgent(_client=provider.ollama_client(json.dumps(CANNED["director"])))
+    detector = SmartEventDetector(llm_provider=provider)
+    for turn, narrative in enumerate(narratives):
+        detector._llm_detect(narrative, "Bleakhold Station", ["Ilsa Renn"], "Kade")
+        director._llm_analyze(_world_state(turn), narrative, "weak_hit")
+    legacy = _stats(provider)
+
+    provider.reset()
+    previous = set_health_monitor(StaticHealthMonitor(online=True))
+    try:
+        analyzer = TurnAnalyzer(provider, sections=sections)
+        for turn, narrative in enumerate(narratives):
+            analyzer.analyze(
+                narrative,
+                location="Bleakhold Station",
+                active_npcs=["Ilsa Renn"],
+                player_name="Kade",
+                director_state=director.state.to_dict(),
+                last_roll="weak_hit",
+            )
+    finally:
+        set_health_monitor(previous)
+    merged = _stats(provider)
+
+    return {
+        "legacy": legacy,
+        "merged": merged,
+        "est_saved_ms": round(legacy["est_ms"] - merged["est_ms"], 1),
+        "speedup": round(legacy["est_ms"] / max(merged["est_ms"], 1e-9), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate per-turn side-analysis cost, separate calls vs one merged call")
+    parser.add_argument("--turns", type=int, default=30, help="Narrations to analyze")
+    parser.add_argument("--overhead-ms", type=float, default=120.0, help="Fixed cost per request")
+    parser.add_argument("--prefill-rate", type=float, default=500.0, help="Prompt tokens/sec")
+    parser.add_argument("--decode-rate", type=float, default=40.0, help="Generated tokens/sec")
+    parser.add_argument(
+        "--sections", nargs="+", choices=SECTIONS, default=list(DEFAULT_SECTIONS), help="Sections the merged call asks for"
+    )
+    parser.add_argument("--summary-out", type=Path, default=None, help="Optional JSON output path")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.turns, args.overhead_ms, args.prefill_rate, args.decode_rate, tuple(args.sections))
+
+    print(json.dumps(results, indent=2))
+    if args.summary_out:
+        args.summary_out.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Saved summary to {args.summary_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,75 +1,330 @@
 from __future__ import annotations
 
+import atexit
 import json
+import sqlite3
+import threading
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+# Deleted entries are queued as tombstones until the next flush.
+_TOMBSTONE = None
+
+
+class _SqliteTier:
+    """Shared on-disk tier for every cache instance using the same file.
+
+    Writes are queued in ``pending`` and flushed in batches as per-key upserts
+    by the maintenance thread, which also sweeps expired rows and enforces
+    ``max_bytes`` by dropping the oldest-written entries first.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, flush_interval: float, sweep_interval: float):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self.evictions = 0
+        self.pending: Dict[str, Optional[tuple]] = {}
+        self._pending_since = 0.0
+        self._last_sweep = time.time()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries (timestamp)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at)")
+        self.bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def read(self, key: str) -> Optional[tuple]:
+        """Return ``(value_json, timestamp)`` for ``key``, preferring unflushed writes."""
+        with self._lock:
+            if key in self.pending:
+                entry = self.pending[key]
+                return (entry[0], entry[1]) if entry is not _TOMBSTONE else None
+            return self._conn.execute("SELECT value, timestamp FROM entries WHERE key = ?", (key,)).fetchone()
+
+    def write(self, key: str, value_json: str, timestamp: float, ttl_seconds: float) -> None:
+        with self._lock:
+            if not self.pending:
+                self._pending_since = time.time()
+            self.pending[key] = (value_json, timestamp, timestamp + ttl_seconds)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if not self.pending:
+                self._pending_since = time.time()
+            self.pending[key] = _TOMBSTONE
+
+    def flush(self) -> None:
+        """Write queued entries as one transaction of per-key upserts."""
+        with self._lock:
+            if not self.pending:
+                return
+            batch, self.pending = self.pending, {}
+            try:
+                keys = list(batch)
+                old_sizes: Dict[str, int] = {}
+                for start in range(0, len(keys), 500):
+                    chunk = keys[start:start + 500]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    old_sizes.update(
+                        self._conn.execute(f"SELECT key, size FROM entries WHERE key IN ({placeholders})", chunk)
+                    )
+                upserts = [
+                    (key, entry[0], entry[1], entry[2], len(entry[0]))
+                    for key, entry in batch.items()
+                    if entry is not _TOMBSTONE
+                ]
+                deletes = [(key,) for key, entry in batch.items() if entry is _TOMBSTONE]
+                with self._conn:
+                    self._conn.executemany(
+                        """
+                        INSERT INTO entries (key, value, timestamp, expires_at, size) VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            value = excluded.value,
+                            timestamp = excluded.timestamp,
+                            expires_at = excluded.expires_at,
+                            size = excluded.size
+                        """,
+                        upserts,
+                    )
+                    self._conn.executemany("DELETE FROM entries WHERE key = ?", deletes)
+                self.bytes += sum(row[4] for row in upserts) - sum(old_sizes.values())
+                self._enforce_max_bytes()
+            except Exception:
+                # Persistence failures must not break the caller; drop the batch.
+                pass
+
+    def _enforce_max_bytes(self) -> None:
+        while self.bytes > self.max_bytes:
+            rows = self._conn.execute("SELECT key, size FROM entries ORDER BY timestamp LIMIT 64").fetchall()
+            if not rows:
+                self.bytes = 0
+                return
+            victims = []
+            for key, size in rows:
+                if self.bytes <= self.max_bytes:
+                    break
+                victims.append((key,))
+                self.bytes -= size
+            with self._conn:
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            self.evictions += len(victims)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Delete expired rows; returns how many were removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            try:
+                count, size = self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE expires_at < ?", (now,)
+                ).fetchone()
+                if count:
+                    with self._conn:
+                        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+                    self.bytes -= size
+                return count
+            except Exception:
+                return 0
+
+    def maintain(self, now: float) -> None:
+        if self.pending and now - self._pending_since >= self.flush_interval:
+            self.flush()
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.pending = {}
+            try:
+                with self._conn:
+                    self._conn.execute("DELETE FROM entries")
+            except Exception:
+                pass
+            self.bytes = 0
+
+
+_TIERS: Dict[str, _SqliteTier] = {}
+_TIERS_LOCK = threading.Lock()
+_MAINTENANCE_TICK = 0.25
+_maintenance_thread: Optional[threading.Thread] = None
+
+
+def _maintenance_loop() -> None:
+    while True:
+        time.sleep(_MAINTENANCE_TICK)
+        with _TIERS_LOCK:
+            tiers = list(_TIERS.values())
+        now = time.time()
+        for tier in tiers:
+            tier.maintain(now)
+
+
+def _get_tier(path: Path, max_bytes: int, flush_interval: float, sweep_interval: float) -> _SqliteTier:
+    global _maintenance_thread
+    key = str(path.resolve())
+    with _TIERS_LOCK:
+        tier = _TIERS.get(key)
+        if tier is None:
+            tier = _SqliteTier(path, max_bytes, flush_interval, sweep_interval)
+            _TIERS[key] = tier
+        else:
+            tier.max_bytes = max_bytes
+        if _maintenance_thread is None:
+            _maintenance_thread = threading.Thread(target=_maintenance_loop, name="cache-maintenance", daemon=True)
+            _maintenance_thread.start()
+        return tier
+
+
+def flush_all() -> None:
+    """Flush queued writes for every open cache file."""
+    with _TIERS_LOCK:
+        tiers = list(_TIERS.values())
+    for tier in tiers:
+        tier.flush()
+
+
+atexit.register(flush_all)
+
 
 class PersistentTTLCache:
-    """Simple TTL cache that persists to disk.
+    """Two-tier TTL cache: a bounded in-memory LRU in front of SQLite.
 
-    Values are stored alongside a timestamp. When a value expires, it is
-    removed on the next access and the backing file is rewritten.
+    ``_store`` is the memory tier (key -> ``{"value", "timestamp"}``). Misses
+    fall through to a per-file SQLite table in WAL mode. Writes are queued and
+    flushed in batches, a background sweeper removes expired rows, and the file
+    is kept under ``max_bytes`` by evicting the oldest entries.
     """
 
-    def __init__(self, name: str, ttl_seconds: int = 3600, directory: Path | str | None = None):
+    def __init__(
+        self,
+        name: str,
+        ttl_seconds: int = 3600,
+        directory: Path | str | None = None,
+        max_memory_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        flush_interval: float = 0.5,
+        sweep_interval: float = 60.0,
+    ):
         self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
         self.directory = Path(directory) if directory else Path(__file__).resolve().parent
         self.directory.mkdir(parents=True, exist_ok=True)
-        self.path = self.directory / f"{name}.json"
-        self._store: Dict[str, Dict[str, Any]] = {}
-        self._load()
+        self.path = self.directory / f"{name}.db"
+        self.hits = 0
+        self.misses = 0
+        self._store: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._tier = _get_tier(self.path, max_bytes, flush_interval, sweep_interval)
+        self._import_legacy_json(self.directory / f"{name}.json")
 
-    def _load(self) -> None:
-        if not self.path.exists():
+    def _import_legacy_json(self, legacy_path: Path) -> None:
+        """Move entries from the old whole-file JSON format into SQLite, once."""
+        if not legacy_path.exists():
             return
         try:
-            data = json.loads(self.path.read_text())
+            data = json.loads(legacy_path.read_text())
             if isinstance(data, dict):
-                self._store = data
-                self.purge_expired()
+                for key, entry in data.items():
+                    if isinstance(entry, dict) and not self._is_expired(entry.get("timestamp", 0)):
+                        self._tier.write(key, json.dumps(entry.get("value")), entry["timestamp"], self.ttl_seconds)
+                self._tier.flush()
+            legacy_path.unlink()
         except Exception:
-            # Corrupt cache should not crash the application; start fresh.
-            self._store = {}
-
-    def _persist(self) -> None:
-        try:
-            self.path.write_text(json.dumps(self._store))
-        except Exception:
-            # Avoid raising from persistence failures to keep core flow running.
+            # Corrupt legacy cache should not crash the application; start fresh.
             pass
 
+    @property
+    def evictions(self) -> int:
+        return self._tier.evictions
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._store),
+            "disk_bytes": self._tier.bytes,
+        }
+
     def _is_expired(self, timestamp: float) -> bool:
         return (time.time() - timestamp) > self.ttl_seconds
 
+    def _remember(self, key: str, value: Any, timestamp: float) -> None:
+        self._store[key] = {"value": value, "timestamp": timestamp}
+        self._store.move_to_end(key)
+        while len(self._store) > self.max_memory_entries:
+            self._store.popitem(last=False)
+
     def get(self, key: str, default: Optional[Any] = None) -> Optional[Any]:
-        entry = self._store.get(key)
-        if not entry:
-            return default
+        with self._lock:
+            entry = self._store.get(key)
+            if entry is None:
+                row = self._tier.read(key)
+                if row is None:
+                    self.misses += 1
+                    return default
+                try:
+                    value = json.loads(row[0])
+                except ValueError:
+                    self.misses += 1
+                    return default
+                self._remember(key, value, row[1])
+                entry = self._store[key]
+
+            if self._is_expired(entry.get("timestamp", 0)):
+                self._store.pop(key, None)
+                self._tier.delete(key)
+                self.misses += 1
+                return default
 
-        timestamp = entry.get("timestamp", 0)
-        if self._is_expired(timestamp):
-            self._store.pop(key, None)
-            self._persist()
-            return default
-        return entry.get("value", default)
+            self._store.move_to_end(key)
+            self.hits += 1
+            return entry.get("value", default)
 
     def set(self, key: str, value: Any) -> None:
-        self._store[key] = {"value": value, "timestamp": time.time()}
-        self._persist()
+        timestamp = time.time()
+        with self._lock:
+            self._remember(key, value, timestamp)
+        try:
+            self._tier.write(key, json.dumps(value), timestamp, self.ttl_seconds)
+        except (TypeError, ValueError):
+            # Unserializable values stay memory-only, as before they failed to persist.
+            pass
+
+    def flush(self) -> None:
+        """Write queued entries to disk now."""
+        self._tier.flush()
 
     def purge_expired(self) -> None:
-        expired_keys = [k for k, v in self._store.items() if self._is_expired(v.get("timestamp", 0))]
-        for key in expired_keys:
-            self._store.pop(key, None)
-        if expired_keys:
-            self._persist()
+        with self._lock:
+            expired_keys = [k for k, v in self._store.items() if self._is_expired(v.get("timestamp", 0))]
+            for key in expired_keys:
+                self._store.pop(key, None)
+                self._tier.delete(key)
+        self._tier.flush()
+        self._tier.sweep()
 
     def clear(self) -> None:
-        self._store.clear()
-        try:
-            if self.path.exists():
-                self.path.unlink()
-        except Exception:
-            pass
+        with self._lock:
+            self._store.clear()
+        self._tier.clear()
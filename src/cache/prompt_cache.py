@@ -12,8 +12,8 @@ if TYPE_CHECKING:
 class PromptResultCache(PersistentTTLCache):
     """Cache for prompt/results with TTL persistence."""
 
-    def __init__(self, ttl_seconds: int = 1800, directory: str | None = None):
-        super().__init__("prompt_results", ttl_seconds=ttl_seconds, directory=directory)
+    def __init__(self, ttl_seconds: int = 1800, directory: str | None = None, max_bytes: int = 16 * 1024 * 1024):
+        super().__init__("prompt_results", ttl_seconds=ttl_seconds, directory=directory, max_bytes=max_bytes)
 
     def make_key(self, prompt: str, context: "PromptContext" | None = None) -> str:
         context_text = context.formatted_context() if context else ""
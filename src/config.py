@@ -14,6 +14,7 @@ class PathConfig:
     """File and directory paths."""
     saves_dir: str = "saves"
     feedback_db: str = "saves/feedback_learning.db"
+    sessions_db: str = "saves/sessions.db"
     style_profiles_dir: str = "data/style_profiles"
     datasworn_dir: str = "data/datasworn"
 
@@ -21,6 +22,7 @@ class PathConfig:
         # Allow environment variable overrides
         self.saves_dir = os.environ.get("STARFORGED_SAVES_DIR", self.saves_dir)
         self.feedback_db = os.environ.get("STARFORGED_FEEDBACK_DB", self.feedback_db)
+        self.sessions_db = os.environ.get("STARFORGED_SESSIONS_DB", self.sessions_db)
 
 
 @dataclass
@@ -37,10 +39,28 @@ class LLMConfig:
     repeat_penalty: float = 1.15
     max_tokens: int = 2000
 
+    # Background provider health checks
+    health_check_interval: float = 15.0
+    connectivity_timeout: float = 1.5
+
+    # Longest a caller waits on an identical prompt already in flight
+    prompt_coalesce_timeout: float = 60.0
+
+    # Hedged narration: when the narrator's provider has not produced a first
+    # token within the hedge_quantile of its recent first-token latencies
+    # (hedge_default_delay seconds until enough are seen), this backend is
+    # raced against it. Empty disables hedging.
+    hedge_backend: str = ""
+    hedge_model: Optional[str] = None
+    hedge_quantile: float = 0.95
+    hedge_default_delay: float = 1.5
+
     def __post_init__(self):
         self.default_provider = os.environ.get("LLM_PROVIDER", self.default_provider)
         self.default_model = os.environ.get("LLM_MODEL", self.default_model)
         self.ollama_model = os.environ.get("OLLAMA_MODEL", self.ollama_model)
+        self.hedge_backend = os.environ.get("LLM_HEDGE_PROVIDER", self.hedge_backend).lower()
+        self.hedge_model = os.environ.get("LLM_HEDGE_MODEL", self.hedge_model)
 
 
 @dataclass
@@ -75,6 +95,57 @@ class NarrativeConfig:
     few_shot_example_count: int = 2
     max_example_length: int = 400
 
+    # Narrator prompt token budget (see prompt_budget.PromptBudgetPacker):
+    # the system prompt gets what is left of the window after the player
+    # prompt and the response's max_tokens.
+    context_window_tokens: int = 8192
+
+    # Narrator context stages (see narrator_pipeline.run_stages)
+    stage_workers: int = 8
+    stage_budget_ms: float = 500.0
+    stage_cache_size: int = 256
+
+    # Speculative next-turn preparation in the server (see speculation.SpeculationCache)
+    speculation_enabled: bool = True
+    speculation_wait_seconds: float = 1.0  # About what preparing the turn inline costs
+    speculation_max_sessions: int = 64
+
+    # Per-turn side analyses (see turn_analysis.TurnAnalyzer): events and
+    # director guidance. Add "summary" and "entities" to have the model write
+    # scene summaries and extract entities too, instead of the heuristics.
+    turn_analysis_sections: tuple[str, ...] = ("events", "director")
+
+    def __post_init__(self):
+        sections = os.environ.get("STARFORGED_TURN_ANALYSIS_SECTIONS")
+        if sections:
+            self.turn_analysis_sections = tuple(name.strip() for name in sections.split(",") if name.strip())
+
+
+@dataclass
+class SessionConfig:
+    """API server sessions: storage (session_store), request execution (request_execution) and state versions (state_delta)."""
+    max_hot_sessions: int = 128  # Live GameStates kept in memory per worker
+    offload_workers: int = 8  # Threads for blocking sections of async handlers
+    loop_lag_interval_ms: float = 50.0
+    state_patch_history: int = 16  # State versions a delta request can start from
+
+    def __post_init__(self):
+        self.max_hot_sessions = int(os.environ.get("STARFORGED_MAX_HOT_SESSIONS", self.max_hot_sessions))
+        self.offload_workers = int(os.environ.get("STARFORGED_OFFLOAD_WORKERS", self.offload_workers))
+
+
+@dataclass
+class JobConfig:
+    """Background media generation (job_queue)."""
+    workers: int = 4  # Scene image, blueprint and voice jobs run at once
+    max_finished: int = 512  # Finished jobs kept for status lookups and deduplication
+    wait_timeout_seconds: float = 20.0  # Longest /api/jobs/{id}/wait long-poll
+    max_attempts: int = 3  # Runs of one failing job, counting the first
+    retry_backoff_seconds: float = 10.0  # Before the first retry; doubles after each
+
+    def __post_init__(self):
+        self.workers = int(os.environ.get("STARFORGED_MEDIA_WORKERS", self.workers))
+
 
 @dataclass
 class FeedbackConfig:
@@ -85,6 +156,7 @@ class FeedbackConfig:
     # Retrieval settings
     positive_examples: int = 2
     negative_examples: int = 1
+    example_char_budget: int = 600  # Characters of example text injected per turn
 
 
 @dataclass
@@ -176,6 +248,8 @@ class GameConfig:
     llm: LLMConfig = field(default_factory=LLMConfig)
     director: DirectorConfig = field(default_factory=DirectorConfig)
     narrative: NarrativeConfig = field(default_factory=NarrativeConfig)
+    sessions: SessionConfig = field(default_factory=SessionConfig)
+    jobs: JobConfig = field(default_factory=JobConfig)
     feedback: FeedbackConfig = field(default_factory=FeedbackConfig)
     ui: UIConfig = field(default_factory=UIConfig)
     telemetry: TelemetryConfig = field(default_factory=TelemetryConfig)
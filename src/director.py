@@ -261,6 +261,7 @@ class DirectorAgent:
         player_action: str = "",  # Added for profiling
         last_roll_outcome: str = "",
         vow_progress: float = 0.0,
+        analysis=None,
     ) -> DirectorPlan:
         """
         Analyze current state and produce a DirectorPlan.
@@ -270,6 +271,9 @@ class DirectorAgent:
             session_history: Summary of recent events
             last_roll_outcome: "strong_hit", "weak_hit", "miss", or ""
             vow_progress: 0.0 - 1.0 completion of current vow
+            analysis: TurnAnalysis of the last narration; its director
+                section replaces the separate LLM call. Looked up from the
+                turn analysis cache by ``session_history`` when omitted.
         
         Returns:
             DirectorPlan with pacing, tone, and beat guidance
@@ -363,7 +367,10 @@ class DirectorAgent:
 
         # Then try LLM analysis for richer guidance
         try:
-            llm_plan = self._llm_analyze(world_state, session_history, last_roll_outcome)
+            if analysis is None:
+                from .turn_analysis import get_turn_analyzer
+                analysis = get_turn_analyzer().cached(session_history)
+            llm_plan = self._llm_analyze(world_state, session_history, last_roll_outcome, analysis)
             if llm_plan:
                 # Merge LLM insights with heuristic plan
                 plan = self._merge_plans(plan, llm_plan)
@@ -418,8 +425,12 @@ class DirectorAgent:
         world_state: dict[str, Any],
         session_history: str,
         last_roll_outcome: str,
+        analysis=None,
     ) -> DirectorPlan | None:
         """Use LLM for deeper dramatic analysis."""
+        if analysis is not None and analysis.director:
+            return self._plan_from_llm(analysis.director)
+
         # Build context for LLM
         context = {
             "world_state": world_state,
@@ -455,14 +466,7 @@ Remember: Output ONLY valid JSON, no explanation."""
             json_end = content.rfind("}") + 1
             if json_start >= 0 and json_end > json_start:
                 json_str = content[json_start:json_end]
-                data = json.loads(json_str)
-                
-                return DirectorPlan(
-                    pacing=Pacing(data.get("pacing", "standard")),
-                    tone=Tone(data.get("tone", "mysterious")),
-                    beats=data.get("beats", []),
-                    notes_for_narrator=data.get("notes_for_narrator", ""),
-                )
+                return self._plan_from_llm(json.loads(json_str))
         except (json.JSONDecodeError, ValueError, KeyError) as e:
             logger.debug(f"LLM plan parsing fallback: {e}")
             return None
@@ -472,6 +476,16 @@ Remember: Output ONLY valid JSON, no explanation."""
         
         return None
     
+    @staticmethod
+    def _plan_from_llm(data: dict[str, Any]) -> DirectorPlan:
+        """Build a DirectorPlan from the LLM's JSON guidance."""
+        return DirectorPlan(
+            pacing=Pacing(data.get("pacing", "standard")),
+            tone=Tone(data.get("tone", "mysterious")),
+            beats=data.get("beats", []),
+            notes_for_narrator=data.get("notes_for_narrator", ""),
+        )
+
     def _merge_plans(self, heuristic: DirectorPlan, llm: DirectorPlan) -> DirectorPlan:
         """Merge heuristic and LLM plans, preferring LLM for creative elements."""
         # LLM provides better beats and notes
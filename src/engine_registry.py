@@ -0,0 +1,151 @@
+"""
+Session-scoped registry of live narrative engines.
+
+Narrative engines (NarrativeCraftEngine, ProseEnhancementEngine, ...) are
+hydrated from their GameState payload once and then kept alive between
+turns. Each engine carries a dirty flag; only engines marked dirty are
+serialized back into GameState when the turn is checkpointed.
+
+Narrator stages reach the registry through an ``EngineLease``. A stage that
+overruns its budget keeps running in the background, so its lease is
+revoked: the engines it took are dropped from the registry (the next turn
+rehydrates them from GameState) and anything it asks for afterwards is a
+detached copy.
+"""
+
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from src.logging_config import get_logger
+
+logger = get_logger("engine_registry")
+
+# Sessions whose engines stay resident; least recently used are dropped.
+MAX_LIVE_SESSIONS = 64
+
+
+@dataclass
+class EngineSlot:
+    """One live engine and the payload it was hydrated from (or last wrote)."""
+    engine: Any
+    source: Any
+    dirty: bool = False
+
+
+@dataclass
+class SessionEngineRegistry:
+    """Live engines for a single session, keyed by their GameState key."""
+    session_id: str
+    _slots: dict[str, EngineSlot] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    hydrations: int = 0
+
+    def get(self, key: str, engine_cls: type, payload: Any = None) -> Any:
+        """
+        Return the live engine for ``key``, hydrating it only when needed.
+
+        The live engine is reused while ``payload`` still matches what it was
+        hydrated from or last flushed; a different payload (a loaded save, a
+        rewound checkpoint) replaces it.
+        """
+        payload = payload or {}
+        with self._lock:
+            slot = self._slots.get(key)
+            # An empty payload is a new game or a reset, not "keep the live engine"
+            if slot is not None and (payload is slot.source or payload == slot.source):
+                return slot.engine
+
+            engine = engine_cls.from_dict(payload) if payload else engine_cls()
+            self._slots[key] = EngineSlot(engine=engine, source=payload)
+            self.hydrations += 1
+            return engine
+
+    def mark_dirty(self, key: str) -> None:
+        """Flag an engine whose state changed this turn."""
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is not None:
+                slot.dirty = True
+
+    def is_dirty(self, key: str) -> bool:
+        slot = self._slots.get(key)
+        return bool(slot and slot.dirty)
+
+    def discard(self, key: str) -> None:
+        """Forget the live engine for ``key``, unflushed changes included."""
+        with self._lock:
+            self._slots.pop(key, None)
+
+    def flush(self) -> dict[str, dict]:
+        """Serialize dirty engines for the checkpoint and clear their flags."""
+        with self._lock:
+            updates: dict[str, dict] = {}
+            for key, slot in self._slots.items():
+                if not slot.dirty:
+                    continue
+                payload = slot.engine.to_dict()
+                slot.source = payload
+                slot.dirty = False
+                updates[key] = payload
+            return updates
+
+
+class EngineLease:
+    """One stage's access to a registry, revocable if the stage overruns its budget."""
+
+    def __init__(self, registry: SessionEngineRegistry):
+        self.registry = registry
+        self.keys: set[str] = set()
+        self.revoked = False
+        self._lock = threading.Lock()
+
+    def get(self, key: str, engine_cls: type, payload: Any = None) -> Any:
+        with self._lock:
+            if not self.revoked:
+                self.keys.add(key)
+                return self.registry.get(key, engine_cls, payload)
+        return engine_cls.from_dict(payload) if payload else engine_cls()
+
+    def mark_dirty(self, key: str) -> None:
+        with self._lock:
+            if not self.revoked:
+                self.registry.mark_dirty(key)
+
+    def revoke(self) -> list[str]:
+        """Detach the stage and drop the engines it took; returns their keys."""
+        with self._lock:
+            self.revoked = True
+            for key in self.keys:
+                self.registry.discard(key)
+            return sorted(self.keys)
+
+
+_REGISTRIES: OrderedDict[str, SessionEngineRegistry] = OrderedDict()
+_REGISTRIES_LOCK = threading.Lock()
+
+
+def get_engine_registry(session_id: str) -> SessionEngineRegistry:
+    """Get (or create) the engine registry for a session."""
+    with _REGISTRIES_LOCK:
+        registry = _REGISTRIES.get(session_id)
+        if registry is None:
+            registry = SessionEngineRegistry(session_id=session_id)
+            _REGISTRIES[session_id] = registry
+            while len(_REGISTRIES) > MAX_LIVE_SESSIONS:
+                evicted, _ = _REGISTRIES.popitem(last=False)
+                logger.debug(f"Dropped live engines for idle session '{evicted}'")
+        else:
+            _REGISTRIES.move_to_end(session_id)
+        return registry
+
+
+def drop_engine_registry(session_id: Optional[str] = None) -> None:
+    """Forget live engines for one session, or for all sessions."""
+    with _REGISTRIES_LOCK:
+        if session_id is None:
+            _REGISTRIES.clear()
+        else:
+            _REGISTRIES.pop(session_id, None)
@@ -311,11 +311,13 @@ class EnhancementEngine:
         location: str = "",
         active_npcs: List[str] = None,
         player_name: str = "the protagonist",
+        analysis=None,
     ):
         """
         Process after narrative generation for event detection.
 
-        Call this after the narrator generates output.
+        Call this after the narrator generates output. ``analysis`` is the
+        turn's ``TurnAnalysis``; when given, its events are used directly.
         """
         self._lazy_init()
         active_npcs = active_npcs or []
@@ -327,6 +329,7 @@ class EnhancementEngine:
                 location=location,
                 active_npcs=active_npcs,
                 player_name=player_name,
+                analysis=analysis,
             )
 
             # Record world changes from detected events
@@ -16,6 +16,9 @@ The more you play, the better it gets - specifically for YOU.
 
 import sqlite3
 import json
+import copy
+import math
+import threading
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
@@ -27,6 +30,10 @@ import re
 from uuid import uuid4
 from collections import defaultdict, Counter
 
+from src.logging_config import get_logger
+
+logger = get_logger("feedback_learning")
+
 
 # =============================================================================
 # METRICS HOOKS
@@ -168,6 +175,27 @@ class PreferenceProfile:
 # DATABASE MANAGER
 # =============================================================================
 
+# Relevance index tokenization and BM25 parameters
+SEARCH_TOKEN = re.compile(r"[a-z0-9']+")
+SEARCH_STOPWORDS = frozenset({
+    "the", "and", "you", "your", "are", "was", "were", "for", "with", "that",
+    "this", "but", "not", "its", "his", "her", "they", "them", "their", "into",
+    "from", "has", "have", "had", "can", "all", "out", "then", "than", "there",
+})
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Postings read to generate candidates; rarer terms are read first
+SEARCH_MAX_CANDIDATE_POSTINGS = 500
+
+
+def search_terms(text: str) -> List[str]:
+    """Tokenize text for the relevance index (lowercase, no stopwords)."""
+    return [
+        token for token in SEARCH_TOKEN.findall(text.lower())
+        if len(token) > 2 and token not in SEARCH_STOPWORDS
+    ]
+
+
 class FeedbackDatabase:
     """SQLite database for feedback storage."""
     
@@ -175,27 +203,47 @@ class FeedbackDatabase:
         self.db_path = db_path
         self._is_memory = db_path == ":memory:"
         self._conn = None
+        self._local = threading.local()
+        self._thread_conns: Dict[int, sqlite3.Connection] = {}
+        self._conns_lock = threading.Lock()
         
         # For in-memory databases, keep a single connection open
         if self._is_memory:
-            self._conn = sqlite3.connect(":memory:")
-            self._init_tables(self._conn)
-        else:
-            # For file databases, just ensure tables exist
-            conn = sqlite3.connect(db_path)
-            self._init_tables(conn)
-            conn.close()
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self._init_tables(self._get_conn())
     
     def _get_conn(self):
-        """Get a database connection."""
+        """Get this thread's pooled connection (the shared one for in-memory databases)."""
         if self._is_memory:
             return self._conn
-        return sqlite3.connect(self.db_path)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            self._register_conn(conn)
+        return conn
+    
+    def _register_conn(self, conn: sqlite3.Connection):
+        """Track a thread's connection, closing those left by finished threads."""
+        live = {thread.ident for thread in threading.enumerate()}
+        with self._conns_lock:
+            for ident in [i for i in self._thread_conns if i not in live]:
+                self._thread_conns.pop(ident).close()
+            self._thread_conns[threading.get_ident()] = conn
     
-    def _close_conn(self, conn):
-        """Close connection (unless in-memory)."""
-        if not self._is_memory:
-            conn.close()
+    def close(self):
+        """Close every pooled connection."""
+        with self._conns_lock:
+            for conn in self._thread_conns.values():
+                conn.close()
+            self._thread_conns.clear()
+        self._local = threading.local()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
     
     def _init_tables(self, conn):
         """Initialize database tables."""
@@ -250,37 +298,191 @@ class FeedbackDatabase:
             )
         """)
         
+        # Per-word document frequency, maintained by save_paragraph
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS word_stats (
+                word TEXT PRIMARY KEY,
+                accepted_docs INTEGER NOT NULL DEFAULT 0,
+                rejected_docs INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_word_stats_accepted ON word_stats (accepted_docs)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_word_stats_rejected ON word_stats (rejected_docs)")
+        
+        # Running sentence-length aggregates, one row per decision (accepted = 0/1)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS length_stats (
+                accepted INTEGER PRIMARY KEY,
+                paragraphs INTEGER NOT NULL DEFAULT 0,
+                sentence_samples INTEGER NOT NULL DEFAULT 0,
+                sentence_length_sum REAL NOT NULL DEFAULT 0,
+                sentence_length_sumsq REAL NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # BM25 relevance index: postings per term, document lengths, corpus totals
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_postings (
+                term TEXT NOT NULL,
+                accepted INTEGER NOT NULL,
+                paragraph_id TEXT NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, accepted, paragraph_id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_search_postings_paragraph ON search_postings (paragraph_id)")
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_terms (
+                term TEXT NOT NULL,
+                accepted INTEGER NOT NULL,
+                df INTEGER NOT NULL,
+                PRIMARY KEY (term, accepted)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_docs (
+                paragraph_id TEXT PRIMARY KEY,
+                accepted INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_stats (
+                accepted INTEGER PRIMARY KEY,
+                documents INTEGER NOT NULL DEFAULT 0,
+                total_length INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        
+        # Databases written before the stats tables existed need a one-off backfill
+        cursor.execute("SELECT COUNT(*) FROM length_stats")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT text, accepted, avg_sentence_length FROM paragraphs")
+            for text, accepted, avg_sentence_length in cursor.fetchall():
+                self._apply_paragraph_stats(cursor, text, bool(accepted), avg_sentence_length, 1)
+        cursor.execute("SELECT COUNT(*) FROM search_stats")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("SELECT paragraph_id, text, accepted FROM paragraphs")
+            for paragraph_id, text, accepted in cursor.fetchall():
+                self._index_paragraph(cursor, paragraph_id, text, bool(accepted))
+        
+        # Composite index in ExampleRetriever's filter order, plus the unfiltered fallback
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_paragraphs_retrieval
+            ON paragraphs (accepted, pacing, tone, scene_type, timestamp)
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_paragraphs_recent ON paragraphs (accepted, timestamp)")
+        
         conn.commit()
     
+    @staticmethod
+    def _apply_paragraph_stats(cursor, text: str, accepted: bool, avg_sentence_length: float, sign: int):
+        """Add (sign=1) or remove (sign=-1) one paragraph from the stats tables."""
+        words = set(text.lower().split())
+        if words:
+            column = "accepted_docs" if accepted else "rejected_docs"
+            cursor.executemany(f"""
+                INSERT INTO word_stats (word, {column}) VALUES (?, ?)
+                ON CONFLICT(word) DO UPDATE SET {column} = {column} + excluded.{column}
+            """, [(word, sign) for word in words])
+        
+        length = avg_sentence_length or 0.0
+        sampled = 1 if length > 0 else 0
+        cursor.execute("""
+            INSERT INTO length_stats VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(accepted) DO UPDATE SET
+                paragraphs = paragraphs + excluded.paragraphs,
+                sentence_samples = sentence_samples + excluded.sentence_samples,
+                sentence_length_sum = sentence_length_sum + excluded.sentence_length_sum,
+                sentence_length_sumsq = sentence_length_sumsq + excluded.sentence_length_sumsq
+        """, (
+            1 if accepted else 0,
+            sign,
+            sign * sampled,
+            sign * sampled * length,
+            sign * sampled * length * length,
+        ))
+    
+    @staticmethod
+    def _index_paragraph(cursor, paragraph_id: str, text: str, accepted: bool):
+        """Add one paragraph to the BM25 relevance index."""
+        terms = search_terms(text)
+        counts = Counter(terms)
+        flag = 1 if accepted else 0
+        cursor.executemany(
+            "INSERT INTO search_postings VALUES (?, ?, ?, ?)",
+            [(term, flag, paragraph_id, tf) for term, tf in counts.items()]
+        )
+        cursor.executemany("""
+            INSERT INTO search_terms VALUES (?, ?, 1)
+            ON CONFLICT(term, accepted) DO UPDATE SET df = df + 1
+        """, [(term, flag) for term in counts])
+        cursor.execute("INSERT INTO search_docs VALUES (?, ?, ?)", (paragraph_id, flag, len(terms)))
+        cursor.execute("""
+            INSERT INTO search_stats VALUES (?, 1, ?)
+            ON CONFLICT(accepted) DO UPDATE SET
+                documents = documents + 1,
+                total_length = total_length + excluded.total_length
+        """, (flag, len(terms)))
+    
+    @staticmethod
+    def _unindex_paragraph(cursor, paragraph_id: str):
+        """Remove one paragraph from the BM25 relevance index."""
+        cursor.execute("SELECT accepted, length FROM search_docs WHERE paragraph_id = ?", (paragraph_id,))
+        doc = cursor.fetchone()
+        if not doc:
+            return
+        cursor.execute("""
+            UPDATE search_terms SET df = df - 1
+            WHERE accepted = ? AND term IN (SELECT term FROM search_postings WHERE paragraph_id = ?)
+        """, (doc[0], paragraph_id))
+        cursor.execute("DELETE FROM search_postings WHERE paragraph_id = ?", (paragraph_id,))
+        cursor.execute("DELETE FROM search_docs WHERE paragraph_id = ?", (paragraph_id,))
+        cursor.execute(
+            "UPDATE search_stats SET documents = documents - 1, total_length = total_length - ? WHERE accepted = ?",
+            (doc[1], doc[0])
+        )
+    
     def save_paragraph(self, para: GeneratedParagraph):
         """Save a paragraph to the database."""
         conn = self._get_conn()
-        cursor = conn.cursor()
+        # The paragraph and its stats commit (or roll back) together
+        with conn:
+            cursor = conn.cursor()
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO paragraphs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            para.paragraph_id,
-            para.text,
-            1 if para.accepted else 0,
-            para.pacing,
-            para.tone,
-            para.scene_type,
-            json.dumps(para.npcs_present),
-            para.location,
-            para.oracle_result,
-            para.move_triggered,
-            json.dumps(para.seeds_activated),
-            json.dumps(para.consequences_triggered),
-            para.session_number,
-            para.timestamp,
-            para.word_count,
-            para.sentence_count,
-            para.avg_sentence_length
-        ))
+            # Re-saving an id replaces the row, so retract its old contribution first
+            cursor.execute(
+                "SELECT text, accepted, avg_sentence_length FROM paragraphs WHERE paragraph_id = ?",
+                (para.paragraph_id,)
+            )
+            previous = cursor.fetchone()
+            if previous:
+                self._apply_paragraph_stats(cursor, previous[0], bool(previous[1]), previous[2], -1)
+                self._unindex_paragraph(cursor, para.paragraph_id)
+            self._apply_paragraph_stats(cursor, para.text, para.accepted, para.avg_sentence_length, 1)
+            self._index_paragraph(cursor, para.paragraph_id, para.text, para.accepted)
         
-        conn.commit()
-        self._close_conn(conn)
+            cursor.execute("""
+                INSERT OR REPLACE INTO paragraphs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                para.paragraph_id,
+                para.text,
+                1 if para.accepted else 0,
+                para.pacing,
+                para.tone,
+                para.scene_type,
+                json.dumps(para.npcs_present),
+                para.location,
+                para.oracle_result,
+                para.move_triggered,
+                json.dumps(para.seeds_activated),
+                json.dumps(para.consequences_triggered),
+                para.session_number,
+                para.timestamp,
+                para.word_count,
+                para.sentence_count,
+                para.avg_sentence_length
+            ))
     
     def query_paragraphs(
         self,
@@ -312,51 +514,135 @@ class FeedbackDatabase:
             params.append(scene_type)
         
         query += " ORDER BY timestamp " + ("DESC" if recent_first else "ASC")
-        query += f" LIMIT {limit}"
+        query += " LIMIT ?"
+        params.append(limit)
         
         cursor.execute(query, params)
-        rows = cursor.fetchall()
-        self._close_conn(conn)
-        
-        paragraphs = []
-        for row in rows:
-            paragraphs.append(GeneratedParagraph(
-                paragraph_id=row[0],
-                text=row[1],
-                accepted=bool(row[2]),
-                pacing=row[3],
-                tone=row[4],
-                scene_type=row[5],
-                npcs_present=json.loads(row[6]) if row[6] else [],
-                location=row[7],
-                oracle_result=row[8],
-                move_triggered=row[9],
-                seeds_activated=json.loads(row[10]) if row[10] else [],
-                consequences_triggered=json.loads(row[11]) if row[11] else [],
-                session_number=row[12],
-                timestamp=row[13],
-                word_count=row[14],
-                sentence_count=row[15],
-                avg_sentence_length=row[16]
-            ))
+        return [self._row_to_paragraph(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _row_to_paragraph(row) -> GeneratedParagraph:
+        return GeneratedParagraph(
+            paragraph_id=row[0],
+            text=row[1],
+            accepted=bool(row[2]),
+            pacing=row[3],
+            tone=row[4],
+            scene_type=row[5],
+            npcs_present=json.loads(row[6]) if row[6] else [],
+            location=row[7],
+            oracle_result=row[8],
+            move_triggered=row[9],
+            seeds_activated=json.loads(row[10]) if row[10] else [],
+            consequences_triggered=json.loads(row[11]) if row[11] else [],
+            session_number=row[12],
+            timestamp=row[13],
+            word_count=row[14],
+            sentence_count=row[15],
+            avg_sentence_length=row[16]
+        )
+    
+    def get_paragraphs(self, paragraph_ids: List[str]) -> List[GeneratedParagraph]:
+        """Fetch paragraphs by id, preserving the order of ``paragraph_ids``."""
+        if not paragraph_ids:
+            return []
+        conn = self._get_conn()
+        placeholders = ", ".join("?" for _ in paragraph_ids)
+        rows = conn.execute(
+            f"SELECT * FROM paragraphs WHERE paragraph_id IN ({placeholders})", list(paragraph_ids)
+        ).fetchall()
+        by_id = {row[0]: self._row_to_paragraph(row) for row in rows}
+        return [by_id[pid] for pid in paragraph_ids if pid in by_id]
+    
+    def search_paragraphs(
+        self,
+        query: str,
+        accepted: bool,
+        limit: int = 20,
+        max_df_ratio: float = 0.5
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank paragraphs by BM25 relevance to ``query``.
+        
+        Candidates come from the rarest query terms' postings, capped at
+        SEARCH_MAX_CANDIDATE_POSTINGS; commoner terms only add to the scores of
+        those candidates, so a query costs the same at 1k or 100k paragraphs.
+        Terms found in more than ``max_df_ratio`` of the documents are skipped.
+        Returns (paragraph_id, score) pairs, best first.
+        """
+        terms = sorted(set(search_terms(query)))
+        if not terms:
+            return []
+        
+        flag = 1 if accepted else 0
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT documents, total_length FROM search_stats WHERE accepted = ?", (flag,))
+        totals = cursor.fetchone()
+        if not totals or not totals[0]:
+            return []
+        documents, total_length = totals
+        avg_length = total_length / documents if total_length else 1.0
+        
+        placeholders = ", ".join("?" for _ in terms)
+        cursor.execute(
+            f"SELECT term, df FROM search_terms WHERE accepted = ? AND term IN ({placeholders}) AND df > 0",
+            [flag, *terms]
+        )
+        doc_freq = sorted(cursor.fetchall(), key=lambda item: (item[1], item[0]))
+        if documents >= 4:  # In tiny corpora every shared term looks "common"
+            doc_freq = [(term, df) for term, df in doc_freq if df <= documents * max_df_ratio]
+        
+        postings: List[Tuple[str, str, int]] = []
+        candidates: set = set()
+        scanned = 0
+        for term, df in doc_freq:
+            if not candidates or scanned + df <= SEARCH_MAX_CANDIDATE_POSTINGS:
+                cursor.execute(
+                    "SELECT paragraph_id, tf FROM search_postings WHERE term = ? AND accepted = ? LIMIT ?",
+                    (term, flag, SEARCH_MAX_CANDIDATE_POSTINGS)
+                )
+                rows = cursor.fetchall()
+                scanned += len(rows)
+                candidates.update(pid for pid, _ in rows)
+            else:
+                ids = sorted(candidates)
+                cursor.execute(f"""
+                    SELECT paragraph_id, tf FROM search_postings
+                    WHERE term = ? AND accepted = ? AND paragraph_id IN ({", ".join("?" for _ in ids)})
+                """, [term, flag, *ids])
+                rows = cursor.fetchall()
+            postings.extend((pid, term, tf) for pid, tf in rows)
+        
+        if not postings:
+            return []
+        ids = sorted(candidates)
+        cursor.execute(
+            f"SELECT paragraph_id, length FROM search_docs WHERE paragraph_id IN ({', '.join('?' for _ in ids)})",
+            ids
+        )
+        lengths = dict(cursor.fetchall())
+        idf = {term: math.log(1 + (documents - df + 0.5) / (df + 0.5)) for term, df in doc_freq}
         
-        return paragraphs
+        scores: Dict[str, float] = defaultdict(float)
+        for paragraph_id, term, tf in postings:
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * lengths.get(paragraph_id, avg_length) / avg_length)
+            scores[paragraph_id] += idf[term] * tf * (BM25_K1 + 1) / norm
+        
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get overall statistics."""
         conn = self._get_conn()
         cursor = conn.cursor()
         
-        cursor.execute("SELECT COUNT(*) FROM paragraphs")
-        total = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM paragraphs WHERE accepted = 1")
-        accepted = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(DISTINCT session_number) FROM paragraphs")
-        sessions = cursor.fetchone()[0]
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(accepted), 0), COUNT(DISTINCT session_number)
+            FROM paragraphs
+        """)
+        total, accepted, sessions = cursor.fetchone()
         
-        self._close_conn(conn)
         
         return {
             "total_paragraphs": total,
@@ -366,6 +652,57 @@ class FeedbackDatabase:
             "sessions": sessions
         }
     
+    def get_length_stats(self) -> Dict[bool, Dict[str, float]]:
+        """Paragraph counts and sentence-length aggregates, keyed by accepted."""
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT accepted, paragraphs, sentence_samples, sentence_length_sum, sentence_length_sumsq
+            FROM length_stats
+        """)
+        rows = cursor.fetchall()
+        
+        stats = {
+            flag: {"paragraphs": 0, "sentence_samples": 0, "sentence_length_sum": 0.0, "sentence_length_sumsq": 0.0}
+            for flag in (True, False)
+        }
+        for accepted, paragraphs, samples, total, total_sq in rows:
+            stats[bool(accepted)] = {
+                "paragraphs": paragraphs,
+                "sentence_samples": samples,
+                "sentence_length_sum": total,
+                "sentence_length_sumsq": total_sq,
+            }
+        return stats
+    
+    def top_words(self, accepted: bool, limit: int = 100, min_length: int = 4) -> List[Tuple[str, int, int]]:
+        """Most frequent words by document frequency as (word, accepted_docs, rejected_docs)."""
+        column = "accepted_docs" if accepted else "rejected_docs"
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT word, accepted_docs, rejected_docs FROM word_stats
+            WHERE {column} > 0 AND length(word) >= ?
+            ORDER BY {column} DESC, word
+            LIMIT ?
+        """, (min_length, limit))
+        rows = cursor.fetchall()
+        return rows
+    
+    def word_frequencies(self, words: List[str]) -> Dict[str, Tuple[int, int]]:
+        """Document frequency (accepted, rejected) for specific words."""
+        if not words:
+            return {}
+        conn = self._get_conn()
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" for _ in words)
+        cursor.execute(
+            f"SELECT word, accepted_docs, rejected_docs FROM word_stats WHERE word IN ({placeholders})",
+            list(words)
+        )
+        rows = cursor.fetchall()
+        return {word: (accepted, rejected) for word, accepted, rejected in rows}
+    
     def save_seed(self, seed: NarrativeSeed):
         """Save a seed to the database."""
         conn = self._get_conn()
@@ -388,7 +725,6 @@ class FeedbackDatabase:
         ))
         
         conn.commit()
-        self._close_conn(conn)
     
     def save_preferences(self, profile: PreferenceProfile):
         """Save preference profile."""
@@ -401,7 +737,6 @@ class FeedbackDatabase:
         """, (json.dumps(profile_dict), datetime.now().isoformat()))
         
         conn.commit()
-        self._close_conn(conn)
     
     def get_latest_preferences(self) -> Optional[PreferenceProfile]:
         """Get most recent preference profile."""
@@ -413,7 +748,6 @@ class FeedbackDatabase:
                 SELECT profile_json FROM preferences ORDER BY id DESC LIMIT 1
             """)
             row = cursor.fetchone()
-            self._close_conn(conn)
             
             if row:
                 data = json.loads(row[0])
@@ -437,22 +771,24 @@ class PreferenceAnalyzer:
     def analyze_all_preferences(self, min_samples: int = 20) -> PreferenceProfile:
         """Run full preference analysis."""
         
-        accepted = self.db.query_paragraphs(accepted=True, limit=500)
-        rejected = self.db.query_paragraphs(accepted=False, limit=500)
+        totals = self.db.get_length_stats()
+        accepted_total = totals[True]["paragraphs"]
+        rejected_total = totals[False]["paragraphs"]
         
-        if len(accepted) + len(rejected) < min_samples:
+        if accepted_total + rejected_total < min_samples:
             return PreferenceProfile()  # Not enough data
         
+        accepted = self.db.query_paragraphs(accepted=True, limit=500)
+        rejected = self.db.query_paragraphs(accepted=False, limit=500)
+        
         profile = PreferenceProfile()
-        profile.total_decisions_analyzed = len(accepted) + len(rejected)
+        profile.total_decisions_analyzed = accepted_total + rejected_total
         profile.last_analysis = datetime.now().isoformat()
         
-        # Analyze sentence length
-        profile.preferred_sentence_length = self._analyze_sentence_length(accepted, rejected)
-        
-        # Analyze vocabulary
-        profile.forbidden_words = self._find_forbidden_words(accepted, rejected)
-        profile.preferred_words = self._find_preferred_words(accepted, rejected)
+        # Sentence length and vocabulary come from the incremental stats tables
+        profile.preferred_sentence_length = self._analyze_sentence_length(totals[True])
+        profile.forbidden_words = self._find_forbidden_words(accepted_total, rejected_total)
+        profile.preferred_words = self._find_preferred_words(accepted_total, rejected_total)
         
         # Analyze paragraph length
         profile.max_paragraph_words = self._analyze_paragraph_length(accepted, rejected)
@@ -468,53 +804,31 @@ class PreferenceAnalyzer:
         
         return profile
     
-    def _analyze_sentence_length(
-        self,
-        accepted: List[GeneratedParagraph],
-        rejected: List[GeneratedParagraph]
-    ) -> Tuple[float, float]:
-        """Find preferred sentence length range."""
+    def _analyze_sentence_length(self, accepted_stats: Dict[str, float]) -> Tuple[float, float]:
+        """Find preferred sentence length range from running aggregates."""
         
-        accepted_lengths = [p.avg_sentence_length for p in accepted if p.avg_sentence_length > 0]
-        rejected_lengths = [p.avg_sentence_length for p in rejected if p.avg_sentence_length > 0]
-        
-        if not accepted_lengths:
+        samples = accepted_stats["sentence_samples"]
+        if not samples:
             return (8.0, 15.0)
         
         # Find sweet spot
-        avg_accepted = sum(accepted_lengths) / len(accepted_lengths)
+        avg_accepted = accepted_stats["sentence_length_sum"] / samples
         
         # Standard deviation for range
-        variance = sum((x - avg_accepted) ** 2 for x in accepted_lengths) / len(accepted_lengths)
+        variance = max(0.0, accepted_stats["sentence_length_sumsq"] / samples - avg_accepted ** 2)
         std_dev = variance ** 0.5
         
         return (max(5, avg_accepted - std_dev), avg_accepted + std_dev)
     
-    def _find_forbidden_words(
-        self,
-        accepted: List[GeneratedParagraph],
-        rejected: List[GeneratedParagraph]
-    ) -> List[str]:
+    def _find_forbidden_words(self, accepted_total: int, rejected_total: int) -> List[str]:
         """Find words that appear much more often in rejected paragraphs."""
         
-        accepted_words = Counter()
-        rejected_words = Counter()
-        
-        for p in accepted:
-            accepted_words.update(p.text.lower().split())
-        for p in rejected:
-            rejected_words.update(p.text.lower().split())
-        
         forbidden = []
         
         # Words that appear in rejected but rarely in accepted
-        for word, count in rejected_words.most_common(100):
-            if len(word) < 4:
-                continue
-            
-            accepted_count = accepted_words.get(word, 0)
-            rejected_rate = count / len(rejected) if rejected else 0
-            accepted_rate = accepted_count / len(accepted) if accepted else 0
+        for word, accepted_count, count in self.db.top_words(accepted=False, limit=100):
+            rejected_rate = count / rejected_total if rejected_total else 0
+            accepted_rate = accepted_count / accepted_total if accepted_total else 0
             
             # Word appears 3x more often in rejected
             if rejected_rate > accepted_rate * 3 and count >= 3:
@@ -522,37 +836,23 @@ class PreferenceAnalyzer:
         
         # Common problematic words to check
         KNOWN_PROBLEMATIC = ["suddenly", "very", "really", "just", "basically"]
+        frequencies = self.db.word_frequencies(KNOWN_PROBLEMATIC)
         for word in KNOWN_PROBLEMATIC:
-            if word in rejected_words and rejected_words[word] > accepted_words.get(word, 0) * 2:
+            accepted_count, rejected_count = frequencies.get(word, (0, 0))
+            if rejected_count and rejected_count > accepted_count * 2:
                 if word not in forbidden:
                     forbidden.append(word)
         
         return forbidden[:10]
     
-    def _find_preferred_words(
-        self,
-        accepted: List[GeneratedParagraph],
-        rejected: List[GeneratedParagraph]
-    ) -> List[str]:
+    def _find_preferred_words(self, accepted_total: int, rejected_total: int) -> List[str]:
         """Find words that appear much more often in accepted paragraphs."""
         
-        accepted_words = Counter()
-        rejected_words = Counter()
-        
-        for p in accepted:
-            accepted_words.update(p.text.lower().split())
-        for p in rejected:
-            rejected_words.update(p.text.lower().split())
-        
         preferred = []
         
-        for word, count in accepted_words.most_common(100):
-            if len(word) < 4:
-                continue
-            
-            rejected_count = rejected_words.get(word, 0)
-            accepted_rate = count / len(accepted) if accepted else 0
-            rejected_rate = rejected_count / len(rejected) if rejected else 0
+        for word, count, rejected_count in self.db.top_words(accepted=True, limit=100):
+            accepted_rate = count / accepted_total if accepted_total else 0
+            rejected_rate = rejected_count / rejected_total if rejected_total else 0
             
             # Word appears 3x more often in accepted
             if accepted_rate > rejected_rate * 3 and count >= 3:
@@ -657,17 +957,83 @@ class PreferenceAnalyzer:
 class ExampleRetriever:
     """Retrieves similar examples for few-shot prompting."""
     
+    # Displayed length of each example in the few-shot prompt
+    POSITIVE_DISPLAY_CHARS = 200
+    NEGATIVE_DISPLAY_CHARS = 100
+    
     def __init__(self, db: FeedbackDatabase):
         self.db = db
     
+    @staticmethod
+    def _scene_query(context: Dict[str, Any]) -> str:
+        """What the current scene is about: the player's input plus the location."""
+        return " ".join(str(context.get(key) or "") for key in ("player_input", "location")).strip()
+    
+    def _ranked_candidates(
+        self,
+        context: Dict[str, Any],
+        accepted: bool,
+        pool: int
+    ) -> List[GeneratedParagraph]:
+        """Paragraphs most relevant to the scene, ties broken by matching pacing/tone/scene."""
+        query = self._scene_query(context)
+        if not query:
+            return []
+        ranked = self.db.search_paragraphs(query, accepted=accepted, limit=pool)
+        if not ranked:
+            return []
+        
+        scores = dict(ranked)
+        wanted = [(field_name, context.get(field_name)) for field_name in ("pacing", "tone", "scene_type")]
+        
+        def rank_key(para: GeneratedParagraph):
+            matches = sum(1 for field_name, value in wanted if value and getattr(para, field_name) == value)
+            return (-scores[para.paragraph_id], -matches)
+        
+        return sorted(self.db.get_paragraphs([pid for pid, _ in ranked]), key=rank_key)
+    
+    @staticmethod
+    def _merge(*groups: List[GeneratedParagraph]) -> List[GeneratedParagraph]:
+        seen = set()
+        merged = []
+        for group in groups:
+            for para in group:
+                if para.paragraph_id not in seen:
+                    seen.add(para.paragraph_id)
+                    merged.append(para)
+        return merged
+    
+    @staticmethod
+    def _within_budget(
+        texts: List[str],
+        n: int,
+        char_budget: Optional[int],
+        display_chars: int
+    ) -> List[str]:
+        """Take up to ``n`` texts in rank order whose displayed length fits the budget."""
+        chosen = []
+        used = 0
+        for text in texts:
+            if len(chosen) >= n:
+                break
+            cost = min(len(text), display_chars)
+            if char_budget is not None and used + cost > char_budget:
+                continue
+            chosen.append(text)
+            used += cost
+        return chosen
+    
     def get_positive_examples(
         self,
         context: Dict[str, Any],
-        n: int = 3
+        n: int = 3,
+        char_budget: Optional[int] = None
     ) -> List[str]:
-        """Get similar accepted paragraphs."""
+        """Get accepted paragraphs, most relevant to the current scene first."""
+        
+        relevant = self._ranked_candidates(context, accepted=True, pool=n * 10)
         
-        # Query with context filtering
+        # Fill remaining slots with recent paragraphs matching the scene settings
         candidates = self.db.query_paragraphs(
             accepted=True,
             pacing=context.get("pacing"),
@@ -677,24 +1043,26 @@ class ExampleRetriever:
             recent_first=True
         )
         
-        if len(candidates) < n:
+        if len(relevant) + len(candidates) < n:
             # Fallback to any accepted
-            candidates = self.db.query_paragraphs(
+            candidates += self.db.query_paragraphs(
                 accepted=True,
                 limit=n * 2,
                 recent_first=True
             )
         
-        # Return top n
-        return [c.text for c in candidates[:n]]
+        texts = [p.text for p in self._merge(relevant, candidates)]
+        return self._within_budget(texts, n, char_budget, self.POSITIVE_DISPLAY_CHARS)
     
     def get_negative_examples(
         self,
         context: Dict[str, Any],
-        n: int = 2
+        n: int = 2,
+        char_budget: Optional[int] = None
     ) -> List[str]:
-        """Get similar rejected paragraphs to avoid."""
+        """Get rejected paragraphs to avoid, most relevant to the current scene first."""
         
+        relevant = self._ranked_candidates(context, accepted=False, pool=n * 10)
         candidates = self.db.query_paragraphs(
             accepted=False,
             pacing=context.get("pacing"),
@@ -704,32 +1072,43 @@ class ExampleRetriever:
             recent_first=True
         )
         
-        return [c.text for c in candidates[:n]]
+        texts = [p.text for p in self._merge(relevant, candidates)]
+        return self._within_budget(texts, n, char_budget, self.NEGATIVE_DISPLAY_CHARS)
     
     def build_few_shot_prompt(
         self,
         context: Dict[str, Any],
         n_positive: int = 3,
-        n_negative: int = 2
+        n_negative: int = 2,
+        char_budget: Optional[int] = None
     ) -> str:
-        """Build a few-shot prompt from examples."""
+        """
+        Build a few-shot prompt from examples.
         
-        positive = self.get_positive_examples(context, n_positive)
-        negative = self.get_negative_examples(context, n_negative)
+        ``char_budget`` caps the example text injected; positive examples are
+        chosen first and anti-examples share whatever budget is left.
+        """
         
+        positive = self.get_positive_examples(context, n_positive, char_budget)
         if not positive:
             return ""
         
+        remaining = None
+        if char_budget is not None:
+            remaining = char_budget - sum(min(len(ex), self.POSITIVE_DISPLAY_CHARS) for ex in positive)
+        negative = self.get_negative_examples(context, n_negative, remaining)
+        
         prompt = "<learned_style>\n"
         prompt += "EXAMPLES THE PLAYER LOVED:\n"
         for i, ex in enumerate(positive, 1):
-            prompt += f"  Example {i}: \"{ex[:200]}...\"\n" if len(ex) > 200 else f"  Example {i}: \"{ex}\"\n"
+            limit = self.POSITIVE_DISPLAY_CHARS
+            prompt += f"  Example {i}: \"{ex[:limit]}...\"\n" if len(ex) > limit else f"  Example {i}: \"{ex}\"\n"
         
         if negative:
             prompt += "\nPATTERNS THE PLAYER REJECTED (avoid these):\n"
             for i, ex in enumerate(negative, 1):
                 # Only show the problematic pattern, not full text
-                prompt += f"  Anti-example {i}: \"{ex[:100]}...\"\n"
+                prompt += f"  Anti-example {i}: \"{ex[:self.NEGATIVE_DISPLAY_CHARS]}...\"\n"
         
         prompt += "</learned_style>\n"
         return prompt
@@ -791,6 +1170,159 @@ PLAYER-SPECIFIC STYLE RULES (from {self.profile.total_decisions_analyzed} decisi
 """
 
 
+# =============================================================================
+# BACKGROUND PREFERENCE ANALYSIS
+# =============================================================================
+
+@dataclass(frozen=True)
+class PreferenceSnapshot:
+    """Published result of a preference analysis, shared read-only with readers."""
+    profile: Optional[PreferenceProfile] = None
+    guidance: str = ""
+    decisions_analyzed: int = 0
+    version: int = 0
+
+
+class PreferenceAnalysisWorker:
+    """
+    Re-runs preference analysis on a daemon thread.
+
+    Recording feedback only bumps a counter; once ``reanalysis_threshold`` new
+    decisions have arrived the worker re-analyzes, persists the profile and
+    swaps in a new :class:`PreferenceSnapshot`. Readers call :meth:`snapshot`,
+    which never touches the database.
+    """
+
+    def __init__(
+        self,
+        db: FeedbackDatabase,
+        reanalysis_threshold: int = 10,
+        min_samples: int = 20,
+    ):
+        self.db = db
+        self.analyzer = PreferenceAnalyzer(db)
+        self.reanalysis_threshold = reanalysis_threshold
+        self.min_samples = min_samples
+        self.analyses_run = 0
+
+        self._snapshot = PreferenceSnapshot()
+        self._pending = 0
+        self._wake = threading.Event()
+        self._published = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name=f"preference-analysis:{db.db_path}", daemon=True
+        )
+        self._thread.start()
+
+    def snapshot(self) -> PreferenceSnapshot:
+        """Latest published preferences (non-blocking)."""
+        return self._snapshot
+
+    def notify_decision(self, count: int = 1) -> None:
+        """Count newly recorded decisions, waking the worker at the threshold."""
+        self._pending += count
+        if self._pending >= self.reanalysis_threshold:
+            self._wake.set()
+
+    def request_analysis(self) -> None:
+        """Ask the worker to check for due analysis now."""
+        self._wake.set()
+
+    def wait_for_version(self, version: int, timeout: float = 5.0) -> bool:
+        """Block until a snapshot newer than ``version`` is published (for tests/tools)."""
+        with self._published:
+            return self._published.wait_for(lambda: self._snapshot.version > version, timeout)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        try:
+            profile = self.db.get_latest_preferences()
+        except Exception as e:
+            logger.warning(f"Preference worker could not load profile: {e}")
+            profile = None
+        if profile is not None:
+            self._publish(profile)
+
+        while not self._stopped:
+            # Clear before checking so a notify that lands mid-analysis is not lost
+            self._wake.clear()
+            try:
+                self._analyze_if_due()
+            except Exception as e:
+                logger.warning(f"Preference analysis error: {e}")
+            self._wake.wait()
+
+    def _analyze_if_due(self) -> None:
+        self._pending = 0
+        total = self.db.get_statistics()["total_paragraphs"]
+        if total < self.min_samples:
+            return
+        current = self._snapshot.profile
+        if current is not None and total - current.total_decisions_analyzed < self.reanalysis_threshold:
+            return
+
+        profile = self.analyzer.analyze_all_preferences(min_samples=self.min_samples)
+        self.db.save_preferences(profile)
+        self.analyses_run += 1
+        self._publish(profile)
+
+    def _publish(self, profile: PreferenceProfile) -> None:
+        profile = copy.deepcopy(profile)
+        snapshot = PreferenceSnapshot(
+            profile=profile,
+            guidance=PromptModifier(profile).generate_modifications(),
+            decisions_analyzed=profile.total_decisions_analyzed,
+            version=self._snapshot.version + 1,
+        )
+        with self._published:
+            self._snapshot = snapshot
+            self._published.notify_all()
+
+
+_PREFERENCE_WORKERS: Dict[str, PreferenceAnalysisWorker] = {}
+_PREFERENCE_WORKERS_LOCK = threading.Lock()
+
+
+def _worker_key(db_path: str) -> str:
+    return db_path if db_path == ":memory:" else str(Path(db_path).resolve())
+
+
+def get_preference_worker(db_path: str) -> PreferenceAnalysisWorker:
+    """Get (or start) the shared analysis worker for a feedback database file."""
+    if db_path == ":memory:":
+        raise ValueError("In-memory feedback databases have no shared worker; build one directly")
+    from src.config import config
+
+    key = _worker_key(db_path)
+    worker = _PREFERENCE_WORKERS.get(key)
+    if worker is not None:
+        return worker
+    with _PREFERENCE_WORKERS_LOCK:
+        worker = _PREFERENCE_WORKERS.get(key)
+        if worker is None:
+            worker = PreferenceAnalysisWorker(
+                FeedbackDatabase(db_path),
+                reanalysis_threshold=config.feedback.reanalysis_threshold,
+                min_samples=config.feedback.min_paragraphs_for_analysis,
+            )
+            _PREFERENCE_WORKERS[key] = worker
+        return worker
+
+
+def stop_preference_workers() -> None:
+    """Stop and forget all shared workers (primarily for tests)."""
+    with _PREFERENCE_WORKERS_LOCK:
+        workers = list(_PREFERENCE_WORKERS.values())
+        _PREFERENCE_WORKERS.clear()
+    for worker in workers:
+        worker.stop()
+
+
 # =============================================================================
 # MASTER FEEDBACK ENGINE
 # =============================================================================
@@ -837,6 +1369,8 @@ class FeedbackLearningEngine:
         )
         
         self.db.save_paragraph(paragraph)
+        if not self.db._is_memory:
+            get_preference_worker(self.db.db_path).notify_decision()
         return para_id
     
     def run_preference_analysis(self) -> PreferenceProfile:
@@ -428,6 +428,12 @@ class GameState(TypedDict):
     # Narrative Orchestrator (all narrative systems)
     narrative_orchestrator: NarrativeOrchestratorState
 
+    # Narrative engine payloads (written back by the session engine registry)
+    narrative_craft: dict[str, Any]
+    prose_enhancement: dict[str, Any]
+    narrative_systems: dict[str, Any]
+    character_arcs: dict[str, Any]
+
     # Photo Album
     album: PhotoAlbumState
 
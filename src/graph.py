@@ -5,8 +5,9 @@ Assembles the complete state graph with persistence.
 
 from __future__ import annotations
 import sqlite3
+import threading
 from pathlib import Path
-from typing import Literal
+from typing import Any, Literal
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.sqlite import SqliteSaver
@@ -56,19 +57,47 @@ def route_after_approval(state: GameState) -> Literal["narrator", "world_state",
         return "world_state"
 
 
-def create_game_graph(checkpoint_path: str = "saves/game_sessions.db") -> StateGraph:
+# ============================================================================
+# Compiled graph cache
+# ============================================================================
+
+# Compiled graphs keyed by resolved checkpoint path, with the shared
+# checkpoint connection each one uses. SqliteSaver serializes access to its
+# connection with an internal lock, so one connection per database is safe
+# to share across threads.
+_GRAPH_CACHE: dict[str, tuple[Any, sqlite3.Connection]] = {}
+_GRAPH_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(checkpoint_path: str) -> str:
+    if checkpoint_path == ":memory:":
+        return checkpoint_path
+    return str(Path(checkpoint_path).resolve())
+
+
+def open_checkpoint_connection(checkpoint_path: str) -> sqlite3.Connection:
+    """Open a thread-shareable SQLite connection tuned for checkpoint writes."""
+    if checkpoint_path != ":memory:":
+        # Ensure saves directory exists
+        Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(checkpoint_path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+def build_game_graph(checkpointer: SqliteSaver):
     """
-    Create and return the compiled game graph.
+    Build and compile the game graph around an existing checkpointer.
 
     Args:
-        checkpoint_path: Path to SQLite database for checkpointing.
+        checkpointer: Checkpoint saver the compiled graph persists through.
 
     Returns:
         Compiled StateGraph ready for invocation.
     """
-    # Ensure saves directory exists
-    Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
-
     # Create the graph builder
     builder = StateGraph(GameState)
 
@@ -127,14 +156,44 @@ def create_game_graph(checkpoint_path: str = "saves/game_sessions.db") -> StateG
     # Command goes to end
     builder.add_edge("command", END)
 
-    # Set up checkpointer
-    conn = sqlite3.connect(checkpoint_path, check_same_thread=False)
-    checkpointer = SqliteSaver(conn)
-
     # Compile the graph
-    graph = builder.compile(checkpointer=checkpointer)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def create_game_graph(checkpoint_path: str = "saves/game_sessions.db"):
+    """
+    Return the compiled game graph for a checkpoint database.
+
+    The graph is compiled once per checkpoint path and reused for the life
+    of the process, together with its pooled WAL-mode connection.
 
-    return graph
+    Args:
+        checkpoint_path: Path to SQLite database for checkpointing.
+
+    Returns:
+        Compiled StateGraph ready for invocation.
+    """
+    key = _cache_key(checkpoint_path)
+    cached = _GRAPH_CACHE.get(key)
+    if cached is not None:
+        return cached[0]
+
+    with _GRAPH_CACHE_LOCK:
+        cached = _GRAPH_CACHE.get(key)
+        if cached is None:
+            conn = open_checkpoint_connection(checkpoint_path)
+            cached = (build_game_graph(SqliteSaver(conn)), conn)
+            _GRAPH_CACHE[key] = cached
+    return cached[0]
+
+
+def clear_graph_cache() -> None:
+    """Drop cached graphs and close their checkpoint connections."""
+    with _GRAPH_CACHE_LOCK:
+        entries = list(_GRAPH_CACHE.values())
+        _GRAPH_CACHE.clear()
+    for _, conn in entries:
+        conn.close()
 
 
 # ============================================================================
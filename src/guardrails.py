@@ -5,15 +5,20 @@ This module provides lightweight safety layers:
 - Context packet assembly from known facts.
 - Prompt guardrails that constrain content to verified information.
 - Post-generation verification to flag unsupported statements.
+- Incremental verification that releases sentences as a stream completes them.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Iterable, List
+from typing import AsyncIterable, AsyncIterator, Generator, Iterable, List, Optional
 import re
 
 
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+EMPTY_OUTPUT_MESSAGE = "[All content removed by guardrails. Provide a cautious, in-universe summary.]"
+
+
 DEFAULT_WHITELIST = {
     "forge",
     "ironsworn",
@@ -103,29 +108,71 @@ class GuardrailFactStore:
 
         return any(concept in lowered for concept in self.whitelist_concepts)
 
+    def verify_sentence(self, sentence: str) -> Optional[str]:
+        """Verify one sentence; returns None when the content filter drops it."""
+        stripped = sentence.strip()
+        if not stripped:
+            return None
+        if any(topic in sentence.lower() for topic in self.banned_topics):
+            return None
+        if self.is_sentence_supported(stripped):
+            return stripped
+        return f"[Unverified—express uncertainty] {stripped}"
+
+    def incremental_verifier(self) -> "IncrementalVerifier":
+        """Create a verifier that checks streamed output sentence by sentence."""
+        return IncrementalVerifier(self)
+
     def verify_output(self, text: str) -> str:
         """Flag sentences that lack support in the fact store."""
-        filtered = self.apply_content_filter(text)
-        if not filtered:
-            return "[All content removed by guardrails. Provide a cautious, in-universe summary.]"
+        verifier = self.incremental_verifier()
+        verified = verifier.feed(text) + verifier.finish()
+        return " ".join(verified).strip()
 
-        sentences = _split_sentences(filtered)
-        verified: List[str] = []
 
+@dataclass
+class IncrementalVerifier:
+    """Verifies a stream of model output one completed sentence at a time.
+
+    Text is buffered until a sentence boundary arrives; each completed
+    sentence is verified and released immediately, so callers can forward
+    prose to the player while the model is still generating.
+    """
+
+    fact_store: GuardrailFactStore
+    _buffer: str = ""
+    _released: int = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        """Add streamed text and return any sentences it completed."""
+        self._buffer += chunk
+        parts = SENTENCE_BOUNDARY.split(self._buffer)
+        if len(parts) < 2:
+            return []
+        self._buffer = parts[-1]
+        return self._verify(parts[:-1])
+
+    def finish(self) -> List[str]:
+        """Verify the trailing partial sentence once the stream ends."""
+        tail, self._buffer = self._buffer, ""
+        verified = self._verify([tail])
+        if not self._released:
+            return [EMPTY_OUTPUT_MESSAGE]
+        return verified
+
+    def _verify(self, sentences: Iterable[str]) -> List[str]:
+        verified: List[str] = []
         for sentence in sentences:
-            if not sentence.strip():
-                continue
-            if self.is_sentence_supported(sentence):
-                verified.append(sentence.strip())
-            else:
-                verified.append(f"[Unverified—express uncertainty] {sentence.strip()}")
-
-        return " ".join(verified).strip()
+            checked = self.fact_store.verify_sentence(sentence)
+            if checked is not None:
+                verified.append(checked)
+        self._released += len(verified)
+        return verified
 
 
 def _split_sentences(text: str) -> List[str]:
     """Lightweight sentence splitter for narrative prose."""
-    return [s for s in re.split(r"(?<=[.!?])\s+", text) if s]
+    return [s for s in SENTENCE_BOUNDARY.split(text) if s]
 
 
 def build_guardrail_prompt(fact_store: GuardrailFactStore) -> str:
@@ -136,3 +183,33 @@ def build_guardrail_prompt(fact_store: GuardrailFactStore) -> str:
 def sanitize_and_verify(text: str, fact_store: GuardrailFactStore) -> str:
     """Apply filtering and verification in a single helper."""
     return fact_store.verify_output(text)
+
+
+def stream_verified(chunks: Iterable[str], fact_store: GuardrailFactStore) -> Generator[str, None, None]:
+    """Yield verified prose as soon as each sentence in ``chunks`` completes.
+
+    Joining the yielded pieces gives the same text as ``sanitize_and_verify``
+    applied to the full output.
+    """
+    verifier = fact_store.incremental_verifier()
+    separator = ""
+    for chunk in chunks:
+        for sentence in verifier.feed(chunk):
+            yield separator + sentence
+            separator = " "
+    for sentence in verifier.finish():
+        yield separator + sentence
+        separator = " "
+
+
+async def astream_verified(chunks: AsyncIterable[str], fact_store: GuardrailFactStore) -> AsyncIterator[str]:
+    """Async counterpart of :func:`stream_verified` for provider ``astream`` output."""
+    verifier = fact_store.incremental_verifier()
+    separator = ""
+    async for chunk in chunks:
+        for sentence in verifier.feed(chunk):
+            yield separator + sentence
+            separator = " "
+    for sentence in verifier.finish():
+        yield separator + sentence
+        separator = " "
@@ -0,0 +1,249 @@
+"""
+In-process background jobs for media generation.
+
+Scene images, ship blueprints and voice clips take seconds. Handlers submit
+them to a ``JobQueue`` and answer at once with a handle
+(``Job.handle()``); clients poll ``/api/jobs/{id}`` or wait on
+``/api/jobs/{id}/wait`` for the result.
+
+* Priorities: lower runs first. Voice clips go ahead of scene images,
+  which go ahead of blueprints.
+* Deduplication: a job is identified by ``(kind, key)``, where the key
+  names its content. Submitting the same content while it is queued,
+  running or finished returns the existing job. Failed jobs are retried,
+  at most ``max_attempts`` times in all and each after an exponentially
+  growing ``retry_backoff``; until then the failed job is returned.
+* Completion: ``on_done`` callbacks run on the worker thread once a job
+  finishes. A job submitted with ``hold=True`` is not forgotten after
+  finishing until ``release`` says its result has been applied.
+* Bounded workers: a fixed number of daemon threads. Coroutine functions
+  run on a short-lived event loop in the worker, so a job never depends on
+  the loop of the request that submitted it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from src.logging_config import get_logger
+
+logger = get_logger("jobs")
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    kind: str
+    key: str
+    fn: Callable[[], Any]
+    priority: int = 0
+    attempt: int = 1
+    held: bool = False  # Kept after finishing until released (see JobQueue.release)
+    id: str = field(default_factory=lambda: uuid.uuid4().hex[:16])
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    _finished: threading.Event = field(default_factory=threading.Event, repr=False)
+    _callbacks: list = field(default_factory=list, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes; False on timeout."""
+        return self._finished.wait(timeout)
+
+    def handle(self) -> dict[str, Any]:
+        """What a response returns for the job: enough to poll it."""
+        return {"job_id": self.id, "kind": self.kind, "status": self.status}
+
+    def to_dict(self) -> dict[str, Any]:
+        queued_until = self.started_at or time.time()
+        data = {
+            **self.handle(),
+            "priority": self.priority,
+            "attempt": self.attempt,
+            "result": self.result,
+            "error": self.error,
+            "queued_ms": round((queued_until - self.submitted_at) * 1000.0, 1),
+        }
+        if self.started_at is not None:
+            data["run_ms"] = round(((self.finished_at or time.time()) - self.started_at) * 1000.0, 1)
+        return data
+
+
+class JobQueue:
+    """Priority queue of deduplicated jobs run by a fixed set of worker threads."""
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_finished: int = 512,
+        name: str = "jobs",
+        max_attempts: int = 3,
+        retry_backoff: float = 10.0,
+    ):
+        self.workers = max(1, workers)
+        self.max_finished = max_finished
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.name = name
+        self.submitted = 0
+        self.deduplicated = 0
+        self.completed = 0
+        self.failed = 0
+        self._queue: "queue.PriorityQueue[tuple[int, int, Job]]" = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._by_key: dict[tuple[str, str], Job] = {}
+        self._threads: list[threading.Thread] = []
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        key: str,
+        fn: Callable[[], Any],
+        priority: int = 0,
+        on_done: Optional[Callable[[Job], None]] = None,
+        hold: bool = False,
+    ) -> Job:
+        """Queue ``fn`` (sync or async, no arguments) unless the same content already has a job.
+
+        ``on_done`` is called with the job once it finishes, right away if
+        the returned job already has.
+        """
+        with self._lock:
+            existing = self._by_key.get((kind, key))
+            if existing is not None and (existing.status != FAILED or not self._may_retry(existing)):
+                self.deduplicated += 1
+                existing.held = existing.held or hold
+                if on_done is not None and not existing.finished:
+                    existing._callbacks.append(on_done)
+                    on_done = None
+                job = existing
+            else:
+                job = Job(
+                    kind=kind,
+                    key=key,
+                    fn=fn,
+                    priority=priority,
+                    attempt=existing.attempt + 1 if existing is not None else 1,
+                    held=hold,
+                )
+                if on_done is not None:
+                    job._callbacks.append(on_done)
+                    on_done = None
+                self._jobs[job.id] = job
+                self._by_key[(kind, key)] = job
+                self.submitted += 1
+                self._start_workers()
+                self._queue.put((priority, next(self._order), job))
+        if on_done is not None:
+            _run_callback(job, on_done)
+        return job
+
+    def release(self, job: Job) -> None:
+        """Mark a held job's result as applied, so it can be forgotten."""
+        with self._lock:
+            job.held = False
+            self._forget_old()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find(self, kind: str, key: str) -> Optional[Job]:
+        with self._lock:
+            return self._by_key.get((kind, key))
+
+    def _may_retry(self, job: Job) -> bool:
+        """Whether a failed job may run again: attempts left and its backoff over."""
+        if job.attempt >= self.max_attempts:
+            return False
+        backoff = self.retry_backoff * 2 ** (job.attempt - 1)
+        return time.time() >= (job.finished_at or 0.0) + backoff
+
+    def _start_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._work, name=f"{self.name}-{len(self._threads)}", daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            with self._lock:
+                job.status = RUNNING
+                job.started_at = time.time()
+                self._running += 1
+            try:
+                result = job.fn()
+                if inspect.isawaitable(result):
+                    result = asyncio.run(_awaited(result))
+                job.result, job.status = result, DONE
+            except Exception as exc:
+                logger.warning(f"{job.kind} job {job.id} failed: {exc}")
+                job.error, job.status = str(exc), FAILED
+            with self._lock:
+                job.finished_at = time.time()
+                self._running -= 1
+                if job.status == DONE:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._forget_old()
+                callbacks, job._callbacks = job._callbacks, []
+            job._finished.set()
+            for callback in callbacks:
+                _run_callback(job, callback)
+
+    def _forget_old(self) -> None:
+        finished = [job for job in self._jobs.values() if job.finished and not job.held]
+        for job in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
+            if self._by_key.get((job.kind, job.key)) is job:
+                del self._by_key[(job.kind, job.key)]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queue.qsize(),
+                "running": self._running,
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+
+def _run_callback(job: Job, callback: Callable[[Job], None]) -> None:
+    try:
+        callback(job)
+    except Exception as exc:
+        logger.warning(f"Completion callback of {job.kind} job {job.id} failed: {exc}")
+
+
+async def _awaited(awaitable) -> Any:
+    return await awaitable
@@ -4,21 +4,45 @@ LLM Provider Abstraction
 Provides a unified interface for multiple LLM backends:
 - Ollama (local models)
 - Google Gemini (API)
+- Mock (deterministic offline replies for load tests and benchmarks)
 
 Configuration via environment variables:
-- LLM_PROVIDER: "ollama" or "gemini" (default: ollama)
+- LLM_PROVIDER: "ollama", "gemini" or "mock" (default: ollama)
 - GEMINI_API_KEY: Your Gemini API key
 - OLLAMA_MODEL: Model name for Ollama (default: llama3.1)
 - GEMINI_MODEL: Model name for Gemini (default: gemini-2.0-flash)
+- LLM_MAX_CONCURRENCY: In-flight async requests allowed per provider (default: 4)
+- OLLAMA_KEEP_ALIVE: How long Ollama keeps the model (and its KV cache) loaded (default: 30m)
+- OLLAMA_NUM_CTX: Context window requested from Ollama (default: 8192)
+- MOCK_LLM_PROFILE: Latency profile for the mock provider (default: local)
+- MOCK_LLM_SEED: Seed for mock replies and latency samples (default: 0)
+- MOCK_LLM_TIME_SCALE: Multiplier on simulated mock delays, 0 to skip sleeping (default: 1.0)
 """
 
+import asyncio
+import hashlib
+import math
 import os
+import random
+import re
+import threading
+import time
+import weakref
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Generator, Optional, Dict, Any, List
+from typing import AsyncIterator, Callable, Generator, Iterator, Optional, Dict, Any, List
 import json
 
 
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "4"))
+
+# Ollama reuses the KV cache of a loaded model when a prompt shares a prefix
+# with an earlier one. Keeping the model resident and never varying num_ctx
+# (a different value forces a reload) keeps that cache alive between turns.
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_NUM_CTX = int(os.environ.get("OLLAMA_NUM_CTX", "8192"))
+
+
 @dataclass(frozen=True)
 class LLMCapabilities:
     """Descriptor for a provider's abilities and operational cost."""
@@ -30,12 +54,67 @@ class LLMCapabilities:
     vendor: str | None = None
 
 
+# =============================================================================
+# SHARED ASYNC CLIENTS
+# =============================================================================
+
+# Async HTTP clients hold connections bound to the event loop that opened them,
+# so pooled clients and concurrency limiters are partitioned per loop.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+_LIMITERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = weakref.WeakKeyDictionary()
+
+
+def get_shared_async_client(key: str, factory: Callable[[], Any]) -> Any:
+    """Return the pooled async client for ``key`` on the running event loop.
+
+    Every caller on the same loop shares one client (and so one keep-alive
+    connection pool) per key; ``factory`` is only invoked on first use.
+    """
+    loop = asyncio.get_running_loop()
+    clients = _ASYNC_CLIENTS.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None:
+        client = factory()
+        clients[key] = client
+    return client
+
+
+def get_concurrency_limiter(key: str, limit: int) -> asyncio.Semaphore:
+    """Return the semaphore bounding in-flight async requests for ``key``."""
+    loop = asyncio.get_running_loop()
+    limiters = _LIMITERS.setdefault(loop, {})
+    limiter = limiters.get(key)
+    if limiter is None:
+        limiter = asyncio.Semaphore(max(1, limit))
+        limiters[key] = limiter
+    return limiter
+
+
+async def close_async_clients() -> None:
+    """Close every pooled client opened on the running loop."""
+    loop = asyncio.get_running_loop()
+    clients = _ASYNC_CLIENTS.pop(loop, {})
+    _LIMITERS.pop(loop, None)
+    for client in clients.values():
+        closer = getattr(client, "close", None)
+        if closer is None:
+            continue
+        try:
+            result = closer()
+            if asyncio.iscoroutine(result):
+                await result
+        except Exception:
+            pass
+
+
 # =============================================================================
 # ABSTRACT PROVIDER
 # =============================================================================
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
+
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
     
     @abstractmethod
     def chat(
@@ -47,6 +126,66 @@ class LLMProvider(ABC):
     ) -> str | Generator[str, None, None]:
         """Send a chat completion request."""
         pass
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> str:
+        """Send a chat completion request without blocking the event loop.
+
+        Providers without a native async client fall back to running
+        :meth:`chat` on a worker thread, bounded by ``max_concurrency``.
+        """
+        async with self._limiter():
+            response = await asyncio.to_thread(self.chat, messages, temperature, max_tokens, False)
+        return response if isinstance(response, str) else "".join(response)
+
+    def chat_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+    ) -> str:
+        """Chat completion whose reply should be a JSON object matching ``schema``.
+
+        Providers without structured output get the schema as an instruction
+        appended to the last message; callers must still validate the reply.
+        """
+        instruction = "Output ONLY a JSON object matching this JSON schema, no explanation:\n" + json.dumps(schema)
+        constrained = [dict(message) for message in messages]
+        if constrained:
+            constrained[-1]["content"] = f"{constrained[-1].get('content', '')}\n\n{instruction}"
+        else:
+            constrained.append({"role": "user", "content": instruction})
+        response = self.chat(constrained, temperature, max_tokens, False)
+        return response if isinstance(response, str) else "".join(response)
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> AsyncIterator[str]:
+        """Stream a chat completion as an async iterator of text chunks."""
+        async with self._limiter():
+            response = await asyncio.to_thread(self.chat, messages, temperature, max_tokens, True)
+            if isinstance(response, str):
+                yield response
+                return
+
+            chunks = iter(response)
+            done = object()
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, done)
+                if chunk is done:
+                    break
+                yield chunk
+
+    def _limiter(self) -> asyncio.Semaphore:
+        return get_concurrency_limiter(self.name, self.max_concurrency)
     
     @abstractmethod
     def is_available(self) -> bool:
@@ -74,6 +213,10 @@ class OllamaProvider(LLMProvider):
     """Ollama local model provider."""
     
     model: str = "llama3.1"
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    keep_alive: str | float | None = OLLAMA_KEEP_ALIVE
+    num_ctx: int = OLLAMA_NUM_CTX
+    last_prefill: Dict[str, Any] = field(default_factory=dict, repr=False)
     _client: Any = field(default=None, repr=False)
     
     def __post_init__(self):
@@ -82,6 +225,37 @@ class OllamaProvider(LLMProvider):
             self._client = ollama.Client()
         except ImportError:
             self._client = None
+
+    def _options(self, temperature: float, max_tokens: int) -> Dict[str, Any]:
+        return {"temperature": temperature, "num_predict": max_tokens, "num_ctx": self.num_ctx}
+
+    def _record_prefill(self, response: Any) -> None:
+        """Keep the prompt evaluation stats of the last non-streamed reply."""
+        try:
+            self.last_prefill = {
+                "prompt_eval_count": response.get("prompt_eval_count") or 0,
+                "prompt_eval_ms": (response.get("prompt_eval_duration") or 0) / 1e6,
+            }
+        except Exception:
+            self.last_prefill = {}
+
+    def _async_client(self) -> Any:
+        """Shared ``ollama.AsyncClient`` for the configured host."""
+        if not self._client:
+            return None
+
+        def factory():
+            import httpx
+            import ollama
+
+            return ollama.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency * 2,
+                    max_keepalive_connections=self.max_concurrency,
+                )
+            )
+
+        return get_shared_async_client(f"ollama:{os.environ.get('OLLAMA_HOST', '')}", factory)
     
     def chat(
         self,
@@ -100,14 +274,87 @@ class OllamaProvider(LLMProvider):
                 response = self._client.chat(
                     model=self.model,
                     messages=messages,
-                    options={
-                        "temperature": temperature,
-                        "num_predict": max_tokens
-                    }
+                    options=self._options(temperature, max_tokens),
+                    keep_alive=self.keep_alive,
                 )
+                self._record_prefill(response)
                 return response.get("message", {}).get("content", "")
         except Exception as e:
             return f"[Ollama error: {e}]"
+
+    def chat_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+    ) -> str:
+        """Structured output: Ollama constrains decoding to ``schema`` itself."""
+        if not self._client:
+            return "[Ollama not installed. Run: pip install ollama]"
+
+        try:
+            response = self._client.chat(
+                model=self.model,
+                messages=messages,
+                format=schema,
+                options=self._options(temperature, max_tokens),
+                keep_alive=self.keep_alive,
+            )
+            self._record_prefill(response)
+            return response.get("message", {}).get("content", "")
+        except Exception as e:
+            return f"[Ollama error: {e}]"
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> str:
+        client = self._async_client()
+        if not client:
+            return "[Ollama not installed. Run: pip install ollama]"
+
+        try:
+            async with self._limiter():
+                response = await client.chat(
+                    model=self.model,
+                    messages=messages,
+                    options=self._options(temperature, max_tokens),
+                    keep_alive=self.keep_alive,
+                )
+            self._record_prefill(response)
+            return response.get("message", {}).get("content", "")
+        except Exception as e:
+            return f"[Ollama error: {e}]"
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> AsyncIterator[str]:
+        client = self._async_client()
+        if not client:
+            yield "[Ollama not installed. Run: pip install ollama]"
+            return
+
+        try:
+            async with self._limiter():
+                stream = await client.chat(
+                    model=self.model,
+                    messages=messages,
+                    stream=True,
+                    options=self._options(temperature, max_tokens),
+                    keep_alive=self.keep_alive,
+                )
+                async for chunk in stream:
+                    content = chunk.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+        except Exception as e:
+            yield f"[Ollama error: {e}]"
     
     def _stream_chat(
         self,
@@ -120,10 +367,8 @@ class OllamaProvider(LLMProvider):
                 model=self.model,
                 messages=messages,
                 stream=True,
-                options={
-                    "temperature": temperature,
-                    "num_predict": max_tokens
-                }
+                options=self._options(temperature, max_tokens),
+                keep_alive=self.keep_alive,
             )
             for chunk in stream:
                 content = chunk.get("message", {}).get("content", "")
@@ -166,6 +411,7 @@ class GeminiProvider(LLMProvider):
     
     model: str = "gemini-2.0-flash"
     api_key: str = ""
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
     _client: Any = field(default=None, repr=False)
     
     def __post_init__(self):
@@ -182,6 +428,42 @@ class GeminiProvider(LLMProvider):
         else:
             self._client = None
     
+    def _unavailable_message(self) -> str:
+        if not self.api_key:
+            return "[Gemini API key not set. Set GEMINI_API_KEY environment variable.]"
+        return "[google-generativeai not installed. Run: pip install google-generativeai]"
+
+    def _start_chat(self, messages: List[Dict[str, str]]) -> tuple[Any, str]:
+        """Convert messages to Gemini format and open a chat session.
+
+        Returns the chat session and the final user message to send.
+        """
+        gemini_messages = []
+        system_prompt = ""
+        
+        for msg in messages:
+            role = msg.get("role", "user")
+            content = msg.get("content", "")
+            
+            if role == "system":
+                system_prompt = content
+            elif role == "user":
+                gemini_messages.append({"role": "user", "parts": [content]})
+            elif role == "assistant":
+                gemini_messages.append({"role": "model", "parts": [content]})
+        
+        # Start chat with history
+        chat = self._client.start_chat(history=gemini_messages[:-1] if len(gemini_messages) > 1 else [])
+        
+        # Get the last user message
+        last_message = gemini_messages[-1]["parts"][0] if gemini_messages else ""
+        
+        # Prepend system prompt to first message if present
+        if system_prompt and last_message:
+            last_message = f"[System: {system_prompt}]\n\n{last_message}"
+
+        return chat, last_message
+
     def chat(
         self,
         messages: List[Dict[str, str]],
@@ -190,35 +472,10 @@ class GeminiProvider(LLMProvider):
         stream: bool = False
     ) -> str | Generator[str, None, None]:
         if not self._client:
-            if not self.api_key:
-                return "[Gemini API key not set. Set GEMINI_API_KEY environment variable.]"
-            return "[google-generativeai not installed. Run: pip install google-generativeai]"
+            return self._unavailable_message()
         
         try:
-            # Convert messages to Gemini format
-            gemini_messages = []
-            system_prompt = ""
-            
-            for msg in messages:
-                role = msg.get("role", "user")
-                content = msg.get("content", "")
-                
-                if role == "system":
-                    system_prompt = content
-                elif role == "user":
-                    gemini_messages.append({"role": "user", "parts": [content]})
-                elif role == "assistant":
-                    gemini_messages.append({"role": "model", "parts": [content]})
-            
-            # Start chat with history
-            chat = self._client.start_chat(history=gemini_messages[:-1] if len(gemini_messages) > 1 else [])
-            
-            # Get the last user message
-            last_message = gemini_messages[-1]["parts"][0] if gemini_messages else ""
-            
-            # Prepend system prompt to first message if present
-            if system_prompt and last_message:
-                last_message = f"[System: {system_prompt}]\n\n{last_message}"
+            chat, last_message = self._start_chat(messages)
             
             generation_config = {
                 "temperature": temperature,
@@ -236,6 +493,52 @@ class GeminiProvider(LLMProvider):
                 
         except Exception as e:
             return f"[Gemini error: {e}]"
+
+    # The SDK keeps one process-wide async transport per API key, so the
+    # async paths only need the per-provider concurrency bound.
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> str:
+        if not self._client:
+            return self._unavailable_message()
+
+        try:
+            chat, last_message = self._start_chat(messages)
+            async with self._limiter():
+                response = await chat.send_message_async(
+                    last_message,
+                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+                )
+            return response.text
+        except Exception as e:
+            return f"[Gemini error: {e}]"
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> AsyncIterator[str]:
+        if not self._client:
+            yield self._unavailable_message()
+            return
+
+        try:
+            chat, last_message = self._start_chat(messages)
+            async with self._limiter():
+                response = await chat.send_message_async(
+                    last_message,
+                    generation_config={"temperature": temperature, "max_output_tokens": max_tokens},
+                    stream=True,
+                )
+                async for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+        except Exception as e:
+            yield f"[Gemini error: {e}]"
     
     def _stream_chat(
         self,
@@ -279,6 +582,297 @@ class GeminiProvider(LLMProvider):
         )
 
 
+# =============================================================================
+# MOCK PROVIDER
+# =============================================================================
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Simulated serving characteristics for :class:`MockProvider`.
+
+    ``distribution`` shapes the spread around the means: ``"fixed"`` (none),
+    ``"normal"`` or ``"lognormal"`` (the long right tail real serving shows).
+    Jitter values are relative, e.g. 0.25 is a 25% spread. A zero rate means
+    that phase takes no time.
+    """
+
+    ttft_ms: float = 350.0
+    ttft_jitter: float = 0.25
+    prefill_tokens_per_second: float = 0.0  # Adds prompt-length dependent prefill to the TTFT
+    tokens_per_second: float = 40.0
+    tps_jitter: float = 0.15
+    error_rate: float = 0.0
+    output_tokens: int = 180  # Typical prose reply length, before max_tokens caps it
+    distribution: str = "lognormal"
+
+
+MOCK_LATENCY_PROFILES: Dict[str, LatencyProfile] = {
+    "instant": LatencyProfile(ttft_ms=0.0, tokens_per_second=0.0, distribution="fixed"),
+    "local": LatencyProfile(ttft_ms=250.0, prefill_tokens_per_second=500.0, tokens_per_second=35.0),
+    "cloud": LatencyProfile(ttft_ms=600.0, ttft_jitter=0.4, tokens_per_second=90.0, error_rate=0.01),
+    "degraded": LatencyProfile(ttft_ms=2500.0, ttft_jitter=0.8, tokens_per_second=12.0, tps_jitter=0.3, error_rate=0.1),
+}
+
+_MOCK_SUBJECTS = [
+    "The hull", "A warning light", "Your pulse", "The drive core", "Static on the comm",
+    "The airlock seal", "A voice from aft", "The nav display", "Cold air", "The old beacon",
+]
+_MOCK_VERBS = ["groans", "flickers", "hammers", "hums", "crackles", "shudders", "whispers", "burns", "stalls", "answers"]
+_MOCK_TAILS = [
+    "against the dark", "in the corridor behind you", "like a held breath", "as the station turns",
+    "beneath the console", "somewhere beyond the viewport", "and then falls silent", "with a sound like rain",
+]
+
+
+class MockLLMError(RuntimeError):
+    """Simulated provider failure raised by :class:`MockProvider`."""
+
+
+@dataclass
+class _MockReply:
+    text: str
+    ttft_s: float
+    decode_s: float
+    failed: bool
+
+    def chunks(self) -> List[tuple[str, float]]:
+        """Word-sized chunks with the decode delay preceding each."""
+        pieces = re.findall(r"\S+\s*", self.text) or [self.text]
+        step = self.decode_s / len(pieces)
+        return [(piece, step) for piece in pieces]
+
+
+@dataclass
+class MockProvider(LLMProvider):
+    """Deterministic offline provider for load tests and benchmarks.
+
+    Replies are seeded by ``seed`` and the messages, so a prompt always gets
+    the same prose (or, from :meth:`chat_json`, the same schema-shaped JSON).
+    Latency and injected errors come from the ``model`` profile in
+    ``MOCK_LATENCY_PROFILES`` (or an explicit ``profile``); repeats of a
+    prompt draw fresh samples in a fixed order, so runs are reproducible even
+    under concurrency. ``time_scale`` multiplies every delay actually slept
+    (0 skips sleeping) while ``simulated_ms`` totals the unscaled time.
+    """
+
+    model: str = "local"
+    seed: int = 0
+    profile: Optional[LatencyProfile] = None
+    time_scale: float = 1.0
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+    calls: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
+    prompt_tokens: int = field(default=0, init=False)
+    output_tokens: int = field(default=0, init=False)
+    simulated_ms: float = field(default=0.0, init=False)
+    _attempts: Dict[str, int] = field(default_factory=dict, init=False, repr=False)
+    _lock: Any = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def __post_init__(self):
+        if self.profile is None:
+            if self.model not in MOCK_LATENCY_PROFILES:
+                raise ValueError(
+                    f"Unknown mock latency profile '{self.model}'. Choose one of: {', '.join(MOCK_LATENCY_PROFILES)}."
+                )
+            self.profile = MOCK_LATENCY_PROFILES[self.model]
+
+    def reset(self) -> None:
+        """Zero the counters and restart every prompt's sample sequence."""
+        with self._lock:
+            self.calls = self.errors = self.prompt_tokens = self.output_tokens = 0
+            self.simulated_ms = 0.0
+            self._attempts.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "simulated_ms": round(self.simulated_ms, 1),
+        }
+
+    # -- Reply content (overridable for canned replies) ------------------------
+
+    def compose(self, messages: List[Dict[str, str]], max_tokens: int, rng: random.Random) -> str:
+        """Seeded prose of roughly ``profile.output_tokens`` tokens."""
+        from src.prompt_budget import get_token_counter
+
+        counter = get_token_counter()
+        target = min(max_tokens, max(1, round(self.profile.output_tokens * rng.uniform(0.75, 1.25))))
+        sentences: List[str] = []
+        used = 0
+        while used < target:
+            sentence = f"{rng.choice(_MOCK_SUBJECTS)} {rng.choice(_MOCK_VERBS)} {rng.choice(_MOCK_TAILS)}."
+            sentences.append(sentence)
+            used += counter.count(sentence)
+        return " ".join(sentences)
+
+    def compose_json(self, schema: Dict[str, Any], rng: random.Random) -> str:
+        """Seeded JSON value shaped like ``schema``."""
+        return json.dumps(self._fake_value(schema, rng))
+
+    def _fake_value(self, schema: Dict[str, Any], rng: random.Random) -> Any:
+        if "enum" in schema:
+            return rng.choice(schema["enum"])
+        kind = schema.get("type")
+        if kind == "object":
+            return {name: self._fake_value(sub, rng) for name, sub in schema.get("properties", {}).items()}
+        if kind == "array":
+            return [self._fake_value(schema.get("items", {}), rng) for _ in range(rng.randint(1, 3))]
+        if kind == "string":
+            return f"{rng.choice(_MOCK_SUBJECTS)} {rng.choice(_MOCK_VERBS)}"
+        if kind == "integer":
+            return rng.randint(1, 10)
+        if kind == "number":
+            return round(rng.random(), 2)
+        if kind == "boolean":
+            return rng.random() < 0.5
+        return None
+
+    # -- Simulation ------------------------------------------------------------
+
+    def _spread(self, rng: random.Random, mean: float, jitter: float) -> float:
+        if mean <= 0 or jitter <= 0 or self.profile.distribution == "fixed":
+            return mean
+        if self.profile.distribution == "normal":
+            return max(0.0, rng.gauss(mean, mean * jitter))
+        mu = math.log(mean) - jitter ** 2 / 2  # Keeps the lognormal mean at ``mean``
+        return rng.lognormvariate(mu, jitter)
+
+    def simulate(self, messages: List[Dict[str, str]], compose: Callable[[random.Random], str]) -> _MockReply:
+        """Plan one reply: its text from ``compose`` and its sampled timing."""
+        from src.prompt_budget import get_token_counter
+
+        counter = get_token_counter()
+        digest = hashlib.sha256(json.dumps(messages, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        with self._lock:
+            attempt = self._attempts.get(digest, 0)
+            self._attempts[digest] = attempt + 1
+
+        text = compose(random.Random(f"{self.seed}:{digest}"))
+        timing = random.Random(f"{self.seed}:{digest}:{attempt}")
+        profile = self.profile
+        prompt_tokens = sum(counter.count(str(m.get("content", ""))) for m in messages)
+        output_tokens = counter.count(text)
+
+        ttft_ms = self._spread(timing, profile.ttft_ms, profile.ttft_jitter)
+        if profile.prefill_tokens_per_second > 0:
+            ttft_ms += prompt_tokens / profile.prefill_tokens_per_second * 1000.0
+        rate = self._spread(timing, profile.tokens_per_second, profile.tps_jitter)
+        decode_ms = output_tokens / rate * 1000.0 if rate > 0 else 0.0
+        failed = timing.random() < profile.error_rate
+
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            if failed:
+                self.errors += 1
+                self.simulated_ms += ttft_ms
+            else:
+                self.output_tokens += output_tokens
+                self.simulated_ms += ttft_ms + decode_ms
+        return _MockReply(text, ttft_ms / 1000.0, decode_ms / 1000.0, failed)
+
+    def _fail(self) -> MockLLMError:
+        return MockLLMError(f"{self.name}: simulated provider failure")
+
+    def _sleep(self, seconds: float) -> None:
+        if seconds > 0 and self.time_scale > 0:
+            time.sleep(seconds * self.time_scale)
+
+    async def _asleep(self, seconds: float) -> None:
+        if seconds > 0 and self.time_scale > 0:
+            await asyncio.sleep(seconds * self.time_scale)
+
+    # -- LLMProvider -----------------------------------------------------------
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+        stream: bool = False
+    ) -> str | Generator[str, None, None]:
+        reply = self.simulate(messages, lambda rng: self.compose(messages, max_tokens, rng))
+        if stream:
+            return self._stream_reply(reply)
+        self._sleep(reply.ttft_s)
+        if reply.failed:
+            raise self._fail()
+        self._sleep(reply.decode_s)
+        return reply.text
+
+    def chat_json(
+        self,
+        messages: List[Dict[str, str]],
+        schema: Dict[str, Any],
+        temperature: float = 0.3,
+        max_tokens: int = 1024,
+    ) -> str:
+        reply = self.simulate(messages, lambda rng: self.compose_json(schema, rng))
+        self._sleep(reply.ttft_s)
+        if reply.failed:
+            raise self._fail()
+        self._sleep(reply.decode_s)
+        return reply.text
+
+    def _stream_reply(self, reply: _MockReply) -> Iterator[str]:
+        self._sleep(reply.ttft_s)
+        if reply.failed:
+            raise self._fail()
+        for index, (chunk, delay) in enumerate(reply.chunks()):
+            if index:
+                self._sleep(delay)
+            yield chunk
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> str:
+        async with self._limiter():
+            reply = self.simulate(messages, lambda rng: self.compose(messages, max_tokens, rng))
+            await self._asleep(reply.ttft_s)
+            if reply.failed:
+                raise self._fail()
+            await self._asleep(reply.decode_s)
+        return reply.text
+
+    async def astream(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        max_tokens: int = 1024,
+    ) -> AsyncIterator[str]:
+        async with self._limiter():
+            reply = self.simulate(messages, lambda rng: self.compose(messages, max_tokens, rng))
+            await self._asleep(reply.ttft_s)
+            if reply.failed:
+                raise self._fail()
+            for index, (chunk, delay) in enumerate(reply.chunks()):
+                if index:
+                    await self._asleep(delay)
+                yield chunk
+
+    def is_available(self) -> bool:
+        return True
+
+    @property
+    def name(self) -> str:
+        return f"Mock ({self.model})"
+
+    def capabilities(self) -> LLMCapabilities:
+        return LLMCapabilities(
+            max_output_tokens=4096,
+            safety_features=[],
+            cost_per_1k_tokens=0.0,
+            supports_streaming=True,
+            vendor="mock",
+        )
+
+
 # =============================================================================
 # PROVIDER FACTORY
 # =============================================================================
@@ -292,8 +886,8 @@ def get_llm_provider(
     Get an LLM provider based on configuration.
     
     Args:
-        provider_type: "ollama" or "gemini" (default: from LLM_PROVIDER env var or "ollama")
-        model: Model name (default: from env var or provider default)
+        provider_type: "ollama", "gemini" or "mock" (default: from LLM_PROVIDER env var or "ollama")
+        model: Model name, or the latency profile for "mock" (default: from env var or provider default)
         api_key: API key for Gemini (default: from GEMINI_API_KEY env var)
     
     Returns:
@@ -308,6 +902,13 @@ def get_llm_provider(
         if api_key is None:
             api_key = os.environ.get("GEMINI_API_KEY", "")
         return GeminiProvider(model=model, api_key=api_key)
+
+    if provider_type == "mock":
+        return MockProvider(
+            model=model or os.environ.get("MOCK_LLM_PROFILE", "local"),
+            seed=int(os.environ.get("MOCK_LLM_SEED", "0")),
+            time_scale=float(os.environ.get("MOCK_LLM_TIME_SCALE", "1.0")),
+        )
     
     else:  # Default to ollama
         if model is None:
@@ -401,6 +1002,18 @@ def generate_narrative(
     return chat_completion(messages, temperature, max_tokens, stream, provider)
 
 
+async def achat_completion(
+    messages: List[Dict[str, str]],
+    temperature: float = 0.7,
+    max_tokens: int = 1024,
+    provider: LLMProvider = None
+) -> str:
+    """Async counterpart of :func:`chat_completion` for use inside event loops."""
+    if provider is None:
+        provider = get_provider()
+    return await provider.achat(messages, temperature, max_tokens)
+
+
 # =============================================================================
 # MODULE TESTING
 # =============================================================================
@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from typing import Any
 import ollama
 
+from src.prompt_budget import PackResult, PromptBudgetPacker, PromptSection
+
 
 # ============================================================================
 # Memory Tiers
@@ -133,13 +135,16 @@ class MemoryManager:
     model: str = "llama3.1"
     _client: ollama.Client = field(default_factory=ollama.Client, repr=False)
     
-    def summarize_scene(self, scene_text: str) -> str:
+    def summarize_scene(self, scene_text: str, analysis=None) -> str:
         """
         Use LLM to compress a scene into 2-3 sentences.
-        Falls back to truncation if LLM unavailable.
+        Falls back to truncation if LLM unavailable. A ``TurnAnalysis``
+        that already carries a summary is used without another call.
         """
         if len(scene_text) < 200:
             return scene_text
+        if analysis is not None and analysis.summary:
+            return analysis.summary
         
         try:
             response = self._client.chat(
@@ -186,56 +191,46 @@ class MemoryManager:
     def build_narrator_context(self, token_budget: int = 3000) -> str:
         """
         Build context string for narrator with intelligent allocation.
-        
-        Allocation strategy:
-        - 40% active context (immediate scene)
-        - 30% session buffer (recent events)
-        - 20% lorebook entries (if available)
-        - 10% campaign summary (major beats)
-        
+
+        Allocation strategy (shares of the token budget):
+        - active context (immediate scene): at least 40%, at most 70%
+        - session buffer (recent events): at least 30%, at most 50%
+        - campaign summary (major beats): at least 10%, at most 20%
+
+        Minimums are reserved in that order; budget a tier leaves unused
+        flows to the others up to their maximums.
+
         Args:
-            token_budget: Approximate character budget (~4 chars per token)
-        
+            token_budget: Budget in tokens (see prompt_budget.get_token_counter)
+
         Returns:
             Formatted context string
         """
-        char_budget = token_budget * 4
-        
-        # Calculate allocations
-        active_budget = int(char_budget * 0.40)
-        session_budget = int(char_budget * 0.30)
-        campaign_budget = int(char_budget * 0.10)
-        # Reserve 20% for lorebook (handled separately)
-        
-        parts = []
-        
-        # Active context (highest priority)
-        active_str = self.active.to_context_string()
-        if active_str:
-            parts.append(active_str[:active_budget])
-        
-        # Session buffer
-        session_str = self.session.to_context_string()
-        if session_str:
-            parts.append(session_str[:session_budget])
-        
-        # Campaign summary
-        campaign_str = self.campaign.to_context_string()
-        if campaign_str:
-            parts.append(campaign_str[:campaign_budget])
-        
-        return "\n\n---\n\n".join(parts)
-    
-    def process_scene_end(self, scene_text: str, npcs: list[str] = None) -> None:
+        return self.pack_narrator_context(token_budget).text
+
+    def pack_narrator_context(self, token_budget: int = 3000) -> PackResult:
+        """Like build_narrator_context, but also reports truncated and dropped tiers."""
+        packer = PromptBudgetPacker(token_budget)
+        return packer.pack(
+            [
+                PromptSection("active", self.active.to_context_string(), priority=90, min_share=0.4, max_share=0.7),
+                PromptSection("session", self.session.to_context_string(), priority=70, min_share=0.3, max_share=0.5),
+                PromptSection("campaign", self.campaign.to_context_string(), priority=50, min_share=0.1, max_share=0.2),
+            ],
+            separator="\n\n---\n\n",
+        )
+
+    def process_scene_end(self, scene_text: str, npcs: list[str] = None, analysis=None) -> None:
         """
         Called when a scene ends. Updates all memory tiers.
         
         Args:
             scene_text: The narrative text from the scene
             npcs: NPCs that appeared in the scene
+            analysis: Optional TurnAnalysis of the scene to reuse
         """
         # Summarize and add to session
-        summary = self.summarize_scene(scene_text)
+        summary = self.summarize_scene(scene_text, analysis=analysis)
         self.session.add_scene_summary(summary)
         
         # Update NPC tracking
@@ -312,14 +307,23 @@ class MemoryManager:
 # Entity Extraction (for Knowledge Graph integration)
 # ============================================================================
 
-def extract_entities(narrative_text: str, client: ollama.Client = None, model: str = "llama3.1") -> list[dict]:
+def extract_entities(
+    narrative_text: str,
+    client: ollama.Client = None,
+    model: str = "llama3.1",
+    analysis=None,
+) -> list[dict]:
     """
     Extract entities (NPCs, locations, items) from narrative text.
-    Uses LLM for extraction.
+    Uses LLM for extraction, unless ``analysis`` (the turn's TurnAnalysis)
+    already holds the entities.
     
     Returns:
         List of dicts with keys: type, name, description
     """
+    if analysis is not None and analysis.entities is not None:
+        return analysis.entities
+
     if client is None:
         client = ollama.Client()
     
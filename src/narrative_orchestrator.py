@@ -12,8 +12,9 @@ Integrates:
 - Pacing Intelligence (prose_enhancement.py)
 """
 
+from collections.abc import MutableMapping
 from dataclasses import dataclass, field
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List
 
 from src.story_graph import StoryDAG, TensionCurve
 from src.narrative_memory import NarrativeMemory, NarrativeSnapshot
@@ -35,6 +36,54 @@ from src.narrative import (
 from src.psychology import DreamSequenceEngine, PhobiaSystem, AddictionSystem, MoralInjurySystem, AttachmentSystem, TrustDynamicsSystem
 
 
+class NPCMemoryBanks(MutableMapping):
+    """NPC memory banks by NPC id, deserialized one NPC at a time.
+
+    A bank stays a payload until it is first read, and ``to_dict`` reuses the
+    payload of every bank not read since it was loaded or last serialized.
+    """
+
+    def __init__(self, banks: Optional[Dict[str, NPCMemoryBank]] = None):
+        # npc_id -> [bank or None if not yet deserialized, payload or None if possibly changed]
+        self._entries: Dict[str, list] = {nid: [bank, None] for nid, bank in (banks or {}).items()}
+
+    def __getitem__(self, npc_id: str) -> NPCMemoryBank:
+        entry = self._entries[npc_id]
+        if entry[0] is None:
+            entry[0] = NPCMemoryBank.from_dict(entry[1])
+        entry[1] = None
+        return entry[0]
+
+    def __setitem__(self, npc_id: str, bank: NPCMemoryBank) -> None:
+        self._entries[npc_id] = [bank, None]
+
+    def __delitem__(self, npc_id: str) -> None:
+        del self._entries[npc_id]
+
+    def __contains__(self, npc_id: object) -> bool:
+        return npc_id in self._entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"NPCMemoryBanks({list(self._entries)})"
+
+    def to_dict(self) -> dict:
+        for entry in self._entries.values():
+            if entry[1] is None:
+                entry[1] = entry[0].to_dict()
+        return {nid: entry[1] for nid, entry in self._entries.items()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "NPCMemoryBanks":
+        banks = cls()
+        banks._entries = {nid: [None, payload] for nid, payload in data.items()}
+        return banks
+
 
 @dataclass
 class NarrativeOrchestrator:
@@ -54,7 +103,7 @@ class NarrativeOrchestrator:
     
     # Phase 1 Systems
     payoff_tracker: PayoffTracker = field(default_factory=PayoffTracker)
-    npc_memories: Dict[str, NPCMemoryBank] = field(default_factory=dict)
+    npc_memories: NPCMemoryBanks = field(default_factory=NPCMemoryBanks)
     consequence_manager: ConsequenceManager = field(default_factory=ConsequenceManager)
     echo_system: ChoiceEchoSystem = field(default_factory=ChoiceEchoSystem)
     
@@ -98,6 +147,33 @@ class NarrativeOrchestrator:
     # State
     current_scene: int = 0
     latest_snapshot: Optional[NarrativeSnapshot] = None
+
+    def __post_init__(self):
+        # Subsystems out of __dict__: name -> (object or None if not yet
+        # deserialized, payload). Any access through __getattr__ moves them back.
+        self._parked: Dict[str, tuple] = {}
+        # Times each subsystem's payload was regenerated by to_dict
+        self._versions: Dict[str, int] = {}
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes missing from __dict__: subsystems that
+        # from_dict left serialized or to_dict parked.
+        parked = self.__dict__.get("_parked")
+        if not parked or name not in parked:
+            raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+        live, payload = parked.pop(name)
+        if live is None:
+            live = _SUBSYSTEMS[name].from_dict(payload)
+        self.__dict__[name] = live
+        return live
+
+    def dirty_subsystems(self) -> List[str]:
+        """Subsystems accessed (so possibly changed) since they were loaded or last serialized."""
+        return [name for name in _SUBSYSTEMS if name in self.__dict__]
+
+    def subsystem_versions(self) -> Dict[str, int]:
+        """How many times ``to_dict`` regenerated each subsystem's payload."""
+        return {name: self._versions.get(name, 0) for name in _SUBSYSTEMS}
     
     def advance_scene(self):
         """Advance all systems to next scene."""
@@ -130,6 +206,40 @@ class NarrativeOrchestrator:
         
         This is the main entry point for narrator prompt enhancement.
         """
+        base = self.get_base_guidance(location=location, active_npcs=active_npcs)
+        action = self.get_action_guidance(active_npcs=active_npcs, player_action=player_action)
+        return f"{base}\\n{action}" if action else base
+
+    def get_action_guidance(self, active_npcs: list[str] = None, player_action: str = "") -> str:
+        """The part of the guidance that depends on the player's action."""
+        sections = []
+
+        # Quiet Moment Check
+        moment_data = self.bond_manager.quiet_tracker.get_quiet_moment(context=player_action)
+        moment_type = moment_data.get("type")
+        moment_prompt = moment_data.get("prompt")
+        if moment_type:
+            sections.append(f"\\n[PACING: A quiet moment is suggested ({moment_type}). {moment_prompt}]")
+
+        # Choice echoes
+        for npc in active_npcs or []:
+            choice_recall = self.echo_system.generate_echo(
+                npc_id=npc, 
+                current_scene=self.current_scene, 
+                context=player_action
+            )
+            if choice_recall:
+                 sections.append(f"\\n[CHOICE ECHO for {npc}: {choice_recall}]")
+
+        return "\\n".join(sections)
+
+    def get_base_guidance(self, location: str = "", active_npcs: list[str] = None) -> str:
+        """
+        Guidance that only reads orchestrator state, not the player's action.
+
+        Callers may prepare it ahead of the turn (see speculation) and append
+        get_action_guidance once the action is known.
+        """
         sections = []
         active_npcs = active_npcs or []
         
@@ -219,13 +329,6 @@ class NarrativeOrchestrator:
         if bond_context:
             sections.append(f"\\n<relationship_context>\\n{bond_context}\\n</relationship_context>")
             
-        # Quiet Moment Check
-        moment_data = self.bond_manager.quiet_tracker.get_quiet_moment(context=player_action)
-        moment_type = moment_data.get("type")
-        moment_prompt = moment_data.get("prompt")
-        if moment_type:
-            sections.append(f"\\n[PACING: A quiet moment is suggested ({moment_type}). {moment_prompt}]")
-
         # 7. World Coherence (New)
         coherence_context = self.world_coherence.get_coherence_context(location=location, active_npcs=active_npcs)
         if coherence_context:
@@ -251,15 +354,6 @@ class NarrativeOrchestrator:
                 echo = self.npc_memories[npc].generate_callback(self.current_scene)
                 if echo:
                     sections.append(f"\\n[CALLBACK SUGGESTION for {npc}: {echo}]")
-            
-            # Choice echoes
-            choice_recall = self.echo_system.generate_echo(
-                npc_id=npc, 
-                current_scene=self.current_scene, 
-                context=player_action
-            )
-            if choice_recall:
-                 sections.append(f"\\n[CHOICE ECHO for {npc}: {choice_recall}]")
 
         # 11. NPC Depth Context (Phase 2)
         # Add basic reputation summary
@@ -473,173 +567,88 @@ class NarrativeOrchestrator:
         return self.latest_snapshot
                 
     def to_dict(self) -> dict:
-        """Serialize all systems."""
-        return {
-            "story_graph": self.story_graph.to_dict(),
-            "narrative_memory": self.narrative_memory.to_dict(),
-            "theme_engine": self.theme_engine.to_dict(),
-            "narrative_variety": self.narrative_variety.to_dict(),
-            "prose_engine": self.prose_engine.to_dict(),
-            "bond_manager": self.bond_manager.to_dict(),
-            "world_coherence": self.world_coherence.to_dict(),
-            "dilemma_generator": {}, # Stateless generator
+        """Serialize all systems.
+
+        Subsystems not accessed since they were loaded or last serialized
+        reuse their payload. The others are serialized and then parked with
+        their payload until next accessed. Access is what counts, so keep
+        references to subsystems within a turn rather than across calls.
+        """
+        data = {
             "current_scene": self.current_scene,
-            # Phase 1 Persistence
-            "payoff_tracker": self.payoff_tracker.to_dict(),
-            "npc_memories": {nid: mem.to_dict() for nid, mem in self.npc_memories.items()},
-            "consequence_manager": self.consequence_manager.to_dict(),
-            "echo_system": self.echo_system.to_dict(),
-            # Phase 2 Persistence
-            "npc_emotions": self.npc_emotions.to_dict(),
-            "reputation": self.reputation.to_dict(),
-            "social_reputation": self.social_reputation.to_dict(),
-            "irony_tracker": self.irony_tracker.to_dict(),
-            # Phase 3 Persistence
-            "story_beats": self.story_beats.to_dict(),
-            "plot_manager": self.plot_manager.to_dict(),
-            "branching_system": self.branching_system.to_dict(),
-            "npc_goals": self.npc_goals.to_dict(),
-            # Phase 4 Persistence
-            "ending_system": self.ending_system.to_dict(),
-            "impossible_choices": self.impossible_choices.to_dict(),
-            "environmental_storyteller": self.environmental_storyteller.to_dict(),
-            "flashback_system": self.flashback_system.to_dict(),
-            # Phase 5 Persistence
-            "unreliable_system": self.unreliable_system.to_dict(),
-            "meta_system": self.meta_system.to_dict(),
-            "npc_skills": self.npc_skills.to_dict(),
-            "multiplayer_system": self.multiplayer_system.to_dict(),
-            # Psychology Persistence
-            "dream_engine": self.dream_engine.to_dict(),
-            "phobia_system": self.phobia_system.to_dict(),
-            # Psychology Phase 2 Persistence
-            "addiction_system": self.addiction_system.to_dict(),
-            "moral_injury_system": self.moral_injury_system.to_dict(),
-            # Psychology Phase 3 Persistence
-            "attachment_system": self.attachment_system.to_dict(),
-            "trust_dynamics": self.trust_dynamics.to_dict(),
+            "dilemma_generator": {},  # Stateless generator
         }
+        for name in _SUBSYSTEMS:
+            if name in self.__dict__:
+                live = self.__dict__.pop(name)
+                if hasattr(live, "to_dict"):
+                    payload = live.to_dict()
+                else:  # A plain dict of NPC memory banks
+                    payload = {nid: mem.to_dict() for nid, mem in live.items()}
+                self._parked[name] = (live, payload)
+                self._versions[name] = self._versions.get(name, 0) + 1
+            data[name] = self._parked[name][1]
+        return data
     
     @classmethod
     def from_dict(cls, data: dict) -> "NarrativeOrchestrator":
-        """Deserialize all systems."""
+        """Deserialize all systems.
+
+        Subsystems stay payloads until first accessed, so a turn only pays
+        for the ones it uses and ``to_dict`` writes the rest back unchanged.
+        """
         orchestrator = cls()
         orchestrator.current_scene = data.get("current_scene", 0)
-        
-        if "story_graph" in data:
-            orchestrator.story_graph = StoryDAG.from_dict(data["story_graph"])
-        
-        if "narrative_memory" in data:
-            orchestrator.narrative_memory = NarrativeMemory.from_dict(data["narrative_memory"])
-        
-        if "theme_engine" in data:
-            orchestrator.theme_engine = ThemeEngine.from_dict(data["theme_engine"])
-        
-        if "narrative_variety" in data:
-            orchestrator.narrative_variety = NarrativeVariety.from_dict(data["narrative_variety"])
-        
-        if "prose_engine" in data:
-            orchestrator.prose_engine = ProseEnhancementEngine.from_dict(data["prose_engine"])
-            
-        if "bond_manager" in data:
-            orchestrator.bond_manager = BondManager.from_dict(data["bond_manager"])
-            
-        if "world_coherence" in data:
-            orchestrator.world_coherence = WorldStateCoherence.from_dict(data["world_coherence"])
-            
-        # Phase 1 Rehydration
-        if "payoff_tracker" in data:
-            orchestrator.payoff_tracker = PayoffTracker.from_dict(data["payoff_tracker"])
-            
-        if "npc_memories" in data:
-            orchestrator.npc_memories = {
-                nid: NPCMemoryBank.from_dict(mem_data) 
-                for nid, mem_data in data["npc_memories"].items()
-            }
-            
-        if "consequence_manager" in data:
-            orchestrator.consequence_manager = ConsequenceManager.from_dict(data["consequence_manager"])
-            
-        if "echo_system" in data:
-            orchestrator.echo_system = ChoiceEchoSystem.from_dict(data["echo_system"])
-            
-        # Phase 2 Rehydration
-        if "npc_emotions" in data:
-            orchestrator.npc_emotions = NPCEmotionalStateMachine.from_dict(data["npc_emotions"])
-
-        if "reputation" in data:
-            orchestrator.reputation = MoralReputationSystem.from_dict(data["reputation"])
-
-        if "social_reputation" in data:
-            orchestrator.social_reputation = ReputationLedger.from_dict(data["social_reputation"])
+        for name in _SUBSYSTEMS:
+            if name in data:
+                del orchestrator.__dict__[name]
+                orchestrator._parked[name] = (None, data[name])
+        return orchestrator
 
-        if "irony_tracker" in data:
-            orchestrator.irony_tracker = DramaticIronyTracker.from_dict(data["irony_tracker"])
-            
-        # Phase 3 Rehydration
-        if "story_beats" in data:
-            orchestrator.story_beats = StoryBeatGenerator.from_dict(data["story_beats"])
-            
-        if "plot_manager" in data:
-            orchestrator.plot_manager = PlotManager.from_dict(data["plot_manager"])
-            
-        if "branching_system" in data:
-            orchestrator.branching_system = BranchingNarrativeSystem.from_dict(data["branching_system"])
-            
-        if "npc_goals" in data:
-            orchestrator.npc_goals = NPCGoalPursuitSystem.from_dict(data["npc_goals"])
-            
-        # Phase 4 Rehydration
-        if "ending_system" in data:
-            orchestrator.ending_system = EndingPreparationSystem.from_dict(data["ending_system"])
-            
-        if "dilemma_generator" in data: # Handle legacy/old dilemma generator if needed
-             pass
 
-        if "impossible_choices" in data:
-            orchestrator.impossible_choices = ImpossibleChoiceGenerator.from_dict(data["impossible_choices"])
-            
-        if "environmental_storyteller" in data:
-            orchestrator.environmental_storyteller = EnvironmentalStoryteller.from_dict(data["environmental_storyteller"])
-            
-        if "flashback_system" in data:
-            orchestrator.flashback_system = FlashbackSystem.from_dict(data["flashback_system"])
-            
-        # Phase 5 Rehydration
-        if "unreliable_system" in data:
-            orchestrator.unreliable_system = UnreliableNarratorSystem.from_dict(data["unreliable_system"])
-            
-        if "meta_system" in data:
-            orchestrator.meta_system = MetaNarrativeSystem.from_dict(data["meta_system"])
-            
-        if "npc_skills" in data:
-            orchestrator.npc_skills = NPCSkillSystem.from_dict(data["npc_skills"])
-            
-        if "multiplayer_system" in data:
-            orchestrator.multiplayer_system = NarrativeMultiplayerSystem.from_dict(data["multiplayer_system"])
-            
-        # Psychology Rehydration
-        if "dream_engine" in data:
-            orchestrator.dream_engine = DreamSequenceEngine.from_dict(data["dream_engine"])
-            
-        if "phobia_system" in data:
-            orchestrator.phobia_system = PhobiaSystem.from_dict(data["phobia_system"])
-            
-        # Psychology Phase 2 Rehydration
-        if "addiction_system" in data:
-            orchestrator.addiction_system = AddictionSystem.from_dict(data["addiction_system"])
-            
-        if "moral_injury_system" in data:
-            orchestrator.moral_injury_system = MoralInjurySystem.from_dict(data["moral_injury_system"])
-            
-        # Psychology Phase 3 Rehydration
-        if "attachment_system" in data:
-            orchestrator.attachment_system = AttachmentSystem.from_dict(data["attachment_system"])
-            
-        if "trust_dynamics" in data:
-            orchestrator.trust_dynamics = TrustDynamicsSystem.from_dict(data["trust_dynamics"])
-        
-        return orchestrator
+# Serialized subsystems, in payload order: attribute -> class with from_dict.
+# The legacy "dilemma_generator" payload is ignored; the generator is stateless.
+_SUBSYSTEMS = {
+    "story_graph": StoryDAG,
+    "narrative_memory": NarrativeMemory,
+    "theme_engine": ThemeEngine,
+    "narrative_variety": NarrativeVariety,
+    "prose_engine": ProseEnhancementEngine,
+    "bond_manager": BondManager,
+    "world_coherence": WorldStateCoherence,
+    # Phase 1
+    "payoff_tracker": PayoffTracker,
+    "npc_memories": NPCMemoryBanks,
+    "consequence_manager": ConsequenceManager,
+    "echo_system": ChoiceEchoSystem,
+    # Phase 2
+    "npc_emotions": NPCEmotionalStateMachine,
+    "reputation": MoralReputationSystem,
+    "social_reputation": ReputationLedger,
+    "irony_tracker": DramaticIronyTracker,
+    # Phase 3
+    "story_beats": StoryBeatGenerator,
+    "plot_manager": PlotManager,
+    "branching_system": BranchingNarrativeSystem,
+    "npc_goals": NPCGoalPursuitSystem,
+    # Phase 4
+    "ending_system": EndingPreparationSystem,
+    "impossible_choices": ImpossibleChoiceGenerator,
+    "environmental_storyteller": EnvironmentalStoryteller,
+    "flashback_system": FlashbackSystem,
+    # Phase 5
+    "unreliable_system": UnreliableNarratorSystem,
+    "meta_system": MetaNarrativeSystem,
+    "npc_skills": NPCSkillSystem,
+    "multiplayer_system": NarrativeMultiplayerSystem,
+    # Psychology
+    "dream_engine": DreamSequenceEngine,
+    "phobia_system": PhobiaSystem,
+    "addiction_system": AddictionSystem,
+    "moral_injury_system": MoralInjurySystem,
+    "attachment_system": AttachmentSystem,
+    "trust_dynamics": TrustDynamicsSystem,
+}
 
 
 # =============================================================================
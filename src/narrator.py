@@ -5,13 +5,22 @@ Generates narrative prose using configurable LLM providers.
 
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import Any, Generator, Optional
+from typing import Any, AsyncIterator, Generator, Optional
+import asyncio
 import os
 
-from src.llm_provider import LLMProvider, get_llm_provider
+from src.llm_provider import OLLAMA_KEEP_ALIVE, OLLAMA_NUM_CTX, LLMProvider, get_llm_provider
+from src.prompting import configured_hedge_policy, hedged_chat
+from src.provider_health import get_health_monitor
 from src.psych_profile import PsychologicalProfile, PsychologicalEngine
 from src.style_profile import StyleProfile, load_style_profile
-from src.guardrails import GuardrailFactStore, build_guardrail_prompt, sanitize_and_verify
+from src.guardrails import (
+    GuardrailFactStore,
+    astream_verified,
+    build_guardrail_prompt,
+    sanitize_and_verify,
+    stream_verified,
+)
 from src.logging_config import get_logger
 from src.config import config
 
@@ -266,7 +275,7 @@ def get_examples_for_tone(tone: str, pacing: str, count: int = 2) -> list[dict]:
 class NarratorConfig:
     """Configuration for narrative generation."""
 
-    backend: str | None = None  # "ollama" or "gemini"
+    backend: str | None = None  # "ollama", "gemini" or "mock"
     model: str | None = None
     temperature: float = 0.85
     top_p: float = 0.90
@@ -276,18 +285,21 @@ class NarratorConfig:
     style_profile_name: Optional[str] = None
 
     def __post_init__(self):
-        allowed_backends = {"gemini", "ollama"}
+        allowed_backends = {"gemini", "ollama", "mock"}
 
         resolved_backend = (self.backend or os.environ.get("LLM_PROVIDER") or "gemini").lower()
         if resolved_backend not in allowed_backends:
             raise ValueError(
-                f"Unsupported LLM provider '{resolved_backend}'. Set LLM_PROVIDER to 'gemini' or 'ollama'."
+                f"Unsupported LLM provider '{resolved_backend}'. Set LLM_PROVIDER to 'gemini', 'ollama' or 'mock'."
             )
         self.backend = resolved_backend
 
         if not self.model:
             universal_model = os.environ.get("LLM_MODEL")
-            if universal_model:
+            if self.backend == "mock":
+                # The mock's "model" is its latency profile, not a real model name
+                self.model = os.environ.get("MOCK_LLM_PROFILE", "local")
+            elif universal_model:
                 self.model = universal_model
             elif self.backend == "gemini":
                 self.model = os.environ.get("GEMINI_MODEL", "gemini-2.0-flash")
@@ -363,7 +375,9 @@ class OllamaClient:
                     "top_k": config.top_k,
                     "repeat_penalty": config.repeat_penalty,
                     "num_predict": config.max_tokens,
+                    "num_ctx": OLLAMA_NUM_CTX,
                 },
+                keep_alive=OLLAMA_KEEP_ALIVE,
             )
 
             for chunk in stream:
@@ -420,7 +434,11 @@ def check_provider_availability(
     config: NarratorConfig,
     provider: LLMProvider | None = None,
 ) -> tuple[bool, str]:
-    """Check provider availability and return a user-facing status message."""
+    """Check provider availability and return a user-facing status message.
+
+    Reads the cached status from the provider health monitor, which re-probes
+    providers in the background; only a provider's first check probes inline.
+    """
     provider = provider or get_llm_provider_for_config(config)
 
     backend_hint = ""
@@ -429,7 +447,7 @@ def check_provider_availability(
     elif config.backend == "gemini":
         backend_hint = "Set GEMINI_API_KEY and install google-generativeai."
 
-    available = provider.is_available()
+    available = get_health_monitor().provider_status(provider).reachable
     status = f"{provider.name} is available." if available else (
         f"[{provider.name} unavailable. {backend_hint or 'Check configuration.'}]"
     )
@@ -442,6 +460,14 @@ def _get_provider(config: NarratorConfig) -> LLMProvider:
     return get_llm_provider(provider_type=config.backend, model=config.model)
 
 
+def _get_hedge_provider(narrator_config: NarratorConfig) -> LLMProvider | None:
+    """The backup raced against the narrator's provider (``config.llm.hedge_backend``), if any."""
+    backend, model = config.llm.hedge_backend, config.llm.hedge_model
+    if not backend or (backend == narrator_config.backend and model in (None, narrator_config.model)):
+        return None
+    return get_llm_provider(provider_type=backend, model=model)
+
+
 @dataclass
 class GeminiClient:
     """Lightweight Gemini wrapper used by narrator generation."""
@@ -619,21 +645,36 @@ def build_narrative_prompt(
 
     Returns:
         Complete prompt string.
+
+    Segments run from most to least stable (style and guardrail rules,
+    character and location, psychological state, then this turn's scene,
+    action and dice) so consecutive turns share a long prefix that a local
+    model can serve from its KV cache.
     """
     parts = []
 
-    if context:
-        parts.append(f"[Previous scene]\n{context}\n")
-
-    if guardrail_packet:
-        parts.append(guardrail_packet)
+    # Stable for the whole campaign
+    if style_profile:
+        parts.append("[NARRATIVE STYLE ACTIVE]")
+        if style_profile.tone_directives:
+            parts.append(f"<tone_directives>\n- " + "\n- ".join(style_profile.tone_directives) + "\n</tone_directives>")
+        if style_profile.vocabulary_hints:
+            parts.append(f"<vocabulary_hints>\n- " + "\n- ".join(style_profile.vocabulary_hints) + "\n</vocabulary_hints>")
+        if style_profile.few_shot_examples:
+            parts.append("\n<style_examples>")
+            for i, ex in enumerate(style_profile.few_shot_examples):
+                parts.append(f"Example {i+1}:")
+                parts.append(f"Context: {ex.get('context', 'General')}")
+                parts.append(f"Narrative: {ex.get('narrative', '')}")
+            parts.append("</style_examples>\n")
 
     if guardrail_rules:
         parts.append(guardrail_rules)
 
-    parts.append(f"[Current location: {location}]")
     parts.append(f"[Character: {character_name}]")
-    
+    parts.append(f"[Current location: {location}]")
+
+    # Changes slowly, across scenes
     if psych_profile:
         engine = PsychologicalEngine()
         psych_context = engine.get_narrative_context(psych_profile)
@@ -658,6 +699,22 @@ def build_narrative_prompt(
         if psych_profile.trauma_scars:
             scars_str = "\n  - ".join([f"{s.name}: {s.description}" for s in psych_profile.trauma_scars])
             parts.append(f"<trauma_scars>\n{scars_str}\n</trauma_scars>")
+
+    # Changes every turn, starting with Narrative Orchestrator guidance (if available)
+    if hasattr(build_narrative_prompt, '_orchestrator') and build_narrative_prompt._orchestrator:
+        orchestrator_guidance = build_narrative_prompt._orchestrator.get_comprehensive_guidance(
+            location=location,
+            active_npcs=psych_profile.involved_characters if psych_profile and hasattr(psych_profile, 'involved_characters') else [],
+            player_action=player_input,
+        )
+        if orchestrator_guidance:
+            parts.append(f"\n{orchestrator_guidance}")
+
+    if context:
+        parts.append(f"\n[Previous scene]\n{context}\n")
+
+    if guardrail_packet:
+        parts.append(guardrail_packet)
     
     if hijack:
         parts.append(f"\n[HIJACK ACTIVE: {hijack}]")
@@ -676,35 +733,53 @@ def build_narrative_prompt(
         elif outcome == "miss":
             parts.append("\n[Guidance: Things go wrong. Introduce a setback, danger, or escalation.]")
 
-    # Narrative Orchestrator Guidance (if available)
-    if hasattr(build_narrative_prompt, '_orchestrator') and build_narrative_prompt._orchestrator:
-        orchestrator_guidance = build_narrative_prompt._orchestrator.get_comprehensive_guidance(
-            location=location,
-            active_npcs=psych_profile.involved_characters if psych_profile and hasattr(psych_profile, 'involved_characters') else [],
-            player_action=player_input,
-        )
-        if orchestrator_guidance:
-            parts.append(f"\n{orchestrator_guidance}")
-    
-    if style_profile:
-        parts.append("\n[NARRATIVE STYLE ACTIVE]")
-        if style_profile.tone_directives:
-            parts.append(f"<tone_directives>\n- " + "\n- ".join(style_profile.tone_directives) + "\n</tone_directives>")
-        if style_profile.vocabulary_hints:
-            parts.append(f"<vocabulary_hints>\n- " + "\n- ".join(style_profile.vocabulary_hints) + "\n</vocabulary_hints>")
-        if style_profile.few_shot_examples:
-            parts.append("\n<style_examples>")
-            for i, ex in enumerate(style_profile.few_shot_examples):
-                parts.append(f"Example {i+1}:")
-                parts.append(f"Context: {ex.get('context', 'General')}")
-                parts.append(f"Narrative: {ex.get('narrative', '')}")
-            parts.append("</style_examples>")
-
     parts.append("\n[Write the narrative response now]")
 
     return "\n".join(parts)
 
 
+def _prepare_narrative_request(
+    player_input: str,
+    roll_result: str,
+    outcome: str,
+    character_name: str,
+    location: str,
+    context: str,
+    config: NarratorConfig,
+    psych_profile: PsychologicalProfile | None,
+    hijack: str | None,
+) -> tuple[GuardrailFactStore, list[dict[str, str]]]:
+    """Build the guardrail store and chat messages shared by every entry point."""
+    guardrail_store = build_guardrail_store(
+        player_input=player_input,
+        character_name=character_name,
+        location=location,
+        context=context,
+        roll_result=roll_result,
+        psych_profile=psych_profile,
+    )
+
+    prompt = build_narrative_prompt(
+        player_input=player_input,
+        roll_result=roll_result,
+        outcome=outcome,
+        character_name=character_name,
+        location=location,
+        context=context,
+        psych_profile=psych_profile,
+        hijack=hijack,
+        style_profile=load_style_profile(config.style_profile_name) if config.style_profile_name else None,
+        guardrail_packet=guardrail_store.build_context_packet(),
+        guardrail_rules=guardrail_store.guardrail_rules(),
+    )
+
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    return guardrail_store, messages
+
+
 def generate_narrative(
     player_input: str,
     roll_result: str = "",
@@ -735,27 +810,8 @@ def generate_narrative(
     """
     config = config or NarratorConfig()
 
-    guardrail_store = build_guardrail_store(
-        player_input=player_input,
-        character_name=character_name,
-        location=location,
-        context=context,
-        roll_result=roll_result,
-        psych_profile=psych_profile,
-    )
-
-    prompt = build_narrative_prompt(
-        player_input=player_input,
-        roll_result=roll_result,
-        outcome=outcome,
-        character_name=character_name,
-        location=location,
-        context=context,
-        psych_profile=psych_profile,
-        hijack=hijack,
-        style_profile=load_style_profile(config.style_profile_name) if config.style_profile_name else None,
-        guardrail_packet=guardrail_store.build_context_packet(),
-        guardrail_rules=guardrail_store.guardrail_rules(),
+    guardrail_store, messages = _prepare_narrative_request(
+        player_input, roll_result, outcome, character_name, location, context, config, psych_profile, hijack
     )
 
     provider = _get_provider(config)
@@ -767,10 +823,17 @@ def generate_narrative(
             f"*Placeholder narrative for: {player_input}*"
         )
 
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": prompt},
-    ]
+    backup = _get_hedge_provider(config)
+    if backup is not None:
+        narrative = hedged_chat(
+            provider,
+            backup,
+            messages,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            policy=configured_hedge_policy(),
+        )
+        return sanitize_and_verify(narrative, guardrail_store)
 
     response = provider.chat(
         messages=messages,
@@ -787,6 +850,60 @@ def generate_narrative(
     return sanitize_and_verify(narrative, guardrail_store)
 
 
+async def agenerate_narrative(
+    player_input: str,
+    roll_result: str = "",
+    outcome: str = "",
+    character_name: str = "Traveler",
+    location: str = "the void",
+    context: str = "",
+    config: NarratorConfig | None = None,
+    psych_profile: PsychologicalProfile | None = None,
+    hijack: str | None = None,
+) -> str:
+    """
+    Async variant of :func:`generate_narrative` for use inside the server.
+
+    The completion goes through :meth:`LLMProvider.achat`, so a slow model
+    only suspends this request instead of blocking the event loop.
+    """
+    config = config or NarratorConfig()
+
+    guardrail_store, messages = _prepare_narrative_request(
+        player_input, roll_result, outcome, character_name, location, context, config, psych_profile, hijack
+    )
+
+    provider = _get_provider(config)
+    available, status_message = await asyncio.to_thread(check_provider_availability, config, provider)
+
+    if not available:
+        return (
+            f"{status_message}\n\n"
+            f"*Placeholder narrative for: {player_input}*"
+        )
+
+    backup = _get_hedge_provider(config)
+    if backup is not None:
+        # The race runs on the hedge threads; this request only awaits its outcome
+        narrative = await asyncio.to_thread(
+            hedged_chat,
+            provider,
+            backup,
+            messages,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+            policy=configured_hedge_policy(),
+        )
+    else:
+        narrative = await provider.achat(
+            messages=messages,
+            temperature=config.temperature,
+            max_tokens=config.max_tokens,
+        )
+
+    return sanitize_and_verify(narrative, guardrail_store)
+
+
 def generate_narrative_stream(
     player_input: str,
     roll_result: str = "",
@@ -801,31 +918,13 @@ def generate_narrative_stream(
     """
     Generate narrative prose with streaming.
 
-    Yields text chunks as they're generated for real-time display.
+    Yields verified sentences as soon as the provider completes them, so the
+    first prose reaches the player long before generation finishes.
     """
     config = config or NarratorConfig()
 
-    guardrail_store = build_guardrail_store(
-        player_input=player_input,
-        character_name=character_name,
-        location=location,
-        context=context,
-        roll_result=roll_result,
-        psych_profile=psych_profile,
-    )
-
-    prompt = build_narrative_prompt(
-        player_input=player_input,
-        roll_result=roll_result,
-        outcome=outcome,
-        character_name=character_name,
-        location=location,
-        context=context,
-        psych_profile=psych_profile,
-        hijack=hijack,
-        style_profile=load_style_profile(config.style_profile_name) if config.style_profile_name else None,
-        guardrail_packet=guardrail_store.build_context_packet(),
-        guardrail_rules=guardrail_store.guardrail_rules(),
+    guardrail_store, messages = _prepare_narrative_request(
+        player_input, roll_result, outcome, character_name, location, context, config, psych_profile, hijack
     )
 
     provider = _get_provider(config)
@@ -835,11 +934,6 @@ def generate_narrative_stream(
         yield status_message
         return
 
-    messages = [
-        {"role": "system", "content": SYSTEM_PROMPT},
-        {"role": "user", "content": prompt},
-    ]
-
     response = provider.chat(
         messages=messages,
         temperature=config.temperature,
@@ -851,5 +945,43 @@ def generate_narrative_stream(
         yield sanitize_and_verify(response, guardrail_store)
         return
 
-    raw_text = "".join(response)
-    yield sanitize_and_verify(raw_text, guardrail_store)
+    yield from stream_verified(response, guardrail_store)
+
+
+async def agenerate_narrative_stream(
+    player_input: str,
+    roll_result: str = "",
+    outcome: str = "",
+    character_name: str = "Traveler",
+    location: str = "the void",
+    context: str = "",
+    config: NarratorConfig | None = None,
+    psych_profile: PsychologicalProfile | None = None,
+    hijack: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Async variant of :func:`generate_narrative_stream` for the server.
+
+    Chunks come from :meth:`LLMProvider.astream` and are released one
+    verified sentence at a time, without blocking the event loop.
+    """
+    config = config or NarratorConfig()
+
+    guardrail_store, messages = _prepare_narrative_request(
+        player_input, roll_result, outcome, character_name, location, context, config, psych_profile, hijack
+    )
+
+    provider = _get_provider(config)
+    available, status_message = await asyncio.to_thread(check_provider_availability, config, provider)
+
+    if not available:
+        yield status_message
+        return
+
+    chunks = provider.astream(
+        messages=messages,
+        temperature=config.temperature,
+        max_tokens=config.max_tokens,
+    )
+    async for sentence in astream_verified(chunks, guardrail_store):
+        yield sentence
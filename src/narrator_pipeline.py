@@ -4,11 +4,18 @@ Breaks down the monolithic narrator_node into modular, testable functions.
 """
 
 from __future__ import annotations
-from dataclasses import dataclass, field
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, replace
 from typing import Any, Callable, Optional
 
 from src.logging_config import get_logger
 from src.config import config
+from src.prompt_budget import PromptSection
 
 logger = get_logger("narrator")
 
@@ -48,6 +55,9 @@ class NarrativeContext:
     # State references (for systems that need full state)
     state: dict[str, Any] = field(default_factory=dict)
 
+    # Live per-session engines (engine_registry.SessionEngineRegistry), if any
+    engines: Any = None
+
     def add_injection(self, section_name: str, content: str) -> None:
         """Add a labeled injection to the system prompt."""
         if content and content.strip():
@@ -193,40 +203,29 @@ def stage_few_shot_examples(ctx: NarrativeContext) -> NarrativeContext:
 def stage_feedback_learning(ctx: NarrativeContext) -> NarrativeContext:
     """Inject learned preferences from feedback system."""
     try:
-        from src.feedback_learning import FeedbackLearningEngine, PromptModifier, ExampleRetriever
-
-        feedback_engine = FeedbackLearningEngine(db_path=config.paths.feedback_db)
-
-        stats = feedback_engine.db.get_statistics()
+        from src.feedback_learning import ExampleRetriever, get_preference_worker
 
-        if stats["total_paragraphs"] >= config.feedback.min_paragraphs_for_analysis:
-            current_profile = feedback_engine.current_profile
-            should_analyze = (
-                current_profile is None or
-                stats["total_paragraphs"] - current_profile.total_decisions_analyzed >= config.feedback.reanalysis_threshold
-            )
-
-            if should_analyze:
-                new_profile = feedback_engine.run_preference_analysis()
-                feedback_engine.current_profile = new_profile
+        worker = get_preference_worker(config.paths.feedback_db)
+        snapshot = worker.snapshot()
 
-            if feedback_engine.current_profile:
-                modifier = PromptModifier(feedback_engine.current_profile)
-                preference_injection = modifier.generate_modifications()
-                if preference_injection:
-                    ctx.add_injection("learned_preferences", preference_injection)
+        if snapshot.profile is not None:
+            if snapshot.guidance:
+                ctx.add_injection("learned_preferences", snapshot.guidance)
 
             # Add few-shot examples from similar accepted paragraphs
-            retriever = ExampleRetriever(feedback_engine.db)
+            retriever = ExampleRetriever(worker.db)
             context = {
                 "pacing": ctx.pacing,
                 "tone": ctx.tone,
                 "scene_type": "general",
+                "player_input": ctx.player_input,
+                "location": ctx.location,
             }
             few_shot_prompt = retriever.build_few_shot_prompt(
                 context,
                 n_positive=config.feedback.positive_examples,
-                n_negative=config.feedback.negative_examples
+                n_negative=config.feedback.negative_examples,
+                char_budget=config.feedback.example_char_budget
             )
             if few_shot_prompt:
                 ctx.add_injection("feedback_examples", few_shot_prompt)
@@ -415,6 +414,231 @@ def run_pipeline(
     return ctx
 
 
+# ============================================================================
+# Parallel, budgeted stage execution
+# ============================================================================
+
+# Renders one stage's contribution to the system prompt ("" for nothing).
+StageRenderer = Callable[[NarrativeContext], str]
+
+# Extracts everything a stage's output depends on.
+StageInputs = Callable[[NarrativeContext], Any]
+
+
+@dataclass(frozen=True)
+class StageSpec:
+    """Declarative description of one independent context stage.
+
+    Stages that declare ``inputs`` are memoized: their output is reused
+    while the declared inputs hash the same. Only declare inputs for stages
+    that do not change engine state. ``priority`` and the shares decide how
+    much of the prompt token budget the stage's output may take (see
+    prompt_budget.PromptBudgetPacker); ``volatility`` places it in the
+    stable-to-volatile prompt layout.
+    """
+    name: str
+    render: StageRenderer
+    budget_ms: Optional[float] = None  # Falls back to config.narrative.stage_budget_ms
+    inputs: Optional[StageInputs] = None
+    priority: int = 50
+    min_share: float = 0.0
+    max_share: float = 0.15
+    volatility: int = 2  # 0 = campaign, 1 = scene, 2 = turn
+
+
+@dataclass
+class StageOutcome:
+    """Result of running one stage."""
+    name: str
+    status: str  # "ok", "empty", "timeout" or "error"
+    elapsed_ms: float
+    output: str = ""
+    cached: bool = False
+
+
+class StageCache:
+    """Bounded LRU of stage outputs keyed by a hash of their declared inputs."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else config.narrative.stage_cache_size
+        self._entries: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.stage_hits: dict[str, int] = {}
+        self.stage_misses: dict[str, int] = {}
+
+    @staticmethod
+    def make_key(stage_name: str, inputs: Any) -> str:
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(f"{stage_name}:{payload}".encode("utf-8")).hexdigest()
+
+    def get(self, stage_name: str, key: str) -> Optional[str]:
+        with self._lock:
+            output = self._entries.get(key)
+            if output is None:
+                self.misses += 1
+                self.stage_misses[stage_name] = self.stage_misses.get(stage_name, 0) + 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.stage_hits[stage_name] = self.stage_hits.get(stage_name, 0) + 1
+            return output
+
+    def put(self, key: str, output: str) -> None:
+        with self._lock:
+            self._entries[key] = output
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "by_stage": {
+                    name: {"hits": self.stage_hits.get(name, 0), "misses": self.stage_misses.get(name, 0)}
+                    for name in sorted(set(self.stage_hits) | set(self.stage_misses))
+                },
+            }
+
+
+# Process-wide cache shared by every session's narrator turns.
+STAGE_CACHE = StageCache()
+
+
+_STAGE_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_STAGE_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_stage_executor() -> ThreadPoolExecutor:
+    """Shared worker pool so stage threads are not respawned every turn."""
+    global _STAGE_EXECUTOR
+    if _STAGE_EXECUTOR is None:
+        with _STAGE_EXECUTOR_LOCK:
+            if _STAGE_EXECUTOR is None:
+                _STAGE_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=config.narrative.stage_workers,
+                    thread_name_prefix="narrator-stage",
+                )
+    return _STAGE_EXECUTOR
+
+
+def _run_stage(spec: StageSpec, ctx: NarrativeContext) -> tuple[str, float]:
+    start = time.perf_counter()
+    output = spec.render(ctx)
+    return output or "", (time.perf_counter() - start) * 1000.0
+
+
+def stage_sections(stages: list[StageSpec], outcomes: list[StageOutcome]) -> list[PromptSection]:
+    """Turn stage outputs into prompt sections carrying each stage's priority and shares."""
+    return [
+        PromptSection(spec.name, outcome.output, spec.priority, spec.min_share, spec.max_share, spec.volatility)
+        for spec, outcome in zip(stages, outcomes)
+        if outcome.output
+    ]
+
+
+def run_stages(
+    ctx: NarrativeContext,
+    stages: list[StageSpec],
+    executor: Optional[ThreadPoolExecutor] = None,
+    cache: Optional[StageCache] = None,
+) -> list[StageOutcome]:
+    """
+    Run independent stages concurrently, each within its time budget.
+
+    Budgets are measured from dispatch. A stage that misses its budget or
+    raises is skipped; its worker is left to finish in the background. When
+    the context carries live engines, each stage gets its own lease on them
+    (engine_registry.EngineLease); an over-budget stage's lease is revoked,
+    so its late writes never reach the engines that get flushed. Memoized
+    stages whose inputs are unchanged are served from the cache without
+    being dispatched.
+
+    Args:
+        ctx: Shared context; stages must only read it
+        stages: Stage registry, in prompt order
+        executor: Optional pool (defaults to the shared stage pool)
+        cache: Optional stage cache (defaults to STAGE_CACHE)
+
+    Returns:
+        One outcome per stage, in registry order regardless of completion order
+    """
+    executor = executor or _get_stage_executor()
+    cache = cache if cache is not None else STAGE_CACHE
+    dispatched = time.perf_counter()
+
+    keys: list[Optional[str]] = []
+    futures: list[Any] = []
+    leases: list[Any] = []
+    for spec in stages:
+        key = None
+        cached_output = None
+        if spec.inputs is not None:
+            try:
+                key = cache.make_key(spec.name, spec.inputs(ctx))
+                cached_output = cache.get(spec.name, key)
+            except Exception as e:
+                logger.debug(f"Pipeline stage '{spec.name}' inputs unavailable: {e}")
+                key = None
+        keys.append(key)
+        lease = None
+        if cached_output is not None:
+            futures.append(cached_output)
+        else:
+            stage_ctx = ctx
+            if ctx.engines is not None:
+                from src.engine_registry import EngineLease
+
+                lease = EngineLease(ctx.engines)
+                stage_ctx = replace(ctx, engines=lease)
+            futures.append(executor.submit(_run_stage, spec, stage_ctx))
+        leases.append(lease)
+
+    outcomes: list[StageOutcome] = []
+    for spec, key, future, lease in zip(stages, keys, futures, leases):
+        if isinstance(future, str):
+            outcomes.append(StageOutcome(spec.name, "ok" if future else "empty", 0.0, future, cached=True))
+            continue
+
+        budget_ms = spec.budget_ms if spec.budget_ms is not None else config.narrative.stage_budget_ms
+        remaining = budget_ms / 1000.0 - (time.perf_counter() - dispatched)
+        try:
+            output, elapsed_ms = future.result(timeout=max(remaining, 0.0))
+        except FutureTimeoutError:
+            future.cancel()
+            if lease is not None:
+                dropped = lease.revoke()
+                if dropped:
+                    logger.debug(f"Dropped engines of over-budget stage '{spec.name}': {', '.join(dropped)}")
+            elapsed_ms = (time.perf_counter() - dispatched) * 1000.0
+            logger.warning(f"Pipeline stage '{spec.name}' exceeded {budget_ms:.0f}ms budget; skipped")
+            outcomes.append(StageOutcome(spec.name, "timeout", elapsed_ms))
+            continue
+        except Exception as e:
+            logger.debug(f"Pipeline stage '{spec.name}' fallback: {e}")
+            outcomes.append(StageOutcome(spec.name, "error", (time.perf_counter() - dispatched) * 1000.0))
+            continue
+
+        if key is not None:
+            cache.put(key, output)
+        outcomes.append(StageOutcome(spec.name, "ok" if output else "empty", elapsed_ms, output))
+
+    return outcomes
+
+
 def create_context_from_state(state: dict[str, Any]) -> NarrativeContext:
     """
     Create a NarrativeContext from game state.
@@ -0,0 +1,743 @@
+"""
+Narrator context stages - the system prompt injections used by narrator_node.
+
+Each stage reads the game state from a NarrativeContext and returns the exact
+text it contributes to the narrator's system prompt. Stages are independent
+of one another, so run_stages can execute them concurrently; NARRATOR_STAGES
+fixes the order their output is assembled in. Narrative engines come from
+the session's live engine registry when one is attached to the context.
+"""
+
+from __future__ import annotations
+from typing import Any
+
+from src.narrator_pipeline import NarrativeContext, StageSpec
+from src.game_state import (
+    DirectorStateModel,
+    MemoryStateModel,
+    VoiceManagerState,
+    QuestLoreState,
+    CompanionManagerState,
+    SessionState,
+)
+
+
+# ============================================================================
+# State helpers
+# ============================================================================
+
+def _character(ctx: NarrativeContext) -> Any:
+    return ctx.state.get("character")
+
+
+def _world(ctx: NarrativeContext) -> Any:
+    return ctx.state.get("world")
+
+
+def _memory(ctx: NarrativeContext) -> Any:
+    return ctx.state.get("memory", MemoryStateModel())
+
+
+def _director(ctx: NarrativeContext) -> Any:
+    return ctx.state.get("director", DirectorStateModel())
+
+
+def _active_npcs(ctx: NarrativeContext) -> list[str]:
+    memory_state = _memory(ctx)
+    return memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
+
+
+def _location(ctx: NarrativeContext, default: str = "") -> str:
+    world = _world(ctx)
+    return world.current_location if world else default
+
+
+def _character_name(ctx: NarrativeContext, default: str) -> str:
+    character = _character(ctx)
+    return character.name if character else default
+
+
+def _in_combat(ctx: NarrativeContext) -> bool:
+    world = _world(ctx)
+    return getattr(world, 'combat_active', False) if world else False
+
+
+def _engine(ctx: NarrativeContext, key: str, engine_cls: type, payload: Any = None) -> Any:
+    """Live engine from the session registry, or a fresh one hydrated from state."""
+    if payload is None:
+        payload = ctx.state.get(key, {})
+    if ctx.engines is not None:
+        return ctx.engines.get(key, engine_cls, payload)
+    return engine_cls.from_dict(payload) if payload else engine_cls()
+
+
+def _mark_dirty(ctx: NarrativeContext, key: str) -> None:
+    if ctx.engines is not None:
+        ctx.engines.mark_dirty(key)
+
+
+def _tagged(tag: str, content: str) -> str:
+    return f"\n\n<{tag}>\n{content}\n</{tag}>" if content else ""
+
+
+# ============================================================================
+# Stages
+# ============================================================================
+
+def render_feedback_learning(ctx: NarrativeContext) -> str:
+    """Learned preferences and accepted/rejected examples from feedback."""
+    from src.config import config
+    from src.feedback_learning import ExampleRetriever, get_preference_worker
+
+    # Analysis runs on the background worker; only its last snapshot is read here.
+    worker = get_preference_worker(config.paths.feedback_db)
+    snapshot = worker.snapshot()
+    if snapshot.profile is None:
+        return ""
+
+    output = ""
+    if snapshot.guidance:
+        output += f"\n\n{snapshot.guidance}"
+
+    # Add few-shot examples from similar accepted paragraphs
+    retriever = ExampleRetriever(worker.db)
+    context = {
+        "pacing": ctx.pacing,
+        "tone": ctx.tone,
+        "scene_type": "general",
+        "player_input": ctx.player_input,
+        "location": ctx.location,
+    }
+    few_shot_prompt = retriever.build_few_shot_prompt(
+        context,
+        n_positive=config.feedback.positive_examples,
+        n_negative=config.feedback.negative_examples,
+        char_budget=config.feedback.example_char_budget,
+    )
+    if few_shot_prompt:
+        output += f"\n\n{few_shot_prompt}"
+
+    return output
+
+
+def render_narrative_craft(ctx: NarrativeContext) -> str:
+    """Genre, McKee structure and archetypes."""
+    from src.narrative_craft import NarrativeCraftEngine
+
+    craft_engine = _engine(ctx, "narrative_craft", NarrativeCraftEngine)
+    craft_context = craft_engine.get_craft_context()
+
+    craft_engine.scenes_in_current_beat += 1
+    _mark_dirty(ctx, "narrative_craft")
+    return _tagged("narrative_craft", craft_context)
+
+
+def prose_craft_inputs(ctx: NarrativeContext) -> tuple:
+    director_model = _director(ctx)
+    return (
+        getattr(director_model, 'tension_level', 0.5),
+        getattr(director_model, 'tone', 'neutral'),
+        _character_name(ctx, "the protagonist"),
+        getattr(director_model, 'beat_type', 'general'),
+        _location(ctx, "generic"),
+    )
+
+
+def render_prose_craft(ctx: NarrativeContext) -> str:
+    """Sentence rhythm, sensory detail and dialogue craft."""
+    from src.prose_craft import ProseCraftEngine
+
+    tension_level, emotional_state, pov_character, scene_type, location_type = prose_craft_inputs(ctx)
+    return ProseCraftEngine().generate_comprehensive_guidance(
+        tension_level=tension_level,
+        emotional_state=emotional_state,
+        pov_character=pov_character,
+        scene_type=scene_type,
+        location_type=location_type,
+    )
+
+
+def render_prose_enhancement(ctx: NarrativeContext) -> str:
+    """Sensory tracking, voice consistency and metaphors."""
+    from src.prose_enhancement import ProseEnhancementEngine
+
+    prose_enhancer = _engine(ctx, "prose_enhancement", ProseEnhancementEngine)
+
+    # Get genre from narrative craft if available
+    craft_state = ctx.state.get("narrative_craft", {})
+    genre = "space_opera"
+    if craft_state and "genre" in craft_state:
+        genre = craft_state["genre"]
+
+    guidance = prose_enhancer.get_comprehensive_guidance(
+        location=_location(ctx),
+        active_npcs=_active_npcs(ctx)[:3],
+        genre=genre,
+        subjects=["danger", "technology", "emotion"]
+    )
+    _mark_dirty(ctx, "prose_enhancement")  # Tracks current location and genre
+    return guidance
+
+
+def render_narrative_systems(ctx: NarrativeContext) -> str:
+    """Tension arc, dialogue, transitions and themes."""
+    from src.narrative_systems import NarrativeSystemsEngine
+
+    narrative_systems = _engine(ctx, "narrative_systems", NarrativeSystemsEngine)
+
+    ns_tension = getattr(_director(ctx), 'tension_level', 0.5)
+    guidance = narrative_systems.get_comprehensive_guidance(
+        tension_level=ns_tension,
+        scene_position="middle",
+        is_climactic=ns_tension >= 0.8,
+        include_themes=True
+    )
+    _mark_dirty(ctx, "narrative_systems")  # Records the tension arc
+    return guidance
+
+
+def render_character_arcs(ctx: NarrativeContext) -> str:
+    """Hero's Journey, foreshadowing, pacing and emotional beats."""
+    from src.character_arcs import CharacterArcEngine
+
+    arc_engine = _engine(ctx, "character_arcs", CharacterArcEngine)
+    guidance = arc_engine.get_comprehensive_guidance(
+        protagonist_name=_character_name(ctx, ""),
+        detected_emotion=None,
+        current_scene_type=None
+    )
+    _mark_dirty(ctx, "character_arcs")  # Records the scene for pacing
+    return guidance
+
+
+def render_world_coherence(ctx: NarrativeContext) -> str:
+    """State tracking, agency validation, surprises and recaps."""
+    from src.world_coherence import WorldCoherenceEngine
+
+    coherence_engine = _engine(ctx, "world_coherence", WorldCoherenceEngine)
+    return coherence_engine.get_comprehensive_guidance(
+        location=_location(ctx),
+        active_npcs=_active_npcs(ctx)[:3],
+        is_session_start=False,
+        protagonist=_character_name(ctx, "")
+    )
+
+
+def specialized_scenes_inputs(ctx: NarrativeContext) -> tuple:
+    return ("combat" if _in_combat(ctx) else "general", ctx.state.get("specialized_scenes", {}))
+
+
+def render_specialized_scenes(ctx: NarrativeContext) -> str:
+    """Combat, investigation, social, exploration and horror scene guidance."""
+    from src.specialized_scenes import SpecializedScenesEngine
+
+    scenes_engine = _engine(ctx, "specialized_scenes", SpecializedScenesEngine)
+
+    scene_type, _ = specialized_scenes_inputs(ctx)
+    scene_guidance = scenes_engine.get_scene_guidance(scene_type)
+    return f"\n\n{scene_guidance}" if scene_guidance else ""
+
+
+def render_advanced_simulation(ctx: NarrativeContext) -> str:
+    """Relationships, flashbacks, consequences, time and dialogue."""
+    from src.advanced_simulation import AdvancedSimulationEngine
+
+    sim_engine = _engine(ctx, "advanced_simulation", AdvancedSimulationEngine)
+    return sim_engine.get_comprehensive_guidance(
+        active_npcs=_active_npcs(ctx)[:3],
+        player_name=_character_name(ctx, "player"),
+        current_context={"location": _location(ctx)}
+    )
+
+
+def render_quest_lore(ctx: NarrativeContext) -> str:
+    """Objectives, worldbuilding, NPC schedules and rumors."""
+    from src.quest_lore import QuestLoreEngine
+
+    quest_lore_state = ctx.state.get("quest_lore", QuestLoreState())
+    ql_data = quest_lore_state.model_dump() if hasattr(quest_lore_state, 'model_dump') else quest_lore_state
+    ql_engine = _engine(ctx, "quest_lore", QuestLoreEngine, ql_data)
+    return ql_engine.get_comprehensive_guidance(
+        current_location=_location(ctx),
+        active_npcs=_active_npcs(ctx)[:3],
+        current_day=1
+    )
+
+
+def render_faction_environment(ctx: NarrativeContext) -> str:
+    """Politics, weather, economy and companions."""
+    from src.faction_environment import FactionEnvironmentEngine
+
+    fe_engine = _engine(ctx, "faction_environment", FactionEnvironmentEngine)
+    return fe_engine.get_comprehensive_guidance(
+        location=_location(ctx),
+        active_npcs=_active_npcs(ctx)[:3]
+    )
+
+
+def render_final_systems(ctx: NarrativeContext) -> str:
+    """Encounters, voice consistency and memory consolidation."""
+    from src.final_systems import FinalSystemsEngine
+
+    final_engine = _engine(ctx, "final_systems", FinalSystemsEngine)
+
+    tension = 0.5
+    director_state = ctx.state.get("director", {})
+    if director_state and "tension" in director_state:
+        tension = director_state.get("tension", 0.5)
+
+    return final_engine.get_comprehensive_guidance(current_tension=tension)
+
+
+def render_campaign_truths(ctx: NarrativeContext) -> str:
+    """World settings and elements the setting forbids."""
+    from src.campaign_truths import CampaignTruths, create_default_campaign
+
+    campaign_truths_state = ctx.state.get("campaign_truths", {})
+    truths = CampaignTruths.from_dict(campaign_truths_state) if campaign_truths_state else create_default_campaign()
+
+    output = _tagged("world_truths", truths.get_narrative_context())
+    forbidden = truths.get_forbidden_elements()
+    if forbidden:
+        output += _tagged("forbidden_by_setting", f"Do not include: {', '.join(forbidden)}")
+    return output
+
+
+def render_npc_personalities(ctx: NarrativeContext) -> str:
+    """Big Five traits for the NPCs in the scene."""
+    active_npcs = _active_npcs(ctx)
+    if not active_npcs:
+        return ""
+
+    from src.personality import create_personality, OCEANProfile
+
+    npc_personalities = ctx.state.get("npc_personalities", {})
+    personality_context = ""
+    for npc in active_npcs[:3]:
+        if npc in npc_personalities:
+            profile = OCEANProfile.from_dict(npc_personalities[npc])
+        else:
+            # Generate random personality for new NPCs
+            profile = create_personality("everyman")
+            npc_personalities[npc] = profile.to_dict()
+        personality_context += profile.get_narrator_context(npc) + "\n\n"
+
+    return _tagged("npc_personalities", personality_context.strip())
+
+
+def cinematography_inputs(ctx: NarrativeContext) -> tuple:
+    director_model = _director(ctx)
+    tension = director_model.tension_level if hasattr(director_model, 'tension_level') else 0.5
+
+    memory_state = _memory(ctx)
+    is_action = _in_combat(ctx)
+    is_dialogue = any(npc in ctx.player_input.lower() for npc in (memory_state.active_npcs if memory_state else []))
+    return tension, is_action, is_dialogue
+
+
+def render_cinematography(ctx: NarrativeContext) -> str:
+    """Shot selection based on emotion and action."""
+    from src.personality import CinematographyDirector
+
+    tension, is_action, is_dialogue = cinematography_inputs(ctx)
+    camera_context = CinematographyDirector().get_narrator_context(
+        emotional_intensity=tension,
+        tactical_complexity=0.7 if is_action else 0.3,
+        is_dialogue=is_dialogue,
+        is_action=is_action,
+    )
+    return f"\n\n<cinematography>\n{camera_context}\n</cinematography>"
+
+
+def render_smart_zones(ctx: NarrativeContext) -> str:
+    """Living scene context for the current zone."""
+    from src.smart_zones import SmartZoneManager
+
+    smart_zone_state = ctx.state.get("smart_zones", {})
+    zone_manager = SmartZoneManager.from_dict(smart_zone_state) if smart_zone_state else None
+    if not zone_manager:
+        return ""
+    return _tagged("living_scene", zone_manager.get_current_zone_context())
+
+
+def render_combat_orchestration(ctx: NarrativeContext) -> str:
+    """Attack-grid coordination while combat is active."""
+    if not _in_combat(ctx):
+        return ""
+
+    from src.combat_orchestrator import CombatOrchestrator
+
+    combat_state = ctx.state.get("combat_orchestrator", {})
+    orchestrator = CombatOrchestrator.from_dict(combat_state) if combat_state else None
+    if not orchestrator:
+        return ""
+    return f"\n\n<combat_orchestration>\n{orchestrator.get_combat_context()}\n</combat_orchestration>"
+
+
+def render_npc_barks(ctx: NarrativeContext) -> str:
+    """NPC vocalizations reacting to evidence in the player's action."""
+    from src.barks import BarkManager, detect_evidence
+
+    bark_state = ctx.state.get("barks", {})
+    bark_manager = BarkManager.from_dict(bark_state) if bark_state else BarkManager()
+
+    for ev_type in detect_evidence(ctx.player_input):
+        bark_manager.add_evidence(ev_type, location=_location(ctx, "unknown"))
+
+    bark_context = bark_manager.get_narrator_context()
+    bark_manager.update_cooldowns()
+    return _tagged("npc_barks", bark_context)
+
+
+def render_world_time(ctx: NarrativeContext) -> str:
+    """Time-based NPC activities."""
+    from src.daily_scripts import DailyScriptManager
+
+    daily_state = ctx.state.get("daily_scripts", {})
+    daily_manager = DailyScriptManager.from_dict(daily_state) if daily_state else None
+    if not daily_manager:
+        return ""
+    return _tagged("world_time", daily_manager.get_narrator_context())
+
+
+def render_lorebook(ctx: NarrativeContext) -> str:
+    """Keyword-activated lore retrieval."""
+    from src.daily_scripts import Lorebook
+
+    lorebook_state = ctx.state.get("lorebook", {})
+    lorebook = Lorebook.from_dict(lorebook_state) if lorebook_state else None
+    if not lorebook:
+        return ""
+    return _tagged("lorebook", lorebook.get_context_for_input(ctx.player_input))
+
+
+def render_tactical_map(ctx: NarrativeContext) -> str:
+    """Influence-map spatial analysis while combat is active."""
+    if not _in_combat(ctx):
+        return ""
+
+    from src.influence_maps import InfluenceMap, Position
+
+    influence_state = ctx.state.get("influence_maps", {})
+    imap = InfluenceMap.from_dict(influence_state) if influence_state else None
+    if not imap:
+        return ""
+    # Assume player at origin for text-based game
+    return _tagged("tactical_map", imap.get_narrator_context(Position(0, 0)))
+
+
+def render_memory_context(ctx: NarrativeContext) -> str:
+    """Recent events, key relationships and campaign history."""
+    memory_state = _memory(ctx)
+    if not memory_state:
+        return ""
+
+    context_parts = []
+    if hasattr(memory_state, 'scene_summaries') and memory_state.scene_summaries:
+        recent = memory_state.scene_summaries[-3:]
+        context_parts.append("[Recent Events]\n" + "\n".join(f"- {s}" for s in recent))
+
+    if hasattr(memory_state, 'key_relationships') and memory_state.key_relationships:
+        rels = [f"{npc}: {rel}" for npc, rel in list(memory_state.key_relationships.items())[:5]]
+        context_parts.append("[Key Relationships]\n" + "\n".join(f"- {r}" for r in rels))
+
+    if hasattr(memory_state, 'major_beats') and memory_state.major_beats:
+        context_parts.append("[Campaign History]\n" + "\n".join(f"- {b}" for b in memory_state.major_beats[-3:]))
+
+    return _tagged("memory_context", "\n\n".join(context_parts))
+
+
+def render_character_voices(ctx: NarrativeContext) -> str:
+    """Voice profiles for characters in the scene."""
+    voice_state = ctx.state.get("voices", VoiceManagerState())
+    if not (voice_state and hasattr(voice_state, 'active_characters') and voice_state.active_characters):
+        return ""
+
+    voice_parts = []
+    for char_name in voice_state.active_characters:
+        profile = voice_state.profiles.get(char_name.lower(), {})
+        if profile:
+            lines = [f"[CHARACTER VOICE: {profile.get('name', char_name)}]"]
+            if profile.get('speech_patterns'):
+                lines.append(f"Speech: {'; '.join(profile['speech_patterns'][:2])}")
+            if profile.get('relationship_to_player'):
+                lines.append(f"Relationship: {profile['relationship_to_player']}")
+            voice_parts.append("\n".join(lines))
+
+    return _tagged("character_voices", "\n\n".join(voice_parts))
+
+
+def render_npc_behaviors(ctx: NarrativeContext) -> str:
+    """Behavior tree evaluations for active NPCs."""
+    active_npcs = _active_npcs(ctx)
+    if not active_npcs:
+        return ""
+
+    from src.behavior_tree import evaluate_npc_behavior
+
+    voice_state = ctx.state.get("voices", VoiceManagerState())
+    bt_parts = []
+    for npc_name in active_npcs[:3]:  # Limit to 3 NPCs
+        # Get archetype from voice profiles or default
+        archetype = "civilian"
+        if voice_state and hasattr(voice_state, 'profiles'):
+            profile = voice_state.profiles.get(npc_name.lower(), {})
+            archetype = profile.get("archetype", "civilian")
+
+        bt_context = evaluate_npc_behavior(
+            npc_name=npc_name,
+            archetype=archetype,
+            player_name=_character_name(ctx, "Traveler"),
+            player_reputation=0.5,
+            in_combat=False,
+            has_quest=False,
+        )
+        if bt_context.action and bt_context.dialogue_intent:
+            bt_parts.append(
+                f"[NPC BEHAVIOR: {npc_name}]\n"
+                f"Action: {bt_context.action}\n"
+                f"Manner: {bt_context.dialogue_intent}"
+            )
+
+    return _tagged("npc_behaviors", "\n\n".join(bt_parts))
+
+
+def render_social_memory(ctx: NarrativeContext) -> str:
+    """Vendettas and shared history with active NPCs."""
+    from src.social_memory import SocialGraph
+
+    social_state = ctx.state.get("social_memory", {})
+    memory_state = _memory(ctx)
+    graph = SocialGraph()
+
+    social_context = ""
+    stored_histories = social_state.get("histories", {})
+    if stored_histories and memory_state and hasattr(memory_state, 'active_npcs'):
+        for npc in memory_state.active_npcs[:3]:
+            vendetta_context = graph.get_narrator_context(npc)
+            if vendetta_context:
+                social_context += vendetta_context + "\n"
+
+            history_context = graph.get_history(npc).get_narrative_context()
+            if history_context:
+                social_context += history_context + "\n"
+
+    return _tagged("social_memory", social_context.strip())
+
+
+def render_combat_assessment(ctx: NarrativeContext) -> str:
+    """Warn the narrator about unfair fights."""
+    world = _world(ctx)
+    if not (world and hasattr(world, 'combat_active') and world.combat_active):
+        return ""
+
+    from src.combat_prediction import quick_combat_check, get_combat_warning_context
+
+    prediction = quick_combat_check(
+        1.0, 1,
+        getattr(world, 'enemy_strength', 1.0), getattr(world, 'enemy_count', 1),
+        is_ranged=True
+    )
+    return _tagged("combat_assessment", get_combat_warning_context(prediction))
+
+
+def render_companion(ctx: NarrativeContext) -> str:
+    """Companion intervention or standing context."""
+    companion_state = ctx.state.get("companions", CompanionManagerState())
+    if not (companion_state.active_companion and companion_state.companions):
+        return ""
+
+    from src.companion import CompanionContext, create_companion
+
+    comp_data = companion_state.companions.get(companion_state.active_companion)
+    if not comp_data:
+        raise ValueError("Active companion data not found")
+
+    companion = create_companion(
+        comp_data.get("archetype", "soldier"),
+        comp_data.get("name", "Companion")
+    )
+
+    character = _character(ctx)
+    world = _world(ctx)
+    session = ctx.state.get("session", SessionState())
+    companion_ctx = CompanionContext(
+        player_health=character.health if hasattr(character, 'health') else 1.0,
+        player_in_combat=_in_combat(ctx),
+        threat_level=getattr(world, 'threat_level', 0.0) if world else 0.0,
+        current_scene=session.scene_number if hasattr(session, 'scene_number') else 0,
+    )
+
+    intervention = companion.update(companion_ctx)
+    if intervention:
+        companion_context = (
+            f"[COMPANION: {intervention['companion_name']}]\n"
+            f"Action: {intervention['action']}\n"
+            f"Intent: {intervention['dialogue_intent']}\n"
+            f"Style: {intervention['speech_style']}"
+        )
+        if intervention.get('signature_phrase'):
+            companion_context += f"\nPhrase: \"{intervention['signature_phrase']}\""
+    else:
+        companion_context = companion.get_narrator_context(companion_ctx)
+
+    return _tagged("companion", companion_context)
+
+
+def render_npc_plans(ctx: NarrativeContext) -> str:
+    """GOAP plan for the lead NPC during combat."""
+    active_npcs = _active_npcs(ctx)
+    if not active_npcs or not _in_combat(ctx):
+        return ""
+
+    from src.goap import plan_npc_action
+
+    npc_name = active_npcs[0]
+    goap_state = {
+        "has_weapon": True,
+        "weapon_drawn": True,
+        "target_visible": True,
+        "target_in_range": False,
+    }
+    plan = plan_npc_action("attack_player", {"target_damaged": True}, goap_state, "combat")
+    if not plan:
+        return ""
+
+    goap_context = f"[{npc_name} PLAN]\n" + "\n".join([f"- {a['description']}" for a in plan])
+    return _tagged("npc_plans", goap_context)
+
+
+def render_character_bonds(ctx: NarrativeContext) -> str:
+    """Bond relationships, with callbacks at high tension."""
+    from src.emotional_storytelling import BondManager
+
+    emotional_state = ctx.state.get("emotional_storytelling", {})
+    bond_manager = BondManager.from_dict(emotional_state) if emotional_state else BondManager()
+    bond_context = bond_manager.get_all_bonds_context()
+
+    director_model = _director(ctx)
+    if hasattr(director_model, 'tension_level') and director_model.tension_level > 0.7:
+        callback = bond_manager.get_callback_for_climax()
+        if callback:
+            bond_context += f"\n\n[CALLBACK OPPORTUNITY]\n{callback}"
+
+    return _tagged("character_bonds", bond_context)
+
+
+def render_campaign_theme(ctx: NarrativeContext) -> str:
+    """The campaign's tracked theme."""
+    from src.moral_dilemma import ThemeTracker
+
+    theme_state = ctx.state.get("theme_tracker", {})
+    theme = ThemeTracker.from_dict(theme_state) if theme_state else None
+    if not theme:
+        return ""
+    return _tagged("campaign_theme", theme.get_theme_context())
+
+
+def render_environmental_storytelling(ctx: NarrativeContext) -> str:
+    """Show-don't-tell guidance."""
+    from src.environmental_storytelling import EnvironmentalStoryGenerator
+
+    return _tagged("environmental_storytelling", EnvironmentalStoryGenerator().get_show_dont_tell_guidance())
+
+
+def render_style_examples(ctx: NarrativeContext) -> str:
+    """Tone-matched few-shot examples."""
+    from src.narrator import get_examples_for_tone
+
+    examples = get_examples_for_tone(ctx.tone, ctx.pacing, count=2)
+    few_shot_parts = [
+        f"[Example - {ex.get('roll', 'Narrative')}]\n{ex.get('narrative', '')[:400]}"
+        for ex in examples
+    ]
+    return _tagged("style_examples", "\n\n".join(few_shot_parts))
+
+
+def render_enhancements(ctx: NarrativeContext) -> str:
+    """All enhancement-engine systems, unified."""
+    from src.enhancement_engine import EnhancementEngine
+
+    enhancement_state = ctx.state.get("enhancements", {})
+    enhancement_engine = EnhancementEngine.from_dict(enhancement_state) if enhancement_state else EnhancementEngine()
+
+    session = ctx.state.get("session", SessionState())
+    turn_count = session.turn_count if hasattr(session, 'turn_count') else 0
+    enhancement_engine.set_scene(turn_count)
+
+    character = _character(ctx)
+    vow_states = []
+    if character and hasattr(character, 'vows'):
+        for vow in character.vows:
+            vow_states.append(vow.model_dump() if hasattr(vow, 'model_dump') else vow.__dict__)
+
+    asset_states = []
+    if character and hasattr(character, 'assets'):
+        for asset in character.assets:
+            asset_states.append(asset.model_dump() if hasattr(asset, 'model_dump') else asset.__dict__)
+
+    enhancement_ctx = enhancement_engine.process_turn(
+        player_input=ctx.player_input,
+        location=_location(ctx),
+        active_npcs=_active_npcs(ctx),
+        player_name=_character_name(ctx, "the protagonist"),
+        vow_states=vow_states,
+        asset_states=asset_states,
+        is_session_start=(turn_count == 0),
+    )
+    enhancement_context = enhancement_ctx.get_narrator_injection()
+    return f"\n\n{enhancement_context}" if enhancement_context else ""
+
+
+# Prompt order. Output is assembled in this order however stages finish.
+# Stages with declared inputs are read-only and memoized on those inputs, so
+# a turn where only the player's sentence changes re-renders just the stages
+# that read it (barks, lorebook, cinematography, enhancements, ...).
+# Priorities rank stages for the prompt token budget: continuity (memory,
+# truths, voices, lore) outranks flavour (barks, camera, tactical map).
+# Volatility moves campaign- and scene-level stages ahead of per-turn ones
+# so consecutive prompts share a long cacheable prefix.
+NARRATOR_STAGES: list[StageSpec] = [
+    StageSpec("feedback_learning", render_feedback_learning, budget_ms=1500.0, priority=60),
+    StageSpec("narrative_craft", render_narrative_craft),
+    StageSpec("prose_craft", render_prose_craft, inputs=prose_craft_inputs, priority=45),
+    StageSpec("prose_enhancement", render_prose_enhancement, priority=45),
+    StageSpec("narrative_systems", render_narrative_systems),
+    StageSpec("character_arcs", render_character_arcs, priority=60, volatility=1),
+    StageSpec("world_coherence", render_world_coherence, priority=70, volatility=1),
+    StageSpec("specialized_scenes", render_specialized_scenes, inputs=specialized_scenes_inputs, priority=55),
+    StageSpec("advanced_simulation", render_advanced_simulation, priority=40),
+    StageSpec("quest_lore", render_quest_lore, priority=65, volatility=1),
+    StageSpec("faction_environment", render_faction_environment, priority=45, volatility=1),
+    StageSpec("final_systems", render_final_systems, priority=40),
+    StageSpec(
+        "campaign_truths", render_campaign_truths,
+        inputs=lambda ctx: ctx.state.get("campaign_truths", {}), priority=75, min_share=0.03, volatility=0,
+    ),
+    StageSpec("npc_personalities", render_npc_personalities, priority=65, volatility=1),
+    StageSpec("cinematography", render_cinematography, inputs=cinematography_inputs, priority=35),
+    StageSpec("smart_zones", render_smart_zones, priority=35, volatility=1),
+    StageSpec("combat_orchestration", render_combat_orchestration, priority=60),
+    StageSpec("npc_barks", render_npc_barks, priority=30),
+    StageSpec("world_time", render_world_time),
+    StageSpec("lorebook", render_lorebook, priority=70, max_share=0.2),
+    StageSpec("tactical_map", render_tactical_map, priority=30, volatility=1),
+    StageSpec("memory_context", render_memory_context, priority=85, min_share=0.05, max_share=0.2, volatility=1),
+    StageSpec("character_voices", render_character_voices, priority=75, volatility=1),
+    StageSpec("npc_behaviors", render_npc_behaviors, priority=55),
+    StageSpec("social_memory", render_social_memory, priority=55, volatility=1),
+    StageSpec("combat_assessment", render_combat_assessment, priority=55),
+    StageSpec("companion", render_companion, priority=55, volatility=1),
+    StageSpec("npc_plans", render_npc_plans, priority=45, volatility=1),
+    StageSpec("character_bonds", render_character_bonds, volatility=1),
+    StageSpec("campaign_theme", render_campaign_theme, priority=60, volatility=0),
+    StageSpec(
+        "environmental_storytelling", render_environmental_storytelling,
+        inputs=lambda ctx: (), priority=30, volatility=0,
+    ),
+    StageSpec(
+        "style_examples", render_style_examples,
+        inputs=lambda ctx: (ctx.tone, ctx.pacing), priority=40, volatility=1,
+    ),
+    StageSpec("enhancements", render_enhancements),
+]
@@ -8,6 +8,7 @@ import re
 import time
 from typing import Any
 
+from langchain_core.runnables import RunnableConfig
 from langgraph.types import interrupt, Command
 
 from src.logging_config import get_logger
@@ -327,12 +328,20 @@ async def director_node(state: GameState) -> dict[str, Any]:
         "primary_vow_phase": primary_vow.phase if primary_vow else "establishing",
     }
     
+    # Reuse the director guidance from the last narration's turn analysis
+    last_narrative = next(
+        (m.get("content", "") for m in reversed(messages) if isinstance(m, dict) and m.get("role") == "assistant"),
+        "",
+    )
+    from src.turn_analysis import get_turn_analyzer
+
     # Analyze and get plan
     plan = director.analyze(
         world_state=world_state,
         session_history=session_summary,
         last_roll_outcome=last_roll.outcome if last_roll else "",
         vow_progress=vow_progress,
+        analysis=get_turn_analyzer().cached(last_narrative),
     )
     
     # Override with vow-based guidance for high-progress vows
@@ -557,17 +566,21 @@ def oracle_interpreter_node(state: GameState) -> dict[str, Any]:
 # Narrator Node - Enhanced with Memory, Voice, and Dynamic Few-Shot
 # ============================================================================
 
-def narrator_node(state: GameState) -> dict[str, Any]:
+def narrator_node(state: GameState, config: RunnableConfig | None = None) -> dict[str, Any]:
     """
     Generate narrative prose with full system integration:
     - Director guidance for pacing and tone
     - Memory context for continuity
     - Voice profiles for NPC consistency
     - Dynamic few-shot examples matching current tone
+
+    Context injections come from narrator_stages.NARRATOR_STAGES, run in
+    parallel under per-stage time budgets. Narrative engines stay alive in the
+    session's engine registry; only the ones changed this turn are written
+    back to the state.
     """
     from src.narrator import (
-        build_narrative_prompt, NarratorConfig, SYSTEM_PROMPT,
-        get_examples_for_tone, validate_narrative,
+        build_narrative_prompt, NarratorConfig, SYSTEM_PROMPT, validate_narrative,
     )
     from src.director import DirectorPlan, Pacing, Tone
     from src.memory import MemoryManager, ActiveContext, SessionBuffer, CampaignSummary
@@ -580,9 +593,6 @@ def narrator_node(state: GameState) -> dict[str, Any]:
     messages = state.get("messages", [])
     director_state = state.get("director", DirectorStateModel())
     memory_state = state.get("memory", MemoryStateModel())
-    voice_state = state.get("voices", VoiceManagerState())
-    quest_lore_state = state.get("quest_lore", QuestLoreState())
-    companion_state = state.get("companions", CompanionManagerState())
 
     # Get last player input
     player_input = ""
@@ -603,88 +613,6 @@ def narrator_node(state: GameState) -> dict[str, Any]:
         notes_for_narrator=director_state.last_notes if hasattr(director_state, 'last_notes') else "",
     )
     
-    # Build Memory context
-    memory_context = ""
-    if memory_state:
-        context_parts = []
-        
-        # Recent scene summaries
-        if hasattr(memory_state, 'scene_summaries') and memory_state.scene_summaries:
-            recent = memory_state.scene_summaries[-3:]
-            context_parts.append("[Recent Events]\n" + "\n".join(f"- {s}" for s in recent))
-        
-        # Key relationships from campaign
-        if hasattr(memory_state, 'key_relationships') and memory_state.key_relationships:
-            rels = [f"{npc}: {rel}" for npc, rel in list(memory_state.key_relationships.items())[:5]]
-            context_parts.append("[Key Relationships]\n" + "\n".join(f"- {r}" for r in rels))
-        
-        # Major story beats
-        if hasattr(memory_state, 'major_beats') and memory_state.major_beats:
-            context_parts.append("[Campaign History]\n" + "\n".join(f"- {b}" for b in memory_state.major_beats[-3:]))
-        
-        if context_parts:
-            memory_context = "\n\n".join(context_parts)
-
-    # Build Voice context for active NPCs
-    voice_context = ""
-    if voice_state and hasattr(voice_state, 'active_characters') and voice_state.active_characters:
-        voice_parts = []
-        for char_name in voice_state.active_characters:
-            profile = voice_state.profiles.get(char_name.lower(), {})
-            if profile:
-                lines = [f"[CHARACTER VOICE: {profile.get('name', char_name)}]"]
-                if profile.get('speech_patterns'):
-                    lines.append(f"Speech: {'; '.join(profile['speech_patterns'][:2])}")
-                if profile.get('relationship_to_player'):
-                    lines.append(f"Relationship: {profile['relationship_to_player']}")
-                voice_parts.append("\n".join(lines))
-        if voice_parts:
-            voice_context = "\n\n".join(voice_parts)
-
-    # Evaluate Behavior Trees for active NPCs
-    npc_behavior_context = ""
-    if memory_state and hasattr(memory_state, 'active_npcs') and memory_state.active_npcs:
-        from src.behavior_tree import evaluate_npc_behavior
-        
-        bt_parts = []
-        for npc_name in memory_state.active_npcs[:3]:  # Limit to 3 NPCs
-            # Get archetype from voice profiles or default
-            archetype = "civilian"
-            if voice_state and hasattr(voice_state, 'profiles'):
-                profile = voice_state.profiles.get(npc_name.lower(), {})
-                archetype = profile.get("archetype", "civilian")
-            
-            # Evaluate BT
-            bt_context = evaluate_npc_behavior(
-                npc_name=npc_name,
-                archetype=archetype,
-                player_name=character.name if character else "Traveler",
-                player_reputation=0.5,  # Could be pulled from memory
-                in_combat=False,  # Could be pulled from world state
-                has_quest=False,  # Could be pulled from NPC data
-            )
-            
-            if bt_context.action and bt_context.dialogue_intent:
-                bt_parts.append(
-                    f"[NPC BEHAVIOR: {npc_name}]\n"
-                    f"Action: {bt_context.action}\n"
-                    f"Manner: {bt_context.dialogue_intent}"
-                )
-        
-        if bt_parts:
-            npc_behavior_context = "\n\n".join(bt_parts)
-
-    # Get tone-matched few-shot examples
-    examples = get_examples_for_tone(tone, pacing, count=2)
-    few_shot_context = ""
-    if examples:
-        few_shot_parts = []
-        for ex in examples:
-            few_shot_parts.append(
-                f"[Example - {ex.get('roll', 'Narrative')}]\n{ex.get('narrative', '')[:400]}"
-            )
-        few_shot_context = "\n\n".join(few_shot_parts)
-    
     # Build enhanced prompt with Director guidance
     prompt = build_narrative_prompt(
         player_input=player_input,
@@ -694,736 +622,64 @@ def narrator_node(state: GameState) -> dict[str, Any]:
         location=world.current_location if world else "the void",
     )
     
-    # Compose enhanced system prompt with all injections
-    enhanced_system = SYSTEM_PROMPT
-    enhanced_system += director_plan.to_prompt_injection()
-    
-    # FEEDBACK LEARNING: Auto-inject learned preferences
-    try:
-        from src.feedback_learning import FeedbackLearningEngine, PromptModifier, ExampleRetriever
-        
-        feedback_engine = FeedbackLearningEngine(db_path=config.paths.feedback_db)
-        
-        # Check if we have enough data for analysis
-        stats = feedback_engine.db.get_statistics()
-        
-        if stats["total_paragraphs"] >= 20:
-            # Run analysis if we haven't recently or if we have 10+ new decisions
-            current_profile = feedback_engine.current_profile
-            should_analyze = (
-                current_profile is None or 
-                stats["total_paragraphs"] - current_profile.total_decisions_analyzed >= 10
-            )
-            
-            if should_analyze:
-                # Analyze and save new preferences
-                new_profile = feedback_engine.run_preference_analysis()
-                feedback_engine.current_profile = new_profile
-            
-            # Inject learned preferences into prompt
-            if feedback_engine.current_profile:
-                modifier = PromptModifier(feedback_engine.current_profile)
-                preference_injection = modifier.generate_modifications()
-                if preference_injection:
-                    enhanced_system += f"\n\n{preference_injection}"
-            
-            # Add few-shot examples from similar accepted paragraphs
-            retriever = ExampleRetriever(feedback_engine.db)
-            context = {
-                "pacing": pacing,
-                "tone": tone,
-                "scene_type": "general",
-            }
-            few_shot_prompt = retriever.build_few_shot_prompt(context, n_positive=2, n_negative=1)
-            if few_shot_prompt:
-                enhanced_system += f"\n\n{few_shot_prompt}"
-    
-    except Exception as e:
-        # Graceful fallback if feedback learning fails
-        print(f"Feedback learning injection error: {e}")
-    
-    # Narrative Craft Engine - genre, McKee structure, archetypes
-    craft_state = state.get("narrative_craft", {})
-    try:
-        from src.narrative_craft import NarrativeCraftEngine, Genre
-        
-        craft_engine = NarrativeCraftEngine.from_dict(craft_state) if craft_state else NarrativeCraftEngine()
-        craft_context = craft_engine.get_craft_context()
-        
-        if craft_context:
-            enhanced_system += f"\n\n<narrative_craft>\n{craft_context}\n</narrative_craft>"
-        
-        craft_engine.scenes_in_current_beat += 1
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Prose Craft System - sentence rhythm, sensory detail, dialogue craft
-    try:
-        from src.prose_craft import ProseCraftEngine
-        
-        # Get tension and emotional context for prose guidance
-        director_model = state.get("director", DirectorStateModel())
-        prose_tension = getattr(director_model, 'tension_level', 0.5)
-        emotional_state = getattr(director_model, 'tone', 'neutral')
-        
-        # Get POV character info
-        pov_character = character.name if character else "the protagonist"
-        
-        prose_engine = ProseCraftEngine()
-        prose_guidance = prose_engine.generate_comprehensive_guidance(
-            tension_level=prose_tension,
-            emotional_state=emotional_state,
-            pov_character=pov_character,
-            scene_type=getattr(director_model, 'beat_type', 'general'),
-            location_type=world.current_location if world else "generic"
-        )
-        
-        if prose_guidance:
-            enhanced_system += prose_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Prose Enhancement - sensory tracking, voice consistency, metaphors
-    prose_enhancement_state = state.get("prose_enhancement", {})
-    try:
-        from src.prose_enhancement import ProseEnhancementEngine
-        
-        prose_enhancer = ProseEnhancementEngine.from_dict(prose_enhancement_state) if prose_enhancement_state else ProseEnhancementEngine()
-        
-        # Determine active NPCs
-        active_npcs = memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
-        
-        # Get genre from narrative craft if available
-        genre = "space_opera"
-        if craft_state and "genre" in craft_state:
-            genre = craft_state["genre"]
-        
-        # Generate enhancement guidance
-        enhancement_context = prose_enhancer.get_comprehensive_guidance(
-            location=world.current_location if world else "",
-            active_npcs=active_npcs[:3],
-            genre=genre,
-            subjects=["danger", "technology", "emotion"]
-        )
-        
-        if enhancement_context:
-            enhanced_system += enhancement_context
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Narrative Systems - tension arc, dialogue, transitions, themes
-    narrative_systems_state = state.get("narrative_systems", {})
-    try:
-        from src.narrative_systems import NarrativeSystemsEngine
-        
-        narrative_systems = NarrativeSystemsEngine.from_dict(narrative_systems_state) if narrative_systems_state else NarrativeSystemsEngine()
-        
-        # Get tension from director
-        director_model = state.get("director", DirectorStateModel())
-        ns_tension = getattr(director_model, 'tension_level', 0.5)
-        
-        # Determine scene position based on session state
-        session = state.get("session", SessionState())
-        turn_count = getattr(session, 'turn_count', 0) if hasattr(session, 'turn_count') else 0
-        scene_position = "middle"  # Default
-        
-        # Is this a climactic moment?
-        is_climactic = ns_tension >= 0.8
-        
-        # Generate narrative systems guidance
-        ns_guidance = narrative_systems.get_comprehensive_guidance(
-            tension_level=ns_tension,
-            scene_position=scene_position,
-            is_climactic=is_climactic,
-            include_themes=True
-        )
-        
-        if ns_guidance:
-            enhanced_system += ns_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Character Arcs - Hero's Journey, foreshadowing, pacing, emotional beats
-    character_arcs_state = state.get("character_arcs", {})
-    try:
-        from src.character_arcs import CharacterArcEngine
-        
-        arc_engine = CharacterArcEngine.from_dict(character_arcs_state) if character_arcs_state else CharacterArcEngine()
-        
-        # Get protagonist name from character state
-        protagonist_name = character.name if character else ""
-        
-        # Generate character arc guidance
-        arc_guidance = arc_engine.get_comprehensive_guidance(
-            protagonist_name=protagonist_name,
-            detected_emotion=None,  # Could enhance with emotion detection
-            current_scene_type=None  # Could enhance with scene type detection
-        )
-        
-        if arc_guidance:
-            enhanced_system += arc_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # World Coherence - state tracking, agency validation, surprises, recaps
-    world_coherence_state = state.get("world_coherence", {})
-    try:
-        from src.world_coherence import WorldCoherenceEngine
-        
-        coherence_engine = WorldCoherenceEngine.from_dict(world_coherence_state) if world_coherence_state else WorldCoherenceEngine()
-        
-        # Determine active NPCs
-        active_npcs = memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
-        
-        # Generate world coherence guidance
-        coherence_guidance = coherence_engine.get_comprehensive_guidance(
-            location=world.current_location if world else "",
-            active_npcs=active_npcs[:3],
-            is_session_start=False,  # Could enhance with session detection
-            protagonist=character.name if character else ""
-        )
-        
-        if coherence_guidance:
-            enhanced_system += coherence_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Specialized Scenes - combat, investigation, social, exploration, horror
-    specialized_scenes_state = state.get("specialized_scenes", {})
-    try:
-        from src.specialized_scenes import SpecializedScenesEngine
-        
-        scenes_engine = SpecializedScenesEngine.from_dict(specialized_scenes_state) if specialized_scenes_state else SpecializedScenesEngine()
-        
-        # Detect scene type from context
-        scene_type = "general"
-        if getattr(world, 'combat_active', False) if world else False:
-            scene_type = "combat"
-        
-        # Get scene-specific guidance
-        scene_guidance = scenes_engine.get_scene_guidance(scene_type)
-        
-        if scene_guidance:
-            enhanced_system += f"\n\n{scene_guidance}"
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Advanced Simulation - relationships, flashbacks, consequences, time, dialogue
-    advanced_sim_state = state.get("advanced_simulation", {})
-    try:
-        from src.advanced_simulation import AdvancedSimulationEngine
-        
-        sim_engine = AdvancedSimulationEngine.from_dict(advanced_sim_state) if advanced_sim_state else AdvancedSimulationEngine()
-        
-        # Get active NPCs
-        active_npcs = memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
-        
-        # Build context for flashback triggers
-        current_context = {
-            "location": world.current_location if world else ""
-        }
-        
-        # Generate simulation guidance
-        sim_guidance = sim_engine.get_comprehensive_guidance(
-            active_npcs=active_npcs[:3],
-            player_name=character.name if character else "player",
-            current_context=current_context
-        )
-        
-        if sim_guidance:
-            enhanced_system += sim_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-
-
-    
-    # Quest and Lore - objectives, worldbuilding, NPC schedules, rumors
-    try:
-        from src.quest_lore import QuestLoreEngine
-        
-        # Use model_dump() if it's a Pydantic model (which it should be now)
-        ql_data = quest_lore_state.model_dump() if hasattr(quest_lore_state, 'model_dump') else quest_lore_state
-        ql_engine = QuestLoreEngine.from_dict(ql_data) if ql_data else QuestLoreEngine()
-        
-        # Get active NPCs
-        active_npcs = memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
-        
-        # Generate quest/lore guidance
-        ql_guidance = ql_engine.get_comprehensive_guidance(
-            current_location=world.current_location if world else "",
-            active_npcs=active_npcs[:3],
-            current_day=1  # Could enhance with time tracking
-        )
-        
-        if ql_guidance:
-            enhanced_system += ql_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Faction and Environment - politics, weather, economy, companions
-    faction_env_state = state.get("faction_environment", {})
-    try:
-        from src.faction_environment import FactionEnvironmentEngine
-        
-        fe_engine = FactionEnvironmentEngine.from_dict(faction_env_state) if faction_env_state else FactionEnvironmentEngine()
-        
-        # Get active NPCs
-        active_npcs = memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
-        
-        # Generate faction/environment guidance
-        fe_guidance = fe_engine.get_comprehensive_guidance(
-            location=world.current_location if world else "",
-            active_npcs=active_npcs[:3]
-        )
-        
-        if fe_guidance:
-            enhanced_system += fe_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Final Systems - encounters, voice consistency, memory consolidation
-    final_systems_state = state.get("final_systems", {})
-    try:
-        from src.final_systems import FinalSystemsEngine
-        
-        final_engine = FinalSystemsEngine.from_dict(final_systems_state) if final_systems_state else FinalSystemsEngine()
-        
-        # Get current tension from director if available
-        tension = 0.5
-        director_state = state.get("director", {})
-        if director_state and "tension" in director_state:
-            tension = director_state.get("tension", 0.5)
-        
-        final_guidance = final_engine.get_comprehensive_guidance(current_tension=tension)
-        
-        if final_guidance:
-            enhanced_system += final_guidance
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    
-    # Campaign Truths - inject world settings
-    campaign_truths_state = state.get("campaign_truths", {})
-
-
-
-
-
-
-
-
-
-
-    try:
-        from src.campaign_truths import CampaignTruths, create_default_campaign
-        
-        truths = CampaignTruths.from_dict(campaign_truths_state) if campaign_truths_state else create_default_campaign()
-        truths_context = truths.get_narrative_context()
-        
-        if truths_context:
-            enhanced_system += f"\n\n<world_truths>\n{truths_context}\n</world_truths>"
-        
-        # Add forbidden elements to narrator constraints
-        forbidden = truths.get_forbidden_elements()
-        if forbidden:
-            enhanced_system += f"\n\n<forbidden_by_setting>\nDo not include: {', '.join(forbidden)}\n</forbidden_by_setting>"
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # OCEAN Personality - Big Five traits for NPCs
-    if memory_state and hasattr(memory_state, 'active_npcs') and memory_state.active_npcs:
-        try:
-            from src.personality import create_personality, OCEANProfile
-            
-            npc_personalities = state.get("npc_personalities", {})
-            personality_context = ""
-            
-            for npc in memory_state.active_npcs[:3]:
-                if npc in npc_personalities:
-                    profile = OCEANProfile.from_dict(npc_personalities[npc])
-                else:
-                    # Generate random personality for new NPCs
-                    profile = create_personality("everyman")
-                    npc_personalities[npc] = profile.to_dict()
-                
-                personality_context += profile.get_narrator_context(npc) + "\n\n"
-            
-            if personality_context:
-                enhanced_system += f"\n\n<npc_personalities>\n{personality_context.strip()}\n</npc_personalities>"
-        except Exception as e:
-            logger.debug(f"System fallback: {e}")
-    
-    # Cinematography - shot selection based on emotion/action
-    try:
-        from src.personality import CinematographyDirector
-        
-        # Estimate emotional intensity from director state
-        director_model = state.get("director", DirectorStateModel())
-        tension = director_model.tension_level if hasattr(director_model, 'tension_level') else 0.5
-        
-        # Determine if this is action or dialogue
-        is_action = getattr(world, 'combat_active', False) if world else False
-        is_dialogue = any(npc in player_input.lower() for npc in (memory_state.active_npcs if memory_state else []))
-        
-        cinematographer = CinematographyDirector()
-        camera_context = cinematographer.get_narrator_context(
-            emotional_intensity=tension,
-            tactical_complexity=0.7 if is_action else 0.3,
-            is_dialogue=is_dialogue,
-            is_action=is_action,
-        )
-        enhanced_system += f"\n\n<cinematography>\n{camera_context}\n</cinematography>"
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Smart Zones - living scene context
-    smart_zone_state = state.get("smart_zones", {})
-    try:
-        from src.smart_zones import SmartZoneManager
-        
-        zone_manager = SmartZoneManager.from_dict(smart_zone_state) if smart_zone_state else None
-        if zone_manager:
-            zone_context = zone_manager.get_current_zone_context()
-            if zone_context:
-                enhanced_system += f"\n\n<living_scene>\n{zone_context}\n</living_scene>"
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    # Combat Orchestrator - Belgian AI attack grid
-    if getattr(world, 'combat_active', False) if world else False:
-        combat_state = state.get("combat_orchestrator", {})
-        try:
-            from src.combat_orchestrator import CombatOrchestrator
-            
-            orchestrator = CombatOrchestrator.from_dict(combat_state) if combat_state else None
-            if orchestrator:
-                combat_context = orchestrator.get_combat_context()
-                enhanced_system += f"\n\n<combat_orchestration>\n{combat_context}\n</combat_orchestration>"
-        except Exception as e:
-            logger.debug(f"System fallback: {e}")
-    
-    # Bark System - NPC vocalizations and evidence
-    bark_context = ""
-    bark_state = state.get("barks", {})
-    try:
-        from src.barks import BarkManager, detect_evidence, EvidenceType
-        
-        bark_manager = BarkManager.from_dict(bark_state) if bark_state else BarkManager()
-        
-        # Detect evidence from player action
-        evidence_types = detect_evidence(player_input)
-        for ev_type in evidence_types:
-            bark_manager.add_evidence(
-                ev_type,
-                location=world.current_location if world else "unknown",
-            )
-        
-        bark_context = bark_manager.get_narrator_context()
-        bark_manager.update_cooldowns()
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if bark_context:
-        enhanced_system += f"\n\n<npc_barks>\n{bark_context}\n</npc_barks>"
-    
-    # Daily Scripts - Time-based NPC activities
-    daily_context = ""
-    daily_state = state.get("daily_scripts", {})
-    try:
-        from src.daily_scripts import DailyScriptManager
-        
-        daily_manager = DailyScriptManager.from_dict(daily_state) if daily_state else None
-        if daily_manager:
-            daily_context = daily_manager.get_narrator_context()
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if daily_context:
-        enhanced_system += f"\n\n<world_time>\n{daily_context}\n</world_time>"
-    
-    # Lorebook - Keyword-activated lore retrieval
-    lore_context = ""
-    lorebook_state = state.get("lorebook", {})
-    try:
-        from src.daily_scripts import Lorebook
-        
-        lorebook = Lorebook.from_dict(lorebook_state) if lorebook_state else None
-        if lorebook:
-            lore_context = lorebook.get_context_for_input(player_input)
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if lore_context:
-        enhanced_system += f"\n\n<lorebook>\n{lore_context}\n</lorebook>"
-    
-    # Influence Maps - Tactical spatial analysis
-    if getattr(world, 'combat_active', False) if world else False:
-        tactical_context = ""
-        influence_state = state.get("influence_maps", {})
-        try:
-            from src.influence_maps import InfluenceMap, Position
-            
-            imap = InfluenceMap.from_dict(influence_state) if influence_state else None
-            if imap:
-                # Assume player at origin for text-based game
-                player_pos = Position(0, 0)
-                tactical_context = imap.get_narrator_context(player_pos)
-        except Exception as e:
-            logger.debug(f"System fallback: {e}")
-        
-        if tactical_context:
-            enhanced_system += f"\n\n<tactical_map>\n{tactical_context}\n</tactical_map>"
-    
-    if memory_context:
-        enhanced_system += f"\n\n<memory_context>\n{memory_context}\n</memory_context>"
-    
-    if voice_context:
-        enhanced_system += f"\n\n<character_voices>\n{voice_context}\n</character_voices>"
-    
-    if npc_behavior_context:
-        enhanced_system += f"\n\n<npc_behaviors>\n{npc_behavior_context}\n</npc_behaviors>"
-    
-    # Social Memory - Witcher III-style vendettas and history
-    social_context = ""
-    social_state = state.get("social_memory", {})
-    try:
-        from src.social_memory import SocialGraph
-        
-        graph = SocialGraph()
-        # Rebuild from state (simplified)
-        stored_histories = social_state.get("histories", {})
-        if stored_histories and memory_state and hasattr(memory_state, 'active_npcs'):
-            for npc in memory_state.active_npcs[:3]:
-                vendetta_context = graph.get_narrator_context(npc)
-                if vendetta_context:
-                    social_context += vendetta_context + "\n"
-                
-                history = graph.get_history(npc)
-                history_context = history.get_narrative_context()
-                if history_context:
-                    social_context += history_context + "\n"
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if social_context:
-        enhanced_system += f"\n\n<social_memory>\n{social_context.strip()}\n</social_memory>"
-    
-    
-    # Combat Prediction - warn about unfair fights
-    combat_warning_context = ""
-    if world and hasattr(world, 'combat_active') and world.combat_active:
-        try:
-            from src.combat_prediction import quick_combat_check, get_combat_warning_context
-            
-            # Estimate player vs enemy strength
-            player_count = 1  # Could be expanded for companion/party
-            player_strength = 1.0
-            enemy_count = getattr(world, 'enemy_count', 1)
-            enemy_strength = getattr(world, 'enemy_strength', 1.0)
-            
-            prediction = quick_combat_check(
-                player_strength, player_count,
-                enemy_strength, enemy_count,
-                is_ranged=True
-            )
-            combat_warning_context = get_combat_warning_context(prediction)
-        except Exception as e:
-            logger.debug(f"Combat warning fallback: {e}")
-    
-    if combat_warning_context:
-        enhanced_system += f"\n\n<combat_assessment>\n{combat_warning_context}\n</combat_assessment>"
-    
-    # Companion AI - buddy intervention context
-    companion_context = ""
-    if companion_state.active_companion and companion_state.companions:
-        try:
-            from src.companion import CompanionAI, CompanionContext, create_companion
-            
-            comp_data = companion_state.companions.get(companion_state.active_companion)
-            if not comp_data:
-                raise ValueError("Active companion data not found")
-
-            companion = create_companion(
-                comp_data.get("archetype", "soldier"),
-                comp_data.get("name", "Companion")
-            )
-            
-            ctx = CompanionContext(
-                player_health=character.health if hasattr(character, 'health') else 1.0,
-                player_in_combat=getattr(world, 'combat_active', False) if world else False,
-                threat_level=getattr(world, 'threat_level', 0.0) if world else 0.0,
-                current_scene=session.scene_number if hasattr(session, 'scene_number') else 0,
-            )
-            
-            # Check for intervention
-            intervention = companion.update(ctx)
-            if intervention:
-                companion_context = (
-                    f"[COMPANION: {intervention['companion_name']}]\n"
-                    f"Action: {intervention['action']}\n"
-                    f"Intent: {intervention['dialogue_intent']}\n"
-                    f"Style: {intervention['speech_style']}"
-                )
-                if intervention.get('signature_phrase'):
-                    companion_context += f"\nPhrase: \"{intervention['signature_phrase']}\""
-            else:
-                companion_context = companion.get_narrator_context(ctx)
-        except Exception as e:
-            logger.debug(f"System fallback: {e}")
-    
-    if companion_context:
-        enhanced_system += f"\n\n<companion>\n{companion_context}\n</companion>"
-    
-    # GOAP - complex NPC planning for key NPCs
-    goap_context = ""
-    if memory_state and hasattr(memory_state, 'active_npcs') and memory_state.active_npcs:
-        try:
-            from src.goap import plan_npc_action, get_plan_narrative
-            
-            # Only plan for first significant NPC
-            npc_name = memory_state.active_npcs[0]
-            
-            # Build current world state for GOAP
-            goap_state = {
-                "has_weapon": True,
-                "weapon_drawn": getattr(world, 'combat_active', False) if world else False,
-                "target_visible": True,
-                "target_in_range": False,
-            }
-            
-            # Target goal based on situation
-            if getattr(world, 'combat_active', False) if world else False:
-                plan = plan_npc_action(
-                    "attack_player",
-                    {"target_damaged": True},
-                    goap_state,
-                    "combat"
-                )
-                if plan:
-                    goap_context = f"[{npc_name} PLAN]\n"
-                    goap_context += "\n".join([f"- {a['description']}" for a in plan])
-        except Exception as e:
-            logger.debug(f"System fallback: {e}")
-    
-    if goap_context:
-        enhanced_system += f"\n\n<npc_plans>\n{goap_context}\n</npc_plans>"
-    
-    # TLOU-Style: Bond relationships context
-    bond_context = ""
-    emotional_state = state.get("emotional_storytelling", {})
-    try:
-        from src.emotional_storytelling import BondManager
-        
-        bond_manager = BondManager.from_dict(emotional_state) if emotional_state else BondManager()
-        bond_context = bond_manager.get_all_bonds_context()
-        
-        # Check for callback opportunity at high-tension moments
-        director_plan = state.get("director", DirectorStateModel())
-        if hasattr(director_plan, 'tension_level') and director_plan.tension_level > 0.7:
-            callback = bond_manager.get_callback_for_climax()
-            if callback:
-                bond_context += f"\n\n[CALLBACK OPPORTUNITY]\n{callback}"
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if bond_context:
-        enhanced_system += f"\n\n<character_bonds>\n{bond_context}\n</character_bonds>"
-    
-    # TLOU-Style: Theme context
-    theme_context = ""
-    theme_state = state.get("theme_tracker", {})
-    try:
-        from src.moral_dilemma import ThemeTracker
-        
-        theme = ThemeTracker.from_dict(theme_state) if theme_state else None
-        if theme:
-            theme_context = theme.get_theme_context()
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if theme_context:
-        enhanced_system += f"\n\n<campaign_theme>\n{theme_context}\n</campaign_theme>"
-    
-    # TLOU-Style: Environmental storytelling guidance
-    env_story_context = ""
-    try:
-        from src.environmental_storytelling import EnvironmentalStoryGenerator
-        
-        generator = EnvironmentalStoryGenerator()
-        env_story_context = generator.get_show_dont_tell_guidance()
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if env_story_context:
-        enhanced_system += f"\n\n<environmental_storytelling>\n{env_story_context}\n</environmental_storytelling>"
-    
-    if few_shot_context:
-        enhanced_system += f"\n\n<style_examples>\n{few_shot_context}\n</style_examples>"
-    
-    # ==========================================================================
-    # ENHANCEMENT ENGINE INTEGRATION
-    # All 13 enhancement systems unified here
-    # ==========================================================================
-    enhancement_context = ""
-    enhancement_state = state.get("enhancements", {})
-    try:
-        from src.enhancement_engine import EnhancementEngine
-        
-        enhancement_engine = EnhancementEngine.from_dict(enhancement_state) if enhancement_state else EnhancementEngine()
-        
-        # Set current scene
-        turn_count = state.get("session", SessionState()).turn_count if hasattr(state.get("session", SessionState()), 'turn_count') else 0
-        enhancement_engine.set_scene(turn_count)
-        
-        # Get active NPCs
-        active_npcs = memory_state.active_npcs if memory_state and hasattr(memory_state, 'active_npcs') else []
-        
-        # Build vow states for vow complication engine
-        vow_states = []
-        if character and hasattr(character, 'vows'):
-            for vow in character.vows:
-                vow_states.append(vow.model_dump() if hasattr(vow, 'model_dump') else vow.__dict__)
-        
-        # Build asset states for asset narrative engine
-        asset_states = []
-        if character and hasattr(character, 'assets'):
-            for asset in character.assets:
-                asset_states.append(asset.model_dump() if hasattr(asset, 'model_dump') else asset.__dict__)
-        
-        # Process turn through all enhancement systems
-        ctx = enhancement_engine.process_turn(
-            player_input=player_input,
-            location=world.current_location if world else "",
-            active_npcs=active_npcs,
-            player_name=character.name if character else "the protagonist",
-            vow_states=vow_states,
-            asset_states=asset_states,
-            is_session_start=(turn_count == 0),
+    # Context injections from every narrative system. Stages run concurrently
+    # within their time budgets and are assembled in registry order.
+    from src.config import config as game_config
+    from src.engine_registry import get_engine_registry
+    from src.narrator_pipeline import create_context_from_state, run_stages, stage_sections
+    from src.narrator_stages import NARRATOR_STAGES
+    from src.prompt_budget import PromptBudgetPacker, PromptSection, get_token_counter, order_by_stability
+    from src.prompting import PREFIX_TRACKER
+
+    session_id = ((config or {}).get("configurable") or {}).get("thread_id", "default")
+    engines = get_engine_registry(session_id)
+    stage_ctx = create_context_from_state(state)
+    stage_ctx.engines = engines
+    stage_outcomes = run_stages(stage_ctx, NARRATOR_STAGES)
+
+    skipped = [outcome.name for outcome in stage_outcomes if outcome.status == "timeout"]
+    if skipped:
+        logger.info(f"Narrator stages skipped over budget: {', '.join(skipped)}")
+
+    # Compose the enhanced system prompt within the context window, leaving
+    # room for the player prompt and the response. Sections run from most to
+    # least stable so the model can reuse the previous turn's prompt cache.
+    narrator_config = NarratorConfig()
+    counter = get_token_counter()
+    packer = PromptBudgetPacker(
+        game_config.narrative.context_window_tokens - narrator_config.max_tokens - counter.count(prompt),
+        counter=counter,
+    )
+    packed = packer.pack(order_by_stability([
+        PromptSection("system", SYSTEM_PROMPT, priority=100, min_share=1.0, volatility=0),
+        PromptSection("director_guidance", director_plan.to_prompt_injection(), priority=95, max_share=0.2),
+        *stage_sections(NARRATOR_STAGES, stage_outcomes),
+    ]))
+    enhanced_system = packed.text
+    if packed.dropped or packed.truncated:
+        logger.info(
+            f"Narrator prompt packed to {packed.tokens}/{packed.budget} tokens; "
+            f"dropped: {', '.join(packed.dropped) or 'none'}; "
+            f"truncated: {', '.join(packed.truncated) or 'none'}"
         )
-        
-        # Get narrator injection from all systems
-        enhancement_context = ctx.get_narrator_injection()
-    except Exception as e:
-        logger.debug(f"System fallback: {e}")
-    
-    if enhancement_context:
-        enhanced_system += f"\n\n{enhancement_context}"
 
     # Generate narrative with configurable backend
     from src.narrator import check_provider_availability, get_llm_provider_for_config
 
-    config = NarratorConfig()
-    provider = get_llm_provider_for_config(config)
-    available, status_message = check_provider_availability(config, provider)
+    provider = get_llm_provider_for_config(narrator_config)
+    available, status_message = check_provider_availability(narrator_config, provider)
 
     if available:
+        narrator_messages = [
+            {"role": "system", "content": enhanced_system},
+            {"role": "user", "content": prompt},
+        ]
+        reused, total = PREFIX_TRACKER.observe(session_id, narrator_messages)
+        logger.debug(f"Narrator prompt shares {reused}/{total} tokens with the previous turn")
         response = provider.chat(
-            messages=[
-                {"role": "system", "content": enhanced_system},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=config.temperature,
-            max_tokens=config.max_tokens,
+            messages=narrator_messages,
+            temperature=narrator_config.temperature,
+            max_tokens=narrator_config.max_tokens,
             stream=False,
         )
         narrative = response if isinstance(response, str) else "".join(response)
@@ -1466,6 +722,7 @@ def narrator_node(state: GameState) -> dict[str, Any]:
             turn_count=state.get("session", SessionState()).turn_count,
         ),
         "route": "approval",
+        **engines.flush(),
     }
 
 
@@ -1600,6 +857,27 @@ def world_state_manager_node(state: GameState) -> dict[str, Any]:
             # Lose momentum on miss
             character.momentum.value = max(character.momentum.value - 1, -6)
 
+    # One structured call covers the events and next director guidance (and
+    # the summary and entities when configured); the results fan out to the
+    # consumers below, which fall back to heuristics for missing sections.
+    world = state.get("world")
+    analysis = None
+    if final_narrative:
+        try:
+            from src.turn_analysis import get_turn_analyzer
+
+            director_state = state.get("director")
+            analysis = get_turn_analyzer().analyze(
+                final_narrative,
+                location=world.current_location if world else "",
+                active_npcs=getattr(memory_state, "active_npcs", []),
+                player_name=character.name if character else "the protagonist",
+                director_state=director_state.model_dump() if hasattr(director_state, "model_dump") else None,
+                last_roll=last_roll.outcome if last_roll else "",
+            )
+        except Exception as e:
+            logger.debug(f"Turn analysis fallback: {e}")
+
     # Detect significant events in the narrative for consequence engine
     new_delayed_beats = []
     narrative_lower = final_narrative.lower()
@@ -1684,9 +962,11 @@ def world_state_manager_node(state: GameState) -> dict[str, Any]:
         scene_count=consequence_state.scene_count if hasattr(consequence_state, 'scene_count') else 0,
     )
 
-    # Update memory with scene summary
-    # Simple summarization (would use LLM in production)
-    scene_summary = final_narrative[:150] + "..." if len(final_narrative) > 150 else final_narrative
+    # Update memory with scene summary, truncating when no analysis is available
+    if analysis is not None and analysis.summary:
+        scene_summary = analysis.summary
+    else:
+        scene_summary = final_narrative[:150] + "..." if len(final_narrative) > 150 else final_narrative
     
     updated_memory = MemoryStateModel(
         current_scene=final_narrative[:500],
@@ -1707,6 +987,10 @@ def world_state_manager_node(state: GameState) -> dict[str, Any]:
 
     # Auto-detect NPC names from narrative
     detected_npcs = extract_npc_names(final_narrative)
+    if analysis is not None and analysis.entities:
+        detected_npcs += [
+            e["name"] for e in analysis.entities if e["type"] == "NPC" and e["name"] not in detected_npcs
+        ]
     if detected_npcs:
         current_npcs = updated_memory.active_npcs.copy()
         for npc in detected_npcs:
@@ -1739,6 +1023,7 @@ def world_state_manager_node(state: GameState) -> dict[str, Any]:
             location=world.current_location if world else "",
             active_npcs=updated_memory.active_npcs if updated_memory else [],
             player_name=character.name if character else "the protagonist",
+            analysis=analysis,
         )
         
         # Auto-save
@@ -1815,48 +1100,32 @@ def extract_npc_names(text: str) -> list[str]:
 # LLM-Powered Event Extraction (Optional Enhancement)
 # ============================================================================
 
-def extract_events_llm(narrative: str) -> list[dict]:
+def extract_events_llm(narrative: str, analysis=None) -> list[dict]:
     """
     Use LLM to extract significant events from narrative.
-    Falls back to regex if LLM unavailable.
-    
-    Returns list of events with type, description, and priority.
-    """
-    try:
-        import ollama
-        
-        prompt = f"""Analyze this narrative and extract any significant events.
-Output ONLY valid JSON array with events, no explanation.
-
-Event types: kill, spare, betray, ally, discover, promise, threat, loss
-
-Example output:
-[{{"type": "kill", "target": "Raider Captain", "description": "Player killed enemy", "priority": 6}}]
 
-If no significant events, output: []
+    Events come from the shared turn analysis (one structured call per
+    narration); pass ``analysis`` to reuse one already produced.
 
-Narrative:
-{narrative[:1000]}"""
-
-        client = ollama.Client()
-        response = client.chat(
-            model="llama3.1",
-            messages=[{"role": "user", "content": prompt}],
-            options={"temperature": 0.3, "num_predict": 256},
-        )
-        
-        content = response.get("message", {}).get("content", "[]")
-        
-        # Parse JSON
-        import json
-        json_start = content.find("[")
-        json_end = content.rfind("]") + 1
-        if json_start >= 0 and json_end > json_start:
-            events = json.loads(content[json_start:json_end])
-            return events
+    Returns list of events with type, target, description, and priority.
+    """
+    try:
+        if analysis is None:
+            from src.turn_analysis import get_turn_analyzer
+
+            analysis = get_turn_analyzer().analyze(narrative, sections=("events",))
+        return [
+            {
+                "type": event.get("type", ""),
+                "target": (event.get("entities") or [""])[0],
+                "description": event.get("description", ""),
+                "priority": event.get("priority", 5),
+            }
+            for event in analysis.events or []
+        ]
     except Exception as e:
         logger.debug(f"System fallback: {e}")
-    
+
     return []
 
 
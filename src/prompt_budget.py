@@ -0,0 +1,221 @@
+"""
+Token-budgeted prompt assembly.
+
+Narrator prompts are stitched together from many injection sources. Each
+source becomes a ``PromptSection`` with a priority and a minimum/maximum share
+of the budget; ``PromptBudgetPacker`` fits the highest-priority content into
+the token budget, truncating or dropping the rest, and reports what it cut.
+
+Tokens are counted with ``tiktoken`` when it is installed and with
+``ApproxTokenCounter`` otherwise.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+
+from src.logging_config import get_logger
+
+logger = get_logger("prompt_budget")
+
+
+class TokenCounter(Protocol):
+    name: str
+
+    def count(self, text: str) -> int:
+        ...
+
+
+class ApproxTokenCounter:
+    """Tokenizer-free estimate of BPE token counts.
+
+    Letter runs cost one token per ``LETTERS_PER_TOKEN`` characters, digit runs
+    one per ``DIGITS_PER_TOKEN`` (BPE vocabularies group up to three digits),
+    and every punctuation mark or newline run costs one. Markup-heavy prompt
+    blocks come out slightly high, which keeps packed prompts under budget.
+    """
+
+    name = "approx"
+    LETTERS_PER_TOKEN = 6
+    DIGITS_PER_TOKEN = 3
+    _PIECE = re.compile(r"[^\W\d_]+|\d+|\n+|[^\w\s]|_")
+
+    def count(self, text: str) -> int:
+        tokens = 0
+        for match in self._PIECE.finditer(text):
+            piece = match.group()
+            if piece[0].isdigit():
+                tokens += math.ceil(len(piece) / self.DIGITS_PER_TOKEN)
+            elif piece[0].isalpha():
+                tokens += math.ceil(len(piece) / self.LETTERS_PER_TOKEN)
+            else:
+                tokens += 1
+        return tokens
+
+
+class TiktokenCounter:
+    """Exact counts from a ``tiktoken`` encoding."""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        import tiktoken
+
+        self._encoding = tiktoken.get_encoding(encoding)
+        self.name = f"tiktoken:{encoding}"
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+
+_COUNTER: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Return the shared counter: tiktoken if installed, else the approximation."""
+    global _COUNTER
+    if _COUNTER is None:
+        try:
+            _COUNTER = TiktokenCounter()
+        except Exception:
+            # tiktoken is optional; its encodings may also be unavailable offline.
+            _COUNTER = ApproxTokenCounter()
+        logger.debug(f"Prompt token counter: {_COUNTER.name}")
+    return _COUNTER
+
+
+@dataclass
+class PromptSection:
+    """One injection source competing for prompt space."""
+    name: str
+    text: str
+    priority: int = 50  # Higher is packed first
+    min_share: float = 0.0  # Fraction of the budget reserved before lower priorities
+    max_share: float = 1.0  # Fraction of the budget this section may never exceed
+    volatility: int = 2  # 0 = fixed for the campaign, 1 = changes per scene, 2 = changes every turn
+
+
+def order_by_stability(sections: list[PromptSection]) -> list[PromptSection]:
+    """Most stable sections first, keeping the given order within each tier.
+
+    Local models reuse the KV cache for a prompt prefix shared with the
+    previous turn, so volatile content belongs at the end.
+    """
+    return sorted(sections, key=lambda section: section.volatility)
+
+
+@dataclass
+class PackResult:
+    """Packed prompt text and what had to be cut to fit."""
+    text: str
+    budget: int
+    tokens: int
+    included: list[str] = field(default_factory=list)
+    truncated: dict[str, tuple[int, int]] = field(default_factory=dict)  # name -> (original, kept) tokens
+    dropped: list[str] = field(default_factory=list)
+
+
+_TAGGED_BLOCK = re.compile(r"^(\s*<([\w-]+)>\n)(.*)(\n</\2>\s*)$", re.DOTALL)
+
+
+class PromptBudgetPacker:
+    """Fit prompt sections into a token budget by priority and share.
+
+    Packing runs in two passes over sections in priority order: first each
+    section gets up to its ``min_share`` of the budget, then the remainder is
+    handed out up to each ``max_share``. Sections that do not fit whole are
+    truncated at line or word boundaries (keeping ``<tag>`` wrappers intact);
+    sections left with fewer than ``min_section_tokens`` are dropped. Packed
+    sections keep their original order.
+    """
+
+    def __init__(self, budget_tokens: int, counter: Optional[TokenCounter] = None, min_section_tokens: int = 12):
+        self.budget_tokens = max(0, budget_tokens)
+        self.counter = counter or get_token_counter()
+        self.min_section_tokens = min_section_tokens
+
+    def pack(self, sections: list[PromptSection], separator: str = "") -> PackResult:
+        budget = self.budget_tokens
+        separator_cost = self.counter.count(separator) if separator else 0
+        present = [(i, s) for i, s in enumerate(sections) if s.text]
+        sizes = {i: self.counter.count(s.text) + separator_cost for i, s in present}
+        caps = {i: min(sizes[i], int(budget * s.max_share)) for i, s in present}
+
+        ranked = sorted(present, key=lambda item: (-item[1].priority, item[0]))
+        grants = {i: 0 for i, _ in present}
+        remaining = budget
+        for i, section in ranked:
+            grant = min(caps[i], int(budget * section.min_share), remaining)
+            grants[i] = grant
+            remaining -= grant
+        for i, _ in ranked:
+            extra = min(caps[i] - grants[i], remaining)
+            grants[i] += extra
+            remaining -= extra
+
+        result = PackResult(text="", budget=budget, tokens=0)
+        pieces: list[str] = []
+        for i, section in present:
+            grant = grants[i]
+            if grant >= sizes[i]:
+                text, kept = section.text, sizes[i]
+            else:
+                text, kept = self._fit(section.text, grant - separator_cost)
+                if not text:
+                    result.dropped.append(section.name)
+                    continue
+                kept += separator_cost
+                result.truncated[section.name] = (sizes[i], kept)
+            pieces.append(text)
+            result.included.append(section.name)
+            result.tokens += kept
+
+        result.text = separator.join(pieces)
+        return result
+
+    def _fit(self, text: str, max_tokens: int) -> tuple[str, int]:
+        """Truncate until the counted total fits; returns ``("", 0)`` if too small."""
+        target = max_tokens
+        while target >= self.min_section_tokens:
+            truncated = self._truncate(text, target)
+            kept = self.counter.count(truncated)
+            if not truncated:
+                break
+            if kept <= max_tokens:
+                return truncated, kept
+            # Per-line counts are not strictly additive; shrink by the overshoot.
+            target -= kept - max_tokens
+        return "", 0
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut ``text`` to ``max_tokens`` at a line or word boundary."""
+        tagged = _TAGGED_BLOCK.match(text)
+        if tagged:
+            head, _, body, tail = tagged.groups()
+            body_budget = max_tokens - self.counter.count(head) - self.counter.count(tail)
+            return head + self._truncate_body(body, body_budget) + tail if body_budget > 0 else ""
+        return self._truncate_body(text, max_tokens)
+
+    def _truncate_body(self, text: str, max_tokens: int) -> str:
+        kept: list[str] = []
+        used = 0
+        for line in text.split("\n"):
+            cost = self.counter.count(line + "\n")
+            if used + cost <= max_tokens:
+                kept.append(line)
+                used += cost
+                continue
+            # Fill the rest with as many whole words of this line as fit.
+            words = line.split(" ")
+            low, high = 0, len(words)
+            while low < high:
+                mid = (low + high + 1) // 2
+                if used + self.counter.count(" ".join(words[:mid]) + " ...") <= max_tokens:
+                    low = mid
+                else:
+                    high = mid - 1
+            if low:
+                kept.append(" ".join(words[:low]) + " ...")
+            break
+        return "\n".join(kept)
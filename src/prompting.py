@@ -5,14 +5,20 @@ constructed so different LLM providers receive the same structure.
 """
 from __future__ import annotations
 
+import hashlib
+import os
+import threading
 import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-import socket
-from typing import Callable, Dict, List, Iterable, Optional
+from typing import Callable, Deque, Dict, List, Iterable, Optional
 
 from src.cache import PromptResultCache
+from src.config import config
 from src.feedback_learning import record_prompt_metric
 from src.llm_provider import LLMCapabilities, LLMProvider
+from src.provider_health import get_health_monitor, probe_connectivity
 
 
 SYSTEM_PROMPT = (
@@ -105,6 +111,63 @@ def _get_breaker(name: str, *, config: CircuitBreaker | None = None) -> CircuitB
     return breaker
 
 
+_FIRST_TOKEN_LATENCY: Dict[str, Deque[float]] = {}
+_FIRST_TOKEN_LOCK = threading.Lock()  # Hedged attempts record from worker threads
+
+
+def _record_first_token(provider_name: str, latency: float, window: int = 100) -> None:
+    with _FIRST_TOKEN_LOCK:
+        samples = _FIRST_TOKEN_LATENCY.get(provider_name)
+        if samples is None or samples.maxlen != window:
+            samples = deque(samples or (), maxlen=window)
+            _FIRST_TOKEN_LATENCY[provider_name] = samples
+        samples.append(latency)
+
+
+def _first_token_samples(provider_name: str) -> List[float]:
+    with _FIRST_TOKEN_LOCK:
+        return list(_FIRST_TOKEN_LATENCY.get(provider_name, ()))
+
+
+def reset_latency_history():
+    """Clear recorded first-token latencies (primarily for tests)."""
+
+    with _FIRST_TOKEN_LOCK:
+        _FIRST_TOKEN_LATENCY.clear()
+
+
+@dataclass
+class HedgePolicy:
+    """When to fire a backup provider for a primary that has not started answering.
+
+    The delay is the ``quantile`` of the primary's recent first-token
+    latencies, clamped to ``[min_delay, max_delay]``; until ``min_samples``
+    have been seen, ``default_delay`` is used.
+    """
+
+    quantile: float = 0.95
+    min_delay: float = 0.2
+    max_delay: float = 5.0
+    default_delay: float = 1.5
+    min_samples: int = 5
+    window: int = 100
+
+    def delay_for(self, provider_name: str) -> float:
+        samples = sorted(_first_token_samples(provider_name))
+        if len(samples) < self.min_samples:
+            return self.default_delay
+        index = min(len(samples) - 1, int(len(samples) * self.quantile))
+        return min(self.max_delay, max(self.min_delay, samples[index]))
+
+
+def configured_hedge_policy() -> HedgePolicy | None:
+    """The hedge policy set in ``config.llm``; None when hedging is disabled."""
+
+    if not config.llm.hedge_backend:
+        return None
+    return HedgePolicy(quantile=config.llm.hedge_quantile, default_delay=config.llm.hedge_default_delay)
+
+
 @dataclass
 class PromptContext:
     """Context for building a narration prompt."""
@@ -120,9 +183,22 @@ class PromptContext:
 
         lines: List[str] = []
 
+        # Ordered from most to least stable so consecutive turns share a
+        # longer prefix: the scene and table chat change less than the turn's
+        # intent, move outcome and oracle rolls.
         if self.scene_summary.strip():
             lines.append("[Scene]\n" + self.scene_summary.strip())
 
+        if self.prior_exchanges:
+            transcript = []
+            for exchange in self.prior_exchanges:
+                role = exchange.get("role", "user").strip() or "user"
+                content = exchange.get("content", "").strip()
+                if content:
+                    transcript.append(f"{role.capitalize()}: {content}")
+            if transcript:
+                lines.append("[Recent Table Chat]\n" + "\n".join(transcript))
+
         if self.user_intent.strip():
             lines.append("[Player Intent]\n" + self.user_intent.strip())
 
@@ -138,16 +214,6 @@ class PromptContext:
             if oracle_block:
                 lines.append("[Oracle Insights]\n" + oracle_block)
 
-        if self.prior_exchanges:
-            transcript = []
-            for exchange in self.prior_exchanges:
-                role = exchange.get("role", "user").strip() or "user"
-                content = exchange.get("content", "").strip()
-                if content:
-                    transcript.append(f"{role.capitalize()}: {content}")
-            if transcript:
-                lines.append("[Recent Table Chat]\n" + "\n".join(transcript))
-
         return "\n\n".join(lines)
 
 
@@ -160,6 +226,10 @@ def build_narrator_messages(
 ) -> List[Dict[str, str]]:
     """Create structured chat messages for any provider.
 
+    Messages run from most to least stable so a local model can reuse the
+    KV cache of the previous turn: the fixed system prompt, then the
+    append-only exchange history, then this turn's context and prompt.
+
     Args:
         user_prompt: The fresh player input or directive for the narrator.
         context: Optional narrative context payload.
@@ -170,10 +240,6 @@ def build_narrator_messages(
     context = context or PromptContext()
     messages: List[Dict[str, str]] = [{"role": "system", "content": system_prompt}]
 
-    context_block = context.formatted_context()
-    if context_block:
-        messages.append({"role": "user", "content": context_block})
-
     # Preserve any prior exchanges as explicit message history so
     # providers with distinct role handling stay aligned.
     for exchange in context.prior_exchanges:
@@ -182,6 +248,10 @@ def build_narrator_messages(
         if content:
             messages.append({"role": role, "content": content})
 
+    context_block = context.formatted_context()
+    if context_block:
+        messages.append({"role": "user", "content": context_block})
+
     if user_prompt.strip():
         messages.append({"role": "user", "content": user_prompt.strip()})
 
@@ -192,14 +262,50 @@ def build_narrator_messages(
     return messages
 
 
+class PrefixReuseTracker:
+    """Measure how much of each session's prompt repeats the previous turn.
+
+    Local runtimes such as Ollama skip prefill for the longest prefix shared
+    with the prompt they last evaluated, so the reused share is a direct
+    estimate of prefill work saved.
+    """
+
+    def __init__(self, max_sessions: int = 256, counter=None):
+        from src.prompt_budget import get_token_counter
+
+        self.max_sessions = max_sessions
+        self.counter = counter or get_token_counter()
+        self._last: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def flatten(messages: List[Dict[str, str]]) -> str:
+        return "".join(f"<|{m.get('role', 'user')}|>\n{m.get('content', '')}\n" for m in messages)
+
+    def observe(self, session_id: str, messages: List[Dict[str, str]]) -> tuple[int, int]:
+        """Record this turn's prompt; returns ``(reused_tokens, total_tokens)``."""
+        prompt = self.flatten(messages)
+        with self._lock:
+            previous = self._last.pop(session_id, "")
+            self._last[session_id] = prompt
+            while len(self._last) > self.max_sessions:
+                self._last.popitem(last=False)
+        shared = os.path.commonprefix([previous, prompt])
+        return self.counter.count(shared), self.counter.count(prompt)
+
+
+# Narrator prompts per session (see nodes.narrator_node).
+PREFIX_TRACKER = PrefixReuseTracker()
+
+
 def detect_connectivity(timeout: float = 1.5) -> bool:
-    """Return True when outbound connectivity appears available."""
+    """Probe outbound connectivity now.
 
-    try:
-        with socket.create_connection(("8.8.8.8", 53), timeout=timeout):
-            return True
-    except OSError:
-        return False
+    This blocks for up to ``timeout``; the request path reads the cached
+    result from the provider health monitor instead.
+    """
+
+    return probe_connectivity(timeout=timeout)
 
 
 def _deterministic_local_response(user_prompt: str, context: PromptContext) -> str:
@@ -212,6 +318,50 @@ def _deterministic_local_response(user_prompt: str, context: PromptContext) -> s
     )
 
 
+@dataclass
+class _Flight:
+    """One in-progress provider call that identical concurrent requests share."""
+
+    done: threading.Event = field(default_factory=threading.Event)
+    result: str | None = None
+    error: BaseException | None = None
+    followers: int = 0
+
+
+_IN_FLIGHT: Dict[str, _Flight] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+def _flight_key(
+    prompt_key: str, providers: List[LLMProvider], temperature: float, max_tokens: int, stream: bool
+) -> str:
+    """Identity of a provider call: only calls that would send the same request share a flight."""
+
+    names = ",".join(provider.name for provider in providers)
+    payload = f"{prompt_key}\n{temperature!r}\n{max_tokens}\n{stream}\n{names}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _join_flight(key: str) -> tuple[_Flight, bool]:
+    """Return the flight for ``key`` and whether the caller leads it."""
+
+    with _IN_FLIGHT_LOCK:
+        flight = _IN_FLIGHT.get(key)
+        if flight is not None:
+            flight.followers += 1
+            return flight, False
+        flight = _Flight()
+        _IN_FLIGHT[key] = flight
+        return flight, True
+
+
+def _land_flight(key: str, flight: _Flight) -> None:
+    with _IN_FLIGHT_LOCK:
+        if _IN_FLIGHT.get(key) is flight:
+            del _IN_FLIGHT[key]
+    flight.done.set()
+
+
 def execute_prompt_with_fallback(
     user_prompt: str,
     *,
@@ -225,8 +375,27 @@ def execute_prompt_with_fallback(
     breaker_config: CircuitBreaker | None = None,
     prompt_cache: PromptResultCache | None = None,
     connectivity_check: Callable[[], bool] | None = None,
+    coalesce_timeout: float | None = None,
+    hedge: HedgePolicy | None = None,
 ) -> str:
-    """Execute a prompt with retries and capability-aware fallback."""
+    """Execute a prompt with retries and capability-aware fallback.
+
+    With a ``hedge`` policy, the first two available providers are raced: if
+    the primary has not produced a first token within the policy's delay, the
+    secondary is started in parallel, the first successful answer wins and the
+    loser stops streaming.
+
+    Concurrent calls for the same prompt, context, generation settings and
+    eligible providers (see ``_flight_key``) share one provider call: the
+    first caller leads, the rest wait for its result. Whatever the leader
+    raises, including cancellation, is re-raised in every follower. A follower
+    that waits longer than ``coalesce_timeout`` seconds (default
+    ``config.llm.prompt_coalesce_timeout``) raises ``TimeoutError``; the leader
+    keeps running and still caches its result.
+
+    Connectivity comes from the cached status of the provider health monitor
+    unless ``connectivity_check`` is given; no probe runs on this path.
+    """
 
     if not providers:
         raise ValueError("At least one provider is required")
@@ -238,14 +407,228 @@ def execute_prompt_with_fallback(
         raise RuntimeError("No providers satisfy the requested capabilities")
 
     context = context or PromptContext()
-    messages = build_narrator_messages(user_prompt, context)
     cache = prompt_cache or PromptResultCache()
     cached = cache.get_prompt(user_prompt, context)
     if cached:
         record_prompt_metric("prompt_cache_hit", provider=None, metadata={"source": "prompt"})
         return cached
 
-    checker = connectivity_check or detect_connectivity
+    if coalesce_timeout is None:
+        coalesce_timeout = config.llm.prompt_coalesce_timeout
+    key = _flight_key(cache.make_key(user_prompt, context), eligible, temperature, max_tokens, stream)
+    flight, leader = _join_flight(key)
+    if not leader:
+        record_prompt_metric("prompt_coalesced", provider=None, metadata={"key": key[:12]})
+        if not flight.done.wait(coalesce_timeout):
+            record_prompt_metric("prompt_coalesce_timeout", provider=None, metadata={"key": key[:12]})
+            raise TimeoutError(f"Timed out after {coalesce_timeout}s waiting for an identical in-flight prompt")
+        if flight.error is not None:
+            raise flight.error
+        return flight.result
+
+    try:
+        flight.result = _run_prompt(
+            user_prompt,
+            context=context,
+            eligible=eligible,
+            cache=cache,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream,
+            max_retries=max_retries,
+            breaker_config=breaker_config,
+            connectivity_check=connectivity_check,
+            hedge=hedge,
+        )
+        return flight.result
+    except BaseException as exc:
+        flight.error = exc
+        raise
+    finally:
+        _land_flight(key, flight)
+
+
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="prompt-hedge")
+
+
+class _HedgedAttempt:
+    """One provider call raced in a hedge; streams so the first token is observable."""
+
+    def __init__(self, provider: LLMProvider, changed: threading.Event, window: int):
+        self.provider = provider
+        self.changed = changed
+        self.window = window
+        self.first_token = threading.Event()
+        self.done = threading.Event()
+        self.cancelled = threading.Event()
+        self.result: str | None = None
+        self.error: Exception | None = None
+        self.latency = 0.0
+        self._start = time.perf_counter()
+
+    def _mark_first_token(self) -> None:
+        if not self.first_token.is_set():
+            _record_first_token(self.provider.name, time.perf_counter() - self._start, self.window)
+            self.first_token.set()
+            self.changed.set()
+
+    def run(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> None:
+        streaming = self.provider.capabilities().supports_streaming
+        try:
+            response = self.provider.chat(
+                messages=messages, temperature=temperature, max_tokens=max_tokens, stream=streaming
+            )
+            if isinstance(response, str):
+                self._mark_first_token()
+                self.result = response
+            else:
+                parts: List[str] = []
+                for chunk in response:
+                    self._mark_first_token()
+                    if self.cancelled.is_set():
+                        # Lost the race: stop pulling tokens from the provider.
+                        getattr(response, "close", lambda: None)()
+                        break
+                    parts.append(chunk)
+                self._mark_first_token()
+                self.result = "".join(parts)
+        except Exception as exc:  # noqa: BLE001 - surfaced to the hedge coordinator
+            self.error = exc
+        finally:
+            self.latency = time.perf_counter() - self._start
+            self.done.set()
+            self.changed.set()
+
+
+def _hedged_call(
+    primary: LLMProvider,
+    secondary: LLMProvider,
+    messages: List[Dict[str, str]],
+    *,
+    temperature: float,
+    max_tokens: int,
+    policy: HedgePolicy,
+    breaker_config: CircuitBreaker | None,
+) -> tuple[str | None, Exception | None]:
+    """Race ``secondary`` against a slow ``primary``; returns (text, last_error)."""
+
+    changed = threading.Event()
+    delay = policy.delay_for(primary.name)
+    lead = _HedgedAttempt(primary, changed, policy.window)
+    attempts = [lead]
+    _HEDGE_EXECUTOR.submit(lead.run, messages, temperature, max_tokens)
+
+    deadline = time.perf_counter() + delay
+    while not (lead.first_token.is_set() or lead.done.is_set()):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        changed.wait(remaining)
+        changed.clear()
+
+    fired = False
+    if lead.first_token.is_set():
+        record_prompt_metric("hedge_not_fired", primary.name, metadata={"delay_ms": int(delay * 1000)})
+    else:
+        if not lead.done.is_set():
+            fired = True
+            record_prompt_metric(
+                "hedge_fired",
+                primary.name,
+                metadata={"secondary": secondary.name, "delay_ms": int(delay * 1000)},
+            )
+        # A primary that already failed simply hands over to the secondary.
+        attempts.append(_HedgedAttempt(secondary, changed, policy.window))
+        _HEDGE_EXECUTOR.submit(attempts[1].run, messages, temperature, max_tokens)
+
+    winner: _HedgedAttempt | None = None
+    last_error: Exception | None = None
+    pending = list(attempts)
+    while pending and winner is None:
+        if not any(a.done.is_set() for a in pending):
+            changed.wait()
+            changed.clear()
+            continue
+        for attempt in [a for a in pending if a.done.is_set()]:
+            pending.remove(attempt)
+            breaker = _get_breaker(attempt.provider.name, config=breaker_config)
+            if attempt.error is not None:
+                breaker.record_failure(attempt.latency, str(attempt.error))
+                last_error = attempt.error
+            elif winner is None:
+                breaker.record_success()
+                winner = attempt
+
+    for attempt in attempts:
+        if attempt is not winner:
+            attempt.cancelled.set()
+
+    if winner is None:
+        return None, last_error
+    if fired:
+        record_prompt_metric(
+            "hedge_win",
+            winner.provider.name,
+            metadata={
+                "role": "primary" if winner is attempts[0] else "secondary",
+                "latency_ms": int(winner.latency * 1000),
+            },
+        )
+    get_health_monitor().observe(winner.provider.name, winner.latency, success=True)
+    record_prompt_metric(
+        "provider_success", winner.provider.name, metadata={"latency_ms": int(winner.latency * 1000)}
+    )
+    return winner.result, None
+
+
+def hedged_chat(
+    primary: LLMProvider,
+    secondary: LLMProvider,
+    messages: List[Dict[str, str]],
+    *,
+    temperature: float,
+    max_tokens: int,
+    policy: HedgePolicy | None = None,
+    breaker_config: CircuitBreaker | None = None,
+) -> str:
+    """Chat with ``primary``, racing ``secondary`` if it is slow to start answering.
+
+    Raises the last provider error if both fail.
+    """
+
+    text, error = _hedged_call(
+        primary,
+        secondary,
+        messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        policy=policy or HedgePolicy(),
+        breaker_config=breaker_config,
+    )
+    if text is None:
+        raise error or RuntimeError("Hedged providers returned no response")
+    return text
+
+
+def _run_prompt(
+    user_prompt: str,
+    *,
+    context: PromptContext,
+    eligible: List[LLMProvider],
+    cache: PromptResultCache,
+    temperature: float,
+    max_tokens: int,
+    stream: bool,
+    max_retries: int,
+    breaker_config: CircuitBreaker | None,
+    connectivity_check: Callable[[], bool] | None,
+    hedge: HedgePolicy | None,
+) -> str:
+    """Connectivity check, provider attempts and local fallback for an uncached prompt."""
+
+    messages = build_narrator_messages(user_prompt, context)
+    monitor = get_health_monitor()
+    checker = connectivity_check or monitor.is_online
     if not checker():
         fallback = _deterministic_local_response(user_prompt, context)
         cache.store_prompt(user_prompt, context, fallback)
@@ -254,6 +637,24 @@ def execute_prompt_with_fallback(
 
     last_error: Exception | None = None
 
+    if hedge is not None:
+        allowed = [p for p in eligible if _get_breaker(p.name, config=breaker_config).allow_request()]
+        if len(allowed) >= 2:
+            hedged, last_error = _hedged_call(
+                allowed[0],
+                allowed[1],
+                messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                policy=hedge,
+                breaker_config=breaker_config,
+            )
+            if hedged is not None:
+                cache.store_prompt(user_prompt, context, hedged)
+                return hedged
+            # Both raced providers failed; continue with any remaining ones.
+            eligible = [p for p in eligible if p not in allowed[:2]]
+
     for provider in eligible:
         breaker = _get_breaker(provider.name, config=breaker_config)
         if not breaker.allow_request():
@@ -281,6 +682,7 @@ def execute_prompt_with_fallback(
                     break
 
                 breaker.record_success()
+                monitor.observe(provider.name, latency, success=True)
                 record_prompt_metric(
                     "provider_success",
                     provider.name,
@@ -292,6 +694,7 @@ def execute_prompt_with_fallback(
             except Exception as exc:  # noqa: PERF203 - controlled retries
                 latency = time.perf_counter() - start
                 breaker.record_failure(latency, str(exc))
+                monitor.observe(provider.name, latency, success=False, error=str(exc))
                 record_prompt_metric(
                     "provider_retry",
                     provider.name,
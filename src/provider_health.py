@@ -0,0 +1,221 @@
+"""
+Background health monitoring for LLM providers.
+
+Probing connectivity or provider availability on the request path costs up
+to a socket timeout per turn. ``ProviderHealthMonitor`` runs those probes on
+a daemon thread and publishes immutable ``ProviderHealth`` snapshots, so the
+request path only does a dictionary lookup. ``StaticHealthMonitor`` is a
+local stand-in with fixed answers for offline tests and tools.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Optional
+
+from src.logging_config import get_logger
+
+logger = get_logger("provider_health")
+
+
+@dataclass(frozen=True)
+class ProviderHealth:
+    """Last known state of one provider."""
+    name: str
+    reachable: bool
+    latency_ms: Optional[float] = None  # Smoothed latency of probes and real calls
+    breaker_open: bool = False
+    checked_at: float = 0.0
+    error: str = ""
+
+
+def probe_connectivity(host: str = "8.8.8.8", port: int = 53, timeout: float = 1.5) -> bool:
+    """Return True when an outbound TCP connection can be opened."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def _breaker_open(name: str) -> bool:
+    # Imported lazily: src.prompting reads this module on the request path.
+    from src.prompting import _CIRCUIT_BREAKERS
+
+    breaker = _CIRCUIT_BREAKERS.get(name)
+    if breaker is None or breaker.failures < breaker.max_failures:
+        return False
+    return (time.time() - breaker.last_failure_time) <= breaker.reset_timeout
+
+
+class ProviderHealthMonitor:
+    """Probe connectivity and registered providers on a background thread."""
+
+    LATENCY_SMOOTHING = 0.3
+
+    def __init__(
+        self,
+        interval: float = 15.0,
+        connectivity_probe: Callable[[], bool] | None = None,
+    ):
+        self.interval = interval
+        self._connectivity_probe = connectivity_probe or probe_connectivity
+        self._online: Optional[bool] = None
+        self._providers: Dict[str, object] = {}
+        self._status: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ProviderHealthMonitor":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="provider-health", daemon=True)
+                self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.clear()
+            self.refresh()
+            self._wake.wait(self.interval)
+
+    def refresh(self) -> None:
+        """Probe connectivity and every registered provider now."""
+        try:
+            self._online = bool(self._connectivity_probe())
+        except Exception:
+            self._online = False
+        with self._lock:
+            providers = list(self._providers.values())
+        for provider in providers:
+            self._probe_provider(provider)
+
+    def _probe_provider(self, provider) -> ProviderHealth:
+        start = time.perf_counter()
+        error = ""
+        try:
+            reachable = bool(provider.is_available())
+        except Exception as exc:
+            reachable, error = False, str(exc)
+        return self._publish(provider.name, reachable, (time.perf_counter() - start) * 1000.0, error)
+
+    def _publish(self, name: str, reachable: Optional[bool], latency_ms: float, error: str = "") -> ProviderHealth:
+        with self._lock:
+            previous = self._status.get(name)
+            if reachable is None:
+                reachable = previous.reachable if previous is not None else True
+            if previous is not None and previous.latency_ms is not None:
+                latency_ms = previous.latency_ms + self.LATENCY_SMOOTHING * (latency_ms - previous.latency_ms)
+            status = ProviderHealth(
+                name=name,
+                reachable=reachable,
+                latency_ms=round(latency_ms, 2),
+                checked_at=time.time(),
+                error=error,
+            )
+            self._status[name] = status
+            return status
+
+    def register(self, provider) -> None:
+        """Track ``provider``; it is probed on the next refresh."""
+        with self._lock:
+            if provider.name in self._providers:
+                return
+            self._providers[provider.name] = provider
+        self._wake.set()
+
+    def observe(self, name: str, latency: float, success: bool, error: str = "") -> None:
+        """Fold the outcome of a real provider call into its status.
+
+        A success proves the provider reachable; a failure only records the
+        error and leaves reachability to the probes and the circuit breaker.
+        """
+        self._publish(name, True if success else None, latency * 1000.0, error)
+
+    def is_online(self) -> bool:
+        """Cached connectivity; optimistic until the first probe completes."""
+        return True if self._online is None else self._online
+
+    def status(self, name: str) -> Optional[ProviderHealth]:
+        status = self._status.get(name)
+        if status is None:
+            return None
+        return replace(status, breaker_open=_breaker_open(name))
+
+    def provider_status(self, provider) -> ProviderHealth:
+        """Status for ``provider``, registering it on first use.
+
+        An unknown provider is probed once inline so the first turn still gets
+        a real answer; later lookups read the cached snapshot.
+        """
+        status = self.status(provider.name)
+        if status is not None:
+            return status
+        self.register(provider)
+        self._probe_provider(provider)
+        return self.status(provider.name)
+
+    def snapshot(self) -> Dict[str, ProviderHealth]:
+        with self._lock:
+            names = list(self._status)
+        return {name: self.status(name) for name in names}
+
+
+class StaticHealthMonitor(ProviderHealthMonitor):
+    """Fixed health answers with no network access or background thread."""
+
+    def __init__(self, online: bool = True, available: bool = True, latency_ms: float = 1.0):
+        super().__init__(interval=0, connectivity_probe=lambda: online)
+        self._online = online
+        self.available = available
+        self.latency_ms = latency_ms
+
+    def start(self) -> "StaticHealthMonitor":
+        return self
+
+    def _probe_provider(self, provider) -> ProviderHealth:
+        return self._publish(provider.name, self.available, self.latency_ms)
+
+    def set_available(self, name: str, reachable: bool) -> None:
+        self._publish(name, reachable, self.latency_ms)
+
+
+_MONITOR: Optional[ProviderHealthMonitor] = None
+_MONITOR_LOCK = threading.Lock()
+
+
+def get_health_monitor() -> ProviderHealthMonitor:
+    """Return the process-wide monitor, starting it on first use."""
+    global _MONITOR
+    with _MONITOR_LOCK:
+        if _MONITOR is None:
+            from src.config import config
+
+            _MONITOR = ProviderHealthMonitor(
+                interval=config.llm.health_check_interval,
+                connectivity_probe=lambda: probe_connectivity(timeout=config.llm.connectivity_timeout),
+            ).start()
+        return _MONITOR
+
+
+def set_health_monitor(monitor: Optional[ProviderHealthMonitor]) -> Optional[ProviderHealthMonitor]:
+    """Install ``monitor`` as the process-wide monitor; returns the previous one.
+
+    Passing ``None`` drops the current monitor so the next lookup starts a
+    fresh background monitor.
+    """
+    global _MONITOR
+    with _MONITOR_LOCK:
+        previous, _MONITOR = _MONITOR, monitor
+    return previous
@@ -0,0 +1,185 @@
+"""
+Execution helpers that keep the API server's event loop responsive.
+
+* ``BlockingPool``: a bounded thread pool for the synchronous sections of
+  async handlers (orchestrator hydration and serialization, director
+  analysis, voice synthesis), with queue-depth and wait-time metrics.
+  Threads rather than processes because these sections mutate the
+  session's live ``GameState`` in place.
+* ``SessionLocks``: one ``asyncio.Lock`` per session, so two turns for the
+  same session run one after the other instead of racing on its state.
+  The locks live in the worker process: they serialize turns only when a
+  session is served by a single worker (see the class docstring).
+* ``LoopLagMonitor``: samples how late the event loop wakes up from a short
+  sleep, which is the latency every other request on the worker sees.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _percentiles(samples) -> dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max_ms": round(ordered[-1], 2),
+    }
+
+
+class BlockingPool:
+    """Bounded thread pool for blocking work awaited from the event loop."""
+
+    def __init__(self, workers: int = 8, name: str = "blocking", window: int = 512):
+        self.workers = max(1, workers)
+        self.completed = 0
+        self.failed = 0
+        self.peak_queue_depth = 0
+        self._queued = 0
+        self._running = 0
+        self._waits: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=name)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the pool without blocking the loop."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self.peak_queue_depth = max(self.peak_queue_depth, self._queued)
+
+        def call() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._waits.append((started - submitted) * 1000.0)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self._executor, call)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "peak_queue_depth": self.peak_queue_depth,
+                "completed": self.completed,
+                "failed": self.failed,
+                "queue_wait": _percentiles(self._waits),
+            }
+
+
+class SessionLocks:
+    """Per-session ``asyncio.Lock`` objects, created on demand.
+
+    Locks are bound to the loop they are used on, so they are partitioned
+    per loop, and held weakly: a session nobody is waiting on costs nothing.
+
+    Single worker only: the locks are per process, so two worker processes
+    can run turns for the same session at once. The server is run as one
+    worker (``uvicorn src.server:app`` without ``--workers``). With several,
+    ``SessionStore``'s compare-and-set write-back still keeps one worker from
+    overwriting another's turn, but the turn that loses is dropped rather
+    than queued behind the other.
+    """
+
+    def __init__(self):
+        self.acquisitions = 0
+        self.contended = 0
+        self._waiting = 0
+        self._locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, weakref.WeakValueDictionary]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _lock_for(self, session_id: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        locks = self._locks.get(loop)
+        if locks is None:
+            locks = self._locks[loop] = weakref.WeakValueDictionary()
+        lock = locks.get(session_id)
+        if lock is None:
+            lock = locks[session_id] = asyncio.Lock()
+        return lock
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        """Hold ``session_id``'s lock for the duration of the block."""
+        lock = self._lock_for(session_id)
+        self.acquisitions += 1
+        if lock.locked():
+            self.contended += 1
+        self._waiting += 1
+        try:
+            await lock.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            lock.release()
+
+    def stats(self) -> dict[str, Any]:
+        return {"acquisitions": self.acquisitions, "contended": self.contended, "waiting": self._waiting}
+
+
+class LoopLagMonitor:
+    """Measure event-loop lag: how late a ``sleep(interval)`` wakes up."""
+
+    def __init__(self, interval_ms: float = 50.0, window: int = 1200):
+        self.interval_ms = interval_ms
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop (no-op if already running)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._sample())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _sample(self) -> None:
+        interval = self.interval_ms / 1000.0
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            self._samples.append(max(0.0, (time.perf_counter() - expected) * 1000.0))
+
+    def reset(self) -> None:
+        self._samples.clear()
+
+    def stats(self) -> dict[str, Any]:
+        return {"interval_ms": self.interval_ms, "samples": len(self._samples), **_percentiles(self._samples)}
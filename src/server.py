@@ -2,11 +2,21 @@
 Starforged AI Game Master - Backend Server
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from concurrent.futures import Future
+from contextlib import aclosing
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Optional, Dict, Any
+import asyncio
+import hashlib
+import json
+import re
+import time
 import uvicorn
 import os
 import sys
@@ -26,7 +36,7 @@ from src.game_state import (
     Character,
     NarrativeState
 )
-from src.narrator import generate_narrative, NarratorConfig
+from src.narrator import agenerate_narrative, agenerate_narrative_stream, NarratorConfig
 from src.image_gen import (
     generate_location_image, 
     generate_portrait, 
@@ -35,7 +45,7 @@ from src.image_gen import (
     TimeOfDay,
     WeatherCondition
 )
-from src.director import DirectorAgent
+from src.director import DirectorAgent, DirectorPlan
 from src.memory_system import MemoryPalace
 from src.relationship_system import RelationshipWeb
 from src.config import config
@@ -44,7 +54,14 @@ from src.auto_save import AutoSaveSystem
 from src.photo_album import PhotoAlbumManager
 from src.psychology_api_models import *
 from src.additional_api import register_starmap_routes, register_rumor_routes, register_audio_routes  # Added import
+from src.engine_registry import drop_engine_registry
+from src.job_queue import DONE, Job, JobQueue
 from src.lore import LoreRegistry
+from src.request_execution import BlockingPool, LoopLagMonitor, SessionLocks
+from src.session_store import SessionStore
+from src.speculation import SpeculationCache, state_fingerprint
+from src.state_delta import PayloadStats, StateVersions, etag_matches
+from src.turn_analysis import get_turn_analyzer
 
 app = FastAPI(title="Starforged AI GM")
 
@@ -57,9 +74,137 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory session store (simple dict for single user for now)
-# Key: session_id, Value: GameState
-SESSIONS: Dict[str, GameState] = {}
+# Session store: a bounded in-memory LRU over a SQLite file that every worker
+# process on this host shares. Key: session_id, Value: GameState
+SESSIONS = SessionStore(config.paths.sessions_db, max_hot=config.sessions.max_hot_sessions)
+
+
+@app.middleware("http")
+async def persist_sessions(request, call_next):
+    """Write back the sessions a request changed once its handler returns."""
+    with SESSIONS.tracking() as touched:
+        response = await call_next(request)
+        if touched:
+            await asyncio.to_thread(SESSIONS.sync, touched)
+    return response
+
+
+# Blocking sections of async handlers run on OFFLOAD; turns for one session
+# are serialized by SESSION_LOCKS (within this process: run a single worker);
+# LOOP_LAG shows whether the loop keeps up.
+OFFLOAD = BlockingPool(workers=config.sessions.offload_workers, name="handler")
+SESSION_LOCKS = SessionLocks()
+LOOP_LAG = LoopLagMonitor(interval_ms=config.sessions.loop_lag_interval_ms)
+
+# Served state is versioned by content hash (ETag); clients that send the
+# tag they hold get a JSON Patch instead of the whole state. PAYLOADS keeps
+# per-endpoint response size and serialization time.
+STATE_VERSIONS = StateVersions(
+    max_sessions=config.sessions.max_hot_sessions, history=config.sessions.state_patch_history
+)
+PAYLOADS = PayloadStats()
+
+# Media generation (scene images, voice clips, ship blueprints) runs on JOBS;
+# handlers answer with job handles. Lower priority values run first.
+JOBS = JobQueue(
+    workers=config.jobs.workers,
+    max_finished=config.jobs.max_finished,
+    name="media",
+    max_attempts=config.jobs.max_attempts,
+    retry_backoff=config.jobs.retry_backoff_seconds,
+)
+PRIORITY_VOICE = 0
+PRIORITY_SCENE_IMAGE = 1
+PRIORITY_BLUEPRINT = 2
+
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    LOOP_LAG.start()
+
+
+@app.on_event("shutdown")
+async def flush_sessions():
+    await LOOP_LAG.stop()
+    SESSIONS.sync()
+
+
+@app.get("/api/metrics/runtime")
+def runtime_metrics():
+    """Event-loop lag, offload queue depth, session lock contention, store counters and payload sizes."""
+    return {
+        "event_loop_lag": LOOP_LAG.stats(),
+        "offload": OFFLOAD.stats(),
+        "session_locks": SESSION_LOCKS.stats(),
+        "sessions": SESSIONS.stats(),
+        "speculation": SPECULATION.stats(),
+        "payloads": PAYLOADS.stats(),
+        "jobs": JOBS.stats(),
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status of a background media job, with its result once done."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/wait")
+async def wait_for_job(job_id: str, timeout: Optional[float] = None):
+    """Long-poll: answer when the job finishes or after ``timeout`` seconds, whichever is first."""
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    limit = config.jobs.wait_timeout_seconds
+    await asyncio.to_thread(job.wait, min(timeout, limit) if timeout is not None else limit)
+    return job.to_dict()
+
+
+def _state_response(
+    endpoint: str,
+    session_id: str,
+    state: GameState,
+    payload: Optional[Dict[str, Any]] = None,
+    since: Optional[str] = None,
+    if_none_match: Optional[str] = None,
+) -> Response:
+    """Serialize ``state`` as a versioned response and record its size and cost.
+
+    Without ``payload`` the body is the state itself; otherwise ``payload``
+    is returned with the state under ``state``. With ``since`` (an ETag the
+    client holds) the body carries ``state_patch`` operations instead, or
+    the full state if that version is no longer known. A matching
+    ``If-None-Match`` gives ``304 Not Modified``.
+    """
+    start = time.perf_counter()
+    snapshot = STATE_VERSIONS.snapshot(session_id, state)
+    headers = {"ETag": snapshot.etag, "X-State-Version": str(snapshot.version)}
+    patch = STATE_VERSIONS.patch_since(session_id, since) if since else None
+
+    if etag_matches(if_none_match, snapshot.etag):
+        mode, status, body = "not_modified", 304, b""
+    elif payload is None and since is None:
+        mode, status, body = "full", 200, snapshot.body
+    else:
+        out = dict(payload or {}, state_version=snapshot.version, state_etag=snapshot.etag)
+        if patch is None:
+            mode = "full"
+            out["state"] = snapshot.document
+        else:
+            mode = "delta"
+            out["state_base"] = since
+            out["state_patch"] = patch
+        status, body = 200, json.dumps(jsonable_encoder(out), separators=(",", ":")).encode("utf-8")
+
+    serialize_ms = (time.perf_counter() - start) * 1000.0
+    PAYLOADS.record(endpoint, mode, len(body), serialize_ms)
+    headers["Server-Timing"] = f"serialize;dur={serialize_ms:.2f}"
+    if status == 304:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # Mount Assets Directory
 ASSETS_DIR = Path("data/assets")
@@ -103,6 +248,7 @@ class InitRequest(BaseModel):
 class ActionRequest(BaseModel):
     session_id: str
     action: str
+    since: Optional[str] = None  # State ETag the client holds; the response then carries a patch
 
 @app.get("/")
 def health_check():
@@ -144,6 +290,12 @@ def get_lore(q: str = "", factions: str = "", locations: str = "", items: str =
     )
     return {"entries": [entry.to_dict() for entry in entries]}
 
+def _install_session(session_id: str, state: GameState) -> None:
+    """Start or replace a session's campaign, dropping live engines left from the previous one."""
+    drop_engine_registry(session_id)
+    SESSIONS[session_id] = state
+
+
 @app.post("/api/session/start")
 async def start_session(req: InitRequest):
     session_id = "default"  # Single session for MVP
@@ -226,14 +378,14 @@ async def start_session(req: InitRequest):
     
     state['relationships'].crew = {k: v.to_dict() for k, v in relationships.crew.items()}
     
-    SESSIONS[session_id] = state
+    _install_session(session_id, state)
     
     # Build personalized intro context
     asset_names = [a.name for a in state['character'].assets] if state['character'].assets else []
     asset_context = f"You are equipped with: {', '.join(asset_names)}." if asset_names else ""
     
     # Initial Narrative
-    intro_narrative = generate_narrative(
+    intro_narrative = await agenerate_narrative(
         player_input="[Begin Game]",
         character_name=req.character_name,
         location="The Forge",
@@ -254,6 +406,7 @@ async def start_session(req: InitRequest):
     
     state['narrative'].pending_narrative = intro_narrative
     state['narrative'].current_scene = "The Forge"
+    _speculate_next_turn(session_id, state)
     
     return {
         "session_id": session_id,
@@ -317,10 +470,16 @@ def get_psyche(session_id: str):
     return response
 
 @app.get("/api/state/{session_id}")
-def get_state(session_id: str):
+def get_state(session_id: str, since: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    """The session's state, with an ETag.
+
+    ``If-None-Match`` gives 304 when unchanged; ``?since=<etag>`` returns
+    ``{"state_version", "state_etag", "state_base", "state_patch"}`` with the
+    JSON Patch from that version (or ``"state"`` in full if it is unknown).
+    """
     if session_id not in SESSIONS:
         raise HTTPException(status_code=404, detail="Session not found")
-    return SESSIONS[session_id]
+    return _state_response("state", session_id, SESSIONS[session_id], since=since, if_none_match=if_none_match)
 
 @app.get("/api/npc/{npc_id}")
 async def get_npc_data(npc_id: str, session_id: str = "default"):
@@ -484,184 +643,491 @@ def slice_asset(req: SliceRequest):
             
     return {"created": sliced_files}
 
-@app.post("/api/chat")
-async def chat(req: ActionRequest):
-    if req.session_id not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    state = SESSIONS[req.session_id]
-    
-    # 0. Hydrate Orchestrator & Director
+@dataclass
+class ChatTurn:
+    """Per-turn context shared by the JSON and streaming chat endpoints."""
+
+    orchestrator: Any
+    director_plan: DirectorPlan
+    active_npcs: list
+    context: str
+
+
+@dataclass
+class PreparedTurn:
+    """The part of a chat turn that does not depend on the player's action."""
+
+    orchestrator: Any
+    director: DirectorAgent
+    director_plan: DirectorPlan
+    active_npcs: list
+    guidance: str  # Orchestrator guidance before the action-dependent tail
+
+
+def _prepare_chat_turn(state: GameState) -> PreparedTurn:
+    """Hydrate orchestrator and director and run everything that ignores the action.
+
+    Only reads ``state``, so it can run speculatively while the player types;
+    ``_begin_chat_turn`` writes the director's updates back.
+    """
     from src.narrative_orchestrator import NarrativeOrchestrator
-    
+
     # Load Orchestrator
     orchestrator_data = state.get("narrative_orchestrator", {}).get("orchestrator_data", {})
     if orchestrator_data:
         orchestrator = NarrativeOrchestrator.from_dict(orchestrator_data)
     else:
         orchestrator = NarrativeOrchestrator()
-    
+
     # Director Analysis (Psychology & Pacing)
     director = DirectorAgent()
     director.inner_voice.sync_with_profile(state['psyche'].profile)
     for k, v in state['psyche'].voice_dominance.items():
         if k in director.inner_voice.aspects:
             director.inner_voice.aspects[k].dominance = v
-            
+
     director.relationships = RelationshipWeb.from_dict(state['relationships'].dict())
-            
+
+    # Get active NPCs from world state (simple scan for now)
+    active_npcs = [npc['name'] for npc in state['world'].npcs if npc.get('location') == state['world'].current_location]
+
+    # Director guidance comes from the last narration's turn analysis: one
+    # constrained call, cached so a re-prepared turn does not ask again
+    narrative = state['narrative'].pending_narrative
+    analysis = get_turn_analyzer().analyze(
+        narrative,
+        location=state['world'].current_location,
+        active_npcs=active_npcs,
+        player_name=state['character'].name,
+        director_state=director.state.to_dict(),
+        sections=("director",),
+    )
+
     # Run analysis
     director_plan = director.analyze(
         world_state=state['world'].dict(),
-        session_history=state['narrative'].pending_narrative
+        session_history=narrative,
+        analysis=analysis,
     )
-    
+
+    # Get Orchestrator Guidance (Bonds, Pacing, World Facts, etc.)
+    guidance = orchestrator.get_base_guidance(
+        location=state['world'].current_location,
+        active_npcs=active_npcs,
+    )
+    return PreparedTurn(orchestrator, director, director_plan, active_npcs, guidance)
+
+
+def _begin_chat_turn(state: GameState, action: str, prepared: Optional[PreparedTurn] = None) -> ChatTurn:
+    """Complete a prepared turn for ``action`` (preparing it inline if needed) and build narrator context."""
+    prepared = prepared or _prepare_chat_turn(state)
+    director = prepared.director
+
     # Save back updated state
     for k, v in director.inner_voice.aspects.items():
         state['psyche'].voice_dominance[k] = v.dominance
-        
+
     state['relationships'].crew = {k: v.to_dict() for k, v in director.relationships.crew.items()}
-    
-    # 1. Generate Narrative
+
     # Inject both Director Plan and Orchestrator Guidance
-    director_injection = director_plan.to_prompt_injection()
-    
-    # Get active NPCs from world state (simple scan for now)
-    active_npcs = [npc['name'] for npc in state['world'].npcs if npc.get('location') == state['world'].current_location]
-    
-    # Get Orchestrator Guidance (Bonds, Pacing, World Facts, etc.)
-    orchestrator_guidance = orchestrator.get_comprehensive_guidance(
-        location=state['world'].current_location,
-        active_npcs=active_npcs,
-        player_action=req.action
+    director_injection = prepared.director_plan.to_prompt_injection()
+    action_guidance = prepared.orchestrator.get_action_guidance(
+        active_npcs=prepared.active_npcs,
+        player_action=action
     )
-    
+    orchestrator_guidance = f"{prepared.guidance}\\n{action_guidance}" if action_guidance else prepared.guidance
+
     context_with_director = f"{state['narrative'].pending_narrative}\\n\\n{director_injection}\\n\\n{orchestrator_guidance}"
-    
-    narrative = generate_narrative(
-        player_input=req.action,
-        character_name=state['character'].name,
-        location=state['world'].current_location,
-        context=context_with_director, 
-        config=NarratorConfig(backend="gemini"),
-        psych_profile=state['psyche'].profile
+    return ChatTurn(prepared.orchestrator, prepared.director_plan, prepared.active_npcs, context_with_director)
+
+
+# Next-turn preparation runs in the background between turns; entries are
+# keyed by a fingerprint of every state part _prepare_chat_turn reads.
+SPECULATION = SpeculationCache(max_sessions=config.narrative.speculation_max_sessions)
+
+
+def _turn_fingerprint(state: GameState) -> str:
+    return state_fingerprint(
+        state['world'],
+        state['narrative'].pending_narrative,
+        state['psyche'],
+        state['relationships'],
+        state['narrative_orchestrator'],
     )
-    
-    # Update State
+
+
+def _speculate_next_turn(session_id: str, state: GameState) -> Optional[Future]:
+    """Start preparing the session's next chat turn while the player reads and types."""
+    if not config.narrative.speculation_enabled:
+        return None
+    # Both the fingerprint and the preparation run on the speculation thread
+    return SPECULATION.schedule(session_id, lambda: _turn_fingerprint(state), lambda: _prepare_chat_turn(state))
+
+
+def _take_prepared_turn(session_id: str, state: GameState) -> Optional[PreparedTurn]:
+    """The speculated turn for ``state``, or None if there is none or the state moved on."""
+    return SPECULATION.take(session_id, _turn_fingerprint(state), timeout=config.narrative.speculation_wait_seconds)
+
+
+def _finish_chat_turn(state: GameState, turn: ChatTurn, action: str, narrative: str) -> None:
+    """Record the narrative and let the orchestrator process the interaction."""
     state['narrative'].pending_narrative = narrative
-    
-    # 2. Process Interaction in Orchestrator (Updates Bonds, Facts, Plans)
-    orchestrator.process_interaction(
-        player_input=req.action,
+
+    # Process Interaction in Orchestrator (Updates Bonds, Facts, Plans)
+    turn.orchestrator.process_interaction(
+        player_input=action,
         narrative_output=narrative,
         location=state['world'].current_location,
-        active_npcs=active_npcs
+        active_npcs=turn.active_npcs
     )
-    
+
     # Save Orchestrator State
-    state['narrative_orchestrator'].orchestrator_data = orchestrator.to_dict()
-    
-    # 3. Check for Location Change / Generate Visuals with Environmental Conditions
+    state['narrative_orchestrator'].orchestrator_data = turn.orchestrator.to_dict()
+
+
+def _roll_scene_conditions(state: GameState) -> tuple[str, str]:
+    """Pick time of day and weather for a newly visited location and apply them."""
     import random
-    
+
+    time_options = [t.value for t in TimeOfDay]
+    weather_options = [w.value for w in WeatherCondition]
+
+    # Weighted random for more common conditions
+    time_weights = [0.4, 0.2, 0.2, 0.2]  # Day, Night, Twilight, Dawn
+    weather_weights = [0.5, 0.15, 0.15, 0.1, 0.05, 0.05]  # Clear, Rain, Dust Storm, Fog, Snow, Storm
+
+    new_time = random.choices(time_options, weights=time_weights)[0]
+    new_weather = random.choices(weather_options, weights=weather_weights)[0]
+
+    # Update world state
+    state['world'].current_time = new_time
+    state['world'].current_weather = new_weather
+    return new_time, new_weather
+
+
+async def _render_scene_image(location: str, narrative: str, time_of_day: str, weather: str) -> Optional[str]:
+    """Generate the location image with environmental conditions; None if generation failed."""
+    try:
+        description = narrative[:100] if narrative else "A mysterious location in the Forge"
+        return await generate_location_image(
+            location_name=location,
+            description=description,
+            time_of_day=time_of_day,
+            weather=weather
+        )
+    except Exception as e:
+        print(f"Image generation failed: {e}")
+        return None
+
+
+def _scene_visuals(time_of_day: str, weather: str, image_url: Optional[str]) -> Dict[str, str]:
+    """A ``location_visuals`` entry."""
+    return {
+        "time": time_of_day,
+        "weather": weather,
+        "image_url": image_url or "/assets/defaults/location_placeholder.png"
+    }
+
+
+def _apply_scene_visuals(state: GameState, cached: Dict[str, str]) -> str:
+    state['world'].current_time = cached["time"]
+    state['world'].current_weather = cached["weather"]
+    return cached["image_url"]
+
+
+def _queue_scene_image(session_id: str, state: GameState, narrative: str) -> tuple[Optional[str], Optional[Job]]:
+    """The current location's scene image if known, else the job generating it.
+
+    The job returns the ``location_visuals`` entry instead of writing it;
+    once it finishes, ``_store_scene_visuals`` stores the entry holding the
+    session lock, like a handler. If the loop that submitted the job has
+    closed by then, the next turn stores it instead.
+    """
     location = state['world'].current_location
     location_visuals = state['world'].location_visuals
-    
-    # Check if we have cached visuals for this location
+
     if location not in location_visuals:
-        # Generate new environmental conditions
-        time_options = [t.value for t in TimeOfDay]
-        weather_options = [w.value for w in WeatherCondition]
-        
-        # Weighted random for more common conditions
-        time_weights = [0.4, 0.2, 0.2, 0.2]  # Day, Night, Twilight, Dawn
-        weather_weights = [0.5, 0.15, 0.15, 0.1, 0.05, 0.05]  # Clear, Rain, Dust Storm, Fog, Snow, Storm
-        
-        new_time = random.choices(time_options, weights=time_weights)[0]
-        new_weather = random.choices(weather_options, weights=weather_weights)[0]
-        
-        # Update world state
-        state['world'].current_time = new_time
-        state['world'].current_weather = new_weather
-        
-        # Generate image with environmental conditions
-        image_url = None
-        try:
-            description = narrative[:100] if narrative else "A mysterious location in the Forge"
-            image_url = await generate_location_image(
-                location_name=location,
-                description=description,
-                time_of_day=new_time,
-                weather=new_weather
+        key = f"{session_id}:{location}"
+        job = JOBS.find("scene_image", key)
+        if job is not None and job.status == DONE:
+            location_visuals[location] = job.result
+            JOBS.release(job)
+        elif job is not None and not job.finished:
+            return None, job
+        else:
+            new_time, new_weather = _roll_scene_conditions(state)
+            loop = asyncio.get_running_loop()
+
+            async def render() -> Dict[str, str]:
+                image_url = await _render_scene_image(location, narrative, new_time, new_weather)
+                return _scene_visuals(new_time, new_weather, image_url)
+
+            def stored(job: Job) -> None:
+                if not loop.is_closed():
+                    asyncio.run_coroutine_threadsafe(_store_scene_visuals(session_id, location, job), loop)
+
+            job = JOBS.submit(
+                "scene_image", key, render, priority=PRIORITY_SCENE_IMAGE, on_done=stored, hold=True
             )
-        except Exception as e:
-            print(f"Image generation failed: {e}")
-        
-        # Cache the visuals
-        location_visuals[location] = {
-            "time": new_time,
-            "weather": new_weather,
-            "image_url": image_url or "/assets/defaults/location_placeholder.png"
-        }
-    else:
-        # Use cached visuals
-        cached = location_visuals[location]
-        state['world'].current_time = cached["time"]
-        state['world'].current_weather = cached["weather"]
-        image_url = cached["image_url"]
-
-    # 4. NPC Voice Synthesis Integration
-    voice_audio = None
+            return None, job
+
+    return _apply_scene_visuals(state, location_visuals[location]), None
+
+
+async def _store_scene_visuals(session_id: str, location: str, job: Job) -> None:
+    """Store a finished scene image job's ``location_visuals`` entry in its session."""
     try:
-        # Simple extraction for now: look for "NPC Name: \"Dialogue\""
-        for npc_name in active_npcs:
-            pattern = rf"{npc_name}:\s*\"([^\"]+)\""
-            match = re.search(pattern, narrative)
-            if match:
-                dialogue = match.group(1)
-                from src.voice_generator import VoiceGenerator
-                from src.character_voice import VoiceManager
-                
-                # Get voice manager from state if exists, else create
-                v_manager_data = state.get("voice_manager")
-                if v_manager_data:
-                    v_manager = VoiceManager.from_dict(v_manager_data)
-                else:
-                    v_manager = VoiceManager()
-                
-                profile = v_manager.get_character(npc_name)
-                voice_profile = "default"
-                if profile and profile.voice_id:
-                    # If character has a specific voice_id, we'd need to update VoiceGenerator
-                    # For now, let's map to archetype profiles in VoiceGenerator
-                    # In a real app, VoiceGenerator should support dynamic IDs
-                    pass 
-                
-                # Fallback to archetype-based voice
-                generator = VoiceGenerator()
-                # Find archetype from world npcs
-                archetype = "default"
-                for w_npc in state['world'].npcs:
-                    if w_npc['name'] == npc_name:
-                        archetype = w_npc.get('archetype', 'default')
-                        break
-                
-                voice_audio = generator.generate_speech(dialogue, archetype)
-                if voice_audio:
-                    print(f"Generated voice for {npc_name}: {voice_audio}")
-                break # Only generate one voice clip per turn for now
+        if job.status == DONE:
+            async with SESSION_LOCKS.hold(session_id):
+                with SESSIONS.pinned(session_id):
+                    if session_id in SESSIONS:
+                        SESSIONS[session_id]['world'].location_visuals.setdefault(location, job.result)
+                        await OFFLOAD.run(SESSIONS.sync, [session_id])
+    finally:
+        JOBS.release(job)
+
+
+def _npc_dialogue(state: GameState, active_npcs: list, narrative: str) -> Optional[tuple[str, str, str]]:
+    """``(npc_name, dialogue, archetype)`` for the first quoted NPC line in the narrative, if any."""
+    # Simple extraction for now: look for "NPC Name: \"Dialogue\""
+    for npc_name in active_npcs:
+        match = re.search(rf"{npc_name}:\s*\"([^\"]+)\"", narrative)
+        if match:
+            # Archetype-based voice from the world's NPCs
+            archetype = "default"
+            for w_npc in state['world'].npcs:
+                if w_npc['name'] == npc_name:
+                    archetype = w_npc.get('archetype', 'default')
+                    break
+            return npc_name, match.group(1), archetype
+    return None
+
+
+def _voice_clip(dialogue: str, archetype: str) -> str:
+    from src.voice_generator import VoiceGenerator
+
+    voice_audio = VoiceGenerator().generate_speech(dialogue, archetype)
+    if not voice_audio:
+        raise RuntimeError("No audio generated")
+    return voice_audio
+
+
+def _queue_npc_voice(state: GameState, active_npcs: list, narrative: str) -> Optional[Job]:
+    """Queue a clip for the first quoted NPC line; the same line in the same voice is generated once."""
+    try:
+        line = _npc_dialogue(state, active_npcs, narrative)
     except Exception as e:
         print(f"Voice synthesis failed in chat: {e}")
+        return None
+    if line is None:
+        return None
+    _, dialogue, archetype = line
+    key = hashlib.sha1(f"{archetype}\n{dialogue}".encode("utf-8")).hexdigest()
+    return JOBS.submit("voice_clip", key, lambda: _voice_clip(dialogue, archetype), priority=PRIORITY_VOICE)
+
+
+def _job_result(name: str, job: Job) -> Optional[str]:
+    """The asset URL a finished job produced; None if it has not finished or failed."""
+    if job.status != DONE:
+        return None
+    return job.result["image_url"] if name in ("scene_image", "action_image") else job.result
+
+
+def _job_assets(ready: Dict[str, Optional[str]], **jobs: Optional[Job]) -> Dict[str, Any]:
+    """The ``assets`` of a response: ``ready`` and finished results inline, handles for the rest."""
+    assets: Dict[str, Any] = {**ready, "jobs": {}}
+    for name, job in jobs.items():
+        if job is None:
+            continue
+        if job.status == DONE:
+            assets[name] = _job_result(name, job)
+        else:
+            assets["jobs"][name] = job.handle()
+    return assets
+
+
+async def _job_events(image_url: Optional[str], scene_job: Optional[Job], voice_job: Optional[Job]) -> AsyncIterator[tuple[str, Dict[str, Any]]]:
+    """``scene_image`` and ``voice_clip`` events, each as soon as its job finishes.
+
+    Waits at most ``config.jobs.wait_timeout_seconds``; a job still running
+    then is reported with its handle so the client can keep polling it.
+    """
+    if scene_job is None:
+        yield "scene_image", {"url": image_url}
+    if voice_job is None:
+        yield "voice_clip", {"url": None}
+    names = {"scene_image": scene_job, "voice_clip": voice_job}
+    waits = {
+        asyncio.create_task(asyncio.to_thread(job.wait, config.jobs.wait_timeout_seconds)): event
+        for event, job in names.items()
+        if job is not None
+    }
+    try:
+        while waits:
+            done, _ = await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                event = waits.pop(task)
+                job = names[event]
+                yield event, {"url": _job_result(event, job), "job": job.handle()}
+    finally:
+        for task in waits:
+            task.cancel()
+
+
+def _chat_state_delta(state: GameState) -> Dict[str, Any]:
+    """The parts of the session state a chat turn can change."""
+    return jsonable_encoder({
+        "narrative": {"pending_narrative": state['narrative'].pending_narrative},
+        "world": {
+            "current_location": state['world'].current_location,
+            "current_time": state['world'].current_time,
+            "current_weather": state['world'].current_weather,
+            "location_visuals": state['world'].location_visuals,
+        },
+        "psyche": {"voice_dominance": state['psyche'].voice_dominance},
+        "relationships": {"crew": state['relationships'].crew},
+    })
 
-    return {
-        "narrative": narrative,
-        "state": state,
-        "assets": {
-            "scene_image": image_url,
-            "voice_audio": voice_audio
+
+@app.post("/api/chat")
+async def chat(req: ActionRequest):
+    if req.session_id not in SESSIONS:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async with SESSION_LOCKS.hold(req.session_id):
+        state = SESSIONS[req.session_id]
+
+        # 0. Hydrate Orchestrator & Director (usually prepared while the player typed)
+        prepared = await asyncio.to_thread(_take_prepared_turn, req.session_id, state)
+        turn = await OFFLOAD.run(_begin_chat_turn, state, req.action, prepared)
+
+        # 1. Generate Narrative
+        narrative = await agenerate_narrative(
+            player_input=req.action,
+            character_name=state['character'].name,
+            location=state['world'].current_location,
+            context=turn.context, 
+            config=NarratorConfig(backend="gemini"),
+            psych_profile=state['psyche'].profile
+        )
+
+        # 2. Update State & Orchestrator
+        await OFFLOAD.run(_finish_chat_turn, state, turn, req.action, narrative)
+
+        # 3. Scene image for a new location and NPC voice clip generate in the
+        # background; the response carries job handles for them
+        image_url, scene_job = _queue_scene_image(req.session_id, state, narrative)
+        voice_job = _queue_npc_voice(state, turn.active_npcs, narrative)
+
+        _speculate_next_turn(req.session_id, state)
+
+        payload = {
+            "narrative": narrative,
+            "assets": _job_assets(
+                {"scene_image": image_url, "voice_audio": None}, scene_image=scene_job, voice_audio=voice_job
+            )
         }
+        return await OFFLOAD.run(_state_response, "chat", req.session_id, state, payload, req.since)
+
+
+# Scene images only need the opening of the narrative, so streaming turns
+# start image generation as soon as this many characters have been released.
+SCENE_IMAGE_PREFIX_CHARS = 100
+
+
+async def _chat_events(session_id: str, action: str) -> AsyncIterator[tuple[str, Dict[str, Any]]]:
+    """Run a chat turn, yielding ``(event, payload)`` pairs as results become available.
+
+    Events, in the order they can first appear: ``director_plan``,
+    ``narrative`` (verified prose, sentence by sentence), ``state_delta``,
+    ``scene_image`` and ``voice_clip`` (whichever job finishes first) and
+    ``done``. The turn holds the session lock up to ``state_delta``; media
+    jobs run on ``JOBS`` and are waited for after it is released.
+    """
+    async with SESSION_LOCKS.hold(session_id):
+        # Streamed turns outlive the request's tracking block; keep the state hot
+        with SESSIONS.pinned(session_id):
+            state = SESSIONS[session_id]
+            prepared = await asyncio.to_thread(_take_prepared_turn, session_id, state)
+            turn = await OFFLOAD.run(_begin_chat_turn, state, action, prepared)
+            yield "director_plan", jsonable_encoder(asdict(turn.director_plan))
+
+            scene: Optional[tuple[Optional[str], Optional[Job]]] = None
+            parts: list[str] = []
+            async for sentence in agenerate_narrative_stream(
+                player_input=action,
+                character_name=state['character'].name,
+                location=state['world'].current_location,
+                context=turn.context,
+                config=NarratorConfig(backend="gemini"),
+                psych_profile=state['psyche'].profile
+            ):
+                parts.append(sentence)
+                yield "narrative", {"text": sentence}
+                if scene is None and sum(len(p) for p in parts) >= SCENE_IMAGE_PREFIX_CHARS:
+                    scene = _queue_scene_image(session_id, state, "".join(parts))
+
+            narrative = "".join(parts)
+            await OFFLOAD.run(_finish_chat_turn, state, turn, action, narrative)
+
+            image_url, scene_job = scene or _queue_scene_image(session_id, state, narrative)
+            voice_job = _queue_npc_voice(state, turn.active_npcs, narrative)
+
+            yield "state_delta", _chat_state_delta(state)
+            # Streamed turns finish after the request middleware has run.
+            await OFFLOAD.run(SESSIONS.sync, [session_id])
+            _speculate_next_turn(session_id, state)
+
+    async for event, payload in _job_events(image_url, scene_job, voice_job):
+        yield event, payload
+    yield "done", {
+        "narrative": narrative,
+        "assets": _job_assets(
+            {"scene_image": image_url, "voice_audio": None}, scene_image=scene_job, voice_audio=voice_job
+        ),
     }
 
+
+def _format_sse(event: str, payload: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(req: ActionRequest):
+    """Server-Sent Events variant of ``/api/chat``."""
+    if req.session_id not in SESSIONS:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    async def event_source():
+        # Closing the turn on disconnect releases its session lock right away
+        async with aclosing(_chat_events(req.session_id, req.action)) as events:
+            async for event, payload in events:
+                yield _format_sse(event, payload)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/api/chat/ws")
+async def chat_websocket(websocket: WebSocket):
+    """WebSocket variant of ``/api/chat``; each message is ``{session_id, action}``."""
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_json()
+            session_id = message.get("session_id", "")
+            if session_id not in SESSIONS:
+                await websocket.send_json({"event": "error", "data": {"detail": "Session not found"}})
+                continue
+            async with aclosing(_chat_events(session_id, message.get("action", ""))) as events:
+                async for event, payload in events:
+                    await websocket.send_json({"event": event, "data": payload})
+    except WebSocketDisconnect:
+        pass
+
 class RollCalculateRequest(BaseModel):
     stat: int
     adds: int = 0
@@ -678,28 +1144,8 @@ def calculate_roll_odds(req: RollCalculateRequest):
     from src.rules_engine import calculate_probability
     return calculate_probability(req.stat, req.adds)
 
-@app.post("/api/roll/commit")
-async def commit_roll(req: RollCommitRequest):
-    if req.session_id not in SESSIONS:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    state = SESSIONS[req.session_id]
-    from src.rules_engine import action_roll
-    
-    # Perform the mechanics
-    roll_result = action_roll(req.stat_val, req.adds)
-    
-    # Generate Narrative with the result
-    outcome_map = {
-        "Strong Hit": "strong_hit",
-        "Weak Hit": "weak_hit",
-        "Miss": "miss"
-    }
-    outcome_key = outcome_map[roll_result.result.value]
-    
-    # Construct input string for narrator
-    action_desc = f"Attemping {req.move_name} using {req.stat_name}..."
-
+def _begin_roll_turn(state: GameState, action_desc: str, outcome_key: str) -> ChatTurn:
+    """Hydrate orchestrator and director for a roll outcome and build narrator context."""
     # Hydrate Orchestrator
     from src.narrative_orchestrator import NarrativeOrchestrator
     orchestrator_data = state.get("narrative_orchestrator", {}).get("orchestrator_data", {})
@@ -739,53 +1185,89 @@ async def commit_roll(req: RollCommitRequest):
     )
     
     context_with_director = f"{state['narrative'].pending_narrative}\\n\\n{director_injection}\\n\\n{orchestrator_guidance}"
-    
-    narrative = generate_narrative(
-        player_input=action_desc,
-        roll_result=str(roll_result),
-        outcome=outcome_key,
-        character_name=state['character'].name,
-        location=state['world'].current_location,
-        context=context_with_director,
-        config=NarratorConfig(backend="gemini"),
-        psych_profile=state['psyche'].profile
-    )
-    
+    return ChatTurn(orchestrator, director_plan, active_npcs, context_with_director)
+
+
+def _finish_roll_turn(state: GameState, turn: ChatTurn, action_desc: str, outcome_key: str, narrative: str) -> None:
+    """Record the roll narrative and let the orchestrator process it."""
     # Update state history/pending narrative
     state['narrative'].pending_narrative = narrative
     
     # Process Interaction in Orchestrator
-    orchestrator.process_interaction(
+    turn.orchestrator.process_interaction(
         player_input=action_desc,
         narrative_output=narrative,
         location=state['world'].current_location,
-        active_npcs=active_npcs,
+        active_npcs=turn.active_npcs,
         roll_outcome=outcome_key
     )
-    state['narrative_orchestrator'].orchestrator_data = orchestrator.to_dict()
+    state['narrative_orchestrator'].orchestrator_data = turn.orchestrator.to_dict()
+
+
+@app.post("/api/roll/commit")
+async def commit_roll(req: RollCommitRequest):
+    if req.session_id not in SESSIONS:
+        raise HTTPException(status_code=404, detail="Session not found")
     
-    # Generate Visuals
-    image_url = None
-    try:
+    async with SESSION_LOCKS.hold(req.session_id):
+        state = SESSIONS[req.session_id]
+        from src.rules_engine import action_roll
+        
+        # Perform the mechanics
+        roll_result = action_roll(req.stat_val, req.adds)
+        
+        # Generate Narrative with the result
+        outcome_map = {
+            "Strong Hit": "strong_hit",
+            "Weak Hit": "weak_hit",
+            "Miss": "miss"
+        }
+        outcome_key = outcome_map[roll_result.result.value]
+        
+        # Construct input string for narrator
+        action_desc = f"Attemping {req.move_name} using {req.stat_name}..."
+
+        turn = await OFFLOAD.run(_begin_roll_turn, state, action_desc, outcome_key)
+        
+        narrative = await agenerate_narrative(
+            player_input=action_desc,
+            roll_result=str(roll_result),
+            outcome=outcome_key,
+            character_name=state['character'].name,
+            location=state['world'].current_location,
+            context=turn.context,
+            config=NarratorConfig(backend="gemini"),
+            psych_profile=state['psyche'].profile
+        )
+        
+        await OFFLOAD.run(_finish_roll_turn, state, turn, action_desc, outcome_key, narrative)
+        
+        # Generate Visuals in the background; the response carries the job handle
         image_prompt = f"Action scene: {req.move_name} in {state['world'].current_location}. Outcome: {outcome_key}. {narrative[:100]}..."
-        filename = f"action_{req.session_id}_{hash(narrative)}.png"
-        image_url = await generate_location_image(image_prompt, filename)
-    except Exception as e:
-        print(f"Image generation failed: {e}")
-    
-    return {
-        "roll": {
-            "action_score": roll_result.action_score,
-            "challenge_dice": roll_result.challenge_dice,
-            "result": roll_result.result.value,
-            "is_match": roll_result.is_match
-        },
-        "narrative": narrative,
-        "state": state,
-        "assets": {
-            "scene_image": image_url
+        filename = f"action_{req.session_id}_{hashlib.sha1(narrative.encode('utf-8')).hexdigest()[:16]}.png"
+
+        async def render_action() -> Dict[str, Optional[str]]:
+            try:
+                return {"image_url": await generate_location_image(image_prompt, filename)}
+            except Exception as e:
+                print(f"Image generation failed: {e}")
+                return {"image_url": None}
+
+        image_job = JOBS.submit("action_image", filename, render_action, priority=PRIORITY_SCENE_IMAGE)
+
+        _speculate_next_turn(req.session_id, state)
+        
+        return {
+            "roll": {
+                "action_score": roll_result.action_score,
+                "challenge_dice": roll_result.challenge_dice,
+                "result": roll_result.result.value,
+                "is_match": roll_result.is_match
+            },
+            "narrative": narrative,
+            "state": state,
+            "assets": _job_assets({}, action_image=image_job)
         }
-    }
 
 # ============================================================================
 # Psychological System API Endpoints
@@ -1240,6 +1722,7 @@ def get_difficulty_modifier(session_id: str):
 class ShipBlueprintRequest(BaseModel):
     session_id: str
     force_regenerate: bool = False
+    background: bool = False  # Answer with a job handle instead of waiting
 
 class ShipUpdateRequest(BaseModel):
     session_id: str
@@ -1267,7 +1750,23 @@ async def generate_ship_blueprint_endpoint(req: ShipBlueprintRequest):
             state_dict[k] = v.dict()
         else:
             state_dict[k] = v
-    
+
+    if req.background:
+        ship = json.dumps(jsonable_encoder(state_dict['world'].get('ship')), sort_keys=True)
+        key = hashlib.sha1(ship.encode("utf-8")).hexdigest()
+        if req.force_regenerate:
+            key += f":{time.time_ns()}"  # Never reuse a finished job
+
+        async def render() -> Dict[str, Any]:
+            result = await generate_ship_blueprint(state_dict)
+            return {
+                "blueprint": result["image_base64"],
+                "metadata": result["metadata"],
+                "from_cache": result.get("from_cache", False)
+            }
+
+        return {"job": JOBS.submit("ship_blueprint", key, render, priority=PRIORITY_BLUEPRINT).handle()}
+
     try:
         result = await generate_ship_blueprint(state_dict)
         return {
@@ -1416,7 +1915,7 @@ def load_save(slot_name: str, version: int = 0):
     
     # Restore to session
     session_id = "default"
-    SESSIONS[session_id] = state
+    _install_session(session_id, state)
     
     return {
         "success": True,
@@ -1478,7 +1977,7 @@ def quick_load():
         raise HTTPException(status_code=404, detail="No quick save found")
     
     session_id = "default"
-    SESSIONS[session_id] = state
+    _install_session(session_id, state)
     
     return {
         "success": True,
@@ -0,0 +1,364 @@
+"""
+Bounded session storage for the API server.
+
+``SessionStore`` is a drop-in ``MutableMapping`` for the server's former
+``SESSIONS`` dict. At most ``max_hot`` sessions stay in memory as live
+``GameState`` objects, least recently used first out; every session also
+lives in a SQLite table (WAL mode, so several worker processes on one host
+can share the file) as zlib-compressed JSON. Cold sessions load
+transparently on access.
+
+Handlers mutate state in place, so the store cannot see writes as they
+happen. Instead it re-encodes the sessions a request touched once the
+request ends (``tracking`` / ``sync``), and again before a session is
+evicted, and only writes those whose encoding changed. Each write bumps a
+per-session version and only applies if the stored version is still the one
+the hot copy was read at (compare-and-set). A worker that loses that race
+drops its changes and reloads the stored copy, and a worker whose hot copy
+is older than the stored version reloads it on its next access. Inside a
+``tracking`` block that version check runs once per session.
+
+Sessions a ``tracking`` block has accessed, and those held with ``pinned``,
+are not evicted until the block ends: a handler still mutating its state
+would otherwise keep changing an object the store no longer holds. The hot
+set may exceed ``max_hot`` meanwhile.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import typing
+import zlib
+from collections import Counter, OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import Enum
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from pydantic import BaseModel
+
+from src.game_state import GameState
+from src.logging_config import get_logger
+
+logger = get_logger("session_store")
+
+_FIELD_TYPES = typing.get_type_hints(GameState)
+
+
+class _Touched(set):
+    """Session ids touched by one ``tracking`` block; pinned while it is open."""
+
+    open = True
+
+
+# Session ids touched by the request being handled (see SessionStore.tracking).
+_TOUCHED: ContextVar[Optional[_Touched]] = ContextVar("session_store_touched", default=None)
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON form of values ``json`` cannot encode itself; anything else is an error."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"{type(value).__name__} in session state is not JSON serializable")
+
+
+def encode_state(state: GameState) -> bytes:
+    """Compact binary form of ``state``: zlib-compressed JSON.
+
+    Raises ``TypeError`` for values that would not round-trip, rather than
+    storing their ``str()``.
+    """
+    models = sorted(key for key, value in state.items() if isinstance(value, BaseModel))
+    body = {
+        key: value.model_dump(mode="json") if isinstance(value, BaseModel) else value
+        for key, value in state.items()
+    }
+    payload = json.dumps({"models": models, "state": body}, separators=(",", ":"), default=_encode_value)
+    return zlib.compress(payload.encode("utf-8"), 6)
+
+
+def decode_state(blob: bytes) -> GameState:
+    """Rebuild the ``GameState`` written by :func:`encode_state`."""
+    payload = json.loads(zlib.decompress(blob).decode("utf-8"))
+    state = payload["state"]
+    for key in payload["models"]:
+        state[key] = _FIELD_TYPES[key].model_validate(state[key])
+    return state
+
+
+@dataclass
+class _HotSession:
+    state: GameState
+    version: int
+    digest: str  # Hash of the encoding last written (or read)
+
+
+class SessionStore(MutableMapping):
+    """Bounded in-memory LRU of sessions over a shared SQLite cold store."""
+
+    def __init__(self, path: Path | str, max_hot: int = 128):
+        self.path = str(path)
+        self.max_hot = max(1, max_hot)
+        self.loads = 0
+        self.writes = 0
+        self.evictions = 0
+        self.conflicts = 0
+        self._hot: "OrderedDict[str, _HotSession]" = OrderedDict()
+        self._pins: Counter = Counter()
+        self._lock = threading.RLock()
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        with self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS sessions (
+                    session_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    data BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    # -- Mapping ---------------------------------------------------------------
+
+    def __getitem__(self, session_id: str) -> GameState:
+        with self._lock:
+            hot = self._hot.get(session_id)
+            if hot is not None and self._checked(session_id):
+                self._hot.move_to_end(session_id)
+            elif hot is not None and self._stored_version(session_id) in (None, hot.version):
+                self._hot.move_to_end(session_id)
+            else:
+                hot = self._load(session_id)
+            self._touch(session_id)
+            return hot.state
+
+    def __setitem__(self, session_id: str, state: GameState) -> None:
+        """Store ``state`` as the session, replacing whatever is stored."""
+        blob = encode_state(state)
+        with self._lock:
+            version = self._write(session_id, blob)
+            self._hot[session_id] = _HotSession(state, version, hashlib.sha1(blob).hexdigest())
+            self._hot.move_to_end(session_id)
+            self._touch(session_id)
+            self._trim()
+
+    def __delitem__(self, session_id: str) -> None:
+        with self._lock:
+            self._hot.pop(session_id, None)
+            with self._conn:
+                deleted = self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,)).rowcount
+            if not deleted:
+                raise KeyError(session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            if session_id in self._hot:
+                return True
+            return self._conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute("SELECT session_id FROM sessions")]
+        return iter(ids)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    # -- Write-back ------------------------------------------------------------
+
+    @contextmanager
+    def tracking(self) -> Iterator[set]:
+        """Collect the ids of sessions accessed inside the block (and its tasks).
+
+        Those sessions stay pinned in memory until the block ends.
+        """
+        touched = _Touched()
+        token = _TOUCHED.set(touched)
+        try:
+            yield touched
+        finally:
+            _TOUCHED.reset(token)
+            with self._lock:
+                touched.open = False
+                self._unpin(touched)
+
+    @contextmanager
+    def pinned(self, session_id: str) -> Iterator[None]:
+        """Keep ``session_id`` from being evicted for the duration of the block."""
+        with self._lock:
+            self._pins[session_id] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._unpin([session_id])
+
+    def sync(self, session_ids: Optional[Iterable[str]] = None) -> int:
+        """Write back hot sessions (all of them by default) whose state changed.
+
+        Returns the number of sessions written.
+        """
+        written = 0
+        with self._lock:
+            ids = list(self._hot) if session_ids is None else [sid for sid in session_ids if sid in self._hot]
+            for session_id in ids:
+                written += self._sync_entry(session_id, self._hot[session_id])
+        return written
+
+    def hot_sessions(self) -> list[str]:
+        with self._lock:
+            return list(self._hot)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "hot": len(self._hot),
+            "max_hot": self.max_hot,
+            "pinned": len(self._pins),
+            "loads": self.loads,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "conflicts": self.conflicts,
+        }
+
+    def close(self) -> None:
+        self.sync()
+        with self._lock:
+            self._conn.close()
+
+    # -- Internals -------------------------------------------------------------
+
+    def _touch(self, session_id: str) -> None:
+        touched = _TOUCHED.get()
+        if touched is not None and session_id not in touched:
+            touched.add(session_id)
+            if touched.open:
+                self._pins[session_id] += 1
+
+    def _unpin(self, session_ids: Iterable[str]) -> None:
+        for session_id in session_ids:
+            self._pins[session_id] -= 1
+            if self._pins[session_id] <= 0:
+                del self._pins[session_id]
+
+    def _checked(self, session_id: str) -> bool:
+        """Whether this request already compared the hot copy with the stored version."""
+        touched = _TOUCHED.get()
+        return touched is not None and session_id in touched
+
+    def _stored_version(self, session_id: str) -> Optional[int]:
+        row = self._conn.execute(
+            "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _load(self, session_id: str) -> _HotSession:
+        row = self._conn.execute(
+            "SELECT version, data FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            self._hot.pop(session_id, None)
+            raise KeyError(session_id)
+        version, blob = row
+        hot = _HotSession(decode_state(blob), version, hashlib.sha1(blob).hexdigest())
+        self.loads += 1
+        self._hot[session_id] = hot
+        self._hot.move_to_end(session_id)
+        self._trim()
+        return hot
+
+    def _write(self, session_id: str, blob: bytes) -> int:
+        """Insert or overwrite the stored session unconditionally."""
+        with self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO sessions (session_id, version, data, updated_at) VALUES (?, 1, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    version = version + 1,
+                    data = excluded.data,
+                    updated_at = excluded.updated_at
+                """,
+                (session_id, blob, time.time()),
+            )
+            version = self._conn.execute(
+                "SELECT version FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()[0]
+        self.writes += 1
+        return version
+
+    def _write_if_version(self, session_id: str, blob: bytes, expected: int) -> Optional[int]:
+        """Write ``blob`` only if the stored version is still ``expected``.
+
+        Returns the new version, or None if another writer got there first.
+        """
+        with self._conn:
+            updated = self._conn.execute(
+                """
+                UPDATE sessions SET version = version + 1, data = ?, updated_at = ?
+                WHERE session_id = ? AND version = ?
+                """,
+                (blob, time.time(), session_id, expected),
+            ).rowcount
+            if not updated:
+                # Deleted since it was read: store it again, unless it was re-created meanwhile
+                updated = self._conn.execute(
+                    """
+                    INSERT INTO sessions (session_id, version, data, updated_at) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(session_id) DO NOTHING
+                    """,
+                    (session_id, expected + 1, blob, time.time()),
+                ).rowcount
+        if not updated:
+            return None
+        self.writes += 1
+        return expected + 1
+
+    def _sync_entry(self, session_id: str, hot: _HotSession) -> int:
+        try:
+            blob = encode_state(hot.state)
+        except Exception as e:
+            logger.error(f"Could not encode session {session_id}; its changes are not stored: {e}")
+            return 0
+        digest = hashlib.sha1(blob).hexdigest()
+        if digest == hot.digest:
+            return 0
+        version = self._write_if_version(session_id, blob, hot.version)
+        if version is None:
+            self.conflicts += 1
+            logger.warning(
+                f"Session {session_id} was changed by another worker since version {hot.version}; "
+                "dropping this worker's changes and reloading"
+            )
+            if self._hot.get(session_id) is hot:
+                self._load(session_id)
+            return 0
+        hot.version = version
+        hot.digest = digest
+        return 1
+
+    def _trim(self) -> None:
+        excess = len(self._hot) - self.max_hot
+        if excess <= 0:
+            return
+        # The newest entry is the one being accessed right now
+        evictable = [session_id for session_id in list(self._hot)[:-1] if session_id not in self._pins]
+        for session_id in evictable[:excess]:
+            self._sync_entry(session_id, self._hot.pop(session_id))
+            self.evictions += 1
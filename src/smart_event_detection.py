@@ -351,13 +351,15 @@ If no significant events, output: []'''
         narrative: str,
         location: str = "",
         active_npcs: List[str] = None,
-        player_name: str = "the protagonist"
+        player_name: str = "the protagonist",
+        analysis=None,
     ) -> List[DetectedEvent]:
         """
         Detect significant events in the narrative.
 
         Uses quick keyword filtering first, then LLM for deeper analysis.
-        Falls back to keyword-only detection if LLM unavailable.
+        Falls back to keyword-only detection if LLM unavailable. Pass the
+        turn's ``TurnAnalysis`` to reuse its events instead of a separate call.
         """
         active_npcs = active_npcs or []
 
@@ -369,7 +371,10 @@ If no significant events, output: []'''
 
         # Try LLM-based detection for richer analysis
         if self.use_llm:
-            llm_events = self._llm_detect(narrative, location, active_npcs, player_name)
+            if analysis is not None and analysis.events is not None:
+                llm_events = self._events_from_raw(analysis.events, location)
+            else:
+                llm_events = self._llm_detect(narrative, location, active_npcs, player_name)
             if llm_events:
                 self._event_history.extend(llm_events)
                 return llm_events
@@ -427,8 +432,6 @@ If no significant events, output: []'''
 
     def _parse_llm_response(self, response: str, location: str) -> List[DetectedEvent]:
         """Parse LLM JSON response into DetectedEvent objects."""
-        events = []
-
         # Find JSON array in response
         json_start = response.find("[")
         json_end = response.rfind("]") + 1
@@ -437,26 +440,28 @@ If no significant events, output: []'''
             return []
 
         try:
-            raw_events = json.loads(response[json_start:json_end])
-
-            for raw in raw_events:
-                try:
-                    event_type = EventType(raw.get("type", "discover"))
-                except ValueError:
-                    continue
-
-                events.append(DetectedEvent(
-                    event_type=event_type,
-                    description=raw.get("description", ""),
-                    entities=raw.get("entities", []),
-                    location=location,
-                    severity=float(raw.get("severity", 0.5)),
-                    witnesses=raw.get("witnesses", []),
-                    priority=int(raw.get("priority", 5)),
-                ))
+            return self._events_from_raw(json.loads(response[json_start:json_end]), location)
         except json.JSONDecodeError:
-            pass
+            return []
+
+    def _events_from_raw(self, raw_events: List[Dict[str, Any]], location: str) -> List[DetectedEvent]:
+        """Build DetectedEvent objects from parsed event dicts, skipping unknown types."""
+        events = []
+        for raw in raw_events:
+            try:
+                event_type = EventType(raw.get("type", "discover"))
+            except ValueError:
+                continue
 
+            events.append(DetectedEvent(
+                event_type=event_type,
+                description=raw.get("description", ""),
+                entities=raw.get("entities", []),
+                location=location,
+                severity=float(raw.get("severity", 0.5)),
+                witnesses=raw.get("witnesses", []),
+                priority=int(raw.get("priority", 5)),
+            ))
         return events
 
     def _keyword_detect(
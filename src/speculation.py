@@ -0,0 +1,162 @@
+"""
+Speculative preparation of the next turn.
+
+Most of a chat turn's context does not depend on what the player types:
+director analysis and orchestrator guidance only read the session state.
+``SpeculationCache`` computes that part on a background thread while the
+player reads and types, keyed by a fingerprint of the state it read. On
+submit the caller takes the prepared result if the fingerprint still
+matches (waiting briefly for it if it is already running) and only the
+input-dependent tail is left to compute; any state change in between makes
+the entry stale and the turn is prepared inline as before. An entry still
+queued behind other sessions' speculations is dropped rather than waited on.
+
+The fingerprint can be passed as a callable, in which case it is computed on
+the speculation thread right before the preparation, not by the caller.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, Union
+
+from src.logging_config import get_logger
+
+logger = get_logger("speculation")
+
+
+def _jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    return str(value)
+
+
+def state_fingerprint(*parts: Any) -> str:
+    """Stable hash of the state parts a speculative computation reads."""
+    payload = json.dumps(parts, sort_keys=True, default=_jsonable)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class _Speculation:
+    fingerprint: Future  # Resolves to the fingerprint the preparation read
+    future: Future
+    started_at: float
+
+
+def _resolved(value: Any) -> Future:
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+class SpeculationCache:
+    """Per-session slot for one speculatively prepared turn."""
+
+    def __init__(self, max_sessions: int = 64, workers: int = 2):
+        self.max_sessions = max_sessions
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self._entries: "OrderedDict[str, _Speculation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speculation")
+
+    def schedule(
+        self, session_id: str, fingerprint: Union[str, Callable[[], str]], prepare: Callable[[], Any]
+    ) -> Future:
+        """Start ``prepare`` in the background, replacing the session's previous entry.
+
+        A callable ``fingerprint`` is computed on the background thread,
+        just before ``prepare``.
+        """
+        if callable(fingerprint):
+            fingerprinted: Future = Future()
+            compute = fingerprint
+
+            def run() -> Any:
+                try:
+                    fingerprinted.set_result(compute())
+                except Exception as e:
+                    fingerprinted.set_exception(e)
+                    raise
+                return prepare()
+        else:
+            fingerprinted, run = _resolved(fingerprint), prepare
+        with self._lock:
+            current = self._entries.get(session_id)
+            if (
+                current is not None
+                and not callable(fingerprint)
+                and current.fingerprint.done()
+                and not current.fingerprint.exception()
+                and current.fingerprint.result() == fingerprint
+            ):
+                return current.future
+            future = self._executor.submit(run)
+            self._entries[session_id] = _Speculation(fingerprinted, future, time.perf_counter())
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_sessions:
+                self._entries.popitem(last=False)
+            return future
+
+    def take(self, session_id: str, fingerprint: str, timeout: Optional[float] = None) -> Optional[Any]:
+        """Pop the session's prepared result if it was computed from ``fingerprint``.
+
+        A computation that has not started yet is cancelled, since preparing
+        inline is faster than queueing behind other sessions; one already
+        running is waited on for up to ``timeout`` seconds, which should be
+        about what preparing inline costs. Returns ``None`` on a miss, a
+        stale entry or a failure.
+        """
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.future.cancel():
+            logger.debug(f"Speculative turn for {session_id} still queued; preparing inline")
+            self.misses += 1
+            return None
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            if entry.fingerprint.result(timeout=timeout) != fingerprint:
+                self.stale += 1
+                entry.future.cancel()
+                return None
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            result = entry.future.result(timeout=remaining)
+        except FutureTimeoutError:
+            logger.debug(f"Speculative turn for {session_id} still running; preparing inline")
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.debug(f"Speculative turn for {session_id} failed: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def invalidate(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            entry.future.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses + self.stale
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "pending": len(self._entries),
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,204 @@
+"""
+Versioned session state for the API: strong ETags and JSON-Patch deltas.
+
+Each time a session's state is served, ``StateVersions.snapshot`` encodes it
+once as canonical JSON. Its hash is a strong ETag, so identical content gets
+the same tag on any worker. When the content changed since the last
+snapshot, the session's version advances and the RFC 6902 patch from the
+previous document is kept in a short history. A client that sends the tag
+it last saw then gets only the operations since that tag
+(``patch_since``), or the full document if the tag is too old or unknown
+to this worker.
+
+``PayloadStats`` records response size and serialization time per endpoint.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+
+def _escape(key: str) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def diff(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """JSON Patch operations turning ``old`` into ``new``.
+
+    Objects are compared key by key. A list that only grew at the end (chat
+    messages, narrative history), or a window that dropped items at the
+    front as it grew (short-term memories), becomes ``remove`` operations at
+    the front and ``add`` operations for the new items. Any other changed
+    list is replaced whole.
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: list[dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(diff(old[key], value, child))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        dropped = _dropped_front(old, new)
+        if dropped is not None:
+            kept = len(old) - dropped
+            return [{"op": "remove", "path": f"{path}/0"} for _ in range(dropped)] + [
+                {"op": "add", "path": f"{path}/-", "value": value} for value in new[kept:]
+            ]
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def _dropped_front(old: list, new: list) -> Optional[int]:
+    """How many leading items of ``old`` to drop so the rest prefixes ``new``, if any."""
+    for dropped in range(len(old)):
+        kept = len(old) - dropped
+        if kept <= len(new) and kept > dropped and old[dropped] == new[0] and old[dropped:] == new[:kept]:
+            return dropped
+    if not old and new:
+        return 0
+    return None
+
+
+def apply_patch(document: Any, ops: list[dict[str, Any]]) -> Any:
+    """Apply ``ops`` (as produced by :func:`diff`) to a copy of ``document``."""
+    document = json.loads(json.dumps(document))
+    for op in ops:
+        if op["path"] == "":
+            document = op["value"]
+            continue
+        *parents, last = [_unescape(token) for token in op["path"].split("/")[1:]]
+        target = document
+        for token in parents:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+        if isinstance(target, list):
+            if op["op"] == "add":
+                target.append(op["value"]) if last == "-" else target.insert(int(last), op["value"])
+            elif op["op"] == "remove":
+                del target[int(last)]
+            else:
+                target[int(last)] = op["value"]
+        elif op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = op["value"]
+    return document
+
+
+@dataclass
+class StateSnapshot:
+    version: int
+    etag: str
+    document: Any
+    body: bytes  # Canonical JSON of ``document``
+
+
+@dataclass
+class _SessionVersions:
+    snapshot: StateSnapshot
+    # (etag before, patch to the next version), oldest first
+    history: deque = field(default_factory=deque)
+
+
+class StateVersions:
+    """Per-session state versions with a short history of patches."""
+
+    def __init__(self, max_sessions: int = 128, history: int = 16):
+        self.max_sessions = max_sessions
+        self.history = history
+        self._sessions: "OrderedDict[str, _SessionVersions]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def encode(state: Any) -> tuple[Any, bytes, str]:
+        document = jsonable_encoder(state)
+        body = json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        return document, body, f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+    def snapshot(self, session_id: str, state: Any) -> StateSnapshot:
+        """Encode ``state`` and advance the session's version if it changed."""
+        document, body, etag = self.encode(state)
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                entry = _SessionVersions(StateSnapshot(1, etag, document, body), deque(maxlen=self.history))
+                self._sessions[session_id] = entry
+            elif entry.snapshot.etag != etag:
+                previous = entry.snapshot
+                entry.history.append((previous.etag, diff(previous.document, document)))
+                entry.snapshot = StateSnapshot(previous.version + 1, etag, document, body)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return entry.snapshot
+
+    def patch_since(self, session_id: str, etag: str) -> Optional[list[dict[str, Any]]]:
+        """Operations from the version tagged ``etag`` to the latest, or ``None`` if unknown."""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            if etag == entry.snapshot.etag:
+                return []
+            history = list(entry.history)
+        for index, (before, _) in enumerate(history):
+            if before == etag:
+                return [op for _, patch in history[index:] for op in patch]
+        return None
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Strong comparison of an ``If-None-Match`` header against ``etag``."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class PayloadStats:
+    """Response size and serialization time, per endpoint and mode."""
+
+    def __init__(self, window: int = 256):
+        self._window = window
+        self._endpoints: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, mode: str, nbytes: int, serialize_ms: float) -> None:
+        with self._lock:
+            stats = self._endpoints.setdefault(
+                endpoint, {"modes": {}, "bytes": deque(maxlen=self._window), "ms": deque(maxlen=self._window)}
+            )
+            stats["modes"][mode] = stats["modes"].get(mode, 0) + 1
+            stats["bytes"].append(nbytes)
+            stats["ms"].append(serialize_ms)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                endpoint: {
+                    "responses": dict(stats["modes"]),
+                    "mean_bytes": round(sum(stats["bytes"]) / len(stats["bytes"])),
+                    "max_bytes": max(stats["bytes"]),
+                    "mean_serialize_ms": round(sum(stats["ms"]) / len(stats["ms"]), 3),
+                    "max_serialize_ms": round(max(stats["ms"]), 3),
+                }
+                for endpoint, stats in self._endpoints.items()
+            }
+
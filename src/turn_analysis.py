@@ -0,0 +1,327 @@
+"""
+Per-turn side analyses in one structured LLM call.
+
+After each narration the game wants consequence-worthy events and fresh
+director guidance, and optionally a model-written scene summary and the
+named entities (``config.narrative.turn_analysis_sections``; otherwise
+those come from heuristics). Asking for each one separately pays request
+overhead and prompt prefill once per section, one call after another.
+``TurnAnalyzer`` asks for all of them in a single JSON-schema constrained
+request and hands the parsed ``TurnAnalysis`` to every consumer. Sections the
+merged reply leaves missing or malformed are re-requested on their own,
+concurrently. Analyses are cached by narrative so consumers later in the
+turn (or the next director pass) reuse them instead of asking again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from src.config import config
+from src.logging_config import get_logger
+from src.smart_event_detection import EventType
+
+logger = get_logger("turn_analysis")
+
+SECTIONS = ("summary", "entities", "events", "director")
+DEFAULT_SECTIONS = ("events", "director")
+# Output budget of each section; a request gets the sum for the sections it asks for
+SECTION_MAX_TOKENS = {"summary": 150, "entities": 250, "events": 300, "director": 250}
+ENTITY_TYPES = ["NPC", "LOCATION", "ITEM", "FACTION"]
+PACING_VALUES = ["slow", "standard", "fast"]  # director.Pacing
+TONE_VALUES = ["ominous", "tense", "melancholic", "hopeful", "triumphant", "mysterious"]  # director.Tone
+
+SECTION_SCHEMAS: dict[str, dict[str, Any]] = {
+    "summary": {"type": "string"},
+    "entities": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": ENTITY_TYPES},
+                "name": {"type": "string"},
+                "description": {"type": "string"},
+            },
+            "required": ["type", "name", "description"],
+        },
+    },
+    "events": {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {
+                "type": {"type": "string", "enum": [event_type.value for event_type in EventType]},
+                "description": {"type": "string"},
+                "entities": {"type": "array", "items": {"type": "string"}},
+                "severity": {"type": "number"},
+                "witnesses": {"type": "array", "items": {"type": "string"}},
+                "priority": {"type": "integer"},
+            },
+            "required": ["type", "description", "entities", "severity", "priority"],
+        },
+    },
+    "director": {
+        "type": "object",
+        "properties": {
+            "pacing": {"type": "string", "enum": PACING_VALUES},
+            "tone": {"type": "string", "enum": TONE_VALUES},
+            "beats": {"type": "array", "items": {"type": "string"}},
+            "notes_for_narrator": {"type": "string"},
+        },
+        "required": ["pacing", "tone", "beats", "notes_for_narrator"],
+    },
+}
+
+SECTION_INSTRUCTIONS = {
+    "summary": "summary: the scene in 2-3 sentences. Key events, decisions made, and consequences.",
+    "entities": "entities: every explicitly named NPC, LOCATION, ITEM or FACTION with a brief description from context.",
+    "events": (
+        "events: significant events that should have future consequences (violence, social changes, "
+        "discoveries, resource changes, oaths and sacrifices). severity is 0.0-1.0, priority 1-10. "
+        "Use [] if nothing significant happened."
+    ),
+    "director": (
+        "director: hidden guidance for the next scene. Pick pacing and tone, 1-3 dramatic beats tied to "
+        "the vows, NPCs and world (one threatening something the player cares about, one offering an "
+        "unexpected opportunity), and short notes for the narrator."
+    ),
+}
+
+TURN_ANALYSIS_SYSTEM_PROMPT = (
+    "You analyze one scene of a Starforged-style science fiction RPG for the game's bookkeeping. "
+    "Answer only with the requested JSON fields."
+)
+
+
+def turn_analysis_schema(sections: tuple[str, ...] = SECTIONS) -> dict[str, Any]:
+    """JSON schema for a reply holding ``sections``."""
+    return {
+        "type": "object",
+        "properties": {name: SECTION_SCHEMAS[name] for name in sections},
+        "required": list(sections),
+    }
+
+
+@dataclass
+class TurnAnalysis:
+    """Side analyses of one narration; ``None`` marks a section not produced."""
+    summary: Optional[str] = None
+    entities: Optional[list[dict]] = None
+    events: Optional[list[dict]] = None
+    director: Optional[dict] = None
+    calls: int = 0  # Provider requests spent producing this analysis
+
+    def has(self, section: str) -> bool:
+        return getattr(self, section) is not None
+
+    def merge(self, other: "TurnAnalysis") -> None:
+        for name in SECTIONS:
+            if not self.has(name) and other.has(name):
+                setattr(self, name, getattr(other, name))
+        self.calls += other.calls
+
+
+def _validate_summary(value: Any) -> Optional[str]:
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _validate_entities(value: Any) -> Optional[list[dict]]:
+    if not isinstance(value, list):
+        return None
+    return [
+        {
+            "type": str(item.get("type", "NPC")).upper(),
+            "name": item["name"].strip(),
+            "description": str(item.get("description", "")),
+        }
+        for item in value
+        if isinstance(item, dict) and isinstance(item.get("name"), str) and item["name"].strip()
+    ]
+
+
+def _validate_events(value: Any) -> Optional[list[dict]]:
+    if not isinstance(value, list):
+        return None
+    return [item for item in value if isinstance(item, dict) and isinstance(item.get("type"), str)]
+
+
+def _validate_director(value: Any) -> Optional[dict]:
+    if not isinstance(value, dict):
+        return None
+    if value.get("pacing") not in PACING_VALUES or value.get("tone") not in TONE_VALUES:
+        return None
+    return value
+
+
+_VALIDATORS = {
+    "summary": _validate_summary,
+    "entities": _validate_entities,
+    "events": _validate_events,
+    "director": _validate_director,
+}
+
+
+def parse_turn_analysis(response: str, sections: tuple[str, ...] = SECTIONS) -> TurnAnalysis:
+    """Parse a reply into the valid subset of ``sections``."""
+    analysis = TurnAnalysis()
+    start, end = response.find("{"), response.rfind("}") + 1
+    if start < 0 or end <= start:
+        return analysis
+    try:
+        data = json.loads(response[start:end])
+    except json.JSONDecodeError:
+        return analysis
+    if not isinstance(data, dict):
+        return analysis
+    for name in sections:
+        setattr(analysis, name, _VALIDATORS[name](data.get(name)))
+    return analysis
+
+
+class TurnAnalyzer:
+    """Run the per-turn side analyses as one request and cache the result."""
+
+    def __init__(
+        self,
+        provider=None,
+        max_entries: int = 64,
+        max_tokens: Optional[int] = None,
+        sections: tuple[str, ...] = DEFAULT_SECTIONS,
+    ):
+        self._provider = provider
+        self.max_entries = max_entries
+        self.max_tokens = max_tokens  # None: sized from SECTION_MAX_TOKENS
+        self.sections = sections
+        self._cache: "OrderedDict[str, TurnAnalysis]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def provider(self):
+        if self._provider is not None:
+            return self._provider
+        from src.llm_provider import get_provider
+
+        return get_provider()
+
+    @staticmethod
+    def _key(narrative: str) -> str:
+        return hashlib.sha1(narrative.encode("utf-8")).hexdigest()
+
+    def cached(self, narrative: str) -> Optional[TurnAnalysis]:
+        """Analysis already produced for ``narrative``, if any."""
+        if not narrative:
+            return None
+        with self._lock:
+            return self._cache.get(self._key(narrative))
+
+    def analyze(
+        self,
+        narrative: str,
+        *,
+        location: str = "",
+        active_npcs: Optional[list[str]] = None,
+        player_name: str = "the protagonist",
+        director_state: Optional[dict] = None,
+        last_roll: str = "",
+        sections: Optional[tuple[str, ...]] = None,
+    ) -> TurnAnalysis:
+        """Analyze ``narrative`` (``self.sections`` by default); sections that could not be produced stay ``None``."""
+        if not narrative:
+            return TurnAnalysis()
+        sections = sections or self.sections
+
+        analysis = self.cached(narrative) or TurnAnalysis()
+        missing = tuple(name for name in sections if not analysis.has(name))
+        if not missing or not self._provider_ready():
+            return analysis
+
+        context = self._context(location, active_npcs or [], player_name, director_state, last_roll)
+        merged, answered = self._request(narrative, context, missing)
+        analysis.merge(merged)
+
+        # Whatever the merged reply got wrong is asked for separately, in parallel.
+        retry = tuple(name for name in missing if not analysis.has(name))
+        if retry and answered:
+            logger.debug(f"Turn analysis re-requesting sections: {', '.join(retry)}")
+            with ThreadPoolExecutor(max_workers=len(retry)) as pool:
+                for partial, _ in pool.map(lambda name: self._request(narrative, context, (name,)), retry):
+                    analysis.merge(partial)
+
+        with self._lock:
+            self._cache[self._key(narrative)] = analysis
+            self._cache.move_to_end(self._key(narrative))
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return analysis
+
+    def _provider_ready(self) -> bool:
+        from src.provider_health import get_health_monitor
+
+        try:
+            status = get_health_monitor().provider_status(self.provider)
+        except Exception as e:
+            logger.debug(f"Turn analysis provider unavailable: {e}")
+            return False
+        return bool(status and status.reachable and not status.breaker_open)
+
+    @staticmethod
+    def _context(location, active_npcs, player_name, director_state, last_roll) -> str:
+        lines = [
+            f"- Location: {location or 'unknown'}",
+            f"- Active NPCs: {', '.join(active_npcs[:5]) if active_npcs else 'none present'}",
+            f"- Player Character: {player_name}",
+        ]
+        if last_roll:
+            lines.append(f"- Last roll: {last_roll}")
+        if director_state:
+            lines.append(f"- Director state: {json.dumps(director_state, default=str)}")
+        return "\n".join(lines)
+
+    def _request(self, narrative: str, context: str, sections: tuple[str, ...]) -> tuple[TurnAnalysis, bool]:
+        """One constrained request; the flag is False when the provider call itself failed."""
+        instructions = "\n".join(f"- {SECTION_INSTRUCTIONS[name]}" for name in sections)
+        messages = [
+            {"role": "system", "content": TURN_ANALYSIS_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"CURRENT CONTEXT:\n{context}\n\nNARRATIVE:\n{narrative[:2000]}\n\nFIELDS:\n{instructions}",
+            },
+        ]
+        try:
+            max_tokens = self.max_tokens or sum(SECTION_MAX_TOKENS[name] for name in sections)
+            response = self.provider.chat_json(
+                messages, turn_analysis_schema(sections), temperature=0.3, max_tokens=max_tokens
+            )
+        except Exception as e:
+            logger.warning(f"Turn analysis request failed: {e}")
+            return TurnAnalysis(calls=1), False
+        analysis = parse_turn_analysis(response, sections)
+        analysis.calls = 1
+        return analysis, True
+
+
+_ANALYZER: Optional[TurnAnalyzer] = None
+_ANALYZER_LOCK = threading.Lock()
+
+
+def get_turn_analyzer() -> TurnAnalyzer:
+    """Return the process-wide analyzer, bound to the global LLM provider."""
+    global _ANALYZER
+    with _ANALYZER_LOCK:
+        if _ANALYZER is None:
+            _ANALYZER = TurnAnalyzer(sections=config.narrative.turn_analysis_sections)
+        return _ANALYZER
+
+
+def set_turn_analyzer(analyzer: Optional[TurnAnalyzer]) -> Optional[TurnAnalyzer]:
+    """Install ``analyzer`` as the process-wide analyzer; returns the previous one."""
+    global _ANALYZER
+    with _ANALYZER_LOCK:
+        previous, _ANALYZER = _ANALYZER, analyzer
+    return previous
@@ -0,0 +1,18 @@
+"""Test-wide setup.
+
+``src.server`` opens its session store when it is imported, and the
+narrator stages open the feedback database from ``config.paths``; point
+both at throwaway files before any test module imports them, otherwise
+tests would write into ``saves/``.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+_SAVES_DIR = tempfile.mkdtemp(prefix="starforged-saves-")
+os.environ["STARFORGED_SESSIONS_DB"] = str(Path(_SAVES_DIR) / "sessions.db")
+os.environ["STARFORGED_FEEDBACK_DB"] = str(Path(_SAVES_DIR) / "feedback_learning.db")
+atexit.register(shutil.rmtree, _SAVES_DIR, ignore_errors=True)
@@ -30,3 +30,75 @@ def test_asset_manifest_cache_roundtrip(tmp_path):
     for entry in fresh._store.values():
         entry["timestamp"] = time.time() - 5
     assert fresh.get_manifest() is None
+
+
+def _disk_keys(cache):
+    import sqlite3
+
+    cache.flush()
+    conn = sqlite3.connect(str(cache.path))
+    try:
+        return {row[0] for row in conn.execute("SELECT key FROM entries")}
+    finally:
+        conn.close()
+
+
+def test_memory_tier_is_bounded_lru_over_disk(tmp_path):
+    cache = PromptResultCache(ttl_seconds=60, directory=tmp_path)
+    cache.max_memory_entries = 2
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    assert list(cache._store) == ["b", "c"]
+    # Demoted entries are still served from the SQLite tier
+    assert cache.get("a") == "A"
+    assert list(cache._store) == ["c", "a"]
+    assert cache.stats()["hits"] == 1
+
+
+def test_writes_are_batched_and_visible_before_flush(tmp_path):
+    cache = PromptResultCache(ttl_seconds=60, directory=tmp_path)
+    cache.set("k", {"text": "queued"})
+
+    # Another instance on the same file sees the queued write immediately
+    assert PromptResultCache(ttl_seconds=60, directory=tmp_path).get("k") == {"text": "queued"}
+    assert _disk_keys(cache) == {"k"}
+
+
+def test_max_bytes_evicts_oldest_entries(tmp_path):
+    cache = AssetManifestCache(ttl_seconds=60, directory=tmp_path)
+    cache._tier.max_bytes = 250
+    for i in range(5):
+        cache.set(f"m{i}", "x" * 100)
+        cache.flush()
+
+    assert _disk_keys(cache) == {"m3", "m4"}
+    assert cache.evictions == 3
+    assert cache.stats()["disk_bytes"] <= 250
+
+
+def test_sweeper_removes_expired_rows_and_misses_count(tmp_path):
+    cache = PromptResultCache(ttl_seconds=60, directory=tmp_path)
+    cache.set("old", "stale")
+    cache.flush()
+
+    assert cache._tier.sweep(now=time.time() + 120) == 1
+    cache._store.clear()
+    assert cache.get("old") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_legacy_json_cache_is_imported(tmp_path):
+    import json
+
+    legacy = tmp_path / "prompt_results.json"
+    legacy.write_text(json.dumps({
+        "fresh": {"value": "kept", "timestamp": time.time()},
+        "stale": {"value": "dropped", "timestamp": time.time() - 7200},
+    }))
+
+    cache = PromptResultCache(ttl_seconds=60, directory=tmp_path)
+
+    assert not legacy.exists()
+    assert cache.get("fresh") == "kept"
+    assert cache.get("stale") is None
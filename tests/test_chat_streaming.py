@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+
+from fastapi import WebSocketDisconnect
+from fastapi.testclient import TestClient
+
+from src import server
+from src.director import DirectorAgent, DirectorPlan, Pacing
+from src.game_state import create_initial_state
+
+
+SENTENCES = ["The hull groans under the strain.", " Sparks rain from a ruptured conduit overhead.", " You smell ozone."]
+
+
+def _parse_sse(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def _patch_turn(monkeypatch):
+    image_calls = []
+
+    async def fake_stream(**kwargs):
+        for sentence in SENTENCES:
+            yield sentence
+
+    async def fake_image(location_name, description, time_of_day, weather):
+        image_calls.append(description)
+        return "/assets/scene.png"
+
+    monkeypatch.setattr(server, "agenerate_narrative_stream", fake_stream)
+    monkeypatch.setattr(server, "generate_location_image", fake_image)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    return image_calls
+
+
+def test_chat_stream_emits_typed_events_in_order(monkeypatch):
+    image_calls = _patch_turn(monkeypatch)
+    server.SESSIONS["stream"] = create_initial_state("Kira")
+    client = TestClient(server.app)
+
+    response = client.post("/api/chat/stream", json={"session_id": "stream", "action": "Brace the hatch"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(response.text)
+    names = [name for name, _ in events]
+
+    assert names[0] == "director_plan"
+    assert events[0][1]["pacing"] == "fast"
+    assert names[1:5] == ["narrative"] * 3 + ["state_delta"]
+    assert set(names[5:7]) == {"scene_image", "voice_clip"}
+    assert names[7:] == ["done"]
+
+    narrative = "".join(SENTENCES)
+    media = dict(events[5:7])
+    assert media["scene_image"]["url"] == "/assets/scene.png" and media["scene_image"]["job"]["status"] == "done"
+    assert events[-1][1]["narrative"] == narrative
+    assert events[-1][1]["assets"]["scene_image"] == "/assets/scene.png"
+    assert events[4][1]["narrative"]["pending_narrative"] == narrative
+    # Image generation starts from the streamed prefix, which matches the final text.
+    assert image_calls == [narrative[:server.SCENE_IMAGE_PREFIX_CHARS]]
+
+
+def test_chat_stream_releases_the_session_lock_before_waiting_for_media(monkeypatch):
+    _patch_turn(monkeypatch)
+    release = threading.Event()
+
+    async def slow_image(location_name, description, time_of_day, weather):
+        await asyncio.to_thread(release.wait, 5)
+        return "/assets/slow.png"
+
+    monkeypatch.setattr(server, "generate_location_image", slow_image)
+    server.SESSIONS["stream-lock"] = create_initial_state("Kira")
+
+    seen = []
+
+    async def consume():
+        async for name, _ in server._chat_events("stream-lock", "Brace the hatch"):
+            seen.append(name)
+
+    async def lock_released(lock):
+        while "state_delta" not in seen or lock.locked():
+            await asyncio.sleep(0.01)
+
+    async def scenario():
+        task = asyncio.create_task(consume())
+        await asyncio.wait_for(lock_released(server.SESSION_LOCKS._lock_for("stream-lock")), 5)
+        waiting_for_media = "done" not in seen
+        release.set()
+        await task
+        return waiting_for_media
+
+    assert asyncio.run(scenario())
+    assert set(seen[-3:-1]) == {"scene_image", "voice_clip"} and seen[-1] == "done"
+    del server.SESSIONS["stream-lock"]
+
+
+def test_chat_stream_unknown_session_is_404():
+    client = TestClient(server.app)
+    response = client.post("/api/chat/stream", json={"session_id": "missing", "action": "Look"})
+    assert response.status_code == 404
+
+
+def test_chat_websocket_sends_same_events(monkeypatch):
+    _patch_turn(monkeypatch)
+    server.SESSIONS["ws"] = create_initial_state("Kira")
+    client = TestClient(server.app)
+
+    with client.websocket_connect("/api/chat/ws") as ws:
+        ws.send_json({"session_id": "ws", "action": "Brace the hatch"})
+        names = []
+        while not names or names[-1] != "done":
+            names.append(ws.receive_json()["event"])
+
+    assert names[0] == "director_plan"
+    assert names.count("narrative") == 3
+    assert names[4] == "state_delta" and names[-1] == "done"
+
+
+class _DroppedSocket:
+    """A WebSocket whose client goes away after the first event."""
+
+    def __init__(self, session_id):
+        self.messages = [{"session_id": session_id, "action": "Brace the hatch"}]
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def receive_json(self):
+        if not self.messages:
+            raise WebSocketDisconnect()
+        return self.messages.pop()
+
+    async def send_json(self, data):
+        if self.sent:
+            raise WebSocketDisconnect()
+        self.sent.append(data["event"])
+
+
+def test_disconnected_clients_release_the_session_lock(monkeypatch):
+    _patch_turn(monkeypatch)
+    server.SESSIONS["dropped"] = create_initial_state("Kira")
+
+    async def scenario():
+        lock = server.SESSION_LOCKS._lock_for("dropped")
+        socket = _DroppedSocket("dropped")
+        await server.chat_websocket(socket)
+        after_websocket = lock.locked()
+
+        response = await server.chat_stream(server.ActionRequest(session_id="dropped", action="Look"))
+        assert (await response.body_iterator.__anext__()).startswith("event: director_plan")
+        await response.body_iterator.aclose()
+        return socket.sent, after_websocket, lock.locked()
+
+    sent, after_websocket, after_stream = asyncio.run(scenario())
+    assert sent == ["director_plan"]
+    assert not after_websocket and not after_stream
+    del server.SESSIONS["dropped"]
@@ -0,0 +1,133 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src import engine_registry
+from src.engine_registry import SessionEngineRegistry, drop_engine_registry, get_engine_registry
+from src.game_state import create_initial_state
+from src.narrative_craft import NarrativeCraftEngine
+from src.narrator_pipeline import StageCache, StageSpec, create_context_from_state, run_stages
+from src.narrator_stages import NARRATOR_STAGES
+
+
+@pytest.fixture(autouse=True)
+def _fresh_registries():
+    drop_engine_registry()
+    yield
+    drop_engine_registry()
+
+
+def test_engine_stays_alive_while_payload_is_unchanged():
+    registry = SessionEngineRegistry(session_id="s1")
+
+    first = registry.get("narrative_craft", NarrativeCraftEngine, {})
+    first.scenes_in_current_beat = 4
+    registry.mark_dirty("narrative_craft")
+    flushed = registry.flush()
+
+    # The checkpoint hands back an equal (but not identical) payload next turn.
+    second = registry.get("narrative_craft", NarrativeCraftEngine, copy.deepcopy(flushed["narrative_craft"]))
+
+    assert second is first
+    assert registry.hydrations == 1
+    assert flushed["narrative_craft"]["scenes_in_beat"] == 4
+
+
+def test_different_payload_rehydrates_engine():
+    registry = SessionEngineRegistry(session_id="s1")
+    live = registry.get("narrative_craft", NarrativeCraftEngine, {})
+
+    loaded = NarrativeCraftEngine()
+    loaded.scenes_in_current_beat = 9
+    replaced = registry.get("narrative_craft", NarrativeCraftEngine, loaded.to_dict())
+
+    assert replaced is not live
+    assert replaced.scenes_in_current_beat == 9
+
+
+def test_empty_payload_after_a_flush_rehydrates_a_fresh_engine():
+    registry = SessionEngineRegistry(session_id="s1")
+    live = registry.get("narrative_craft", NarrativeCraftEngine, {})
+    live.scenes_in_current_beat = 7
+    registry.mark_dirty("narrative_craft")
+    registry.flush()
+
+    # A new game on the same thread_id starts from an empty payload
+    fresh = registry.get("narrative_craft", NarrativeCraftEngine, None)
+
+    assert fresh is not live
+    assert fresh.scenes_in_current_beat == 0
+    assert registry.get("narrative_craft", NarrativeCraftEngine, {}) is fresh
+
+
+def test_flush_serializes_only_dirty_engines():
+    registry = SessionEngineRegistry(session_id="s1")
+    registry.get("narrative_craft", NarrativeCraftEngine, {})
+
+    assert registry.flush() == {}
+
+    registry.mark_dirty("narrative_craft")
+    assert registry.is_dirty("narrative_craft")
+    assert set(registry.flush()) == {"narrative_craft"}
+    assert not registry.is_dirty("narrative_craft")
+    assert registry.flush() == {}
+
+
+def test_narrator_stages_reuse_live_engines_across_turns():
+    state = create_initial_state("Kira")
+    registry = get_engine_registry("session-a")
+    hydrations = []
+
+    for turn in range(3):
+        ctx = create_context_from_state(state)
+        ctx.engines = registry
+        run_stages(ctx, NARRATOR_STAGES, cache=StageCache())
+        updates = registry.flush()
+        state.update(updates)
+        hydrations.append(registry.hydrations)
+
+    assert set(updates) == {"narrative_craft", "prose_enhancement", "narrative_systems", "character_arcs"}
+    assert updates["narrative_craft"]["scenes_in_beat"] == 3
+    # Hydrated once on the first turn, reused afterwards.
+    assert hydrations == [10, 10, 10]
+
+
+def test_over_budget_stage_cannot_write_to_flushed_engines():
+    state = create_initial_state("Kira")
+    registry = get_engine_registry("session-b")
+    release, finished = threading.Event(), threading.Event()
+
+    def stalled(ctx):
+        engine = ctx.engines.get("narrative_craft", NarrativeCraftEngine, {})
+        release.wait(5)
+        engine.scenes_in_current_beat += 1
+        ctx.engines.mark_dirty("narrative_craft")
+        ctx.engines.get("narrative_systems", NarrativeCraftEngine, {})
+        finished.set()
+        return "late"
+
+    ctx = create_context_from_state(state)
+    ctx.engines = registry
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        outcomes = run_stages(ctx, [StageSpec("stalled", stalled, budget_ms=30)], executor=pool, cache=StageCache())
+        release.set()
+        assert finished.wait(5)
+
+    assert outcomes[0].status == "timeout"
+    assert registry.flush() == {}
+    assert registry._slots == {}  # Dropped; the next turn rehydrates from GameState
+    assert registry.get("narrative_craft", NarrativeCraftEngine, {}).scenes_in_current_beat == 0
+
+
+def test_idle_sessions_are_evicted(monkeypatch):
+    monkeypatch.setattr(engine_registry, "MAX_LIVE_SESSIONS", 2)
+
+    first = get_engine_registry("a")
+    get_engine_registry("b")
+    get_engine_registry("a")
+    get_engine_registry("c")
+
+    assert get_engine_registry("a") is first
+    assert "b" not in engine_registry._REGISTRIES
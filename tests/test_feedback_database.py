@@ -0,0 +1,100 @@
+import threading
+
+from scripts.benchmark_feedback_retrieval import run_benchmark
+from src.feedback_learning import FeedbackDatabase, GeneratedParagraph
+
+
+def _paragraph(pid, accepted=True, session=0, **context):
+    return GeneratedParagraph(paragraph_id=pid, text="The hull groans.", accepted=accepted, session_number=session, **context)
+
+
+def test_connections_are_pooled_per_thread_in_wal_mode(tmp_path):
+    db = FeedbackDatabase(str(tmp_path / "feedback.db"))
+    try:
+        main_conn = db._get_conn()
+        assert db._get_conn() is main_conn
+        assert main_conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db._get_conn()))
+        thread.start()
+        thread.join()
+        assert other[0] is not main_conn
+    finally:
+        db.close()
+
+
+def test_retrieval_query_uses_composite_index(tmp_path):
+    db = FeedbackDatabase(str(tmp_path / "feedback.db"))
+    try:
+        plan = db._get_conn().execute("""
+            EXPLAIN QUERY PLAN SELECT * FROM paragraphs
+            WHERE accepted = ? AND pacing = ? AND tone = ? AND scene_type = ?
+            ORDER BY timestamp DESC LIMIT ?
+        """, (1, "fast", "tense", "action", 6)).fetchall()
+        details = " ".join(row[-1] for row in plan)
+        assert "idx_paragraphs_retrieval" in details
+        assert "TEMP B-TREE" not in details
+    finally:
+        db.close()
+
+
+def test_statistics_aggregate_in_one_query():
+    db = FeedbackDatabase(":memory:")
+    db.save_paragraph(_paragraph("a", accepted=True, session=1))
+    db.save_paragraph(_paragraph("b", accepted=False, session=1))
+    db.save_paragraph(_paragraph("c", accepted=True, session=2))
+
+    assert db.get_statistics() == {
+        "total_paragraphs": 3,
+        "accepted": 2,
+        "rejected": 1,
+        "accept_rate": 2 / 3,
+        "sessions": 2,
+    }
+    assert FeedbackDatabase(":memory:").get_statistics()["accept_rate"] == 0
+
+
+def test_retrieval_benchmark_reports_both_modes(tmp_path):
+    results = run_benchmark(rows=2000, queries=5, workdir=str(tmp_path))
+
+    assert set(results) == {"legacy", "pooled", "relevance", "speedup"}
+    assert results["pooled"]["mean_ms"] < results["legacy"]["mean_ms"]
+
+
+def test_search_index_ranks_by_relevance_and_tracks_replacements():
+    db = FeedbackDatabase(":memory:")
+    db.save_paragraph(GeneratedParagraph(paragraph_id="reactor", text="The reactor coughs sparks across the deck.", accepted=True))
+    db.save_paragraph(GeneratedParagraph(paragraph_id="airlock", text="The airlock cycles with a hiss.", accepted=True))
+    db.save_paragraph(GeneratedParagraph(paragraph_id="both", text="Reactor alarms echo through the airlock.", accepted=True))
+
+    ranked = db.search_paragraphs("I vent the reactor sparks", accepted=True)
+    assert [pid for pid, _ in ranked] == ["reactor", "both"]
+    assert db.search_paragraphs("reactor", accepted=False) == []
+
+    # Re-saving an id re-indexes its new text
+    db.save_paragraph(GeneratedParagraph(paragraph_id="reactor", text="Static fills the comms.", accepted=True))
+    assert [pid for pid, _ in db.search_paragraphs("reactor", accepted=True)] == ["both"]
+    df = db._get_conn().execute("SELECT df FROM search_terms WHERE term = 'reactor' AND accepted = 1").fetchone()[0]
+    assert df == 1
+
+
+def test_search_index_backfills_existing_database(tmp_path):
+    import sqlite3
+
+    db_path = str(tmp_path / "legacy.db")
+    db = FeedbackDatabase(db_path)
+    db.save_paragraph(GeneratedParagraph(paragraph_id="a", text="The derelict drifts silently.", accepted=True))
+    db.close()
+
+    conn = sqlite3.connect(db_path)
+    for table in ("search_postings", "search_docs", "search_stats", "search_terms"):
+        conn.execute(f"DROP TABLE {table}")
+    conn.commit()
+    conn.close()
+
+    reopened = FeedbackDatabase(db_path)
+    try:
+        assert [pid for pid, _ in reopened.search_paragraphs("derelict", accepted=True)] == ["a"]
+    finally:
+        reopened.close()
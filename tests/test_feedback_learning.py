@@ -211,3 +211,200 @@ def test_automatic_reanalysis():
     # Reanalyze
     profile2 = engine.analyze_preferences()
     assert profile2.total_decisions_analyzed == 35
+
+
+
+def _save_batch(db, start, count):
+    for i in range(start, start + count):
+        db.save_paragraph(GeneratedParagraph(
+            paragraph_id=f"p{i}",
+            text="You run. The door slams. Silence." if i % 2 == 0 else
+                 "You find yourself running through the corridor, and the door slams behind you with a loud noise.",
+            accepted=i % 2 == 0,
+            pacing="fast",
+            tone="tense",
+            session_number=i,
+        ))
+
+
+def test_background_worker_publishes_snapshot_after_threshold(tmp_path):
+    """Analysis runs off-thread once enough new decisions are reported."""
+    from src.feedback_learning import FeedbackDatabase, PreferenceAnalysisWorker
+
+    db = FeedbackDatabase(str(tmp_path / "feedback.db"))
+    worker = PreferenceAnalysisWorker(db, reanalysis_threshold=10, min_samples=20)
+    try:
+        assert worker.snapshot().profile is None
+
+        _save_batch(db, 0, 25)
+        worker.notify_decision(25)
+        assert worker.wait_for_version(0)
+        first = worker.snapshot()
+        assert first.profile.total_decisions_analyzed == 25
+        assert "learned_preferences" in first.guidance
+
+        # Below the threshold: no new analysis, same snapshot object
+        _save_batch(db, 25, 5)
+        worker.notify_decision(5)
+        assert not worker.wait_for_version(first.version, timeout=0.2)
+        assert worker.snapshot() is first
+
+        _save_batch(db, 30, 5)
+        worker.notify_decision(5)
+        assert worker.wait_for_version(first.version)
+        assert worker.snapshot().decisions_analyzed == 35
+        assert worker.analyses_run == 2
+
+        # The profile was persisted for the next process
+        assert db.get_latest_preferences().total_decisions_analyzed == 35
+    finally:
+        worker.stop()
+
+
+def test_snapshot_is_isolated_from_later_analysis(tmp_path):
+    from dataclasses import FrozenInstanceError
+    from src.feedback_learning import FeedbackDatabase, PreferenceAnalysisWorker
+
+    db = FeedbackDatabase(str(tmp_path / "feedback.db"))
+    _save_batch(db, 0, 20)
+    worker = PreferenceAnalysisWorker(db, reanalysis_threshold=10, min_samples=20)
+    try:
+        # Existing decisions are analyzed at startup
+        assert worker.wait_for_version(0)
+        snapshot = worker.snapshot()
+
+        with pytest.raises(FrozenInstanceError):
+            snapshot.guidance = ""
+
+        _save_batch(db, 20, 10)
+        worker.notify_decision(10)
+        assert worker.wait_for_version(snapshot.version)
+        assert snapshot.decisions_analyzed == 20
+        assert snapshot.profile.total_decisions_analyzed == 20
+    finally:
+        worker.stop()
+
+
+def test_record_feedback_notifies_shared_worker(tmp_path):
+    from src.feedback_learning import get_preference_worker, stop_preference_workers
+
+    db_path = str(tmp_path / "feedback.db")
+    try:
+        engine = FeedbackLearningEngine(db_path=db_path)
+        for i in range(30):
+            engine.record_feedback("The hull groans.", accepted=True, context={"session_number": i})
+
+        worker = get_preference_worker(db_path)
+        assert worker.wait_for_version(0)
+        assert worker.snapshot().decisions_analyzed >= 20
+    finally:
+        stop_preference_workers()
+
+
+def test_vocabulary_stats_track_saves_and_replacements():
+    from src.feedback_learning import FeedbackDatabase
+
+    db = FeedbackDatabase(":memory:")
+    db.save_paragraph(GeneratedParagraph(paragraph_id="a", text="Suddenly the hull cracks. Suddenly.", accepted=False))
+    db.save_paragraph(GeneratedParagraph(paragraph_id="b", text="The hull holds.", accepted=True))
+
+    # Document frequency: repeated words in one paragraph count once
+    assert db.word_frequencies(["suddenly", "hull"]) == {"suddenly": (0, 1), "hull": (1, 1)}
+
+    # Replacing a paragraph moves its words to the new decision
+    db.save_paragraph(GeneratedParagraph(paragraph_id="a", text="The hull cracks.", accepted=True))
+    assert db.word_frequencies(["suddenly", "hull"]) == {"suddenly": (0, 0), "hull": (2, 0)}
+
+    totals = db.get_length_stats()
+    assert totals[True]["paragraphs"] == 2
+    assert totals[False]["paragraphs"] == 0
+    assert totals[False]["sentence_length_sum"] == pytest.approx(0.0)
+
+
+def test_vocabulary_stats_backfill_existing_database(tmp_path):
+    import sqlite3
+    from src.feedback_learning import FeedbackDatabase
+
+    db_path = str(tmp_path / "legacy.db")
+    db = FeedbackDatabase(db_path)
+    db.save_paragraph(GeneratedParagraph(paragraph_id="a", text="Very dark. Very cold.", accepted=False))
+
+    # Simulate a database written before the stats tables existed
+    conn = sqlite3.connect(db_path)
+    conn.execute("DROP TABLE word_stats")
+    conn.execute("DROP TABLE length_stats")
+    conn.commit()
+    conn.close()
+
+    reopened = FeedbackDatabase(db_path)
+    assert reopened.word_frequencies(["very"]) == {"very": (0, 1)}
+    assert reopened.get_length_stats()[False]["paragraphs"] == 1
+
+
+def test_analysis_does_not_rescan_corpus_text(monkeypatch):
+    """Vocabulary and sentence length come from the stats tables, not paragraph text."""
+    engine = FeedbackLearningEngine(db_path=":memory:")
+    for i in range(30):
+        engine.record_feedback(
+            "You suddenly feel very afraid of the darkness." if i % 3 == 0 else "Silence. Then the lights die.",
+            accepted=i % 3 != 0,
+            context={"tone": "tense", "session_number": i}
+        )
+
+    split_calls = []
+    original_split = str.split
+
+    class CountingText(str):
+        def split(self, *args, **kwargs):
+            split_calls.append(1)
+            return original_split(self, *args, **kwargs)
+
+    original_query = engine.db.query_paragraphs
+
+    def query(*args, **kwargs):
+        rows = original_query(*args, **kwargs)
+        for row in rows:
+            row.text = CountingText(row.text)
+        return rows
+
+    monkeypatch.setattr(engine.db, "query_paragraphs", query)
+    profile = engine.run_preference_analysis()
+
+    assert split_calls == []
+    assert "suddenly" in profile.forbidden_words
+    assert profile.total_decisions_analyzed == 30
+
+
+def test_retriever_prefers_examples_relevant_to_the_scene():
+    db = FeedbackLearningEngine(db_path=":memory:").db
+    db.save_paragraph(GeneratedParagraph(
+        paragraph_id="old", text="Sparks rain from the reactor housing.", accepted=True,
+        pacing="slow", timestamp="2024-01-01T00:00:00"))
+    for i in range(5):
+        db.save_paragraph(GeneratedParagraph(
+            paragraph_id=f"new{i}", text=f"The corridor is quiet, stop {i}.", accepted=True,
+            pacing="fast", timestamp=f"2024-02-0{i + 1}T00:00:00"))
+
+    retriever = ExampleRetriever(db)
+    context = {"pacing": "fast", "player_input": "I inspect the reactor", "location": "Engineering"}
+
+    examples = retriever.get_positive_examples(context, n=2)
+    assert examples[0] == "Sparks rain from the reactor housing."
+    assert examples[1].startswith("The corridor is quiet")
+
+    # Without a scene query the recency/metadata behaviour is unchanged
+    assert retriever.get_positive_examples({"pacing": "fast"}, n=1) == ["The corridor is quiet, stop 4."]
+
+
+def test_few_shot_prompt_respects_character_budget():
+    db = FeedbackLearningEngine(db_path=":memory:").db
+    for i in range(4):
+        db.save_paragraph(GeneratedParagraph(paragraph_id=f"a{i}", text="x" * 150, accepted=True))
+        db.save_paragraph(GeneratedParagraph(paragraph_id=f"r{i}", text="y" * 150, accepted=False))
+
+    retriever = ExampleRetriever(db)
+    prompt = retriever.build_few_shot_prompt({}, n_positive=3, n_negative=2, char_budget=400)
+
+    assert prompt.count("Example ") == 2
+    assert prompt.count("Anti-example") == 1
+    assert retriever.build_few_shot_prompt({}, n_positive=3, n_negative=2).count("Example ") == 3
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+
+from src.graph import clear_graph_cache, create_game_graph
+from scripts.benchmark_graph import run_benchmark
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_graph_cache()
+    yield
+    clear_graph_cache()
+
+
+def test_graph_is_compiled_once_per_checkpoint_path(tmp_path):
+    path = tmp_path / "sessions.db"
+
+    first = create_game_graph(str(path))
+    second = create_game_graph(str(tmp_path / "." / "sessions.db"))
+    other = create_game_graph(str(tmp_path / "other.db"))
+
+    assert first is second
+    assert other is not first
+    assert first.checkpointer.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_concurrent_callers_share_one_graph(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    graphs = []
+
+    def worker():
+        graph = create_game_graph(path)
+        graph.get_state({"configurable": {"thread_id": threading.current_thread().name}})
+        graphs.append(graph)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(graphs) == 8
+    assert all(graph is graphs[0] for graph in graphs)
+
+
+def test_cached_lookups_reuse_the_compiled_graph_and_connection(tmp_path, monkeypatch):
+    from src import graph as graph_module
+
+    builds, connections = [], []
+    build, connect = graph_module.build_game_graph, graph_module.open_checkpoint_connection
+    monkeypatch.setattr(graph_module, "build_game_graph", lambda saver: builds.append(saver) or build(saver))
+    monkeypatch.setattr(
+        graph_module, "open_checkpoint_connection", lambda path: connections.append(connect(path)) or connections[-1]
+    )
+    path = str(tmp_path / "bench.db")
+
+    graphs = [create_game_graph(path) for _ in range(5)]
+
+    assert all(graph is graphs[0] for graph in graphs)
+    assert len(builds) == 1 and len(connections) == 1
+    assert graphs[0].checkpointer.conn is connections[0]
+
+
+def test_benchmark_reports_both_modes(tmp_path):
+    results = run_benchmark(turns=3, checkpoint_path=str(tmp_path / "bench.db"))
+
+    assert results["rebuild"]["mean_ms"] > 0 and results["cached"]["mean_ms"] >= 0
+    assert "saved_per_turn_ms" in results
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from src.guardrails import (
+    EMPTY_OUTPUT_MESSAGE,
+    GuardrailFactStore,
+    astream_verified,
+    sanitize_and_verify,
+    stream_verified,
+)
+from src import narrator
+
+
+NARRATIVE = (
+    "The airlock groans open. Kira waits in the dark! Is the hull holding? "
+    "As a language model I cannot continue. The ship shudders around you."
+)
+
+
+def _store() -> GuardrailFactStore:
+    return GuardrailFactStore(high_confidence_facts=["Kira"])
+
+
+def _chunks(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 40, len(NARRATIVE)])
+def test_streamed_output_matches_batch_verification(size):
+    streamed = "".join(stream_verified(_chunks(NARRATIVE, size), _store()))
+    assert streamed == sanitize_and_verify(NARRATIVE, _store())
+
+
+def test_async_stream_matches_sync_stream():
+    async def chunks():
+        for chunk in _chunks(NARRATIVE, 5):
+            yield chunk
+
+    async def collect():
+        return [piece async for piece in astream_verified(chunks(), _store())]
+
+    assert asyncio.run(collect()) == list(stream_verified(_chunks(NARRATIVE, 5), _store()))
+
+
+def test_sentences_release_before_stream_ends():
+    verifier = _store().incremental_verifier()
+
+    assert verifier.feed("The airlock groans") == []
+    assert verifier.feed(" open. Kira") == ["The airlock groans open."]
+    assert verifier.feed(" waits.") == []
+    assert verifier.finish() == ["Kira waits."]
+
+
+def test_fully_filtered_stream_yields_placeholder():
+    pieces = list(stream_verified(["I am an LLM. ", "Breaking character now."], _store()))
+    assert pieces == [EMPTY_OUTPUT_MESSAGE]
+
+
+class _StreamingProvider:
+    name = "streaming-stub"
+
+    def __init__(self):
+        self.pulled = 0
+
+    def chat(self, messages, temperature=0.7, max_tokens=1024, stream=False):
+        def gen():
+            for chunk in ("The hull ", "creaks. ", "The void ", "stares back."):
+                self.pulled += 1
+                yield chunk
+        return gen()
+
+
+def test_generate_narrative_stream_yields_incrementally(monkeypatch):
+    provider = _StreamingProvider()
+    monkeypatch.setattr(narrator, "_get_provider", lambda config: provider)
+    monkeypatch.setattr(narrator, "check_provider_availability", lambda config, p: (True, "ok"))
+
+    stream = narrator.generate_narrative_stream("Look around", config=narrator.NarratorConfig(backend="ollama"))
+
+    first = next(stream)
+    assert first == "The hull creaks."
+    # Only the chunks needed for the first sentence have been consumed.
+    assert provider.pulled == 2
+    assert "".join([first, *stream]) == "The hull creaks. The void stares back."
@@ -0,0 +1,223 @@
+import asyncio
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+from src import server
+from src.director import DirectorAgent, DirectorPlan, Pacing
+from src.game_state import create_initial_state
+from src.job_queue import DONE, FAILED, JobQueue
+
+
+def test_jobs_run_by_priority_on_bounded_workers():
+    jobs = JobQueue(workers=1)
+    release = threading.Event()
+    order = []
+
+    blocker = jobs.submit("block", "b", lambda: release.wait(5))
+    for priority, name in [(2, "blueprint"), (1, "scene"), (0, "voice")]:
+        jobs.submit(name, name, lambda name=name: order.append(name), priority=priority)
+    assert jobs.stats()["running"] + jobs.stats()["queue_depth"] == 4
+
+    release.set()
+    for job_id in list(jobs._jobs):
+        assert jobs.get(job_id).wait(5)
+
+    assert blocker.status == DONE
+    assert order == ["voice", "scene", "blueprint"]
+
+
+def test_jobs_deduplicate_by_content_and_retry_failures():
+    jobs = JobQueue(workers=2, max_finished=2, retry_backoff=0)
+    calls = []
+
+    async def render():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"image_url": "/assets/generated/bleakhold.png"}
+
+    first = jobs.submit("scene_image", "s:Bleakhold", render)
+    again = jobs.submit("scene_image", "s:Bleakhold", render)
+    assert again is first and first.wait(5)
+    assert jobs.submit("scene_image", "s:Bleakhold", render) is first
+    assert first.to_dict()["result"] == {"image_url": "/assets/generated/bleakhold.png"} and calls == [1]
+
+    def broken():
+        raise RuntimeError("No audio generated")
+
+    failed = jobs.submit("voice_clip", "line", broken)
+    failed.wait(5)
+    assert failed.status == FAILED and failed.error == "No audio generated"
+    retried = jobs.submit("voice_clip", "line", lambda: "/assets/voice/line.mp3")
+    assert retried is not failed and retried.wait(5) and retried.result == "/assets/voice/line.mp3"
+
+    stats = jobs.stats()
+    assert stats["deduplicated"] == 2 and stats["failed"] == 1 and stats["completed"] == 2
+    assert jobs.get(first.id) is None  # Only the newest max_finished are kept
+
+
+def test_failed_jobs_back_off_and_give_up():
+    jobs = JobQueue(workers=1, max_attempts=2, retry_backoff=60)
+
+    def broken():
+        raise RuntimeError("Renderer offline")
+
+    failed = jobs.submit("scene_image", "s:Bleakhold", broken)
+    assert failed.wait(5) and failed.status == FAILED
+    assert jobs.submit("scene_image", "s:Bleakhold", broken) is failed  # Still backing off
+
+    failed.finished_at -= 61
+    retried = jobs.submit("scene_image", "s:Bleakhold", broken)
+    assert retried is not failed and retried.attempt == 2 and retried.wait(5)
+    retried.finished_at -= 3600
+    assert jobs.submit("scene_image", "s:Bleakhold", broken) is retried  # Out of attempts
+    assert jobs.stats()["failed"] == 2
+
+
+def test_held_jobs_are_kept_until_released_and_callbacks_run():
+    jobs = JobQueue(workers=1, max_finished=0)
+    release = threading.Event()
+    finished = []
+
+    held = jobs.submit("scene_image", "s:Bleakhold", lambda: release.wait(5), hold=True)
+    jobs.submit("scene_image", "s:Bleakhold", lambda: None, on_done=finished.append)
+    release.set()
+    assert held.wait(5)
+    jobs.submit("voice_clip", "line", lambda: None).wait(5)
+
+    assert finished == [held] and jobs.find("scene_image", "s:Bleakhold") is held
+    jobs.submit("scene_image", "s:Bleakhold", lambda: None, on_done=finished.append)
+    assert finished == [held, held]  # Already finished: called at once
+    jobs.release(held)
+    assert jobs.get(held.id) is None
+
+
+def test_finished_scene_image_is_stored_without_another_turn(monkeypatch):
+    release = threading.Event()
+
+    async def fake_narrative(**kwargs):
+        return "The hatch groans open."
+
+    async def slow_render(location, narrative, time_of_day, weather):
+        await asyncio.to_thread(release.wait, 5)
+        return f"/assets/generated/{location}.png"
+
+    monkeypatch.setattr(server, "agenerate_narrative", fake_narrative)
+    monkeypatch.setattr(server, "_render_scene_image", slow_render)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    monkeypatch.setattr(server.config.narrative, "speculation_enabled", False)
+    session_id = "media-callback"
+    server.SESSIONS[session_id] = create_initial_state("Kira")
+    server.SESSIONS[session_id]["world"].current_location = "Iron Drift"
+
+    async def scenario():
+        response = await server.chat(server.ActionRequest(session_id=session_id, action="I listen"))
+        job = server.JOBS.get(json.loads(response.body)["assets"]["jobs"]["scene_image"]["job_id"])
+        release.set()
+        for _ in range(100):
+            if "Iron Drift" in server.SESSIONS[session_id]["world"].location_visuals:
+                break
+            await asyncio.sleep(0.05)
+        return job
+
+    job = asyncio.run(scenario())
+    visuals = server.SESSIONS[session_id]["world"].location_visuals
+    assert visuals["Iron Drift"]["image_url"] == "/assets/generated/Iron Drift.png"
+    assert job.status == DONE and not job.held
+    del server.SESSIONS[session_id]
+
+
+def test_chat_answers_before_media_and_handles_resolve(monkeypatch):
+    release = threading.Event()
+    voiced = []
+
+    async def fake_narrative(**kwargs):
+        return 'Ilsa Renn: "Keep your voice down."'
+
+    async def slow_render(location, narrative, time_of_day, weather):
+        await asyncio.to_thread(release.wait, 5)
+        return f"/assets/generated/{location}.png"
+
+    def fake_voice(dialogue, archetype):
+        voiced.append(dialogue)
+        return "/assets/voice/ilsa.mp3"
+
+    monkeypatch.setattr(server, "agenerate_narrative", fake_narrative)
+    monkeypatch.setattr(server, "_render_scene_image", slow_render)
+    monkeypatch.setattr(server, "_voice_clip", fake_voice)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    monkeypatch.setattr(server.config.narrative, "speculation_enabled", False)
+    session_id = "media-jobs"
+    server.SESSIONS[session_id] = create_initial_state("Kira")
+    server.SESSIONS[session_id]["world"].current_location = "Bleakhold"
+    server.SESSIONS[session_id]["world"].npcs = [{"name": "Ilsa Renn", "location": "Bleakhold", "archetype": "veteran"}]
+
+    async def turn():
+        response = await server.chat(server.ActionRequest(session_id=session_id, action="I listen"))
+        return json.loads(response.body)
+
+    first = asyncio.run(turn())
+    scene = first["assets"]["jobs"]["scene_image"]
+    assert first["assets"]["scene_image"] is None and scene["status"] in ("queued", "running")
+
+    client = TestClient(server.app)
+    release.set()
+    finished = client.get(f"/api/jobs/{scene['job_id']}/wait").json()
+    assert finished["status"] == "done"
+    assert finished["result"]["image_url"] == "/assets/generated/Bleakhold.png"
+    voice = first["assets"]["jobs"]["voice_audio"]
+    assert client.get(f"/api/jobs/{voice['job_id']}/wait").json()["result"] == "/assets/voice/ilsa.mp3"
+
+    second = asyncio.run(turn())
+    assert second["assets"]["scene_image"] == "/assets/generated/Bleakhold.png"
+    assert second["assets"]["voice_audio"] == "/assets/voice/ilsa.mp3" and "jobs" in second["assets"]
+    assert voiced == ["Keep your voice down."]  # The repeated line reuses its clip
+    assert "Bleakhold" in server.SESSIONS[session_id]["world"].location_visuals
+    assert client.get("/api/jobs/missing").status_code == 404
+    del server.SESSIONS[session_id]
+
+
+def test_ship_blueprint_can_run_as_a_job(monkeypatch):
+    async def fake_blueprint(state_dict):
+        return {"image_base64": "iVBORw0KGgo=", "metadata": {"class_type": "freighter"}}
+
+    monkeypatch.setattr("src.image_gen.generate_ship_blueprint", fake_blueprint)
+    session_id = "media-blueprint"
+    server.SESSIONS[session_id] = create_initial_state("Kira")
+    client = TestClient(server.app)
+
+    handle = client.post("/api/ship/blueprint", json={"session_id": session_id, "background": True}).json()["job"]
+    again = client.post("/api/ship/blueprint", json={"session_id": session_id, "background": True}).json()["job"]
+    job = client.get(f"/api/jobs/{handle['job_id']}/wait").json()
+
+    assert handle["kind"] == "ship_blueprint" and again["job_id"] == handle["job_id"]
+    assert job["status"] == "done" and job["result"]["blueprint"]
+    assert "jobs" in client.get("/api/metrics/runtime").json()
+    del server.SESSIONS[session_id]
+
+
+def test_roll_commit_returns_the_action_image_as_a_job(monkeypatch):
+    async def fake_narrative(**kwargs):
+        return f"The {kwargs['outcome']} rings out."
+
+    async def fake_image(prompt, filename):
+        return f"/assets/generated/{filename}"
+
+    monkeypatch.setattr(server, "agenerate_narrative", fake_narrative)
+    monkeypatch.setattr(server, "generate_location_image", fake_image)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    monkeypatch.setattr(server.config.narrative, "speculation_enabled", False)
+    session_id = "media-roll"
+    server.SESSIONS[session_id] = create_initial_state("Kira")
+
+    request = server.RollCommitRequest(session_id=session_id, stat_name="edge", stat_val=2, move_name="Face Danger")
+    assets = asyncio.run(server.commit_roll(request))["assets"]
+    handle = assets["jobs"].get("action_image")
+    job = server.JOBS.get(handle["job_id"]) if handle else None
+
+    assert "scene_image" not in assets  # The roll leaves the scene image alone
+    assert handle is None or (handle["kind"] == "action_image" and job.wait(5))
+    image_url = assets.get("action_image") or job.result["image_url"]
+    assert image_url.startswith(f"/assets/generated/action_{session_id}_")
+    del server.SESSIONS[session_id]
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+from src.llm_provider import (
+    OLLAMA_KEEP_ALIVE,
+    OLLAMA_NUM_CTX,
+    LLMCapabilities,
+    LLMProvider,
+    OllamaProvider,
+    get_shared_async_client,
+)
+
+
+class SlowSyncProvider(LLMProvider):
+    """Provider with only a blocking ``chat`` implementation."""
+
+    max_concurrency = 2
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages, temperature=0.7, max_tokens=1024, stream=False):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        text = f"echo:{messages[-1]['content']}"
+        if stream:
+            return iter(text.split(":"))
+        return text
+
+    def is_available(self) -> bool:
+        return True
+
+    def capabilities(self) -> LLMCapabilities:
+        return LLMCapabilities(max_output_tokens=256, safety_features=[], cost_per_1k_tokens=0.0)
+
+    @property
+    def name(self) -> str:
+        return "slow-sync"
+
+
+class FakeAsyncOllama:
+    def __init__(self):
+        self.calls = []
+        self.keep_alive = []
+
+    async def chat(self, model, messages, stream=False, options=None, keep_alive=None):
+        self.calls.append((model, stream, options))
+        self.keep_alive.append(keep_alive)
+        if stream:
+            async def chunks():
+                for piece in ("The ", "airlock ", "hisses."):
+                    yield {"message": {"content": piece}}
+
+            return chunks()
+        return {"message": {"content": "The airlock hisses."}}
+
+
+def test_default_achat_offloads_blocking_chat_with_bounded_concurrency():
+    provider = SlowSyncProvider()
+    messages = [{"role": "user", "content": "Open the hatch"}]
+
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        beat = asyncio.create_task(heartbeat())
+        results = await asyncio.gather(*(provider.achat(messages) for _ in range(4)))
+        beat.cancel()
+        return results, ticks
+
+    results, ticks = asyncio.run(run())
+
+    assert results == ["echo:Open the hatch"] * 4
+    assert provider.peak == 2
+    # The event loop kept running while the blocking calls were in flight.
+    assert ticks > 5
+
+
+def test_default_astream_yields_sync_chunks():
+    provider = SlowSyncProvider(delay=0)
+
+    async def collect():
+        return [chunk async for chunk in provider.astream([{"role": "user", "content": "x"}])]
+
+    assert asyncio.run(collect()) == ["echo", "x"]
+
+
+def test_ollama_async_paths_share_one_pooled_client(monkeypatch):
+    fake = FakeAsyncOllama()
+    provider_a = OllamaProvider(model="llama3.1")
+    provider_b = OllamaProvider(model="llama3.1")
+    monkeypatch.setattr(OllamaProvider, "_async_client", lambda self: get_shared_async_client("test-ollama", lambda: fake))
+
+    async def run():
+        text = await provider_a.achat([{"role": "user", "content": "Go"}], temperature=0.2, max_tokens=64)
+        chunks = [c async for c in provider_b.astream([{"role": "user", "content": "Go"}])]
+        return text, chunks
+
+    text, chunks = asyncio.run(run())
+
+    assert text == "The airlock hisses."
+    assert "".join(chunks) == "The airlock hisses."
+    assert fake.calls[0] == ("llama3.1", False, {"temperature": 0.2, "num_predict": 64, "num_ctx": OLLAMA_NUM_CTX})
+    assert fake.calls[1][1] is True
+    # Both paths keep the model (and its prompt cache) loaded between turns.
+    assert fake.keep_alive == [OLLAMA_KEEP_ALIVE, OLLAMA_KEEP_ALIVE]
+
+
+def test_shared_client_is_scoped_to_event_loop():
+    created = []
+
+    async def fetch():
+        return get_shared_async_client("scoped", lambda: created.append(object()) or created[-1])
+
+    async def same_loop():
+        return await fetch(), await fetch()
+
+    first, second = asyncio.run(same_loop())
+    third = asyncio.run(fetch())
+
+    assert first is second
+    assert third is not first
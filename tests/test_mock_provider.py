@@ -0,0 +1,94 @@
+import asyncio
+import json
+
+import pytest
+
+from scripts.benchmark_narrator_load import run_benchmark
+from src.llm_provider import LatencyProfile, MockLLMError, MockProvider, get_llm_provider
+from src.narrator import NarratorConfig, _get_provider
+from src.turn_analysis import turn_analysis_schema
+
+MESSAGES = [{"role": "system", "content": "Narrate."}, {"role": "user", "content": "I open the hatch."}]
+
+
+def test_replies_are_deterministic_per_seed_and_prompt():
+    first = MockProvider(model="instant", seed=3)
+    second = MockProvider(model="instant", seed=3)
+
+    reply = first.chat(MESSAGES)
+    assert reply == second.chat(MESSAGES) == first.chat(MESSAGES)
+    assert reply.endswith(".")
+    assert MockProvider(model="instant", seed=4).chat(MESSAGES) != reply
+    assert "".join(first.chat(MESSAGES, stream=True)) == reply
+
+
+def test_chat_json_matches_schema():
+    provider = MockProvider(model="instant")
+    data = json.loads(provider.chat_json(MESSAGES, turn_analysis_schema()))
+
+    assert set(data) == {"summary", "entities", "events", "director"}
+    assert data["director"]["pacing"] in ("slow", "standard", "fast")
+    assert isinstance(data["events"][0]["priority"], int)
+
+
+def test_latency_is_simulated_from_profile():
+    profile = LatencyProfile(ttft_ms=100.0, tokens_per_second=50.0, output_tokens=40, distribution="fixed")
+    provider = MockProvider(model="fixed", profile=profile, time_scale=0.0)
+
+    reply = provider.chat(MESSAGES, max_tokens=20)
+    stats = provider.stats()
+
+    assert stats["calls"] == 1 and stats["output_tokens"] >= 20
+    assert stats["simulated_ms"] == pytest.approx(100.0 + stats["output_tokens"] / 50.0 * 1000.0, abs=0.1)
+    assert reply
+
+
+def test_errors_are_injected_reproducibly():
+    def outcomes():
+        provider = MockProvider(model="flaky", profile=LatencyProfile(error_rate=0.5), time_scale=0.0)
+        results = []
+        for _ in range(20):
+            try:
+                provider.chat(MESSAGES)
+                results.append(True)
+            except MockLLMError:
+                results.append(False)
+        return results
+
+    results = outcomes()
+    assert results == outcomes()
+    assert True in results and False in results
+
+
+def test_async_stream_yields_word_chunks():
+    provider = MockProvider(model="instant")
+
+    async def collect():
+        return [chunk async for chunk in provider.astream(MESSAGES)]
+
+    chunks = asyncio.run(collect())
+    assert len(chunks) > 1
+    assert "".join(chunks) == provider.chat(MESSAGES)
+
+
+def test_factory_and_narrator_config_select_mock(monkeypatch):
+    monkeypatch.setenv("MOCK_LLM_TIME_SCALE", "0")
+    monkeypatch.delenv("MOCK_LLM_PROFILE", raising=False)
+
+    provider = get_llm_provider(provider_type="mock", model="cloud")
+    assert isinstance(provider, MockProvider) and provider.time_scale == 0.0
+    assert provider.profile.tokens_per_second == 90.0
+
+    config = NarratorConfig(backend="mock")
+    assert config.model == "local"
+    assert isinstance(_get_provider(config), MockProvider)
+
+    with pytest.raises(ValueError):
+        get_llm_provider(provider_type="mock", model="llama3.1")
+
+
+def test_load_benchmark_runs_offline():
+    results = run_benchmark(sessions=3, turns=2, profile="instant", time_scale=0.0)
+
+    assert results["completed_turns"] == 6
+    assert results["errors"] == 0
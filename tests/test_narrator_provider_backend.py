@@ -1,7 +1,12 @@
+import asyncio
 import builtins
+import time
 
+from src.config import config as app_config
 from src.llm_provider import LLMProvider
-from src.narrator import NarratorConfig, _get_provider
+from src.narrator import NarratorConfig, _get_hedge_provider, _get_provider, agenerate_narrative
+from src.prompting import reset_latency_history
+from src.provider_health import StaticHealthMonitor, set_health_monitor
 
 
 class DummyProvider(LLMProvider):
@@ -48,3 +53,48 @@ def test_provider_selection_respects_config_backend(monkeypatch):
 
     assert isinstance(provider, DummyProvider)
     assert calls == [("gemini", "custom-model", None)]
+
+
+class PacedProvider(DummyProvider):
+    """Streams one sentence after ``first_token_delay`` seconds."""
+
+    def __init__(self, name, first_token_delay):
+        self._name = name
+        self.first_token_delay = first_token_delay
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def chat(self, messages, temperature=0.7, max_tokens=1024, stream=False):
+        self.calls += 1
+
+        def tokens():
+            time.sleep(self.first_token_delay)
+            yield f"The {self._name} channel crackles to life."
+
+        return tokens() if stream else "".join(tokens())
+
+
+def test_configured_hedge_races_a_backup_on_the_narrator_path(monkeypatch):
+    primary, backup = PacedProvider("gemini", 0.5), PacedProvider("ollama", 0.0)
+    providers = {"gemini": primary, "ollama": backup}
+    monkeypatch.setattr(
+        "src.narrator.get_llm_provider", lambda provider_type=None, model=None, api_key=None: providers[provider_type]
+    )
+    monkeypatch.setattr(app_config.llm, "hedge_backend", "ollama")
+    monkeypatch.setattr(app_config.llm, "hedge_default_delay", 0.05)
+    set_health_monitor(StaticHealthMonitor(online=True))
+    reset_latency_history()
+    try:
+        narrative = asyncio.run(agenerate_narrative("I hail the station", config=NarratorConfig(backend="gemini")))
+    finally:
+        set_health_monitor(None)
+
+    assert "ollama channel" in narrative
+    assert primary.calls == 1 and backup.calls == 1
+
+    monkeypatch.setattr(app_config.llm, "hedge_backend", "")
+    assert _get_provider(NarratorConfig(backend="gemini")) is primary
+    assert _get_hedge_provider(NarratorConfig(backend="gemini")) is None
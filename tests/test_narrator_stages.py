@@ -0,0 +1,119 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.game_state import create_initial_state
+from src.narrator_pipeline import NarrativeContext, StageCache, StageSpec, create_context_from_state, run_stages
+from src.narrator_stages import NARRATOR_STAGES
+
+
+def _sleeper(text: str, delay: float):
+    def render(ctx: NarrativeContext) -> str:
+        time.sleep(delay)
+        return text
+    return render
+
+
+def _boom(ctx: NarrativeContext) -> str:
+    raise RuntimeError("engine unavailable")
+
+
+def test_stage_output_follows_registry_order_not_completion_order():
+    stages = [
+        StageSpec("slow", _sleeper("A", 0.08)),
+        StageSpec("medium", _sleeper("B", 0.04)),
+        StageSpec("fast", _sleeper("C", 0.0)),
+    ]
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        start = time.perf_counter()
+        outcomes = run_stages(NarrativeContext(), stages, executor=pool)
+        elapsed = time.perf_counter() - start
+
+    assert "".join(o.output for o in outcomes) == "ABC"
+    assert [o.status for o in outcomes] == ["ok", "ok", "ok"]
+    # Ran concurrently: closer to the slowest stage than to the sum.
+    assert elapsed < 0.11
+
+
+def test_over_budget_and_failing_stages_are_skipped():
+    stages = [
+        StageSpec("quick", _sleeper("quick", 0.0)),
+        StageSpec("stalled", _sleeper("stalled", 0.5), budget_ms=50),
+        StageSpec("broken", _boom),
+        StageSpec("empty", _sleeper("", 0.0)),
+    ]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        start = time.perf_counter()
+        outcomes = run_stages(NarrativeContext(), stages, executor=pool)
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.3
+        assert {o.name: o.status for o in outcomes} == {
+            "quick": "ok",
+            "stalled": "timeout",
+            "broken": "error",
+            "empty": "empty",
+        }
+        assert "".join(o.output for o in outcomes) == "quick"
+
+
+def test_narrator_stages_assemble_in_registry_order():
+    state = create_initial_state("Kira")
+    state["messages"] = [{"role": "user", "content": "I scan the derelict"}]
+
+    outcomes = run_stages(create_context_from_state(state), NARRATOR_STAGES)
+    prompt = "".join(o.output for o in outcomes)
+
+    assert [o.name for o in outcomes] == [spec.name for spec in NARRATOR_STAGES]
+    sections = ["<narrative_craft>", "<world_truths>", "<environmental_storytelling>", "<style_examples>"]
+    positions = [prompt.index(section) for section in sections]
+    assert positions == sorted(positions)
+
+
+def test_memoized_stage_renders_once_per_distinct_inputs():
+    calls = []
+
+    def render(ctx: NarrativeContext) -> str:
+        calls.append(ctx.tone)
+        return f"<{ctx.tone}>"
+
+    stages = [StageSpec("tone", render, inputs=lambda ctx: (ctx.tone,))]
+    cache = StageCache(max_entries=1)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        first = run_stages(NarrativeContext(tone="grim"), stages, executor=pool, cache=cache)
+        again = run_stages(NarrativeContext(tone="grim"), stages, executor=pool, cache=cache)
+        other = run_stages(NarrativeContext(tone="hopeful"), stages, executor=pool, cache=cache)
+        evicted = run_stages(NarrativeContext(tone="grim"), stages, executor=pool, cache=cache)
+
+    assert [o[0].output for o in (first, again, other, evicted)] == ["<grim>", "<grim>", "<hopeful>", "<grim>"]
+    assert [o[0].cached for o in (first, again, other, evicted)] == [False, True, False, False]
+    assert calls == ["grim", "hopeful", "grim"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 3, 2)
+    assert stats["by_stage"]["tone"] == {"hits": 1, "misses": 3}
+
+
+def test_failed_stage_output_is_not_memoized():
+    stages = [StageSpec("broken", _boom, inputs=lambda ctx: ())]
+    cache = StageCache()
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        run_stages(NarrativeContext(), stages, executor=pool, cache=cache)
+        outcome = run_stages(NarrativeContext(), stages, executor=pool, cache=cache)[0]
+
+    assert outcome.status == "error"
+    assert cache.stats()["size"] == 0
+
+
+def test_new_player_sentence_only_rebuilds_dependent_stages():
+    state = create_initial_state("Kira")
+    cache = StageCache()
+
+    state["messages"] = [{"role": "user", "content": "I scan the derelict"}]
+    run_stages(create_context_from_state(state), NARRATOR_STAGES, cache=cache)
+    state["messages"] = [{"role": "user", "content": "I draw my blade"}]
+    outcomes = {o.name: o for o in run_stages(create_context_from_state(state), NARRATOR_STAGES, cache=cache)}
+
+    assert outcomes["campaign_truths"].cached
+    assert outcomes["style_examples"].cached
+    assert outcomes["environmental_storytelling"].cached
+    assert not outcomes["npc_barks"].cached
+    assert not outcomes["enhancements"].cached
@@ -0,0 +1,92 @@
+import pytest
+
+from scripts.benchmark_orchestrator_roundtrip import run_benchmark
+from src.narrative import NPCMemoryBank
+from src.narrative_orchestrator import NarrativeOrchestrator, NPCMemoryBanks
+
+NPCS = ["Ilsa Renn", "Captain Dorne"]
+
+
+def _played(turns: int = 6) -> dict:
+    orchestrator = NarrativeOrchestrator()
+    for turn in range(turns):
+        orchestrator.process_interaction(
+            player_input=f"I help Ilsa, I promise ({turn})",
+            narrative_output="Ilsa folds her arms. The reactor hums.",
+            location="Bleakhold Station",
+            active_npcs=[NPCS[turn % 2]],
+        )
+    return orchestrator.to_dict()
+
+
+def test_untouched_subsystems_stay_serialized_and_are_reused():
+    data = _played()
+    orchestrator = NarrativeOrchestrator.from_dict(data)
+
+    assert orchestrator.dirty_subsystems() == []
+    assert "bond_manager" not in vars(orchestrator)
+    untouched = orchestrator.to_dict()
+    assert untouched == data and untouched["bond_manager"] is data["bond_manager"]
+
+    orchestrator.phobia_system.add_phobia("Vacuum", ["airlock"])
+    assert orchestrator.dirty_subsystems() == ["phobia_system"]
+    changed = orchestrator.to_dict()
+
+    assert "Vacuum" in str(changed["phobia_system"]) and changed["story_graph"] is data["story_graph"]
+    assert orchestrator.subsystem_versions()["phobia_system"] == 1
+    assert orchestrator.subsystem_versions()["story_graph"] == 0
+    assert orchestrator.to_dict()["phobia_system"] is changed["phobia_system"]  # Parked, not re-serialized
+    assert NarrativeOrchestrator.from_dict(changed).phobia_system.to_dict() == changed["phobia_system"]
+
+
+def test_npc_memory_banks_hydrate_per_npc():
+    data = _played()
+    banks = NPCMemoryBanks.from_dict(data["npc_memories"])
+
+    assert "Ilsa Renn" in banks and len(banks) == 2 and list(banks) == NPCS
+    assert banks._entries["Ilsa Renn"][0] is None
+    banks["Ilsa Renn"].record_notable_event("Player assisted recently", 7)
+    banks["Vesna"] = NPCMemoryBank(npc_id="Vesna")
+
+    out = banks.to_dict()
+    assert out["Captain Dorne"] is data["npc_memories"]["Captain Dorne"]
+    assert out["Ilsa Renn"] is not data["npc_memories"]["Ilsa Renn"] and "Vesna" in out
+    assert banks._entries["Captain Dorne"][0] is None
+
+
+def test_lazy_turn_matches_a_fully_hydrated_one():
+    data = _played()
+    eager = NarrativeOrchestrator.from_dict(data)
+    for name in eager.subsystem_versions():
+        getattr(eager, name)
+    lazy = NarrativeOrchestrator.from_dict(data)
+
+    for orchestrator in (eager, lazy):
+        orchestrator.process_interaction(
+            player_input="I attack the drone",
+            narrative_output="Sparks rain from the conduit.",
+            location="Iron Drift",
+            active_npcs=["Captain Dorne"],
+        )
+
+    assert eager.to_dict() == lazy.to_dict()
+    assert lazy.dirty_subsystems() == []  # to_dict parks what the turn touched
+    with pytest.raises(AttributeError):
+        lazy.missing_system
+
+
+def test_plain_dict_of_memory_banks_still_serializes():
+    orchestrator = NarrativeOrchestrator()
+    orchestrator.npc_memories = {"Vesna": NPCMemoryBank(npc_id="Vesna")}
+
+    data = orchestrator.to_dict()
+
+    assert data["npc_memories"]["Vesna"]["npc_id"] == "Vesna"
+    assert list(NarrativeOrchestrator.from_dict(data).npc_memories) == ["Vesna"]
+
+
+def test_benchmark_lazy_turn_is_cheaper_and_identical():
+    results = run_benchmark(turns=120, npcs=12, repeat=3)
+
+    assert results["identical_output"]
+    assert results["lazy_round_trip"]["mean_ms"] < results["eager_round_trip"]["mean_ms"]
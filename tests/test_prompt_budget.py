@@ -0,0 +1,103 @@
+from src.memory import MemoryManager
+from src.narrator_pipeline import StageOutcome, StageSpec, stage_sections
+from src.prompt_budget import ApproxTokenCounter, PromptBudgetPacker, PromptSection
+
+
+def _block(tag, lines):
+    return f"\n\n<{tag}>\n" + "\n".join(f"- note {i} about the derelict freighter" for i in range(lines)) + f"\n</{tag}>"
+
+
+def test_approx_counter_scales_with_words_digits_and_punctuation():
+    counter = ApproxTokenCounter()
+
+    assert counter.count("") == 0
+    assert counter.count("The hull groans.") == 4
+    assert counter.count("cinematography") > counter.count("hull")
+    assert counter.count("1234567") == 3
+    assert counter.count("<memory_context>") > counter.count("memory context")
+
+
+def test_packer_keeps_priorities_and_reports_cuts():
+    counter = ApproxTokenCounter()
+    sections = [
+        PromptSection("flavour", _block("npc_barks", 40), priority=10),
+        PromptSection("system", "You are the narrator.", priority=100, min_share=1.0),
+        PromptSection("memory", _block("memory_context", 40), priority=80),
+    ]
+    budget = counter.count(sections[1].text) + counter.count(sections[2].text) + 5
+
+    result = PromptBudgetPacker(budget, counter=counter).pack(sections)
+
+    assert result.tokens <= budget
+    assert result.included == ["system", "memory"]
+    assert result.dropped == ["flavour"]
+    assert result.text == "You are the narrator." + sections[2].text
+
+
+def test_packer_truncates_inside_tags_and_preserves_order():
+    counter = ApproxTokenCounter()
+    sections = [
+        PromptSection("lore", _block("lorebook", 50), priority=40),
+        PromptSection("memory", _block("memory_context", 50), priority=80, max_share=0.5),
+    ]
+
+    result = PromptBudgetPacker(200, counter=counter).pack(sections)
+
+    assert result.included == ["lore", "memory"]
+    assert set(result.truncated) == {"lore", "memory"}
+    assert result.truncated["memory"][1] <= 100
+    assert result.tokens <= 200
+    assert result.text.index("<lorebook>") < result.text.index("<memory_context>")
+    assert result.text.count("</lorebook>") == 1 and result.text.count("</memory_context>") == 1
+
+
+def test_min_share_reserves_space_for_lower_priorities():
+    counter = ApproxTokenCounter()
+    sections = [
+        PromptSection("greedy", _block("enhancements", 80), priority=90),
+        PromptSection("truths", _block("campaign_truths", 80), priority=20, min_share=0.25),
+    ]
+
+    result = PromptBudgetPacker(400, counter=counter).pack(sections)
+
+    assert "truths" in result.included
+    assert result.truncated["truths"][1] >= 80
+
+
+def test_stage_sections_carry_stage_budget_settings():
+    stages = [
+        StageSpec("memory_context", lambda ctx: "", priority=85, min_share=0.05, max_share=0.2),
+        StageSpec("npc_barks", lambda ctx: "", priority=30),
+    ]
+    outcomes = [StageOutcome("memory_context", "ok", 1.0, "\n\n<m>\nx\n</m>"), StageOutcome("npc_barks", "empty", 1.0)]
+
+    sections = stage_sections(stages, outcomes)
+
+    assert [(s.name, s.priority, s.min_share, s.max_share) for s in sections] == [("memory_context", 85, 0.05, 0.2)]
+
+
+def test_memory_context_respects_token_budget():
+    memory = MemoryManager()
+    memory.active.current_scene = "The reactor hums beneath the deck plates. " * 200
+    memory.session.scene_summaries = ["Kade bargained for fuel at Bleakhold."] * 3
+    memory.campaign.major_beats = ["Swore to find the lost colony."]
+
+    packed = memory.pack_narrator_context(token_budget=200)
+
+    assert packed.tokens <= 200
+    assert packed.included == ["active", "session", "campaign"]
+    assert "active" in packed.truncated
+    assert memory.build_narrator_context(token_budget=200) == packed.text
+
+
+def test_stable_sections_are_laid_out_first():
+    from src.prompt_budget import order_by_stability
+
+    sections = [
+        PromptSection("director", "pacing", volatility=2),
+        PromptSection("system", "rules", volatility=0),
+        PromptSection("voices", "voices", volatility=1),
+        PromptSection("barks", "barks", volatility=2),
+    ]
+
+    assert [s.name for s in order_by_stability(sections)] == ["system", "voices", "director", "barks"]
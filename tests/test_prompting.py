@@ -18,18 +18,19 @@ def test_context_format_includes_hooks():
 
     messages = build_narrator_messages("Seal the breach before it vents.", context)
 
-    # System + context + prior exchange + user prompt
+    # System + prior exchange + context + user prompt (most to least stable)
     assert messages[0]["role"] == "system"
     assert SYSTEM_PROMPT in messages[0]["content"]
+    assert messages[1] == {"role": "assistant", "content": "The bulkhead is failing."}
 
-    context_message = messages[1]["content"]
+    context_message = messages[-2]["content"]
     assert "[Scene]" in context_message
     assert "[Move Outcome]" in context_message
     assert "Datasworn" in context_message
     assert "[Oracle Insights]" in context_message
     assert "Recent Table Chat" in context_message
+    assert context_message.index("[Recent Table Chat]") < context_message.index("[Move Outcome]")
 
-    assert messages[-2] == {"role": "assistant", "content": "The bulkhead is failing."}
     assert messages[-1]["content"].startswith("Seal the breach")
 
 
@@ -57,3 +58,50 @@ def test_context_handles_empty_sections():
     assert len(messages) == 2
     assert messages[0]["role"] == "system"
     assert messages[1]["content"] == "Describe the void."
+
+
+def test_consecutive_turns_share_a_growing_prefix():
+    from src.prompt_budget import ApproxTokenCounter
+    from src.prompting import PrefixReuseTracker
+
+    tracker = PrefixReuseTracker(counter=ApproxTokenCounter())
+    history = []
+    reuse = []
+    for turn, roll in enumerate(["Strong Hit", "Miss", "Weak Hit"]):
+        context = PromptContext(scene_summary="Derelict station.", move_outcome=roll, prior_exchanges=list(history))
+        reuse.append(tracker.observe("session-a", build_narrator_messages(f"Turn {turn}", context)))
+        history += [{"role": "user", "content": f"Turn {turn}"}, {"role": "assistant", "content": f"Reply {turn}."}]
+
+    assert reuse[0][0] == 0
+    # Everything up to the previous turn's history is reused.
+    assert reuse[1][0] < reuse[2][0] < reuse[2][1]
+    assert tracker.observe("session-b", build_narrator_messages("Turn 0", PromptContext()))[0] == 0
+
+
+def test_narrative_prompt_puts_stable_segments_first():
+    from src.narrator import build_narrative_prompt
+
+    prompt = build_narrative_prompt(
+        player_input="I vent the airlock",
+        roll_result="Miss",
+        outcome="miss",
+        location="Bleakhold Station",
+        context="The lights stutter.",
+        guardrail_packet="[Context packet]",
+        guardrail_rules="[Guardrails]",
+    )
+
+    order = ["[Guardrails]", "[Character:", "[Current location:", "[Previous scene]", "[Context packet]", "[Player action]", "[Dice result]"]
+    positions = [prompt.index(marker) for marker in order]
+    assert positions == sorted(positions)
+
+
+def test_prefix_reuse_benchmark_favours_stable_layout():
+    from scripts.benchmark_prefix_reuse import run_benchmark
+
+    results = run_benchmark(turns=12)
+
+    assert set(results) == {"narrative_prompt", "chat_messages"}
+    for scenario in results.values():
+        assert scenario["stable"]["reuse_ratio"] > scenario["legacy"]["reuse_ratio"]
+        assert scenario["est_saved_ms"] > 0
@@ -12,6 +12,7 @@ from src.prompting import (
     execute_prompt_with_fallback,
     reset_circuit_breakers,
 )
+from src.provider_health import StaticHealthMonitor, set_health_monitor
 
 
 class StubProvider(LLMProvider):
@@ -46,6 +47,11 @@ class StubProvider(LLMProvider):
 def setup_function(_function):
     reset_circuit_breakers()
     clear_prompt_metrics()
+    set_health_monitor(StaticHealthMonitor(online=True))
+
+
+def teardown_function(_function):
+    set_health_monitor(None)
 
 
 def test_prompt_construction_deterministic():
@@ -103,3 +109,108 @@ def test_capability_filtering_prefers_suitable_provider():
 
     assert response.startswith("strong:")
     assert weak.calls == 0
+
+
+class StreamingStub(StubProvider):
+    """Streams words, sleeping ``first_token_delay`` before the first one."""
+
+    def __init__(self, name, first_token_delay=0.0, words=("alpha", "beta", "gamma", "delta"), fail=False):
+        super().__init__(name, LLMCapabilities(max_output_tokens=1024, safety_features=[], cost_per_1k_tokens=0))
+        self.first_token_delay = first_token_delay
+        self.words = words
+        self.fail = fail
+        self.yielded = 0
+
+    def chat(self, messages, temperature=0.7, max_tokens=1024, stream=False):  # noqa: ARG002
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError(f"{self._name} is down")
+
+        def tokens():
+            time.sleep(self.first_token_delay)
+            for word in self.words:
+                self.yielded += 1
+                yield f"{self._name}-{word} "
+                time.sleep(0.02)
+
+        return tokens() if stream else "".join(tokens())
+
+
+def _hedged(providers, tmp_path, policy):
+    from src.cache import PromptResultCache
+
+    return execute_prompt_with_fallback(
+        "Outrun the storm.",
+        providers=providers,
+        capability_request=CapabilityRequest(min_output_tokens=64),
+        prompt_cache=PromptResultCache(directory=tmp_path),
+        connectivity_check=lambda: True,
+        hedge=policy,
+    )
+
+
+def _events(name):
+    return [m for m in recent_prompt_metrics() if m["event"] == name]
+
+
+def test_hedge_fires_for_slow_primary_and_cancels_loser(tmp_path):
+    from src.prompting import HedgePolicy, reset_latency_history
+
+    reset_latency_history()
+    slow = StreamingStub("slow", first_token_delay=0.3)
+    fast = StreamingStub("fast")
+
+    response = _hedged([slow, fast], tmp_path, HedgePolicy(default_delay=0.05))
+
+    assert response.startswith("fast-alpha")
+    assert len(_events("hedge_fired")) == 1
+    assert _events("hedge_win")[0]["metadata"]["role"] == "secondary"
+
+    time.sleep(0.4)
+    # The loser stopped pulling tokens once it lost the race
+    assert slow.yielded < len(slow.words)
+
+
+def test_hedge_not_fired_when_primary_answers_in_time(tmp_path):
+    from src.prompting import HedgePolicy
+
+    primary = StreamingStub("primary")
+    backup = StreamingStub("backup")
+
+    response = _hedged([primary, backup], tmp_path, HedgePolicy(default_delay=0.5))
+
+    assert response.startswith("primary-alpha")
+    assert backup.calls == 0
+    assert len(_events("hedge_not_fired")) == 1
+    assert _events("hedge_win") == []
+
+
+def test_failed_primary_hands_over_without_waiting_for_hedge_delay(tmp_path):
+    from src.prompting import HedgePolicy
+
+    broken = StreamingStub("broken", fail=True)
+    backup = StreamingStub("backup")
+
+    start = time.perf_counter()
+    response = _hedged([broken, backup], tmp_path, HedgePolicy(default_delay=2.0))
+
+    assert response.startswith("backup-alpha")
+    assert time.perf_counter() - start < 1.0
+    assert _events("hedge_fired") == []
+
+
+def test_hedge_delay_tracks_first_token_quantile():
+    from src.prompting import HedgePolicy, _record_first_token, reset_latency_history
+
+    reset_latency_history()
+    policy = HedgePolicy(quantile=0.95, min_delay=0.1, max_delay=2.0, default_delay=1.5, min_samples=5)
+    assert policy.delay_for("ollama") == 1.5
+
+    for latency in [0.2] * 18 + [0.9, 3.0]:
+        _record_first_token("ollama", latency)
+    assert policy.delay_for("ollama") == 2.0  # p95 sample clamped to max_delay
+
+    reset_latency_history()
+    for latency in [0.01] * 10:
+        _record_first_token("ollama", latency)
+    assert policy.delay_for("ollama") == 0.1
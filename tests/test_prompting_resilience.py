@@ -1,6 +1,11 @@
+import threading
+import time
+
 import pytest
 
 from src.cache import PromptResultCache
+from src.config import config
+from src.feedback_learning import clear_prompt_metrics, recent_prompt_metrics
 from src.llm_provider import LLMCapabilities, LLMProvider
 from src.prompting import CapabilityRequest, PromptContext, execute_prompt_with_fallback, reset_circuit_breakers
 
@@ -116,3 +121,138 @@ def test_provider_success_stores_cache(tmp_path):
         connectivity_check=lambda: True,
     )
     assert result == again
+
+
+class GatedProvider(EchoProvider):
+    """Echo provider that blocks until released, counting calls."""
+
+    def __init__(self, name="gated", error: BaseException | None = None):
+        super().__init__(name)
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+        self.error = error
+
+    def chat(self, messages, temperature=0.7, max_tokens=1024, stream=False):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return super().chat(messages, temperature, max_tokens, stream)
+
+
+def _run_concurrently(provider, cache, count, **kwargs):
+    """Start one leader, wait until it is inside the provider, then add followers."""
+    clear_prompt_metrics()
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(execute_prompt_with_fallback(
+                "Hail the derelict",
+                context=PromptContext(scene_summary="Dead hulk"),
+                providers=[provider],
+                capability_request=CapabilityRequest(min_output_tokens=64, allow_streaming=False),
+                prompt_cache=cache,
+                connectivity_check=lambda: True,
+                **kwargs,
+            ))
+        except BaseException as exc:  # noqa: BLE001 - collected for assertions
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    assert provider.started.wait(5)
+    threads += [threading.Thread(target=call) for _ in range(count - 1)]
+    for thread in threads[1:]:
+        thread.start()
+
+    deadline = time.time() + 5
+    while sum(m["event"] == "prompt_coalesced" for m in recent_prompt_metrics()) < count - 1:
+        assert time.time() < deadline
+        time.sleep(0.005)
+    return threads, results, errors
+
+
+def test_identical_concurrent_prompts_share_one_provider_call(tmp_path):
+    provider = GatedProvider()
+    threads, results, errors = _run_concurrently(provider, PromptResultCache(directory=tmp_path), 4)
+    provider.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert provider.calls == 1
+    assert errors == []
+    assert len(results) == 4 and len(set(results)) == 1
+
+
+def test_leader_failure_propagates_to_followers(tmp_path):
+    class Cancelled(BaseException):
+        pass
+
+    provider = GatedProvider(error=Cancelled())
+    threads, results, errors = _run_concurrently(provider, PromptResultCache(directory=tmp_path), 2)
+    provider.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert provider.calls == 1
+    assert results == []
+    assert len(errors) == 2 and all(isinstance(e, Cancelled) for e in errors)
+
+
+def test_follower_timeout_does_not_cancel_leader(tmp_path):
+    provider = GatedProvider()
+    cache = PromptResultCache(directory=tmp_path)
+    threads, results, errors = _run_concurrently(provider, cache, 2, coalesce_timeout=0.05)
+    threads[1].join(5)
+
+    assert len(errors) == 1 and isinstance(errors[0], TimeoutError)
+
+    provider.release.set()
+    threads[0].join(5)
+    assert len(results) == 1
+    assert cache.get_prompt("Hail the derelict", PromptContext(scene_summary="Dead hulk")) == results[0]
+
+
+def test_default_coalesce_timeout_comes_from_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config.llm, "prompt_coalesce_timeout", 0.05)
+    provider = GatedProvider()
+    threads, results, errors = _run_concurrently(provider, PromptResultCache(directory=tmp_path), 2)
+    threads[1].join(5)
+
+    assert len(errors) == 1 and isinstance(errors[0], TimeoutError)
+    provider.release.set()
+    threads[0].join(5)
+
+
+def test_prompts_with_different_generation_settings_do_not_share_a_call(tmp_path):
+    provider = GatedProvider()
+    cache = PromptResultCache(directory=tmp_path)
+    results = []
+
+    def call(**kwargs):
+        results.append(execute_prompt_with_fallback(
+            "Hail the derelict",
+            context=PromptContext(scene_summary="Dead hulk"),
+            providers=[provider],
+            capability_request=CapabilityRequest(min_output_tokens=64, allow_streaming=False),
+            prompt_cache=cache,
+            connectivity_check=lambda: True,
+            **kwargs,
+        ))
+
+    threads = [threading.Thread(target=call, kwargs=kwargs) for kwargs in ({"temperature": 0.2}, {"max_tokens": 64})]
+    threads[0].start()
+    assert provider.started.wait(5)
+    threads[1].start()
+    deadline = time.time() + 5
+    while provider.calls < 2:
+        assert time.time() < deadline
+        time.sleep(0.005)
+    provider.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert provider.calls == 2 and len(results) == 2
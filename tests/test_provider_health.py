@@ -0,0 +1,121 @@
+import time
+
+import pytest
+
+from src.cache import PromptResultCache
+from src.feedback_learning import clear_prompt_metrics, recent_prompt_metrics
+from src.narrator import NarratorConfig, check_provider_availability
+from src.prompting import CapabilityRequest, CircuitBreaker, _get_breaker, execute_prompt_with_fallback, reset_circuit_breakers
+from src.provider_health import ProviderHealthMonitor, StaticHealthMonitor, set_health_monitor
+from tests.test_prompting_resilience import EchoProvider
+
+
+class CountingProvider(EchoProvider):
+    def __init__(self, name="counting", available=True):
+        super().__init__(name)
+        self.available = available
+        self.probes = 0
+
+    def is_available(self) -> bool:
+        self.probes += 1
+        return self.available
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    reset_circuit_breakers()
+    clear_prompt_metrics()
+    yield
+    set_health_monitor(None)
+    reset_circuit_breakers()
+
+
+def test_provider_status_is_probed_once_then_cached():
+    monitor = ProviderHealthMonitor(interval=60, connectivity_probe=lambda: True)
+    provider = CountingProvider()
+
+    first = monitor.provider_status(provider)
+    second = monitor.provider_status(provider)
+
+    assert first.reachable and second.reachable
+    assert provider.probes == 1
+    assert second.latency_ms is not None
+
+
+def test_background_thread_refreshes_connectivity_and_providers():
+    online = {"value": True}
+    monitor = ProviderHealthMonitor(interval=0.02, connectivity_probe=lambda: online["value"])
+    provider = CountingProvider()
+    monitor.register(provider)
+    monitor.start()
+    try:
+        assert _wait_for(lambda: monitor.status("counting") is not None)
+        assert monitor.is_online()
+
+        online["value"] = False
+        provider.available = False
+        assert _wait_for(lambda: not monitor.is_online() and not monitor.status("counting").reachable)
+    finally:
+        monitor.stop()
+
+
+def test_status_reports_open_circuit_breaker():
+    monitor = StaticHealthMonitor()
+    monitor.provider_status(CountingProvider("flaky"))
+
+    breaker = _get_breaker("flaky", config=CircuitBreaker(max_failures=1))
+    breaker.record_failure(0.1, "boom")
+
+    assert monitor.status("flaky").breaker_open
+
+
+def test_observed_failures_keep_reachability_and_smooth_latency():
+    monitor = StaticHealthMonitor(latency_ms=100.0)
+    monitor.provider_status(CountingProvider("remote"))
+
+    monitor.observe("remote", 0.2, success=False, error="timeout")
+    status = monitor.status("remote")
+
+    assert status.reachable
+    assert status.error == "timeout"
+    assert 100.0 < status.latency_ms < 200.0
+
+
+def test_offline_stand_in_skips_providers_without_probing(tmp_path):
+    set_health_monitor(StaticHealthMonitor(online=False))
+    provider = CountingProvider()
+
+    start = time.perf_counter()
+    response = execute_prompt_with_fallback(
+        "Hail the station.",
+        providers=[provider],
+        capability_request=CapabilityRequest(min_output_tokens=64, allow_streaming=False),
+        prompt_cache=PromptResultCache(directory=tmp_path),
+    )
+
+    assert response.startswith("[offline narrator]")
+    assert time.perf_counter() - start < 0.5
+    assert any(m["event"] == "connectivity_offline" for m in recent_prompt_metrics())
+
+
+def test_check_provider_availability_reads_cached_status():
+    monitor = StaticHealthMonitor()
+    set_health_monitor(monitor)
+    provider = CountingProvider("Ollama (llama3.1)")
+
+    assert check_provider_availability(NarratorConfig(backend="ollama"), provider)[0]
+
+    monitor.set_available("Ollama (llama3.1)", False)
+    available, message = check_provider_availability(NarratorConfig(backend="ollama"), provider)
+    assert not available
+    assert "Ollama" in message
+    assert provider.probes == 0
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from scripts.benchmark_loop_lag import run_benchmark
+from src import server
+from src.director import DirectorAgent, DirectorPlan, Pacing
+from src.game_state import create_initial_state
+from src.request_execution import BlockingPool, LoopLagMonitor, SessionLocks
+
+
+def test_blocking_pool_runs_off_the_loop_and_reports_queue_depth():
+    pool = BlockingPool(workers=1)
+    release = threading.Event()
+
+    async def scenario():
+        loop_thread = threading.get_ident()
+        first = asyncio.ensure_future(pool.run(lambda: release.wait(5) and threading.get_ident()))
+        queued = [asyncio.ensure_future(pool.run(lambda x: x * 2, n)) for n in range(3)]
+        await asyncio.sleep(0.05)
+        depth = pool.stats()["queue_depth"]
+        release.set()
+        worker = await first
+        return loop_thread, worker, depth, await asyncio.gather(*queued)
+
+    loop_thread, worker, depth, doubled = asyncio.run(scenario())
+
+    assert worker != loop_thread
+    assert depth == 3
+    assert doubled == [0, 2, 4]
+    stats = pool.stats()
+    assert stats["completed"] == 4 and stats["peak_queue_depth"] >= 3 and stats["queue_depth"] == 0
+
+
+def test_session_locks_serialize_one_session_only():
+    locks = SessionLocks()
+    events = []
+
+    async def turn(session_id, name):
+        async with locks.hold(session_id):
+            events.append(f"{name} start")
+            await asyncio.sleep(0.02)
+            events.append(f"{name} end")
+
+    async def scenario():
+        await asyncio.gather(turn("a", "a1"), turn("a", "a2"), turn("b", "b1"))
+
+    asyncio.run(scenario())
+
+    assert events.index("a1 end") < events.index("a2 start")
+    assert events.index("b1 start") < events.index("a1 end")
+    assert locks.stats()["contended"] == 1
+
+
+def test_loop_lag_monitor_sees_a_blocked_loop():
+    async def scenario():
+        monitor = LoopLagMonitor(interval_ms=5.0)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        time.sleep(0.05)  # Block the loop
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["max_ms"] >= 30.0
+
+
+def test_concurrent_chats_for_one_session_do_not_interleave(monkeypatch):
+    active = []
+    overlaps = []
+
+    async def fake_narrative(**kwargs):
+        active.append(kwargs["player_input"])
+        overlaps.append(len(active))
+        await asyncio.sleep(0.02)
+        active.remove(kwargs["player_input"])
+        return f"Narrated: {kwargs['player_input']}"
+
+    async def no_image(location, narrative, time_of_day, weather):
+        return None
+
+    monkeypatch.setattr(server, "agenerate_narrative", fake_narrative)
+    monkeypatch.setattr(server, "_render_scene_image", no_image)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    monkeypatch.setattr(server.config.narrative, "speculation_enabled", False)
+    server.SESSIONS["locked"] = create_initial_state("Kira")
+
+    async def scenario():
+        requests = [server.ActionRequest(session_id="locked", action=f"Action {n}") for n in range(3)]
+        return await asyncio.gather(*(server.chat(req) for req in requests))
+
+    responses = asyncio.run(scenario())
+
+    assert overlaps == [1, 1, 1]
+    assert [json.loads(r.body)["narrative"] for r in responses] == ["Narrated: Action 0", "Narrated: Action 1", "Narrated: Action 2"]
+    del server.SESSIONS["locked"]
+
+
+def test_runtime_metrics_endpoint():
+    response = TestClient(server.app).get("/api/metrics/runtime")
+
+    assert response.status_code == 200
+    assert {"event_loop_lag", "offload", "session_locks", "sessions", "speculation"} <= set(response.json())
+
+
+def test_benchmark_offload_keeps_loop_lag_low():
+    results = run_benchmark(requests=8, narrator_ms=20.0, blocking_io_ms=20.0, workers=4)
+
+    assert results["offloaded"]["event_loop_lag"]["max_ms"] < results["inline"]["event_loop_lag"]["max_ms"]
+    assert results["offloaded"]["offload"]["completed"] == 16
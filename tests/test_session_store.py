@@ -0,0 +1,165 @@
+import sqlite3
+import threading
+import zlib
+from enum import Enum
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import server
+from src.game_state import create_initial_state
+from src.session_store import SessionStore, decode_state, encode_state
+
+
+def _stored(path, session_id):
+    conn = sqlite3.connect(str(path))
+    try:
+        version, blob = conn.execute(
+            "SELECT version, data FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+    finally:
+        conn.close()
+    return version, decode_state(blob)
+
+
+def test_state_round_trips_in_compact_form():
+    state = create_initial_state("Kira")
+    state["world"].current_location = "Bleakhold"
+    state["starmap"] = {"sectors": ["Ashen Drift"]}
+
+    blob = encode_state(state)
+    restored = decode_state(blob)
+
+    assert restored == state
+    assert type(restored["psyche"].profile) is type(state["psyche"].profile)
+    assert len(blob) < len(zlib.decompress(blob)) / 2
+
+
+def test_encoding_rejects_values_that_would_not_round_trip():
+    class Mood(Enum):
+        CALM = "calm"
+
+    state = create_initial_state("Kira")
+    state["mood"] = Mood.CALM
+    assert decode_state(encode_state(state))["mood"] == "calm"
+
+    state["seen"] = {"Bleakhold"}
+    with pytest.raises(TypeError, match="set"):
+        encode_state(state)
+
+
+def test_memory_is_bounded_and_cold_sessions_load_on_access(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db", max_hot=2)
+    for index in range(5):
+        store[f"s{index}"] = create_initial_state(f"Pilot {index}")
+
+    assert store.hot_sessions() == ["s3", "s4"]
+    assert len(store) == 5 and "s0" in store and "missing" not in store
+
+    state = store["s0"]
+    assert state["character"].name == "Pilot 0"
+    assert store.hot_sessions() == ["s4", "s0"]
+    assert store.stats()["loads"] == 1
+
+
+def test_in_place_changes_survive_eviction_and_sync_skips_unchanged(tmp_path):
+    path = tmp_path / "sessions.db"
+    store = SessionStore(path, max_hot=1)
+    store["a"] = create_initial_state("Kira")
+
+    with store.tracking() as touched:
+        store["a"]["world"].current_location = "Iron Drift"
+    assert touched == {"a"}
+    assert store.sync(touched) == 1
+    assert store.sync(touched) == 0
+
+    store["a"]["narrative"].pending_narrative = "Sparks rain down."
+    store["b"] = create_initial_state("Dorne")  # Evicts "a", writing it back
+
+    version, state = _stored(path, "a")
+    assert version == 3
+    assert state["world"].current_location == "Iron Drift"
+    assert state["narrative"].pending_narrative == "Sparks rain down."
+
+
+def test_sessions_in_use_are_not_evicted(tmp_path):
+    store = SessionStore(tmp_path / "sessions.db", max_hot=1)
+    store["a"] = create_initial_state("Kira")
+    store["b"] = create_initial_state("Dorne")
+    store["c"] = create_initial_state("Vex")
+    other_request = threading.Thread(target=lambda: [store["b"], store["c"]])
+
+    with store.pinned("b"), store.tracking():
+        state = store["a"]
+        other_request.start()
+        other_request.join()
+        assert store.hot_sessions() == ["a", "b", "c"]
+        state["world"].current_location = "Iron Drift"
+        assert store["a"] is state
+        assert store.stats()["pinned"] == 2
+
+    store["d"] = create_initial_state("Asha")
+    assert store.hot_sessions() == ["d"] and store.stats()["pinned"] == 0
+    assert _stored(tmp_path / "sessions.db", "a")[1]["world"].current_location == "Iron Drift"
+
+
+def test_workers_sharing_a_file_see_each_others_writes(tmp_path):
+    path = tmp_path / "sessions.db"
+    first = SessionStore(path)
+    second = SessionStore(path)
+
+    first["shared"] = create_initial_state("Kira")
+    assert second["shared"]["character"].name == "Kira"
+
+    second["shared"]["world"].current_location = "The Forge"
+    second.sync(["shared"])
+
+    assert first["shared"]["world"].current_location == "The Forge"
+
+
+def test_concurrent_write_back_keeps_the_first_writer(tmp_path):
+    path = tmp_path / "sessions.db"
+    first = SessionStore(path)
+    second = SessionStore(path)
+    first["shared"] = create_initial_state("Kira")
+    second["shared"]
+
+    first["shared"]["world"].current_location = "The Forge"
+    second["shared"]["world"].current_location = "Iron Drift"
+    assert second.sync(["shared"]) == 1
+    assert first.sync(["shared"]) == 0
+
+    version, state = _stored(path, "shared")
+    assert version == 2 and state["world"].current_location == "Iron Drift"
+    assert first.stats()["conflicts"] == 1
+    assert first["shared"]["world"].current_location == "Iron Drift"  # Reloaded, not clobbered
+
+
+def test_stored_version_is_checked_once_per_tracked_request(tmp_path):
+    path = tmp_path / "sessions.db"
+    first = SessionStore(path)
+    second = SessionStore(path)
+    first["shared"] = create_initial_state("Kira")
+    second["shared"]["world"].current_location = "The Forge"
+
+    with first.tracking():
+        assert first["shared"]["world"].current_location != "The Forge"
+        second.sync(["shared"])
+        assert first["shared"]["world"].current_location != "The Forge"  # Same request, same copy
+    assert first["shared"]["world"].current_location == "The Forge"
+
+
+def test_server_writes_back_sessions_a_request_changed():
+    session_id = "store-roundtrip"
+    server.SESSIONS[session_id] = create_initial_state("Kira")
+    client = TestClient(server.app)
+
+    response = client.post(
+        "/api/psychology/phobia/add",
+        json={"session_id": session_id, "name": "Vacuum", "triggers": ["airlock"]},
+    )
+
+    assert response.status_code == 200
+    _, state = _stored(server.SESSIONS.path, session_id)
+    assert "Vacuum" in str(state["narrative_orchestrator"].orchestrator_data)
+    del server.SESSIONS[session_id]
@@ -0,0 +1,135 @@
+import random
+import threading
+
+from src import server
+from src.director import DirectorAgent, DirectorPlan, Pacing
+from src.game_state import create_initial_state
+from src.narrative_orchestrator import NarrativeOrchestrator
+from src.speculation import SpeculationCache, state_fingerprint
+
+
+def test_matching_fingerprint_is_a_hit_and_is_consumed():
+    cache = SpeculationCache()
+    cache.schedule("s", "fp", lambda: "prepared").result(timeout=5)
+
+    assert cache.take("s", "fp", timeout=5) == "prepared"
+    assert cache.take("s", "fp", timeout=5) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_state_change_makes_entry_stale():
+    cache = SpeculationCache()
+    state = {"location": "Bleakhold"}
+    cache.schedule("s", state_fingerprint(state), lambda: "prepared")
+
+    state["location"] = "Iron Drift"
+    assert cache.take("s", state_fingerprint(state), timeout=5) is None
+    assert cache.stats()["stale"] == 1
+
+
+def test_same_fingerprint_is_not_recomputed_and_failures_miss():
+    cache = SpeculationCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "prepared"
+
+    first = cache.schedule("s", "fp", prepare)
+    assert cache.schedule("s", "fp", prepare) is first
+    assert started.wait(5)
+    release.set()
+    assert cache.take("s", "fp", timeout=5) == "prepared"
+    assert len(calls) == 1
+
+    failing = cache.schedule("s", "fp", lambda: 1 / 0)
+    failing.exception(timeout=5)
+    assert cache.take("s", "fp", timeout=5) is None
+
+
+def test_callable_fingerprint_is_computed_off_the_caller_thread():
+    cache = SpeculationCache()
+    threads = []
+
+    def fingerprint():
+        threads.append(threading.current_thread().name)
+        return "fp"
+
+    cache.schedule("s", fingerprint, lambda: "prepared").result(timeout=5)
+    assert cache.take("s", "fp", timeout=5) == "prepared"
+    assert threads and threads[0].startswith("speculation")
+
+    cache.schedule("s", fingerprint, lambda: "prepared").result(timeout=5)
+    assert cache.take("s", "other", timeout=5) is None
+    cache.schedule("s", lambda: 1 / 0, lambda: "prepared").exception(timeout=5)
+    assert cache.take("s", "fp", timeout=5) is None
+    assert (cache.hits, cache.stale, cache.misses) == (1, 1, 1)
+
+
+def test_queued_speculation_is_dropped_instead_of_waited_on():
+    cache = SpeculationCache(workers=1)
+    release = threading.Event()
+    busy = cache.schedule("other", "fp", lambda: release.wait(5))
+    queued = cache.schedule("s", "fp", lambda: "prepared")
+
+    assert cache.take("s", "fp", timeout=5) is None
+    assert queued.cancelled() and cache.misses == 1
+    release.set()
+    busy.result(timeout=5)
+
+
+def _deterministic_imagery(monkeypatch):
+    # Guidance samples its imagery from the global random module, which
+    # background threads of other tests may also draw from.
+    monkeypatch.setattr(random, "choice", lambda seq: seq[0])
+    monkeypatch.setattr(random, "sample", lambda population, k: list(population)[:k])
+
+
+def test_base_and_action_guidance_make_up_the_full_guidance(monkeypatch):
+    _deterministic_imagery(monkeypatch)
+    # Guidance records the imagery it used, so compare fresh orchestrators.
+    full = NarrativeOrchestrator().get_comprehensive_guidance("Bleakhold", ["Ilsa"], "I ask Ilsa about the crates")
+    orchestrator = NarrativeOrchestrator()
+    base = orchestrator.get_base_guidance("Bleakhold", ["Ilsa"])
+    action = orchestrator.get_action_guidance(["Ilsa"], "I ask Ilsa about the crates")
+
+    assert full == (f"{base}\\n{action}" if action else base)
+
+
+def test_prepared_turn_leaves_state_untouched_until_begun(monkeypatch):
+    _deterministic_imagery(monkeypatch)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    state = create_initial_state("Kira")
+    before = server._turn_fingerprint(state)
+
+    prepared = server._prepare_chat_turn(state)
+    assert server._turn_fingerprint(state) == before
+
+    turn = server._begin_chat_turn(state, "Brace the hatch", prepared)
+    inline = server._begin_chat_turn(state, "Brace the hatch")
+    assert turn.director_plan is prepared.director_plan
+    assert turn.context == inline.context
+
+
+def test_chat_uses_turn_prepared_after_previous_one(monkeypatch):
+    analyses = []
+
+    def fake_analyze(self, **kwargs):
+        analyses.append(kwargs)
+        return DirectorPlan(pacing=Pacing.FAST)
+
+    monkeypatch.setattr(DirectorAgent, "analyze", fake_analyze)
+    monkeypatch.setattr(server, "SPECULATION", SpeculationCache())
+    state = create_initial_state("Kira")
+
+    server._speculate_next_turn("spec", state).result(timeout=5)
+    assert isinstance(server._take_prepared_turn("spec", state), server.PreparedTurn)
+    assert len(analyses) == 1
+
+    server._speculate_next_turn("spec", state).result(timeout=5)  # Fingerprinted and prepared
+    state["narrative"].pending_narrative = "Something changed."
+    assert server._take_prepared_turn("spec", state) is None
+    assert server.SPECULATION.stats()["hits"] == 1
@@ -0,0 +1,122 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from scripts.benchmark_state_delta import run_benchmark
+from src import server
+from src.director import DirectorAgent, DirectorPlan, Pacing
+from src.game_state import create_initial_state
+from src.state_delta import StateVersions, apply_patch, diff, etag_matches
+
+
+def test_diff_produces_patches_that_apply():
+    old = {
+        "a/b": 1,
+        "gone": True,
+        "log": ["x", "y"],
+        "window": [1, 2, 3, 4],
+        "tags": ["red", "blue"],
+        "nested": {"n": 1},
+    }
+    new = {
+        "a/b": 2,
+        "log": ["x", "y", "z"],
+        "window": [2, 3, 4, 5],
+        "tags": ["green"],
+        "nested": {"n": 1, "m": {"deep": None}},
+    }
+
+    ops = diff(old, new)
+
+    assert apply_patch(old, ops) == new
+    assert {"op": "remove", "path": "/gone"} in ops
+    assert {"op": "replace", "path": "/a~1b", "value": 2} in ops
+    assert {"op": "add", "path": "/log/-", "value": "z"} in ops
+    assert [op["op"] for op in ops if op["path"].startswith("/window")] == ["remove", "add"]
+    assert {"op": "replace", "path": "/tags", "value": ["green"]} in ops
+    assert diff(new, new) == []
+
+
+def test_versions_advance_on_change_and_chain_patches():
+    versions = StateVersions(history=2)
+    state = create_initial_state("Kira")
+
+    first = versions.snapshot("s", state)
+    assert versions.snapshot("s", state).version == first.version == 1
+
+    bodies = [first.body]
+    for location in ["Iron Drift", "The Forge", "Ashen Reach"]:
+        state["world"].current_location = location
+        bodies.append(versions.snapshot("s", state).body)
+    latest = versions.snapshot("s", state)
+
+    assert latest.version == 4
+    second_etag = StateVersions.encode(json.loads(bodies[1]))[2]
+    assert apply_patch(json.loads(bodies[1]), versions.patch_since("s", second_etag)) == latest.document
+    assert versions.patch_since("s", first.etag) is None  # Older than the history
+    assert versions.patch_since("s", latest.etag) == []
+    assert versions.patch_since("other", latest.etag) is None
+    assert etag_matches(f'"stale", {latest.etag}', latest.etag) and not etag_matches(None, latest.etag)
+
+
+def test_state_endpoint_etags_and_deltas():
+    session_id = "delta-state"
+    server.SESSIONS[session_id] = create_initial_state("Kira")
+    client = TestClient(server.app)
+
+    first = client.get(f"/api/state/{session_id}")
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.json()["character"]["name"] == "Kira"
+    assert "serialize;dur=" in first.headers["server-timing"]
+
+    unchanged = client.get(f"/api/state/{session_id}", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304 and unchanged.content == b""
+
+    server.SESSIONS[session_id]["world"].current_location = "Iron Drift"
+    delta = client.get(f"/api/state/{session_id}", params={"since": etag}).json()
+    assert delta["state_base"] == etag and delta["state_version"] == 2
+    assert delta["state_patch"] == [{"op": "replace", "path": "/world/current_location", "value": "Iron Drift"}]
+    assert apply_patch(first.json(), delta["state_patch"]) == client.get(f"/api/state/{session_id}").json()
+
+    unknown = client.get(f"/api/state/{session_id}", params={"since": '"unknown"'}).json()
+    assert unknown["state"]["world"]["current_location"] == "Iron Drift" and "state_patch" not in unknown
+
+    payloads = client.get("/api/metrics/runtime").json()["payloads"]["state"]
+    assert {"full", "delta", "not_modified"} <= set(payloads["responses"])
+    del server.SESSIONS[session_id]
+
+
+def test_chat_returns_a_patch_when_the_client_sends_its_version(monkeypatch):
+    async def fake_narrative(**kwargs):
+        return f"Narrated: {kwargs['player_input']}"
+
+    async def no_image(location, narrative, time_of_day, weather):
+        return None
+
+    monkeypatch.setattr(server, "agenerate_narrative", fake_narrative)
+    monkeypatch.setattr(server, "_render_scene_image", no_image)
+    monkeypatch.setattr(DirectorAgent, "analyze", lambda self, **kwargs: DirectorPlan(pacing=Pacing.FAST))
+    monkeypatch.setattr(server.config.narrative, "speculation_enabled", False)
+    server.SESSIONS["delta-chat"] = create_initial_state("Kira")
+
+    async def turn(action, since=None):
+        response = await server.chat(server.ActionRequest(session_id="delta-chat", action=action, since=since))
+        return json.loads(response.body)
+
+    full = asyncio.run(turn("I open the hatch"))
+    delta = asyncio.run(turn("I step through", since=full["state_etag"]))
+
+    assert full["narrative"] == "Narrated: I open the hatch" and "state" in full
+    assert "state" not in delta and delta["state_version"] == full["state_version"] + 1
+    patched = apply_patch(full["state"], delta["state_patch"])
+    assert patched["narrative"]["pending_narrative"] == "Narrated: I step through"
+    assert StateVersions.encode(patched)[2] == delta["state_etag"]
+    assert server.PAYLOADS.stats()["chat"]["responses"]["delta"] >= 1
+    del server.SESSIONS["delta-chat"]
+
+
+def test_benchmark_delta_is_smaller_late_in_a_session():
+    results = run_benchmark(turns=40, measure=5)
+
+    assert results["delta"]["bytes"]["mean"] < results["full"]["bytes"]["mean"] / 4
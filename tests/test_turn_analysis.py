@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+from scripts.benchmark_turn_analysis import run_benchmark
+from src.director import DirectorAgent, Pacing, Tone
+from src.llm_provider import LLMCapabilities, LLMProvider
+from src.memory import MemoryManager, extract_entities
+from src.provider_health import StaticHealthMonitor, set_health_monitor
+from src.smart_event_detection import EventType, SmartEventDetector
+from src import server
+from src.game_state import create_initial_state
+from src.turn_analysis import SECTIONS, TurnAnalyzer, set_turn_analyzer, turn_analysis_schema
+
+NARRATIVE = (
+    "Kira Vance levels her pistol at the Raider Captain aboard the Iron Drift. "
+    "The shot echoes; the captain falls and does not rise. Kira pockets his data chip."
+)
+
+FULL_REPLY = {
+    "summary": "Kira kills the Raider Captain on the Iron Drift and takes his data chip.",
+    "entities": [
+        {"type": "NPC", "name": "Raider Captain", "description": "Raider leader"},
+        {"type": "location", "name": "Iron Drift", "description": "Derelict hulk"},
+    ],
+    "events": [
+        {"type": "kill", "description": "Kira shot the captain", "entities": ["Raider Captain"], "severity": 0.8, "priority": 7},
+    ],
+    "director": {"pacing": "slow", "tone": "melancholic", "beats": ["The raiders want revenge"], "notes_for_narrator": "Let it land."},
+}
+
+
+class ScriptedProvider(LLMProvider):
+    """Answers chat_json from a reply function and records every request."""
+
+    def __init__(self, reply):
+        self._reply = reply
+        self.requests = []
+
+    def chat(self, messages, temperature=0.7, max_tokens=1024, stream=False):  # noqa: ARG002
+        raise AssertionError("side analyses must use chat_json")
+
+    def chat_json(self, messages, schema, temperature=0.3, max_tokens=1024):  # noqa: ARG002
+        sections = tuple(schema["properties"])
+        self.requests.append(sections)
+        return self._reply(sections)
+
+    def is_available(self) -> bool:
+        return True
+
+    @property
+    def name(self) -> str:
+        return "scripted"
+
+    def capabilities(self) -> LLMCapabilities:
+        return LLMCapabilities(max_output_tokens=1024, safety_features=[], cost_per_1k_tokens=0.0)
+
+
+@pytest.fixture(autouse=True)
+def static_health():
+    set_health_monitor(StaticHealthMonitor(online=True))
+    yield
+    set_health_monitor(None)
+    set_turn_analyzer(None)
+
+
+def test_all_sections_come_from_one_request_and_fan_out():
+    provider = ScriptedProvider(lambda sections: json.dumps({name: FULL_REPLY[name] for name in sections}))
+    analyzer = TurnAnalyzer(provider, sections=SECTIONS)
+
+    analysis = analyzer.analyze(NARRATIVE, location="Iron Drift", active_npcs=["Raider Captain"])
+
+    assert provider.requests == [("summary", "entities", "events", "director")]
+    assert analysis.calls == 1
+    assert analyzer.cached(NARRATIVE) is analysis
+    assert analyzer.analyze(NARRATIVE) is analysis and len(provider.requests) == 1
+
+    events = SmartEventDetector(llm_provider=provider).detect_events(NARRATIVE, location="Iron Drift", analysis=analysis)
+    assert [e.event_type for e in events] == [EventType.KILL]
+    assert events[0].location == "Iron Drift"
+
+    assert MemoryManager(_client=None).summarize_scene(NARRATIVE * 2, analysis=analysis) == FULL_REPLY["summary"]
+    assert [e["type"] for e in extract_entities(NARRATIVE, client=object(), analysis=analysis)] == ["NPC", "LOCATION"]
+
+    plan = DirectorAgent(_client=None)._llm_analyze({}, "", "", analysis)
+    assert (plan.pacing, plan.tone) == (Pacing.SLOW, Tone.MELANCHOLIC)
+    assert len(provider.requests) == 1
+
+
+def test_malformed_sections_are_rerequested_separately():
+    def reply(sections):
+        if len(sections) > 1:
+            # Merged reply with a bad director section and no entities
+            return json.dumps({"summary": FULL_REPLY["summary"], "events": [], "director": {"pacing": "frantic"}})
+        return json.dumps({sections[0]: FULL_REPLY[sections[0]]})
+
+    provider = ScriptedProvider(reply)
+    analysis = TurnAnalyzer(provider, sections=SECTIONS).analyze(NARRATIVE)
+
+    assert provider.requests[0] == ("summary", "entities", "events", "director")
+    assert sorted(provider.requests[1:]) == [("director",), ("entities",)]
+    assert analysis.calls == 3
+    assert analysis.events == []
+    assert analysis.director["tone"] == "melancholic"
+    assert [e["name"] for e in analysis.entities] == ["Raider Captain", "Iron Drift"]
+
+
+def test_unreachable_provider_leaves_sections_to_their_fallbacks():
+    set_health_monitor(StaticHealthMonitor(online=True, available=False))
+    provider = ScriptedProvider(lambda sections: "{}")
+
+    analysis = TurnAnalyzer(provider).analyze(NARRATIVE)
+
+    assert provider.requests == []
+    assert analysis.summary is None and analysis.events is None
+    assert MemoryManager(_client=None).summarize_scene(NARRATIVE * 3, analysis=analysis).endswith("...")
+
+
+def test_director_reuses_cached_analysis_of_previous_narrative():
+    provider = ScriptedProvider(lambda sections: json.dumps({name: FULL_REPLY[name] for name in sections}))
+    analyzer = TurnAnalyzer(provider)
+    set_turn_analyzer(analyzer)
+    analyzer.analyze(NARRATIVE)
+
+    class NoCallClient:
+        def chat(self, **kwargs):
+            raise AssertionError("director should reuse the turn analysis")
+
+    director = DirectorAgent(_client=NoCallClient())
+    plan = director.analyze(world_state={}, session_history=NARRATIVE)
+
+    assert "The raiders want revenge" in plan.beats
+    assert len(provider.requests) == 1
+
+
+def test_summary_and_entities_are_opt_in():
+    provider = ScriptedProvider(lambda sections: json.dumps({name: FULL_REPLY[name] for name in sections}))
+
+    analysis = TurnAnalyzer(provider).analyze(NARRATIVE)
+
+    assert provider.requests == [("events", "director")]
+    assert analysis.summary is None and analysis.entities is None
+    assert MemoryManager(_client=None).summarize_scene(NARRATIVE * 3, analysis=analysis).endswith("...")
+
+
+def test_server_director_consumes_the_turn_analysis(monkeypatch):
+    provider = ScriptedProvider(lambda sections: json.dumps({name: FULL_REPLY[name] for name in sections}))
+    set_turn_analyzer(TurnAnalyzer(provider))
+    state = create_initial_state("Kira")
+    state["narrative"].pending_narrative = NARRATIVE
+
+    class NoCallClient:
+        def chat(self, **kwargs):
+            raise AssertionError("director should use the turn analysis")
+
+    original_init = DirectorAgent.__init__
+    monkeypatch.setattr(DirectorAgent, "__init__", lambda self, **kwargs: original_init(self, _client=NoCallClient()))
+    first = server._prepare_chat_turn(state)
+    again = server._prepare_chat_turn(state)  # A re-prepared turn hits the cache
+
+    assert "The raiders want revenge" in first.director_plan.beats
+    assert "The raiders want revenge" in again.director_plan.beats
+    assert provider.requests == [("director",)]
+
+
+def test_schema_only_lists_requested_sections():
+    schema = turn_analysis_schema(("summary", "events"))
+    assert schema["required"] == ["summary", "events"]
+    assert "kill" in schema["properties"]["events"]["items"]["properties"]["type"]["enum"]
+
+
+def test_benchmark_reports_fewer_calls_and_less_time():
+    results = run_benchmark(turns=3)
+
+    assert results["legacy"]["calls"] == 6
+    assert results["merged"]["calls"] == 3
+    assert results["merged"]["est_ms"] < results["legacy"]["est_ms"]